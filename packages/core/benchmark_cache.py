@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+TTLRUCache Benchmark
+
+Measures get/set/get_many throughput of ``monkey_coder.cache.base.TTLRUCache``
+on caches pre-filled to 1k, 100k and 1M entries, and compares it with the
+previous implementation that scanned every entry for expired items on each
+operation (run at fewer operations and only up to ``--legacy-max`` entries,
+since its cost grows with cache size).
+
+Usage::
+
+    python benchmark_cache.py --sizes 1000,100000,1000000 --ops 20000 --output cache.json
+"""
+
+import argparse
+import json
+import random
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from monkey_coder.cache.base import CacheEntry, TTLRUCache
+
+
+class LegacyTTLRUCache:
+    """The pre-heap TTLRUCache: purges expired entries with a full scan on every call."""
+
+    def __init__(self, max_entries: int = 256, default_ttl: float = 60.0):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._store: "OrderedDict[str, CacheEntry]" = OrderedDict()
+
+    def _purge_expired(self):
+        now = time.time()
+        to_delete = [k for k, v in self._store.items() if v.expires_at < now]
+        for k in to_delete:
+            self._store.pop(k, None)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        self._purge_expired()
+        ttl = self.default_ttl if ttl is None else ttl
+        self._store.pop(key, None)
+        self._store[key] = CacheEntry(value=value, expires_at=time.time() + ttl, created_at=time.time())
+        while len(self._store) > self.max_entries:
+            self._store.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Any]:
+        self._purge_expired()
+        entry = self._store.get(key)
+        if not entry or entry.expires_at < time.time():
+            return None
+        self._store.move_to_end(key, last=True)
+        return entry.value
+
+
+def _timed(fn, ops: int) -> float:
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    return ops / elapsed if elapsed else float("inf")
+
+
+def bench_cache(cache, size: int, ops: int, rng: random.Random, batch: bool) -> Dict[str, float]:
+    keys = [f"key-{i}" for i in range(size)]
+    if batch:
+        cache.set_many((key, {"v": i}) for i, key in enumerate(keys))
+    else:
+        # Filling through set() would be quadratic for the legacy cache; load its store directly
+        now = time.time()
+        for i, key in enumerate(keys):
+            cache._store[key] = CacheEntry(value={"v": i}, expires_at=now + cache.default_ttl, created_at=now)
+
+    lookups: List[str] = [keys[rng.randrange(size)] for _ in range(ops)]
+    writes: List[str] = [f"new-{i}" for i in range(ops)]
+
+    result = {
+        "get_ops_per_sec": _timed(lambda: [cache.get(k) for k in lookups], ops),
+        "set_ops_per_sec": _timed(lambda: [cache.set(k, {"v": 0}) for k in writes], ops),
+    }
+    if batch:
+        chunks = [lookups[i:i + 100] for i in range(0, ops, 100)]
+        result["get_many_keys_per_sec"] = _timed(lambda: [cache.get_many(c) for c in chunks], ops)
+    return result
+
+
+def run(sizes: List[int], ops: int, legacy_max: int, legacy_ops: int, seed: int) -> Dict[str, Any]:
+    results: Dict[str, Any] = {"config": {"sizes": sizes, "ops": ops, "legacy_ops": legacy_ops}, "results": []}
+    for size in sizes:
+        rng = random.Random(seed)
+        start = time.perf_counter()
+        current = bench_cache(TTLRUCache(max_entries=size, default_ttl=3600.0), size, ops, rng, batch=True)
+        entry: Dict[str, Any] = {"size": size, "heap": current, "fill_seconds": time.perf_counter() - start}
+        if size <= legacy_max:
+            legacy = bench_cache(LegacyTTLRUCache(max_entries=size, default_ttl=3600.0), size, legacy_ops, rng, batch=False)
+            entry["legacy_scan"] = legacy
+            entry["get_speedup"] = current["get_ops_per_sec"] / legacy["get_ops_per_sec"]
+        results["results"].append(entry)
+
+        line = f"{size:>9,} entries  get {current['get_ops_per_sec']:>12,.0f}/s  set {current['set_ops_per_sec']:>12,.0f}/s"
+        line += f"  get_many {current['get_many_keys_per_sec']:>12,.0f} keys/s"
+        if "legacy_scan" in entry:
+            line += f"  | legacy get {entry['legacy_scan']['get_ops_per_sec']:>10,.0f}/s ({entry['get_speedup']:.0f}x)"
+        print(line)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark TTLRUCache at several sizes")
+    parser.add_argument("--sizes", default="1000,100000,1000000", help="comma-separated entry counts")
+    parser.add_argument("--ops", type=int, default=20000, help="operations per measurement")
+    parser.add_argument("--legacy-max", type=int, default=100000, help="largest size to run the legacy cache at")
+    parser.add_argument("--legacy-ops", type=int, default=200, help="operations per legacy measurement")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    results = run(sizes, args.ops, args.legacy_max, args.legacy_ops, args.seed)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
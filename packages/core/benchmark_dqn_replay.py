@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+DQN Replay Benchmark
+
+Measures ``DQNRoutingAgent.replay`` training steps per second on the NumPy
+network backend, comparing the minibatch path (one target forward pass, one
+online forward pass and one gradient step per replay) with the previous
+per-transition loop (two forward passes and one single-sample gradient step
+for every sampled transition).
+
+Usage::
+
+    python benchmark_dqn_replay.py --batch-sizes 32,64,128 --steps 200 --output replay.json
+"""
+
+import argparse
+import json
+import random
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+from monkey_coder.quantum.dqn_agent import DQNRoutingAgent
+from monkey_coder.quantum.neural_network import NumpyDQNNetwork
+
+
+def legacy_replay(agent: DQNRoutingAgent) -> float:
+    """The pre-minibatch replay loop, one transition at a time."""
+    minibatch = random.sample(agent.memory, agent.batch_size)
+    total_loss = 0.0
+    for state, action, reward, next_state, done in minibatch:
+        target = reward
+        if not done:
+            next_q_values = agent.q_network.predict_target(next_state.reshape(1, -1))
+            target += agent.discount_factor * np.amax(next_q_values[0])
+        current_q_values = agent.q_network.predict(state.reshape(1, -1))
+        current_q_values[0][action] = target
+        total_loss += float(agent.q_network.train(state.reshape(1, -1), current_q_values))
+    agent.training_step += 1
+    if agent.training_step % agent.target_update_frequency == 0:
+        agent.update_target_network()
+    return total_loss / agent.batch_size
+
+
+def make_agent(batch_size: int, memory: int, seed: int, **kwargs) -> DQNRoutingAgent:
+    agent = DQNRoutingAgent(memory_size=memory, batch_size=batch_size, random_seed=seed, **kwargs)
+    agent.q_network = agent.target_q_network = NumpyDQNNetwork(agent.state_size, agent.action_size)
+    rng = np.random.default_rng(seed)
+    for i in range(memory):
+        agent.memory.append((
+            rng.random(agent.state_size),
+            int(rng.integers(agent.action_size)),
+            float(rng.normal()),
+            rng.random(agent.state_size),
+            i % 20 == 19,
+        ))
+    return agent
+
+
+def _steps_per_sec(step, steps: int) -> float:
+    start = time.perf_counter()
+    for _ in range(steps):
+        step()
+    return steps / (time.perf_counter() - start)
+
+
+def run(batch_sizes: List[int], steps: int, memory: int, seed: int) -> Dict[str, Any]:
+    results: Dict[str, Any] = {"config": {"steps": steps, "memory": memory, "backend": "numpy"}, "results": []}
+    for batch_size in batch_sizes:
+        legacy_agent = make_agent(batch_size, memory, seed)
+        legacy = _steps_per_sec(lambda: legacy_replay(legacy_agent), steps)
+        batched_agent = make_agent(batch_size, memory, seed)
+        batched = _steps_per_sec(batched_agent.replay, steps)
+        double_agent = make_agent(batch_size, memory, seed, double_dqn=True, loss="huber")
+        double = _steps_per_sec(double_agent.replay, steps)
+
+        entry = {
+            "batch_size": batch_size,
+            "legacy_steps_per_sec": legacy,
+            "batched_steps_per_sec": batched,
+            "double_huber_steps_per_sec": double,
+            "speedup": batched / legacy,
+        }
+        results["results"].append(entry)
+        print(
+            f"batch {batch_size:>4}  per-sample {legacy:>9,.1f} steps/s  "
+            f"minibatch {batched:>9,.1f} steps/s ({entry['speedup']:.1f}x)  "
+            f"double+huber {double:>9,.1f} steps/s"
+        )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark DQN replay on the NumPy backend")
+    parser.add_argument("--batch-sizes", default="32,64,128", help="comma-separated minibatch sizes")
+    parser.add_argument("--steps", type=int, default=200, help="replay steps per measurement")
+    parser.add_argument("--memory", type=int, default=5000, help="transitions in the replay buffer")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    batch_sizes = [int(s) for s in args.batch_sizes.split(",") if s]
+    results = run(batch_sizes, args.steps, args.memory, args.seed)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Startup Import-Time Benchmark
+
+Imports each target module in a fresh interpreter under ``python -X
+importtime`` and reports its cumulative import time, peak RSS, the
+packages that contribute most to it, and which heavy ML stacks
+(``monkey_coder.utils.lazy_imports.HEAVY_MODULES``: TensorFlow, torch,
+sentence-transformers, tiktoken, transformers) ended up imported.
+
+With ``--budget-ms`` the script exits with status 1 when a target's median
+import time exceeds the budget or any heavy module is imported at startup,
+so CI can assert on it::
+
+    python benchmark_import_time.py --budget-ms 3000 --output import_time.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Any, Dict, List, Tuple
+
+from monkey_coder.utils.lazy_imports import HEAVY_MODULES
+
+DEFAULT_TARGETS = "monkey_coder.quantum,monkey_coder.context,monkey_coder.app.main"
+
+_PROBE = (
+    "import json, resource, sys\n"
+    "import {target}\n"
+    "heavy = {heavy!r}\n"
+    "print(json.dumps({{'loaded': [m for m in heavy if m in sys.modules],"
+    " 'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}}))\n"
+)
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int, int]]:
+    """
+    Parse ``-X importtime`` output.
+
+    Returns:
+        (module, self_us, cumulative_us, depth) per imported module, in
+        completion order; depth 0 is a top-level import
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # header line
+        name = fields[2].rstrip()
+        stripped = name.lstrip()
+        depth = (len(name) - len(stripped) - 1) // 2
+        entries.append((stripped, int(fields[0]), int(fields[1]), depth))
+    return entries
+
+
+def measure(target: str) -> Dict[str, Any]:
+    """Import ``target`` once in a fresh interpreter."""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    probe = _PROBE.format(target=target, heavy=tuple(HEAVY_MODULES))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        capture_output=True, text=True, env=env, check=False,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {target} failed:\n{proc.stderr[-2000:]}")
+    entries = parse_importtime(proc.stderr)
+    probe_result = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    cumulative_us = next((c for name, _, c, depth in reversed(entries) if name == target and depth == 0), None)
+    if cumulative_us is None:
+        cumulative_us = sum(c for _, _, c, depth in entries if depth == 0)
+    by_package: Dict[str, int] = defaultdict(int)
+    for name, self_us, _, _ in entries:
+        by_package[name.partition(".")[0]] += self_us
+    return {
+        "import_ms": cumulative_us / 1000,
+        "modules": len(entries),
+        "max_rss_mb": probe_result["max_rss_kb"] / 1024,
+        "heavy_loaded": probe_result["loaded"],
+        "by_package_ms": {k: v / 1000 for k, v in by_package.items()},
+    }
+
+
+def run(targets: List[str], repeat: int, top: int) -> Dict[str, Any]:
+    results: Dict[str, Any] = {"config": {"repeat": repeat, "python": sys.version.split()[0]}, "results": []}
+    for target in targets:
+        runs = [measure(target) for _ in range(repeat)]
+        median = statistics.median(r["import_ms"] for r in runs)
+        last = runs[-1]
+        packages = sorted(last["by_package_ms"].items(), key=lambda item: item[1], reverse=True)[:top]
+        entry = {
+            "target": target,
+            "import_ms_median": median,
+            "import_ms_min": min(r["import_ms"] for r in runs),
+            "modules": last["modules"],
+            "max_rss_mb": max(r["max_rss_mb"] for r in runs),
+            "heavy_loaded": sorted({m for r in runs for m in r["heavy_loaded"]}),
+            "top_packages_ms": dict(packages),
+        }
+        results["results"].append(entry)
+        print(f"{target:<28} median {median:8.1f} ms  rss {entry['max_rss_mb']:6.1f} MB  "
+              f"{entry['modules']:>5} modules  heavy: {', '.join(entry['heavy_loaded']) or 'none'}")
+        print("    " + "  ".join(f"{name} {ms:.0f}ms" for name, ms in packages))
+    return results
+
+
+def check_budget(results: Dict[str, Any], budget_ms: float) -> List[str]:
+    """Budget violations: slow targets and heavy modules imported at startup."""
+    failures = []
+    for entry in results["results"]:
+        if entry["import_ms_median"] > budget_ms:
+            failures.append(f"{entry['target']} imports in {entry['import_ms_median']:.0f} ms (budget {budget_ms:.0f} ms)")
+        if entry["heavy_loaded"]:
+            failures.append(f"{entry['target']} imports {', '.join(entry['heavy_loaded'])} at startup")
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark startup import time")
+    parser.add_argument("--targets", default=DEFAULT_TARGETS, help="comma-separated modules to import")
+    parser.add_argument("--repeat", type=int, default=3, help="fresh interpreters per target")
+    parser.add_argument("--top", type=int, default=8, help="packages to list per target")
+    parser.add_argument("--budget-ms", type=float, help="fail if a target's median import time exceeds this")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    targets = [t for t in args.targets.split(",") if t]
+    results = run(targets, args.repeat, args.top)
+    failures = check_budget(results, args.budget_ms) if args.budget_ms is not None else []
+    results["budget_ms"] = args.budget_ms
+    results["failures"] = failures
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Q-Network Inference Benchmark
+
+Per-decision latency of the routing Q-network: ``NumpyDQNNetwork.predict``
+(the training forward pass, which keeps every layer's output for backprop)
+against ``quantum.inference.CompiledQNetwork`` (float32 snapshot, fused
+forward pass into reused scratch buffers), for one state and for small
+batches, on the default agent network and on the 552/276 standard
+architecture. Also reports the time to compile a snapshot, which the agent
+pays once per training step, and whether TensorFlow was imported.
+
+Usage::
+
+    python benchmark_inference.py --iterations 20000 --batch-sizes 1,8,32 --output inference.json
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+from monkey_coder.quantum.inference import CompiledQNetwork
+from monkey_coder.quantum.neural_network import NumpyDQNNetwork
+from monkey_coder.quantum.prediction_constants import PREDICTION_HIDDEN_DIM
+
+ARCHITECTURES = {
+    "agent_21x64x32x12": (21, (64, 32), 12),
+    "standard_112x552x276x12": (112, (PREDICTION_HIDDEN_DIM, PREDICTION_HIDDEN_DIM // 2), 12),
+}
+
+
+def _us_per_call(fn: Callable[[int], Any], iterations: int) -> float:
+    start = time.perf_counter()
+    for i in range(iterations):
+        fn(i)
+    return (time.perf_counter() - start) * 1e6 / iterations
+
+
+def run(iterations: int, batch_sizes: List[int], seed: int) -> Dict[str, Any]:
+    rng = np.random.default_rng(seed)
+    results: Dict[str, Any] = {"config": {"iterations": iterations}, "results": []}
+
+    for name, (state_size, hidden, action_size) in ARCHITECTURES.items():
+        network = NumpyDQNNetwork(state_size, action_size, hidden_layers=hidden)
+        engine = CompiledQNetwork.from_network(network, max_batch=max(batch_sizes))
+        states = rng.normal(size=(256, state_size))
+        n = len(states)
+
+        np.testing.assert_allclose(engine.predict(states[:8]), network.predict(states[:8]), rtol=1e-3, atol=1e-4)
+        entry: Dict[str, Any] = {
+            "network": name,
+            "compile_us": _us_per_call(lambda i: CompiledQNetwork.from_network(network), max(1, iterations // 100)),
+            "per_decision_us": {},
+        }
+        for size in batch_sizes:
+            rounds = max(1, iterations // size)
+            if size == 1:
+                numpy_us = _us_per_call(lambda i: network.predict(states[i % n]), rounds)
+                compiled_us = _us_per_call(lambda i: engine.predict(states[i % n]), rounds)
+            else:
+                batch = states[:size]
+                numpy_us = _us_per_call(lambda i: network.predict(batch), rounds) / size
+                compiled_us = _us_per_call(lambda i: engine.predict(batch), rounds) / size
+            entry["per_decision_us"][str(size)] = {"numpy_predict": numpy_us, "compiled": compiled_us}
+            print(f"{name:<26} batch {size:>3}  numpy predict {numpy_us:7.2f} us  "
+                  f"compiled {compiled_us:7.2f} us  ({numpy_us / compiled_us:.1f}x)")
+        print(f"{name:<26} compile {entry['compile_us']:.1f} us")
+        results["results"].append(entry)
+
+    results["tensorflow_imported"] = "tensorflow" in sys.modules
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark compiled Q-network inference")
+    parser.add_argument("--iterations", type=int, default=20000, help="decisions per measurement")
+    parser.add_argument("--batch-sizes", default="1,8,32", help="comma-separated batch sizes")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    batch_sizes = [int(s) for s in args.batch_sizes.split(",") if s]
+    results = run(args.iterations, batch_sizes, args.seed)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Keyword Matcher Benchmark
+
+Compares the compiled single-pass ``KeywordMatcher`` with naive per-keyword
+scans (one ``kw in prompt`` plus word-boundary ``re.search`` calls per
+vocabulary keyword, which is how the router analysed prompts before the
+matcher existed):
+
+- scan: time to build the hit table for prompts of ``--words`` words
+- routing: ``AdvancedRouter.route_request`` per prompt with either matcher
+
+It also checks that routing is unchanged: every prompt of the corpus is
+routed by a router using the compiled matcher and by one using the naive
+scans, and any difference in provider, model, persona, complexity or
+context is reported (the script exits non-zero if there is one). The
+corpus is ``--corpus`` (a JSONL file of requests in the
+``monkey_coder.core.batch_routing`` input format, e.g. the repo-root
+``requests.jsonl``) plus ``--random`` generated prompts.
+
+Usage::
+
+    python benchmark_keyword_matcher.py --corpus ../../requests.jsonl --random 500 --output keyword_matcher.json
+"""
+
+import argparse
+import json
+import random
+import re
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from monkey_coder.core.batch_routing import request_from_record
+from monkey_coder.core.keyword_matcher import (
+    ROUTING_KEYWORDS,
+    SUBSTRING,
+    WORD,
+    WORD_END,
+    WORD_START,
+    KeywordHits,
+    KeywordMatcher,
+)
+from monkey_coder.core.routing import AdvancedRouter
+from monkey_coder.models import ExecuteRequest
+
+VOCABULARY = sorted({kw for keywords in ROUTING_KEYWORDS.values() for kw in keywords})
+FILLER = "the service handles requests and returns data to the client".split()
+NOISE = ["the", "a", "of", "to", "detail", "fastest", "unittest", "retest", "classic", "authority", "/arch", "/sec"]
+
+
+class NaiveKeywordMatcher(KeywordMatcher):
+    """Builds the same hit table with separate scans per keyword."""
+
+    def __init__(self, vocabulary):
+        super().__init__(vocabulary)
+        self._searches = [
+            (
+                keyword,
+                re.compile(r'\b' + re.escape(keyword)).search,
+                re.compile(re.escape(keyword) + r'\b').search,
+                re.compile(r'\b' + re.escape(keyword) + r'\b').search,
+            )
+            for keyword in self._categories
+        ]
+
+    def _scan(self, text: str) -> KeywordHits:
+        flags: Dict[str, int] = {}
+        for keyword, starts, ends, word in self._searches:
+            if keyword not in text:
+                continue
+            occurrence = SUBSTRING
+            if starts(text):
+                occurrence |= WORD_START
+            if ends(text):
+                occurrence |= WORD_END
+            if word(text):
+                occurrence |= WORD
+            flags[keyword] = occurrence
+
+        category_counts: Dict[str, int] = {}
+        category_word_counts: Dict[str, int] = {}
+        for keyword, keyword_flags in flags.items():
+            for category in self._categories[keyword]:
+                category_counts[category] = category_counts.get(category, 0) + 1
+                if keyword_flags & WORD:
+                    category_word_counts[category] = category_word_counts.get(category, 0) + 1
+        return KeywordHits(text, flags, category_counts, category_word_counts)
+
+
+def random_prompt(rng: random.Random) -> str:
+    words = [rng.choice(VOCABULARY if rng.random() < 0.4 else NOISE) for _ in range(rng.randint(1, 60))]
+    return rng.choice([" ", "-", ". "]).join(words)
+
+
+def long_prompt(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(FILLER) for _ in range(words)) + " design a secure pipeline"
+
+
+def load_corpus(path: Optional[str], count: int, seed: int) -> List[ExecuteRequest]:
+    requests = []
+    if path:
+        with open(path, encoding="utf-8") as f:
+            requests.extend(request_from_record(json.loads(line)) for line in f if line.strip())
+    rng = random.Random(seed)
+    requests.extend(request_from_record({"prompt": random_prompt(rng)}) for _ in range(count))
+    return requests
+
+
+def router_with(matcher: KeywordMatcher) -> AdvancedRouter:
+    router = AdvancedRouter(enable_cache=False)
+    router.keyword_matcher = matcher
+    return router
+
+
+def summary(decision) -> Dict[str, Any]:
+    return {
+        "provider": decision.provider.value,
+        "model": decision.model,
+        "persona": decision.persona.value,
+        "complexity_score": decision.complexity_score,
+        "context_type": decision.metadata.get("context_type"),
+    }
+
+
+def time_per_call(fn: Callable[[Any], Any], items: List[Any], repeats: int) -> float:
+    """Median seconds per call over ``repeats`` passes through ``items``."""
+    runs = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for item in items:
+            fn(item)
+        runs.append((time.perf_counter() - start) / len(items))
+    return statistics.median(runs)
+
+
+def check_decisions(requests: List[ExecuteRequest]) -> List[Dict[str, Any]]:
+    compiled = router_with(KeywordMatcher(ROUTING_KEYWORDS))
+    naive = router_with(NaiveKeywordMatcher(ROUTING_KEYWORDS))
+    mismatches = []
+    for request in requests:
+        expected = summary(naive.route_request(request))
+        actual = summary(compiled.route_request(request))
+        if actual != expected:
+            mismatches.append({"prompt": request.prompt[:120], "naive": expected, "compiled": actual})
+    return mismatches
+
+
+def run(args) -> Dict[str, Any]:
+    requests = load_corpus(args.corpus, args.random, args.seed)
+    mismatches = check_decisions(requests)
+    print(f"decisions       {len(requests) - len(mismatches)}/{len(requests)} unchanged")
+    for mismatch in mismatches[:10]:
+        print(f"  changed: {mismatch['prompt']!r}: {mismatch['naive']} -> {mismatch['compiled']}")
+
+    rng = random.Random(args.seed)
+    texts = [long_prompt(rng, args.words).lower() for _ in range(args.prompts)]
+    # Fresh matchers without memoisation so every call scans
+    scans = {
+        "naive": NaiveKeywordMatcher(ROUTING_KEYWORDS)._scan,
+        "compiled": KeywordMatcher(ROUTING_KEYWORDS)._scan,
+    }
+    scan_ms = {name: time_per_call(scan, texts, args.repeats) * 1000 for name, scan in scans.items()}
+    print(f"scan            naive {scan_ms['naive']:8.3f} ms  compiled {scan_ms['compiled']:8.3f} ms  "
+          f"({args.words}-word prompts, {scan_ms['naive'] / scan_ms['compiled']:.1f}x)")
+
+    long_requests = [request_from_record({"prompt": text}) for text in texts]
+    routers = {
+        "naive": router_with(NaiveKeywordMatcher(ROUTING_KEYWORDS)),
+        "compiled": router_with(KeywordMatcher(ROUTING_KEYWORDS)),
+    }
+    route_ms = {
+        name: time_per_call(router.route_request, long_requests, args.repeats) * 1000
+        for name, router in routers.items()
+    }
+    print(f"route_request   naive {route_ms['naive']:8.3f} ms  compiled {route_ms['compiled']:8.3f} ms  "
+          f"({route_ms['naive'] / route_ms['compiled']:.1f}x)")
+
+    return {
+        "config": {
+            "corpus": args.corpus,
+            "random": args.random,
+            "words": args.words,
+            "prompts": args.prompts,
+            "repeats": args.repeats,
+        },
+        "decisions": {"checked": len(requests), "changed": len(mismatches), "mismatches": mismatches},
+        "scan_ms": scan_ms,
+        "route_request_ms": route_ms,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the compiled routing keyword matcher")
+    parser.add_argument("--corpus", help="JSONL request file whose routing must be unchanged")
+    parser.add_argument("--random", type=int, default=500, help="random prompts added to the corpus")
+    parser.add_argument("--words", type=int, default=10000, help="words per long prompt for timing")
+    parser.add_argument("--prompts", type=int, default=20, help="long prompts to time")
+    parser.add_argument("--repeats", type=int, default=5, help="timing passes (median is reported)")
+    parser.add_argument("--seed", type=int, default=7, help="random seed")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if results["decisions"]["changed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
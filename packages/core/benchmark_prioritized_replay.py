@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Prioritized Replay Benchmark
+
+Compares sample + priority-update throughput of the sum-tree used by
+``PrioritizedExperienceBuffer`` and the DQL ``PrioritizedReplayBuffer``
+with the previous approach, which rebuilt and renormalised the full
+priority array (``np.array(priorities)`` then ``np.random.choice``) on
+every sample and updated priorities one deque index at a time.
+
+Usage::
+
+    python benchmark_prioritized_replay.py --capacities 100000,1000000 --batch-size 64 --output per.json
+"""
+
+import argparse
+import json
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+from monkey_coder.quantum.sum_tree import SumTree
+
+
+class LegacyPriorities:
+    """The pre-sum-tree sampling path over a deque of priorities."""
+
+    def __init__(self, priorities: np.ndarray, alpha: float, beta: float):
+        self.priorities = deque(priorities.tolist(), maxlen=len(priorities))
+        self.alpha = alpha
+        self.beta = beta
+
+    def step(self, batch_size: int, rng: np.random.Generator) -> None:
+        priorities = np.array(self.priorities, dtype=np.float32)
+        probs = priorities ** self.alpha
+        probs /= probs.sum()
+        indices = np.random.choice(len(self.priorities), batch_size, p=probs)
+        weights = (len(self.priorities) * probs[indices]) ** (-self.beta)
+        weights /= weights.max()
+        for idx, priority in zip(indices, rng.random(batch_size) + 1e-6, strict=True):
+            self.priorities[idx] = priority
+
+
+class TreePriorities:
+    """Sum-tree sampling, min-normalised weights and a batched update."""
+
+    def __init__(self, priorities: np.ndarray, alpha: float, beta: float):
+        self.tree = SumTree(len(priorities))
+        self.tree.update(np.arange(len(priorities)), priorities ** alpha)
+        self.alpha = alpha
+        self.beta = beta
+
+    def step(self, batch_size: int, rng: np.random.Generator) -> None:
+        indices, scaled = self.tree.sample(batch_size, rng)
+        # Computed (as the buffer's sample() does) so it is part of the measured work
+        _ = (scaled / self.tree.min) ** (-self.beta)
+        self.tree.update(indices, (rng.random(batch_size) + 1e-6) ** self.alpha)
+
+
+def _steps_per_sec(step: Callable[[], None], min_seconds: float) -> float:
+    steps = 0
+    start = time.perf_counter()
+    while True:
+        step()
+        steps += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return steps / elapsed
+
+
+def run(capacities: List[int], batch_size: int, alpha: float, beta: float, seconds: float, seed: int) -> Dict[str, Any]:
+    results: Dict[str, Any] = {"config": {"batch_size": batch_size, "alpha": alpha, "beta": beta}, "results": []}
+    for capacity in capacities:
+        rng = np.random.default_rng(seed)
+        priorities = rng.random(capacity) + 1e-6
+
+        legacy = LegacyPriorities(priorities, alpha, beta)
+        legacy_rate = _steps_per_sec(lambda legacy=legacy, rng=rng: legacy.step(batch_size, rng), seconds)
+
+        tree = TreePriorities(priorities, alpha, beta)
+        tree_rate = _steps_per_sec(lambda tree=tree, rng=rng: tree.step(batch_size, rng), seconds)
+
+        # Single-transition insertion cost (what add() pays)
+        slots = rng.integers(capacity, size=20000)
+        start = time.perf_counter()
+        for slot in slots.tolist():
+            tree.tree.update(slot, 1.0)
+        add_us = (time.perf_counter() - start) / len(slots) * 1e6
+
+        entry = {
+            "capacity": capacity,
+            "legacy_steps_per_sec": legacy_rate,
+            "sum_tree_steps_per_sec": tree_rate,
+            "speedup": tree_rate / legacy_rate,
+            "sum_tree_add_us": add_us,
+        }
+        results["results"].append(entry)
+        print(
+            f"capacity {capacity:>9,}  sample+update steps/s {legacy_rate:>9,.1f} -> {tree_rate:>9,.1f} "
+            f"({entry['speedup']:,.0f}x)  add {add_us:.1f}us"
+        )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark prioritized replay sampling")
+    parser.add_argument("--capacities", default="100000,1000000", help="comma-separated buffer capacities")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--alpha", type=float, default=0.6)
+    parser.add_argument("--beta", type=float, default=0.4)
+    parser.add_argument("--seconds", type=float, default=2.0, help="minimum time per measurement")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    capacities = [int(s) for s in args.capacities.split(",") if s]
+    results = run(capacities, args.batch_size, args.alpha, args.beta, args.seconds, args.seed)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
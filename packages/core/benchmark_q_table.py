@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Q-Table Benchmark
+
+Compares the ``QLearningRouter`` Q-store (``quantum.q_table.CompactQTable``:
+interned keys, dense NumPy matrix, npz snapshots with incremental deltas)
+with the previous nested-dict table saved as indented JSON, on tables of
+several sizes (entries = states x actions per state). Reports the greedy
+lookup for a state key (and, for the new store, the whole ``select_action``
+call including ``State.to_tuple``), full save / load time, snapshot size,
+and the time of an incremental save after a few updates.
+
+Usage::
+
+    python benchmark_q_table.py --entries 100000,1000000,3000000 --output q_table.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+from monkey_coder.quantum.q_learning import QLearningRouter, State
+
+TASK_TYPES = ['code_generation', 'analysis', 'testing', 'custom', 'documentation']
+DOMAINS = ['frontend', 'backend', 'infrastructure', 'security', 'general']
+
+
+def make_states(count: int, rng: np.random.Generator) -> List[State]:
+    """Distinct states (complexity and context buckets vary fastest)."""
+    states = []
+    for i in range(count):
+        states.append(State(
+            task_type=TASK_TYPES[i % 5],
+            complexity=(i // 5) % 11 / 10,
+            domain=DOMAINS[(i // 55) % 5],
+            persona='developer',
+            context_size=((i // 275) % 33) * 1000,
+            urgency=(i // 9075) % 11 / 10,
+            quality_requirement=float(rng.integers(11)) / 10,
+        ))
+    return states
+
+
+class LegacyQStore:
+    """The nested defaultdict Q-table with max() lookups and indent-2 JSON snapshots."""
+
+    def __init__(self):
+        self.q_table = defaultdict(lambda: defaultdict(float))
+
+    def best(self, state_key):
+        if state_key not in self.q_table or not self.q_table[state_key]:
+            return None
+        return max(self.q_table[state_key].items(), key=lambda x: x[1])[0]
+
+    def save(self, path: Path) -> None:
+        q_table_dict = {}
+        for state_key, actions in self.q_table.items():
+            state_str = json.dumps(state_key)
+            q_table_dict[state_str] = {json.dumps(a): v for a, v in actions.items()}
+        with open(path, 'w') as f:
+            json.dump({'q_table': q_table_dict, 'epsilon': 0.1}, f, indent=2)
+
+    def load(self, path: Path) -> None:
+        with open(path) as f:
+            data = json.load(f)
+        for state_str, actions in data['q_table'].items():
+            state_key = tuple(json.loads(state_str))
+            for action_str, value in actions.items():
+                self.q_table[state_key][tuple(json.loads(action_str))] = value
+
+
+def _ms(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def bench_size(entries: int, actions_per_state: int, lookups: int, legacy: bool, seed: int) -> Dict[str, Any]:
+    rng = np.random.default_rng(seed)
+    workdir = Path(tempfile.mkdtemp(prefix="q_table_bench_"))
+    router = QLearningRouter(save_path=str(workdir / "q_table.npz"))
+    states = make_states(max(1, entries // actions_per_state), rng)
+    action_keys = [a.to_tuple() for a in router.action_space]
+
+    start = time.perf_counter()
+    for state in states:
+        key = state.to_tuple()
+        for action_id in rng.choice(len(action_keys), actions_per_state, replace=False):
+            router.q_table.set(key, action_keys[action_id], float(rng.normal()))
+    fill_seconds = time.perf_counter() - start
+
+    probe = [states[i] for i in rng.integers(len(states), size=lookups)]
+    keys = [s.to_tuple() for s in probe]
+    lookup_us = _ms(lambda: [router.q_table.best(k) for k in keys]) * 1000 / lookups
+    select_us = _ms(lambda: [router.select_action(s, explore=False) for s in probe]) * 1000 / lookups
+    save_ms = _ms(lambda: router.save_q_table(incremental=False))
+    for state in probe[:100]:
+        router.update_q_value(state, router.action_space[0], 1.0)
+    delta_ms = _ms(router.save_q_table)
+    load_ms = _ms(lambda: QLearningRouter(save_path=str(workdir / "q_table.npz")))
+
+    result: Dict[str, Any] = {
+        "entries": router.q_table.num_entries,
+        "states": len(router.q_table),
+        "fill_seconds": fill_seconds,
+        "compact": {
+            "greedy_lookup_us": lookup_us,
+            "select_action_us": select_us,
+            "save_ms": save_ms,
+            "incremental_save_ms": delta_ms,
+            "load_ms": load_ms,
+            "snapshot_bytes": sum(p.stat().st_size for p in workdir.glob("*.npz")),
+            "memory_bytes": router.q_table.memory_bytes(),
+        },
+    }
+
+    if legacy:
+        store = LegacyQStore()
+        for state_key, values in router.q_table.items():
+            store.q_table[state_key].update(values)
+        legacy_lookup_us = _ms(lambda: [store.best(k) for k in keys]) * 1000 / lookups
+        json_path = workdir / "q_table.json"
+        legacy_save_ms = _ms(lambda: store.save(json_path))
+        legacy_load_ms = _ms(lambda: LegacyQStore().load(json_path))
+        result["legacy"] = {
+            "greedy_lookup_us": legacy_lookup_us,
+            "save_ms": legacy_save_ms,
+            "load_ms": legacy_load_ms,
+            "snapshot_bytes": json_path.stat().st_size,
+        }
+
+    for path in workdir.iterdir():
+        os.remove(path)
+    workdir.rmdir()
+    return result
+
+
+def run(sizes: List[int], actions_per_state: int, lookups: int, legacy_max: int, seed: int) -> Dict[str, Any]:
+    results: Dict[str, Any] = {"config": {"actions_per_state": actions_per_state, "lookups": lookups}, "results": []}
+    for entries in sizes:
+        entry = bench_size(entries, actions_per_state, lookups, entries <= legacy_max, seed)
+        results["results"].append(entry)
+        compact = entry["compact"]
+        line = (
+            f"{entry['entries']:>10,} entries  lookup {compact['greedy_lookup_us']:5.1f} us  "
+            f"select_action {compact['select_action_us']:5.1f} us  "
+            f"save {compact['save_ms']:8.1f} ms  delta {compact['incremental_save_ms']:6.1f} ms  "
+            f"load {compact['load_ms']:8.1f} ms  {compact['snapshot_bytes'] / 1e6:7.1f} MB"
+        )
+        if "legacy" in entry:
+            old = entry["legacy"]
+            line += (
+                f"  | legacy lookup {old['greedy_lookup_us']:5.1f} us  save {old['save_ms']:9.1f} ms  "
+                f"load {old['load_ms']:9.1f} ms  {old['snapshot_bytes'] / 1e6:7.1f} MB"
+            )
+        print(line)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the Q-learning router's Q-table")
+    parser.add_argument("--entries", default="100000,1000000,3000000", help="comma-separated table sizes")
+    parser.add_argument("--actions-per-state", type=int, default=64, help="known actions per state")
+    parser.add_argument("--lookups", type=int, default=20000, help="select_action calls per measurement")
+    parser.add_argument("--legacy-max", type=int, default=1000000, help="largest size to run the JSON store at")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    sizes = [int(s) for s in args.entries.split(",") if s]
+    results = run(sizes, args.actions_per_state, args.lookups, args.legacy_max, args.seed)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
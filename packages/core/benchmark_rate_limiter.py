@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Rate Limiter Overhead Benchmark
+
+Runs ``--requests`` rate limit checks from ``--concurrency`` concurrent
+requests and reports per-check latency (p50/p99), Redis round-trips per
+check and how many requests were let through. Compares:
+
+- legacy: the previous check, a synchronous pipeline (ZREMRANGEBYSCORE +
+  ZCARD) then separate ZADD and EXPIRE calls, blocking the event loop
+- sliding_window: ``RedisRateLimiter`` with the atomic Lua sliding window
+- token_bucket: ``RedisRateLimiter`` in token bucket mode
+- fallback: the in-process limiter used while Redis is unreachable
+
+Uses fakeredis (with Lua support via ``lupa``) unless ``--redis-url`` is
+given. fakeredis interprets Lua in-process and has no network, so its
+latencies say nothing about production; only a real server shows the
+round-trip savings.
+
+Usage::
+
+    python benchmark_rate_limiter.py --requests 5000 --redis-url redis://localhost:6379 --output rate_limiter.json
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Any, Dict, List, Optional
+
+import redis
+import redis.asyncio as aioredis
+
+from monkey_coder.middleware.rate_limiter import RedisRateLimiter
+
+WINDOW_SECONDS = 60
+IPS = 100
+
+
+def clients(redis_url: Optional[str]):
+    """A (sync, async) client pair on the same data."""
+    if redis_url:
+        return redis.from_url(redis_url, decode_responses=True), aioredis.from_url(redis_url, decode_responses=True)
+    import fakeredis
+    server = fakeredis.FakeServer()
+    return (fakeredis.FakeRedis(server=server, decode_responses=True),
+            fakeredis.FakeAsyncRedis(server=server, decode_responses=True))
+
+
+def legacy_check(client, key: str, max_requests: int) -> bool:
+    """The check ``RedisRateLimiter`` made before the Lua script."""
+    now = time.time()
+    pipe = client.pipeline()
+    pipe.zremrangebyscore(key, 0, now - WINDOW_SECONDS)
+    pipe.zcard(key)
+    if pipe.execute()[1] >= max_requests:
+        return False
+    client.zadd(key, {str(now): now})
+    client.expire(key, WINDOW_SECONDS)
+    return True
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def drive(requests: int, concurrency: int, check) -> Dict[str, Any]:
+    latencies: List[float] = []
+    allowed = 0
+    counter = iter(range(requests))
+
+    async def client() -> None:
+        nonlocal allowed
+        for n in counter:
+            start = time.perf_counter()
+            ok = await check(f"10.0.0.{n % IPS}")
+            latencies.append(time.perf_counter() - start)
+            allowed += bool(ok)
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return {
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "allowed": allowed,
+    }
+
+
+async def measure(name: str, args) -> Dict[str, Any]:
+    sync_client, async_client = clients(args.redis_url)
+    await async_client.flushdb()
+    round_trips = 1.0
+
+    if name == "legacy":
+        async def check(ip):
+            return legacy_check(sync_client, f"rate_limit:{ip}:bench", args.max_requests)
+        # one pipeline, then ZADD and EXPIRE when the request is allowed
+        round_trips = None
+    else:
+        if name == "fallback":
+            async_client = aioredis.from_url("redis://127.0.0.1:1", socket_connect_timeout=0.2)
+            round_trips = 0.0
+        limiter = RedisRateLimiter(
+            client=async_client,
+            mode="token_bucket" if name == "token_bucket" else "sliding_window",
+            max_requests=args.max_requests,
+            window_seconds=WINDOW_SECONDS,
+        )
+        if name == "fallback":
+            await limiter.hit("warmup", "bench")  # trips the Redis backoff
+
+        async def check(ip):
+            return (await limiter.hit(ip, "bench")).allowed
+
+    result = await drive(args.requests, args.concurrency, check)
+    if round_trips is None:
+        round_trips = (args.requests + 2 * result["allowed"]) / args.requests
+    result = {"path": name, **result, "round_trips_per_check": round_trips}
+    print(f"{name:<15} p50 {result['p50_ms']:7.3f} ms  p99 {result['p99_ms']:7.3f} ms  "
+          f"{round_trips:4.2f} round-trips/check  {result['allowed']:>6} allowed")
+    return result
+
+
+def run(args) -> Dict[str, Any]:
+    results = [asyncio.run(measure(name, args)) for name in ("legacy", "sliding_window", "token_bucket", "fallback")]
+    return {
+        "config": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "max_requests": args.max_requests,
+            "redis": args.redis_url or "fakeredis",
+        },
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark rate limit check overhead")
+    parser.add_argument("--requests", type=int, default=5000, help="rate limit checks to run")
+    parser.add_argument("--concurrency", type=int, default=50, help="concurrent requests")
+    parser.add_argument("--max-requests", type=int, default=10, help="requests allowed per IP per window")
+    parser.add_argument("--redis-url", help="benchmark against this Redis server instead of fakeredis")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Experience Replay Buffer Benchmark
+
+Compares the array-backed ``ExperienceReplayBuffer`` with the previous
+deque-of-``Experience`` storage: memory per stored experience (measured
+with tracemalloc) and the cost of sampling a training minibatch as arrays
+at several buffer sizes.
+
+Usage::
+
+    python benchmark_replay_buffer.py --sizes 10000,100000,300000 --state-size 21 --output replay_buffer.json
+"""
+
+import argparse
+import json
+import random
+import time
+import tracemalloc
+from collections import deque
+from typing import Any, Dict, List
+
+import numpy as np
+
+from monkey_coder.quantum.experience_buffer import Experience, ExperienceReplayBuffer
+
+
+class LegacyReplayBuffer:
+    """The pre-array buffer: a deque of Experience objects, copied to a list per sample."""
+
+    def __init__(self, capacity: int):
+        self._buffer: deque = deque(maxlen=capacity)
+
+    def add(self, experience: Experience) -> None:
+        self._buffer.append(experience)
+
+    def sample_arrays(self, batch_size: int):
+        batch = random.sample(list(self._buffer), batch_size)
+        return (
+            np.array([exp.state for exp in batch]),
+            np.array([exp.action for exp in batch]),
+            np.array([exp.reward for exp in batch]),
+            np.array([exp.next_state for exp in batch]),
+            np.array([exp.done for exp in batch]),
+        )
+
+
+def _fill(factory, size: int, state_size: int, rng: np.random.Generator):
+    """Build a buffer, add ``size`` experiences; returns (buffer, traced bytes per experience)."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    buffer = factory()
+    for i in range(size):
+        buffer.add(Experience(
+            state=rng.random(state_size),
+            action=int(i % 12),
+            reward=float(i % 7),
+            next_state=rng.random(state_size),
+            done=i % 20 == 19,
+            timestamp=float(i),
+        ))
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return buffer, (after - before) / size
+
+
+def _samples_per_sec(sample, batch_size: int, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        sample(batch_size)
+    return iterations / (time.perf_counter() - start)
+
+
+def run(sizes: List[int], state_size: int, batch_size: int, iterations: int, seed: int) -> Dict[str, Any]:
+    results: Dict[str, Any] = {
+        "config": {"state_size": state_size, "batch_size": batch_size, "iterations": iterations},
+        "results": [],
+    }
+    for size in sizes:
+        rng = np.random.default_rng(seed)
+        legacy, legacy_bytes = _fill(lambda: LegacyReplayBuffer(size), size, state_size, rng)
+        legacy_rate = _samples_per_sec(legacy.sample_arrays, batch_size, max(1, iterations // 20))
+        del legacy
+
+        current, current_bytes = _fill(
+            lambda: ExperienceReplayBuffer(capacity=size, min_size=batch_size, cleanup_threshold=1.0),
+            size, state_size, rng,
+        )
+        current_rate = _samples_per_sec(current.sample_batch, batch_size, iterations)
+
+        entry = {
+            "size": size,
+            "legacy_bytes_per_experience": legacy_bytes,
+            "array_bytes_per_experience": current_bytes,
+            "memory_reduction": legacy_bytes / current_bytes,
+            "legacy_samples_per_sec": legacy_rate,
+            "array_samples_per_sec": current_rate,
+            "sample_speedup": current_rate / legacy_rate,
+        }
+        results["results"].append(entry)
+        print(
+            f"{size:>8,} experiences  bytes/exp {legacy_bytes:>6,.0f} -> {current_bytes:>4,.0f} "
+            f"({entry['memory_reduction']:.1f}x)  samples/s {legacy_rate:>9,.1f} -> {current_rate:>9,.1f} "
+            f"({entry['sample_speedup']:,.0f}x)"
+        )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark experience replay storage")
+    parser.add_argument("--sizes", default="10000,100000,300000", help="comma-separated buffer sizes")
+    parser.add_argument("--state-size", type=int, default=21)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--iterations", type=int, default=2000, help="samples per measurement (legacy runs 1/20th)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    results = run(sizes, args.state_size, args.batch_size, args.iterations, args.seed)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
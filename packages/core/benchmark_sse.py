@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+SSE Framing Benchmark
+
+Streams ``--tokens`` small deltas through the streaming execute framing and
+reports CPU time per delta, frames and bytes written, and the size of the
+completion event. Compares:
+
+- legacy: three strings per delta (id, event, data) with ``json.dumps``, a
+  progress event every 5th delta and the full text repeated at the end
+- encoder: ``SSEEncoder`` frames without coalescing (one bytes object per delta)
+- coalesced: ``coalesce_chunks`` + ``SSEEncoder`` with the default size and
+  time bounds, without the full-result payload
+
+Deltas are produced as fast as possible, which is the case where framing
+cost dominates.
+
+Usage::
+
+    python benchmark_sse.py --tokens 20000 --output sse.json
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, AsyncGenerator, Dict, List
+
+from monkey_coder.providers.streaming_adapter import StreamChunk
+from monkey_coder.streaming.sse_encoder import ORJSON_AVAILABLE, SSEEncoder, coalesce_chunks
+
+STREAM_ID = "3f1c2a9e-7d4b-4c1e-9a55-0b6f2d8e1a44"
+
+
+async def source(tokens: int) -> AsyncGenerator[StreamChunk, None]:
+    for i in range(1, tokens + 1):
+        yield StreamChunk(content=" tok" if i % 7 else "\n", index=i, tokens=1)
+
+
+async def legacy(tokens: int) -> List[Any]:
+    """The framing ``create_sse_stream`` used before pre-framed events."""
+    out = []
+    total_content = []
+    chunk_count = 0
+    async for chunk in source(tokens):
+        chunk_count += 1
+        total_content.append(chunk.content)
+        out.append(f"id: {STREAM_ID}-{chunk.index}\n")
+        out.append("event: message\n")
+        out.append("data: " + json.dumps({"content": chunk.content, "index": chunk.index}) + "\n\n")
+        if chunk_count % 5 == 0:
+            out.append("event: progress\n")
+            out.append("data: " + json.dumps({"chunks": chunk_count, "tokens": chunk_count, "progress": 95}) + "\n\n")
+    out.append(f"id: {STREAM_ID}-complete\n")
+    out.append("event: complete\n")
+    out.append("data: " + json.dumps({"status": "completed", "result": "".join(total_content)}) + "\n\n")
+    return out
+
+
+async def encoder_only(tokens: int) -> List[Any]:
+    encoder = SSEEncoder(STREAM_ID)
+    out = [encoder.message(chunk.content, chunk.index) async for chunk in source(tokens)]
+    out.append(encoder.event("complete", {"status": "completed"}, suffix="complete"))
+    return out
+
+
+async def coalesced(tokens: int) -> List[Any]:
+    encoder = SSEEncoder(STREAM_ID)
+    out = [encoder.message(frame.content, frame.index) async for frame in coalesce_chunks(source(tokens))]
+    out.append(encoder.event("complete", {"status": "completed"}, suffix="complete"))
+    return out
+
+
+def measure(name: str, pipeline, tokens: int, repeat: int) -> Dict[str, Any]:
+    cpu = []
+    for _ in range(repeat):
+        start = time.process_time()
+        out = asyncio.run(pipeline(tokens))
+        cpu.append(time.process_time() - start)
+    writes = len(out)
+    total_bytes = sum(len(part if isinstance(part, bytes) else part.encode()) for part in out)
+    last = out[-1] if isinstance(out[-1], bytes) else out[-1].encode()
+    best = min(cpu)
+    result = {
+        "pipeline": name,
+        "cpu_s": best,
+        "cpu_us_per_delta": best / tokens * 1e6,
+        "writes": writes,
+        "bytes": total_bytes,
+        "completion_bytes": len(last),
+    }
+    print(f"{name:<10} {result['cpu_us_per_delta']:7.2f} us/delta  {writes:>7} writes  "
+          f"{total_bytes / 1024:8.1f} KiB  completion {len(last) / 1024:6.1f} KiB")
+    return result
+
+
+def run(tokens: int, repeat: int) -> Dict[str, Any]:
+    print(f"{tokens} deltas, orjson={'yes' if ORJSON_AVAILABLE else 'no'}")
+    results = [
+        measure("legacy", legacy, tokens, repeat),
+        measure("encoder", encoder_only, tokens, repeat),
+        measure("coalesced", coalesced, tokens, repeat),
+    ]
+    return {"config": {"tokens": tokens, "repeat": repeat, "orjson": ORJSON_AVAILABLE}, "results": results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark SSE framing of token streams")
+    parser.add_argument("--tokens", type=int, default=20000, help="deltas per stream")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per pipeline (best is reported)")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = run(args.tokens, args.repeat)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+State Encoder Benchmark
+
+Measures per-request feature assembly for ``AdvancedStateEncoder``:
+
+- the previous path (per-section arrays, ``np.concatenate``, a freshly built
+  weight vector) reproduced here for comparison,
+- ``encode_state`` (one allocation, sections written in place, cached
+  provider section),
+- ``encode_into`` a reused buffer,
+- ``encode_batch`` per request, for a few batch sizes,
+
+next to the ``NumpyDQNNetwork`` forward pass for one state and for a batch,
+so assembly can be compared with the network cost it feeds.
+
+Usage::
+
+    python benchmark_state_encoder.py --iterations 20000 --batch-sizes 16,128 --output state_encoder.json
+"""
+
+import argparse
+import json
+import logging
+import time
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+from monkey_coder.models import ProviderType, TaskType
+from monkey_coder.quantum.neural_network import NumpyDQNNetwork
+from monkey_coder.quantum.state_encoder import (
+    AdvancedStateEncoder,
+    ContextComplexity,
+    ProviderPerformanceHistory,
+    ResourceConstraints,
+    TaskContextProfile,
+    UserPreferences,
+)
+
+
+def make_contexts(count: int, seed: int) -> List[TaskContextProfile]:
+    rng = np.random.default_rng(seed)
+    categories = list(ContextComplexity)
+    task_types = [TaskType.CODE_GENERATION, TaskType.CODE_ANALYSIS, TaskType.DEBUGGING, TaskType.TESTING]
+    return [
+        TaskContextProfile(
+            task_type=task_types[i % 4],
+            estimated_complexity=float(rng.random()),
+            complexity_category=categories[i % 4],
+            domain_requirements={"programming"},
+            quality_threshold=float(rng.choice([0.7, 0.9])),
+            latency_requirement=float(rng.choice([5.0, 30.0])),
+            is_production=bool(i % 2),
+            day_of_week=i % 7 + 1,
+        )
+        for i in range(count)
+    ]
+
+
+class LegacyStateEncoder(AdvancedStateEncoder):
+    """The concatenating encoder this replaced: per-section arrays, np.concatenate, fresh weights."""
+
+    def encode_state(self, task_context, provider_history, user_preferences,
+                     resource_constraints, provider_availability) -> np.ndarray:
+        components = [
+            self._legacy_task(task_context),
+            self._legacy_providers(provider_history, provider_availability),
+            self._legacy_preferences(user_preferences),
+            self._legacy_constraints(resource_constraints),
+            self._legacy_temporal(task_context),
+            self._legacy_context(task_context, provider_availability),
+        ]
+        state = np.concatenate(components)
+        weights = np.ones_like(state)
+        if task_context.is_production:
+            weights[15:75] *= 1.2
+        if task_context.requires_accuracy and task_context.quality_threshold > 0.8:
+            for i in range(5):
+                weights[15 + i * 11 + 2] *= 1.3
+        if task_context.latency_requirement < 10.0:
+            weights[98:106] *= 1.1
+        state = state * weights
+        assert len(state) == self.total_dimensions
+        return state
+
+    @staticmethod
+    def _legacy_task(task_context) -> np.ndarray:
+        features = [task_context.estimated_complexity]
+        for category in [ContextComplexity.SIMPLE, ContextComplexity.MODERATE,
+                         ContextComplexity.COMPLEX, ContextComplexity.CRITICAL]:
+            features.append(1.0 if task_context.complexity_category == category else 0.0)
+        for task_type in [TaskType.CODE_GENERATION, TaskType.CODE_ANALYSIS, TaskType.DEBUGGING, TaskType.TESTING]:
+            features.append(1.0 if task_context.task_type == task_type else 0.0)
+        features.extend([
+            task_context.quality_threshold,
+            min(task_context.latency_requirement / 30.0, 1.0),
+            task_context.cost_sensitivity,
+            1.0 if task_context.requires_reasoning else 0.0,
+            1.0 if task_context.requires_creativity else 0.0,
+            1.0 if task_context.is_production else 0.0,
+        ])
+        return np.array(features, dtype=np.float32)
+
+    @staticmethod
+    def _legacy_providers(provider_history, provider_availability) -> np.ndarray:
+        features = []
+        for provider in ProviderType:
+            is_available = provider_availability.get(provider, True)
+            features.append(1.0 if is_available else 0.0)
+            if provider in provider_history and is_available:
+                h = provider_history[provider]
+                features.extend(np.array([
+                    h.recent_success_rate, h.recent_avg_latency / 10.0, h.recent_avg_quality,
+                    h.recent_cost_efficiency, h.short_term_success_rate, h.short_term_avg_latency / 10.0,
+                    (h.short_term_quality_trend + 1.0) / 2.0, h.medium_term_variance,
+                    h.medium_term_reliability, h.long_term_reputation,
+                    min(h.total_interactions / 1000.0, 1.0),
+                ], dtype=np.float32))
+            else:
+                features.extend([0.5] * 11)
+        return np.array(features, dtype=np.float32)
+
+    @staticmethod
+    def _legacy_preferences(p) -> np.ndarray:
+        provider_scores = [p.provider_preference_scores.get(provider, 0.5) for provider in ProviderType]
+        strategies = [p.preferred_strategies[k] for k in ("task_optimized", "cost_efficient", "performance", "balanced")]
+        return np.array([
+            *provider_scores, *strategies, p.quality_vs_speed_preference,
+            p.cost_sensitivity, p.risk_tolerance, p.personalization_strength,
+        ], dtype=np.float32)
+
+    @staticmethod
+    def _legacy_constraints(c) -> np.ndarray:
+        return np.array([
+            c.max_cost_per_request / 10.0 if c.max_cost_per_request else 1.0,
+            c.max_latency_seconds / 60.0 if c.max_latency_seconds else 1.0,
+            c.min_quality_threshold if c.min_quality_threshold else 0.0,
+            c.cost_weight, c.latency_weight, c.quality_weight, c.constraint_flexibility,
+            1.0 if c.is_premium_user else 0.0,
+            1.0 if c.has_priority_access else 0.0,
+            {"free": 0.0, "standard": 0.33, "premium": 0.66, "enterprise": 1.0}.get(c.billing_tier, 0.33),
+        ], dtype=np.float32)
+
+    @staticmethod
+    def _legacy_temporal(task_context) -> np.ndarray:
+        current_hour = (time.time() // 3600) % 24 / 24.0
+        return np.array([
+            task_context.time_of_day, task_context.day_of_week / 7.0, task_context.timezone_offset / 12.0,
+            current_hour, np.sin(2 * np.pi * current_hour), np.cos(2 * np.pi * current_hour),
+            np.sin(2 * np.pi * task_context.day_of_week / 7.0), np.cos(2 * np.pi * task_context.day_of_week / 7.0),
+        ], dtype=np.float32)
+
+    @staticmethod
+    def _legacy_context(task_context, provider_availability) -> np.ndarray:
+        available_providers = sum(1 for available in provider_availability.values() if available)
+        total_providers = len(provider_availability)
+        return np.array([
+            available_providers / max(total_providers, 1),
+            len(task_context.domain_requirements) / 5.0,
+            1.0 if task_context.requires_accuracy else 0.0,
+            task_context.estimated_complexity ** 2,
+            min(task_context.latency_requirement / 120.0, 1.0),
+            1.0 if available_providers >= 3 else 0.5,
+        ], dtype=np.float32)
+
+
+def _us_per_call(fn: Callable[[int], Any], iterations: int) -> float:
+    start = time.perf_counter()
+    for i in range(iterations):
+        fn(i)
+    return (time.perf_counter() - start) * 1e6 / iterations
+
+
+def run(iterations: int, batch_sizes: List[int], seed: int) -> Dict[str, Any]:
+    encoder = AdvancedStateEncoder()
+    contexts = make_contexts(256, seed)
+    history = {provider: ProviderPerformanceHistory() for provider in ProviderType}
+    availability = {provider: True for provider in ProviderType}
+    preferences = UserPreferences()
+    constraints = ResourceConstraints()
+    shared = (history, preferences, constraints, availability)
+    buffer = np.empty(encoder.state_size, dtype=np.float32)
+    n = len(contexts)
+
+    results: Dict[str, Any] = {
+        "config": {"iterations": iterations, "state_size": encoder.state_size},
+        "encode_us": {},
+        "network_us": {},
+    }
+    timings = results["encode_us"]
+    legacy = LegacyStateEncoder()
+    for context in contexts[:8]:
+        assert np.array_equal(legacy.encode_state(context, *shared), encoder.encode_state(context, *shared))
+    timings["legacy_concatenate"] = _us_per_call(lambda i: legacy.encode_state(contexts[i % n], *shared), iterations)
+    timings["encode_state"] = _us_per_call(lambda i: encoder.encode_state(contexts[i % n], *shared), iterations)
+    timings["encode_into"] = _us_per_call(lambda i: encoder.encode_into(buffer, contexts[i % n], *shared), iterations)
+    for size in batch_sizes:
+        batch_contexts = (contexts * (size // n + 1))[:size]
+        out = np.empty((size, encoder.state_size), dtype=np.float32)
+        rounds = max(1, iterations // size)
+        per_batch = _us_per_call(lambda i: encoder.encode_batch(batch_contexts, *shared, out=out), rounds)
+        timings[f"encode_batch_{size}_per_request"] = per_batch / size
+
+    network = NumpyDQNNetwork(state_size=encoder.state_size, action_size=12)
+    states = encoder.encode_batch((contexts * (max(batch_sizes + [1]) // n + 1))[:max(batch_sizes + [1])], *shared)
+    results["network_us"]["predict_single"] = _us_per_call(lambda i: network.predict(states[i % len(states)]), iterations)
+    for size in batch_sizes:
+        rounds = max(1, iterations // size)
+        results["network_us"][f"predict_batch_{size}_per_request"] = (
+            _us_per_call(lambda i: network.predict(states[:size]), rounds) / size
+        )
+
+    baseline = timings["legacy_concatenate"]
+    for name, value in timings.items():
+        print(f"{name:<32} {value:8.2f} us  ({baseline / value:.1f}x)")
+    for name, value in results["network_us"].items():
+        print(f"{name:<32} {value:8.2f} us")
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark AdvancedStateEncoder feature assembly")
+    parser.add_argument("--iterations", type=int, default=20000, help="encodes per measurement")
+    parser.add_argument("--batch-sizes", default="16,128", help="comma-separated encode_batch sizes")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    batch_sizes = [int(s) for s in args.batch_sizes.split(",") if s]
+    results = run(args.iterations, batch_sizes, args.seed)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Streaming Latency Benchmark
+
+Streams one answer from ``FakeStreamProvider`` (a local provider with a
+configurable time to first token and per-delta interval) and reports time
+to first token (TTFT) and total time for:
+
+- simulated: the previous path for non-streamed answers. It waits for the
+  whole completion, then replays it in 100-character chunks with
+  ``simulate_streaming``'s old 50 ms delay between chunks.
+- native: ``UnifiedStreamHandler.stream_completion`` over the provider's
+  own token stream
+
+Usage::
+
+    python benchmark_streaming.py --chars 4000 --first-token-ms 300 --output streaming.json
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, AsyncIterator, Dict
+
+from monkey_coder.providers.streaming_adapter import FakeStreamProvider, StreamChunk, UnifiedStreamHandler
+
+MESSAGES = [{"role": "user", "content": "Write the module"}]
+LEGACY_CHUNK_SIZE = 100
+LEGACY_DELAY = 0.05
+
+
+async def simulated(handler: UnifiedStreamHandler, provider: FakeStreamProvider) -> AsyncIterator[StreamChunk]:
+    result = await provider.generate_completion("fake-stream", MESSAGES)
+    adapter = handler.get_adapter("simulated")
+    async for chunk in adapter.simulate_streaming(result["content"], chunk_size=LEGACY_CHUNK_SIZE, delay=LEGACY_DELAY):
+        yield chunk
+
+
+async def native(handler: UnifiedStreamHandler, provider: FakeStreamProvider) -> AsyncIterator[StreamChunk]:
+    async for chunk in handler.stream_completion("fake", provider, "fake-stream", MESSAGES):
+        yield chunk
+
+
+async def measure(name: str, path, provider: FakeStreamProvider) -> Dict[str, Any]:
+    handler = UnifiedStreamHandler()
+    start = time.perf_counter()
+    ttft = None
+    chunks = 0
+    chars = 0
+    async for chunk in path(handler, provider):
+        if ttft is None:
+            ttft = time.perf_counter() - start
+        chunks += 1
+        chars += len(chunk.content)
+    total = time.perf_counter() - start
+    result = {"path": name, "ttft_ms": (ttft or 0) * 1000, "total_ms": total * 1000, "chunks": chunks, "chars": chars}
+    print(f"{name:<10} ttft {result['ttft_ms']:8.1f} ms  total {result['total_ms']:8.1f} ms  {chunks:>5} chunks")
+    return result
+
+
+def run(chars: int, chunk_chars: int, first_token_ms: float, token_interval_ms: float) -> Dict[str, Any]:
+    content = ("def handler(event):\n    return process(event)\n" * (chars // 44 + 1))[:chars]
+    provider = FakeStreamProvider(
+        content,
+        chunk_chars=chunk_chars,
+        first_token_delay=first_token_ms / 1000,
+        token_interval=token_interval_ms / 1000,
+    )
+    results = [
+        asyncio.run(measure("simulated", simulated, provider)),
+        asyncio.run(measure("native", native, provider)),
+    ]
+    return {
+        "config": {
+            "chars": chars,
+            "chunk_chars": chunk_chars,
+            "first_token_ms": first_token_ms,
+            "token_interval_ms": token_interval_ms,
+        },
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark streaming TTFT and total latency")
+    parser.add_argument("--chars", type=int, default=4000, help="answer length in characters")
+    parser.add_argument("--chunk-chars", type=int, default=4, help="characters per provider delta")
+    parser.add_argument("--first-token-ms", type=float, default=300.0, help="provider time to first token")
+    parser.add_argument("--token-interval-ms", type=float, default=1.0, help="provider time between deltas")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = run(args.chars, args.chunk_chars, args.first_token_ms, args.token_interval_ms)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+DQN Training Pipeline Benchmark
+
+Measures end-to-end ``DQNTrainingPipeline.train`` throughput (environment
+steps and episodes per second, including replay training) for
+
+- the one-episode-at-a-time loop over ``RoutingEnvironmentSimulator``,
+- the lockstep loop over ``VectorizedRoutingEnvironment`` (``num_envs``),
+- worker-process collection (``num_workers`` x ``num_envs``),
+
+plus raw simulator step throughput without training. Worker-process
+collection only pays off with spare cores; on a single core it measures the
+IPC overhead.
+
+Usage::
+
+    python benchmark_training.py --episodes 2000 --num-envs 16,64 --workers 2 --output training.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+from monkey_coder.quantum.dqn_agent import RoutingAction
+from monkey_coder.quantum.training_pipeline import (
+    DQNTrainingPipeline,
+    RoutingEnvironmentSimulator,
+    TrainingConfig,
+    VectorizedRoutingEnvironment,
+)
+
+
+def simulator_steps_per_sec(num_envs: int, steps: int, seed: int) -> float:
+    """Environment steps per second with random actions and no learning."""
+    rng = np.random.default_rng(seed)
+    if num_envs == 1:
+        env = RoutingEnvironmentSimulator()
+        actions = [RoutingAction.from_action_index(int(a)) for a in rng.integers(12, size=steps)]
+        env.reset()
+        start = time.perf_counter()
+        for action in actions:
+            _, _, done, _ = env.step(action)
+            if done:
+                env.reset()
+        return steps / (time.perf_counter() - start)
+
+    env = VectorizedRoutingEnvironment(num_envs=num_envs, seed=seed)
+    rounds = max(1, steps // num_envs)
+    actions = rng.integers(12, size=(rounds, num_envs))
+    start = time.perf_counter()
+    for row in actions:
+        env.step(row)
+    return rounds * num_envs / (time.perf_counter() - start)
+
+
+def train_throughput(episodes: int, seed: int, **overrides) -> Dict[str, float]:
+    config = TrainingConfig(
+        max_episodes=episodes,
+        batch_size=32,
+        min_buffer_size=256,
+        buffer_size=20000,
+        target_performance=1.1,  # never stop early
+        patience=10 ** 9,
+        seed=seed,
+        **overrides,
+    )
+    pipeline = DQNTrainingPipeline(config)
+    np.random.seed(seed)
+    start = time.perf_counter()
+    pipeline.train()
+    elapsed = time.perf_counter() - start
+    return {
+        "env_steps_per_sec": pipeline.current_step / elapsed,
+        "episodes_per_sec": len(pipeline.training_metrics) / elapsed,
+        "train_steps": len(pipeline.training_losses),
+        "success_rate": float(np.mean(pipeline.episode_successes)),
+        "seconds": elapsed,
+    }
+
+
+def run(episodes: int, env_counts: List[int], workers: int, sim_steps: int, seed: int) -> Dict[str, Any]:
+    results: Dict[str, Any] = {
+        "config": {"episodes": episodes, "num_envs": env_counts, "workers": workers, "cpus": os.cpu_count()},
+        "simulator": {},
+        "training": {},
+    }
+
+    for num_envs in [1] + env_counts:
+        rate = simulator_steps_per_sec(num_envs, sim_steps, seed)
+        results["simulator"][str(num_envs)] = rate
+        print(f"simulator  {num_envs:>4} envs  {rate:>12,.0f} steps/s")
+
+    runs = {"scalar": {}}
+    for num_envs in env_counts:
+        runs[f"vectorized_{num_envs}"] = {"num_envs": num_envs}
+    if workers:
+        runs[f"workers_{workers}x{env_counts[0]}"] = {"num_envs": env_counts[0], "num_workers": workers}
+
+    baseline = None
+    for name, overrides in runs.items():
+        entry = train_throughput(episodes, seed, **overrides)
+        baseline = baseline or entry["env_steps_per_sec"]
+        entry["speedup"] = entry["env_steps_per_sec"] / baseline
+        results["training"][name] = entry
+        print(
+            f"train {name:<18} {entry['env_steps_per_sec']:>10,.0f} env steps/s  "
+            f"{entry['episodes_per_sec']:>9,.0f} episodes/s  ({entry['speedup']:.1f}x)  "
+            f"success {entry['success_rate']:.2f}"
+        )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the DQN training pipeline loops")
+    parser.add_argument("--episodes", type=int, default=2000, help="episodes per training run")
+    parser.add_argument("--num-envs", default="16,64", help="comma-separated lockstep environment counts")
+    parser.add_argument("--workers", type=int, default=2, help="collector processes (0 to skip)")
+    parser.add_argument("--sim-steps", type=int, default=50000, help="environment steps for the simulator-only runs")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    env_counts = [int(s) for s in args.num_envs.split(",") if s]
+    results = run(args.episodes, env_counts, args.workers, args.sim_steps, args.seed)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Usage Event Write Benchmark
+
+Records ``--requests`` usage events from ``--concurrency`` concurrent
+requests against a fake database with a fixed round-trip time and a small
+per-row cost. Reports the latency usage recording adds to each request
+(p50/p99), database round-trips and the time until every event is stored:
+
+- inline: the previous ``PricingMiddleware`` path, one awaited INSERT per
+  request on a pool of ``--pool-size`` connections
+- batched: ``UsageEventWriter.submit`` on the request path, with the
+  background task writing batches
+
+Usage::
+
+    python benchmark_usage_writer.py --requests 5000 --rtt-ms 2 --output usage_writer.json
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from monkey_coder.database.models import UsageEvent
+from monkey_coder.pricing.usage_writer import UsageEventWriter
+
+
+class FakeDatabase:
+    """A connection pool whose statements cost one round-trip plus a per-row cost."""
+
+    def __init__(self, rtt: float, per_row: float, pool_size: int):
+        self.rtt = rtt
+        self.per_row = per_row
+        self.pool = asyncio.Semaphore(pool_size)
+        self.round_trips = 0
+        self.rows = 0
+
+    async def execute(self, rows: int) -> None:
+        async with self.pool:
+            self.round_trips += 1
+            await asyncio.sleep(self.rtt + rows * self.per_row)
+            self.rows += rows
+
+    async def insert_one(self, event: UsageEvent) -> None:
+        await self.execute(1)
+
+    async def insert_many(self, events: List[UsageEvent], use_copy: bool = True) -> int:
+        await self.execute(len(events))
+        return len(events)
+
+
+def make_event(n: int) -> UsageEvent:
+    return UsageEvent(
+        api_key_hash="bench", execution_id=f"exec-{n}", task_type="code_generation",
+        tokens_input=1200, tokens_output=400, tokens_total=1600,
+        provider="openai", model="gpt-4.1", model_cost_input=2e-6, model_cost_output=8e-6,
+        cost_input=0.0024, cost_output=0.0032, cost_total=0.0056,
+        execution_time=1.2, status="completed", metadata={"response_status": 200},
+    )
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def drive(requests: int, concurrency: int, record) -> List[float]:
+    latencies: List[float] = []
+    counter = iter(range(requests))
+
+    async def client() -> None:
+        for n in counter:
+            start = time.perf_counter()
+            await record(make_event(n))
+            latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(0)  # the rest of the request
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies
+
+
+async def inline(db: FakeDatabase, args) -> List[float]:
+    return await drive(args.requests, args.concurrency, db.insert_one)
+
+
+async def batched(db: FakeDatabase, args) -> List[float]:
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = UsageEventWriter(db.insert_many, batch_size=args.batch_size, flush_interval=0.05,
+                                  spill_path=Path(tmp) / "spill.jsonl")
+
+        async def record(event: UsageEvent) -> None:
+            writer.submit(event)
+
+        latencies = await drive(args.requests, args.concurrency, record)
+        await writer.close()
+        return latencies
+
+
+def measure(name: str, path, args) -> Dict[str, Any]:
+    db = FakeDatabase(args.rtt_ms / 1000, args.row_us / 1e6, args.pool_size)
+    start = time.perf_counter()
+    latencies = asyncio.run(path(db, args))
+    total = time.perf_counter() - start
+    result = {
+        "path": name,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "round_trips": db.round_trips,
+        "rows": db.rows,
+        "drain_s": total,
+    }
+    print(f"{name:<8} p50 {result['p50_ms']:8.3f} ms  p99 {result['p99_ms']:8.3f} ms  "
+          f"{db.round_trips:>6} round-trips  all stored after {total:6.2f} s")
+    return result
+
+
+def run(args) -> Dict[str, Any]:
+    return {
+        "config": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "rtt_ms": args.rtt_ms,
+            "row_us": args.row_us,
+            "pool_size": args.pool_size,
+            "batch_size": args.batch_size,
+        },
+        "results": [measure("inline", inline, args), measure("batched", batched, args)],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark inline vs batched usage event writes")
+    parser.add_argument("--requests", type=int, default=5000, help="usage events to record")
+    parser.add_argument("--concurrency", type=int, default=100, help="concurrent requests")
+    parser.add_argument("--rtt-ms", type=float, default=2.0, help="database round-trip time")
+    parser.add_argument("--row-us", type=float, default=5.0, help="database cost per row")
+    parser.add_argument("--pool-size", type=int, default=10, help="database connections")
+    parser.add_argument("--batch-size", type=int, default=500, help="events per batched write")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,7 @@ import hashlib
 import os
 import secrets
 import time
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
 from typing import Any
 
@@ -29,11 +30,22 @@ def _hash_reset_token(token: str) -> str:
     """Hash a reset token for secure storage."""
     return hashlib.sha256(token.encode()).hexdigest()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Flush buffered usage events before the worker exits."""
+    yield
+    try:
+        from monkey_coder.pricing.usage_writer import close_usage_writer
+        await close_usage_writer()
+    except Exception as e:
+        print(f"Warning: Failed to close usage writer: {e}")
+
 # Create FastAPI app
 app = FastAPI(
     title="Monkey Coder API",
     description="AI-powered development assistant API with MCP support",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -110,6 +122,29 @@ async def health_check():
 
     return health_data
 
+@app.get("/api/v1/metrics/http-pool")
+async def http_pool_metrics():
+    """Utilisation of the shared upstream HTTP connection pool."""
+    from monkey_coder.providers.http_pool import get_http_pool_stats
+    return get_http_pool_stats()
+
+@app.get("/api/v1/metrics/single-flight")
+async def single_flight_metrics():
+    """Hit/miss/coalesced counters for identical in-flight provider completions."""
+    from monkey_coder.providers.single_flight import get_single_flight_stats
+    return get_single_flight_stats()
+
+@app.get("/api/v1/providers/status")
+async def provider_status():
+    """Provider startup timeline and cached background health (no live API calls)."""
+    registry = getattr(app.state, "provider_registry", None)
+    if registry is None:
+        raise HTTPException(status_code=503, detail="Provider registry not initialized")
+    return {
+        "startup": registry.startup_timeline(),
+        "health": registry.get_cached_health(),
+    }
+
 # Password reset endpoints
 @app.post("/api/v1/auth/password-reset/request")
 async def request_password_reset(data: PasswordResetRequest):
@@ -7,7 +7,7 @@ import asyncio
 import json
 import logging
 import uuid
-from typing import AsyncGenerator, Optional
+from typing import AsyncGenerator
 
 from fastapi import HTTPException, Request, status
 from sse_starlette.sse import EventSourceResponse
@@ -16,6 +16,7 @@ from ..models import ExecuteRequest
 from ..core.orchestration_coordinator import OrchestrationCoordinator
 from ..core.persona_validation import PersonaValidator
 from ..providers import get_provider_adapter
+from ..providers.streaming_adapter import unified_stream_handler
 from ..config.env_config import get_config
 
 logger = logging.getLogger(__name__)
@@ -71,11 +72,12 @@ async def stream_orchestration_response(
         if hasattr(provider_adapter, 'stream_completion'):
             # Stream tokens from provider
             token_count = 0
-            full_response = ""
             
-            async for chunk in provider_adapter.stream_completion(
-                prompt=enhanced_prompt,
-                model=model_name,
+            async for chunk in unified_stream_handler.stream_completion(
+                provider_name,
+                provider_adapter,
+                model_name or getattr(provider_adapter, "default_model", None),
+                [{"role": "user", "content": enhanced_prompt}],
                 temperature=execute_request.temperature,
                 max_tokens=execute_request.max_tokens
             ):
@@ -84,15 +86,8 @@ async def stream_orchestration_response(
                     break
                 
                 # Send token event
-                if chunk.get('token'):
-                    token = chunk['token']
-                    full_response += token
-                    token_count += 1
-                    
-                    yield f"data: {json.dumps({'event': 'token', 'content': token, 'token_count': token_count})}\n\n"
-                
-                # Yield control
-                await asyncio.sleep(0)
+                token_count += 1
+                yield f"data: {json.dumps({'event': 'token', 'content': chunk.content, 'token_count': token_count})}\n\n"
         else:
             # Fallback to non-streaming with progress updates
             yield f"data: {json.dumps({'event': 'progress', 'message': 'Processing with non-streaming provider...'})}\n\n"
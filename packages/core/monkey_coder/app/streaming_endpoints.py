@@ -5,11 +5,12 @@ This module provides Server-Sent Events (SSE) endpoints for real-time streaming
 of AI-generated responses, with progress tracking and error handling.
 """
 
-import asyncio
 import json
 import logging
+import statistics
 import time
 import uuid
+from collections import deque
 from datetime import datetime
 from typing import Any, AsyncGenerator, Dict, Optional, Protocol
 from dataclasses import dataclass, asdict
@@ -19,6 +20,9 @@ from fastapi import APIRouter, Request, HTTPException, Depends, Query
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
+from ..manifest import PROVIDER_DEFAULTS
+from ..providers.streaming_adapter import unified_stream_handler
+
 logger = logging.getLogger(__name__)
 
 # Create the streaming router
@@ -96,6 +100,44 @@ class AIStreamProvider(Protocol):
         ...
 
 
+# Registry provider names that differ from the manifest's PROVIDER_DEFAULTS keys
+_MANIFEST_PROVIDER_NAMES = {"grok": "xai"}
+
+
+class ProviderStream:
+    """
+    ``AIStreamProvider`` over a registered provider adapter.
+
+    Tokens come from the adapter's native stream through
+    ``unified_stream_handler.stream_completion``.
+    """
+
+    def __init__(self, provider_name: str, provider_adapter: Any):
+        self.provider_name = provider_name
+        self.provider_adapter = provider_adapter
+        # Used when a request names no model; None if the provider has no known default
+        self.default_model: Optional[str] = (
+            getattr(provider_adapter, "default_model", None)
+            or PROVIDER_DEFAULTS.get(_MANIFEST_PROVIDER_NAMES.get(provider_name, provider_name))
+        )
+
+    async def stream_response(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        **kwargs
+    ) -> AsyncGenerator[str, None]:
+        """Stream response from AI provider."""
+        model = model or self.default_model
+        if not model:
+            raise ValueError(f"No model given and no default model known for provider {self.provider_name}")
+        messages = [{"role": "user", "content": prompt}]
+        async for chunk in unified_stream_handler.stream_completion(
+            self.provider_name, self.provider_adapter, model, messages, **kwargs
+        ):
+            yield chunk.content
+
+
 class StreamingService:
     """Service for managing streaming responses."""
     
@@ -108,6 +150,8 @@ class StreamingService:
             "failed_streams": 0,
             "total_tokens": 0
         }
+        # Recent time-to-first-token samples (seconds) for get_metrics()
+        self._ttft_samples: deque = deque(maxlen=512)
 
     async def create_stream(
         self,
@@ -153,7 +197,7 @@ class StreamingService:
                 }
             ).to_sse()
             
-            # Stream from AI provider or simulate
+            # Stream from AI provider, or the canned demo when none is configured
             if ai_provider:
                 async for chunk in self._stream_from_provider(
                     ai_provider,
@@ -167,7 +211,6 @@ class StreamingService:
                     
                     yield chunk
             else:
-                # Simulate streaming for demo
                 async for chunk in self._simulate_stream(streaming_request, stream_id):
                     if await request.is_disconnected():
                         break
@@ -179,7 +222,8 @@ class StreamingService:
                 data={
                     "stream_id": stream_id,
                     "total_tokens": self.active_streams[stream_id]["tokens"],
-                    "duration": time.time() - start_time
+                    "duration": time.time() - start_time,
+                    "ttft_ms": self.active_streams[stream_id].get("ttft_ms"),
                 }
             ).to_sse()
             
@@ -214,6 +258,7 @@ class StreamingService:
     ) -> AsyncGenerator[str, None]:
         """Stream response from AI provider."""
         total_chunks = 0
+        started = time.perf_counter()
         
         async for chunk in provider.stream_response(
             prompt=request.prompt,
@@ -222,6 +267,10 @@ class StreamingService:
             temperature=request.temperature
         ):
             total_chunks += 1
+            if total_chunks == 1:
+                ttft = time.perf_counter() - started
+                self._ttft_samples.append(ttft)
+                self.active_streams[stream_id]["ttft_ms"] = ttft * 1000
             
             # Update metrics
             self.active_streams[stream_id]["chunks"] = total_chunks
@@ -251,7 +300,11 @@ class StreamingService:
         request: StreamingRequest,
         stream_id: str
     ) -> AsyncGenerator[str, None]:
-        """Simulate streaming response for demo purposes."""
+        """
+        Canned demo response, used when no provider is configured.
+
+        Sent as fast as the client reads it; it has no artificial delays.
+        """
         
         # Simulate processing stages
         stages = [
@@ -271,8 +324,6 @@ class StreamingService:
                     "progress": (i + 1) / len(stages) * 100
                 }
             ).to_sse()
-            
-            await asyncio.sleep(0.5)
         
         # Simulate chunked response
         response_parts = [
@@ -311,8 +362,6 @@ class StreamingService:
                     "tokens": self.active_streams[stream_id]["tokens"]
                 }
             ).to_sse()
-            
-            await asyncio.sleep(0.2)
 
     async def send_heartbeat(self, stream_id: str) -> str:
         """Send heartbeat to keep connection alive."""
@@ -326,8 +375,11 @@ class StreamingService:
 
     def get_metrics(self) -> Dict[str, Any]:
         """Get streaming metrics."""
+        samples = sorted(self._ttft_samples)
         return {
             **self.stream_metrics,
+            "ttft_ms_p50": statistics.median(samples) * 1000 if samples else None,
+            "ttft_ms_p95": samples[min(len(samples) - 1, int(0.95 * len(samples)))] * 1000 if samples else None,
             "active_stream_ids": list(self.active_streams.keys())
         }
 
@@ -351,10 +403,22 @@ async def stream_execution(
     Stream AI execution results via Server-Sent Events.
     
     This endpoint provides real-time streaming of AI-generated responses
-    with progress tracking and status updates.
+    with progress tracking and status updates. Tokens are streamed natively
+    from the requested provider when the app has a provider registry.
     """
+    ai_provider = None
+    registry = getattr(request.app.state, "provider_registry", None)
+    if registry is not None:
+        provider_name = streaming_request.provider or "openai"
+        provider_adapter = registry.get_provider(provider_name)
+        if provider_adapter is None:
+            raise HTTPException(status_code=400, detail=f"Provider {provider_name} not available")
+        ai_provider = ProviderStream(provider_name, provider_adapter)
+        if not streaming_request.model and ai_provider.default_model is None:
+            raise HTTPException(status_code=400, detail=f"No default model for provider {provider_name}; set model")
+
     return StreamingResponse(
-        service.create_stream(request, streaming_request),
+        service.create_stream(request, streaming_request, ai_provider),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -6,7 +6,6 @@ with all AI providers for real-time streaming responses.
 """
 
 import asyncio
-import json
 import logging
 import time
 import uuid
@@ -18,7 +17,8 @@ from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 from ..models import ExecuteRequest, TaskStatus
-from ..providers.streaming_adapter import unified_stream_handler, StreamChunk
+from ..providers.streaming_adapter import unified_stream_handler
+from ..streaming.sse_encoder import COALESCE_MAX_CHARS, COALESCE_MAX_DELAY, SSEEncoder, coalesce_chunks
 from ..security import get_api_key, verify_permissions
 from ..core.agent_executor import AgentExecutor
 
@@ -26,6 +26,9 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/v1", tags=["streaming"])
 
+# Minimum seconds between progress events
+PROGRESS_INTERVAL = 1.0
+
 
 class StreamingExecuteRequest(BaseModel):
     """Request model for streaming execution."""
@@ -40,28 +43,47 @@ class StreamingExecuteRequest(BaseModel):
     stream_options: Optional[Dict[str, Any]] = None
 
 
+def _stream_settings(options: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Coalescing and payload settings from ``stream_options``, with defaults."""
+    options = options or {}
+    return {
+        "include_result": bool(options.get("include_result", True)),
+        "max_chars": max(1, int(options.get("max_frame_chars", COALESCE_MAX_CHARS))),
+        "max_delay": max(0.0, float(options.get("coalesce_ms", COALESCE_MAX_DELAY * 1000))) / 1000,
+        "progress_interval": max(0.0, float(options.get("progress_interval", PROGRESS_INTERVAL))),
+    }
+
+
 async def create_sse_stream(
     request: StreamingExecuteRequest,
     agent_executor: AgentExecutor,
     stream_id: str
-) -> AsyncGenerator[str, None]:
+) -> AsyncGenerator[bytes, None]:
     """
     Create an SSE stream for AI execution.
 
+    Provider deltas are coalesced into size- and time-bounded frames and
+    each event is sent as a single pre-framed bytes object. The stream is
+    pulled by the response, so a slow client pauses the provider stream
+    once ``MAX_PENDING_CHUNKS`` deltas are queued instead of growing a
+    buffer. ``stream_options`` may set ``include_result`` (default True: the
+    completion event repeats the full text), ``max_frame_chars``,
+    ``coalesce_ms`` and ``progress_interval`` (seconds).
+
     Args:
         request: Streaming execution request
         agent_executor: Agent executor instance
         stream_id: Unique stream identifier
 
     Yields:
-        SSE-formatted strings
+        SSE-framed events as bytes
     """
+    encoder = SSEEncoder(stream_id)
     try:
+        settings = _stream_settings(request.stream_options)
+
         # Send initial status
-        yield f"id: {stream_id}\n"
-        yield f"event: status\n"
-        status_payload = {'status': 'started', 'timestamp': datetime.now().isoformat()}
-        yield "data: " + json.dumps(status_payload) + "\n\n"
+        yield encoder.event("status", {'status': 'started', 'timestamp': datetime.now().isoformat()})
 
         # Prepare messages for AI provider
         messages = [
@@ -84,86 +106,61 @@ async def create_sse_stream(
 
         logger.info(f"Starting streaming execution with {provider}/{model}")
 
-        # Call provider with streaming enabled
-        response = await provider_adapter.generate_completion(
-            model=model,
-            messages=messages,
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        ttft = None
+
+        # Stream tokens natively from the provider
+        chunks = unified_stream_handler.stream_completion(
+            provider,
+            provider_adapter,
+            model,
+            messages,
             max_tokens=request.max_tokens,
             temperature=request.temperature,
-            stream=True
         )
 
-        # Check if response is streaming
-        if isinstance(response, dict) and response.get("is_streaming"):
-            stream_response = response.get("stream")
-
-            # Stream chunks through unified handler
-            total_content = []
-            chunk_count = 0
-            total_tokens = 0
-
-            async for chunk in unified_stream_handler.stream_response(provider, stream_response):
-                chunk_count += 1
-                total_content.append(chunk.content)
-                total_tokens += chunk.tokens
-
-                # Send content chunk
-                yield f"id: {stream_id}-{chunk.index}\n"
-                yield f"event: message\n"
-                msg_payload = {'content': chunk.content, 'index': chunk.index}
-                yield "data: " + json.dumps(msg_payload) + "\n\n"
-
-                # Send progress every 5 chunks
-                if chunk_count % 5 == 0:
-                    yield f"event: progress\n"
-                    progress_payload = {'chunks': chunk_count, 'tokens': total_tokens, 'progress': min(95, chunk_count * 2)}
-                    yield "data: " + json.dumps(progress_payload) + "\n\n"
-
-                # Check for completion
-                if chunk.finish_reason:
-                    break
-
-            # Final content
-            full_content = "".join(total_content)
-
-        else:
-            # Non-streaming response, simulate streaming
-            full_content = response.get("content", "")
-
-            # Simulate streaming for non-streaming responses
-            async for chunk in unified_stream_handler.stream_response(
-                provider,
-                None,
-                content=full_content,
-                chunk_size=100,
-                delay=0.05
-            ):
-                yield f"id: {stream_id}-{chunk.index}\n"
-                yield f"event: message\n"
-                msg_payload = {'content': chunk.content, 'index': chunk.index}
-                yield "data: " + json.dumps(msg_payload) + "\n\n"
+        total_content = [] if settings["include_result"] else None
+        chunk_count = 0
+        total_tokens = 0
+        last_progress = started
+
+        async for frame in coalesce_chunks(chunks, max_chars=settings["max_chars"], max_delay=settings["max_delay"]):
+            if ttft is None:
+                ttft = loop.time() - started
+            chunk_count += frame.deltas
+            total_tokens += frame.tokens
+            if total_content is not None:
+                total_content.append(frame.content)
+
+            yield encoder.message(frame.content, frame.index)
+
+            # Progress at most once per interval rather than per chunk
+            now = loop.time()
+            if now - last_progress >= settings["progress_interval"]:
+                last_progress = now
+                progress_payload = {'chunks': chunk_count, 'tokens': total_tokens, 'progress': min(95, chunk_count * 2)}
+                yield encoder.event("progress", progress_payload, with_id=False)
 
         # Send completion event
-        yield f"id: {stream_id}-complete\n"
-        yield "event: complete\n"
         completion_payload = {
             "execution_id": stream_id,
             "status": "completed",
-            "result": full_content,
-            "total_tokens": total_tokens if 'total_tokens' in locals() else len(full_content.split()),
+            "total_tokens": total_tokens,
             "provider": provider,
             "model": model,
+            "ttft_ms": round(ttft * 1000, 1) if ttft is not None else None,
         }
-        yield "data: " + json.dumps(completion_payload) + "\n\n"
+        if total_content is not None:
+            completion_payload["result"] = "".join(total_content)
+        yield encoder.event("complete", completion_payload, suffix="complete")
 
     except Exception as e:
         logger.error(f"Streaming execution failed: {e}")
 
         # Send error event
-        yield f"id: {stream_id}-error\n"
-        yield f"event: error\n"
         err_payload = {'error': str(e), 'timestamp': datetime.now().isoformat()}
-        yield "data: " + json.dumps(err_payload) + "\n\n"
+        yield encoder.event("error", err_payload, suffix="error")
 
 
 @router.post("/execute/stream")
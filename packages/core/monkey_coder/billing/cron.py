@@ -3,125 +3,142 @@ Cron job functions for billing operations.
 
 This module contains functions designed to be run as scheduled jobs
 for billing operations like reporting usage to Stripe.
+
+Daily totals come from ``usage_daily_rollups``, which is updated in the
+same transaction as every ``usage_events`` insert (see
+``UsageEvent.create_many``), so reporting never scans raw events.
+``usage_events`` is partitioned by UTC day; retention drops whole
+partitions instead of deleting rows.
 """
 
+import asyncio
 import logging
-from datetime import datetime, timedelta
-from typing import List, Dict, Any
+import os
+import re
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
 
-from ..database.models import UsageEvent, BillingCustomer
+from ..database.connection import get_database_connection
 from .stripe_client import StripeClient
 
 logger = logging.getLogger(__name__)
 
+# Stripe allows 100 requests/s in live mode and 25/s in test mode
+STRIPE_REPORT_CONCURRENCY = int(os.getenv("STRIPE_REPORT_CONCURRENCY", "8"))
+STRIPE_REPORT_RATE = float(os.getenv("STRIPE_REPORT_RATE", "20"))
+
+# Rollup rows fetched per keyset page
+REPORT_PAGE_SIZE = 500
+
+# Rows per DELETE when usage_events is not partitioned
+CLEANUP_DELETE_BATCH = 5000
+
+_UNREPORTED_USAGE_QUERY = """
+    SELECT r.api_key_hash, r.tokens_total, r.cost_total, r.request_count, r.reported_tokens,
+           c.stripe_customer_id, c.stripe_subscription_item_id
+    FROM usage_daily_rollups r
+    LEFT JOIN billing_customers c ON c.api_key_hash = r.api_key_hash AND c.is_active = true
+    WHERE r.usage_date = $1 AND r.tokens_total > r.reported_tokens AND r.api_key_hash > $2
+    ORDER BY r.api_key_hash
+    LIMIT $3
+"""
+
+_PARTITION_NAME = re.compile(r"^usage_events_\w+$")
+_PARTITION_UPPER_BOUND = re.compile(r"TO \('([^']+)'\)")
 
-async def report_daily_usage_to_stripe() -> Dict[str, Any]:
+
+class _RateLimiter:
+    """Spaces calls ``1 / rate`` seconds apart across concurrent workers."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+
+    async def wait(self) -> None:
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        slot = max(now, self._next)
+        self._next = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+async def report_daily_usage_to_stripe(
+    day: Optional[date] = None,
+    stripe_client: Optional[StripeClient] = None,
+    concurrency: Optional[int] = None,
+    rate: Optional[float] = None,
+) -> Dict[str, Any]:
     """
     Report daily usage to Stripe for all customers.
-    
+
     This function is designed to be run as a daily cron job to report
-    usage data to Stripe for metered billing. It aggregates usage data
-    from the previous day and reports it to Stripe.
-    
+    usage data to Stripe for metered billing. It pages through the day's
+    unreported rollup rows by ``api_key_hash`` (keyset pagination, one short
+    query per page, so no transaction stays open while the queue waits on
+    Stripe) and reports them from ``concurrency`` workers, at most ``rate``
+    Stripe calls per second.
+    Each customer is marked reported right after Stripe accepts it, so a
+    rerun only reports what is still outstanding.
+
+    Args:
+        day: UTC day to report (default: yesterday)
+        stripe_client: Stripe client (default: a new ``StripeClient``)
+        concurrency: Concurrent Stripe calls (default ``STRIPE_REPORT_CONCURRENCY``)
+        rate: Stripe calls per second (default ``STRIPE_REPORT_RATE``)
+
     Returns:
         Dict[str, Any]: Summary of reporting results
     """
     logger.info("Starting daily usage reporting to Stripe")
-    
-    # Calculate yesterday's date range
-    yesterday = datetime.utcnow().date() - timedelta(days=1)
-    start_date = datetime.combine(yesterday, datetime.min.time())
-    end_date = datetime.combine(yesterday, datetime.max.time())
-    
+
+    day = day or (datetime.utcnow().date() - timedelta(days=1))
+    start_date = datetime.combine(day, datetime.min.time())
+    end_date = datetime.combine(day, datetime.max.time())
+
     results = {
         "period_start": start_date.isoformat(),
         "period_end": end_date.isoformat(),
         "customers_processed": 0,
+        "customers_skipped": 0,
         "total_usage_reported": 0,
         "errors": [],
         "success": True
     }
-    
+
+    concurrency = concurrency or STRIPE_REPORT_CONCURRENCY
+    limiter = _RateLimiter(STRIPE_REPORT_RATE if rate is None else rate)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+
     try:
-        # Get all active billing customers
-        # In a real implementation, you'd query the database for all customers
-        # For now, we'll get unique API key hashes from usage events
-        
-        stripe_client = StripeClient()
-        customers_processed = set()
-        
-        # Process usage in batches to avoid memory issues
-        batch_size = 100
-        offset = 0
-        
-        while True:
-            # Get usage events for the day (batch processing)
-            # This is a simplified approach - in production you'd want to
-            # aggregate data more efficiently
-            
-            try:
-                # Get unique API key hashes from usage events
-                usage_events = await _get_usage_events_for_period(
-                    start_date, end_date, limit=batch_size, offset=offset
-                )
-                
-                if not usage_events:
+        stripe_client = stripe_client or StripeClient()
+        pool = await get_database_connection()
+        workers = [
+            asyncio.create_task(_report_worker(queue, pool, stripe_client, limiter, day, results))
+            for _ in range(concurrency)
+        ]
+        try:
+            last_key = ""
+            while True:
+                async with pool.acquire() as connection:
+                    rows = await connection.fetch(_UNREPORTED_USAGE_QUERY, day, last_key, REPORT_PAGE_SIZE)
+                # The connection is back in the pool before the queue blocks
+                for row in rows:
+                    await queue.put(row)
+                if len(rows) < REPORT_PAGE_SIZE:
                     break
-                
-                # Group usage by API key hash
-                usage_by_customer = {}
-                for event in usage_events:
-                    api_key_hash = event.api_key_hash
-                    if api_key_hash not in usage_by_customer:
-                        usage_by_customer[api_key_hash] = {
-                            "total_tokens": 0,
-                            "total_cost": 0.0,
-                            "request_count": 0,
-                            "events": []
-                        }
-                    
-                    usage_by_customer[api_key_hash]["total_tokens"] += event.tokens_total
-                    usage_by_customer[api_key_hash]["total_cost"] += event.cost_total
-                    usage_by_customer[api_key_hash]["request_count"] += 1
-                    usage_by_customer[api_key_hash]["events"].append(event)
-                
-                # Report usage for each customer
-                for api_key_hash, usage_data in usage_by_customer.items():
-                    if api_key_hash in customers_processed:
-                        continue
-                    
-                    try:
-                        await _report_customer_usage_to_stripe(
-                            stripe_client=stripe_client,
-                            api_key_hash=api_key_hash,
-                            usage_data=usage_data,
-                            period_start=start_date,
-                            period_end=end_date
-                        )
-                        
-                        customers_processed.add(api_key_hash)
-                        results["customers_processed"] += 1
-                        results["total_usage_reported"] += usage_data["total_tokens"]
-                        
-                    except Exception as e:
-                        error_msg = f"Failed to report usage for customer {api_key_hash}: {e}"
-                        logger.error(error_msg)
-                        results["errors"].append(error_msg)
-                
-                offset += batch_size
-                
-            except Exception as e:
-                error_msg = f"Failed to process usage batch at offset {offset}: {e}"
-                logger.error(error_msg)
-                results["errors"].append(error_msg)
-                break
-        
+                last_key = rows[-1]["api_key_hash"]
+        finally:
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+
         if results["errors"]:
             results["success"] = False
-        
+
         logger.info(f"Daily usage reporting completed. Processed {results['customers_processed']} customers.")
         return results
-        
+
     except Exception as e:
         error_msg = f"Fatal error in daily usage reporting: {e}"
         logger.error(error_msg)
@@ -130,136 +147,256 @@ async def report_daily_usage_to_stripe() -> Dict[str, Any]:
         return results
 
 
-async def _get_usage_events_for_period(
-    start_date: datetime,
-    end_date: datetime,
-    limit: int = 100,
-    offset: int = 0
-) -> List[UsageEvent]:
-    """
-    Get usage events for a specific period.
-    
-    Args:
-        start_date: Start of period
-        end_date: End of period
-        limit: Maximum events to return
-        offset: Offset for pagination
-        
-    Returns:
-        List[UsageEvent]: Usage events
-    """
-    # This is a simplified implementation
-    # In production, you'd want to optimize this query
-    
-    from ..database.connection import get_database_connection
-    import json
-    
-    pool = await get_database_connection()
-    async with pool.acquire() as connection:
-        query = """
-            SELECT * FROM usage_events
-            WHERE created_at >= $1 AND created_at <= $2
-            ORDER BY created_at
-            LIMIT $3 OFFSET $4
-        """
-        
-        rows = await connection.fetch(query, start_date, end_date, limit, offset)
-        
-        events = []
-        for row in rows:
-            event_data = dict(row)
-            if event_data.get('metadata'):
-                event_data['metadata'] = json.loads(event_data['metadata'])
-            else:
-                event_data['metadata'] = {}
-            events.append(UsageEvent(**event_data))
-        
-        return events
+async def _report_worker(
+    queue: asyncio.Queue,
+    pool,
+    stripe_client: StripeClient,
+    limiter: _RateLimiter,
+    day: date,
+    results: Dict[str, Any],
+) -> None:
+    """Report queued rollup rows until the ``None`` sentinel arrives."""
+    while True:
+        row = await queue.get()
+        if row is None:
+            return
+        api_key_hash = row["api_key_hash"]
+        try:
+            reported = await _report_customer_usage_to_stripe(stripe_client, limiter, row, day)
+            if reported is None:
+                results["customers_skipped"] += 1
+                continue
+
+            async with pool.acquire() as connection:
+                await connection.execute("""
+                    UPDATE usage_daily_rollups
+                    SET reported_tokens = $3, reported_at = NOW()
+                    WHERE usage_date = $1 AND api_key_hash = $2
+                """, day, api_key_hash, row["tokens_total"])
+
+            results["customers_processed"] += 1
+            results["total_usage_reported"] += reported
+
+        except Exception as e:
+            error_msg = f"Failed to report usage for customer {api_key_hash}: {e}"
+            logger.error(error_msg)
+            results["errors"].append(error_msg)
 
 
 async def _report_customer_usage_to_stripe(
     stripe_client: StripeClient,
-    api_key_hash: str,
-    usage_data: Dict[str, Any],
-    period_start: datetime,
-    period_end: datetime
-) -> None:
+    limiter: _RateLimiter,
+    usage: Any,
+    day: date,
+) -> Optional[int]:
     """
-    Report usage for a specific customer to Stripe.
-    
+    Report one customer's outstanding usage for a day to Stripe.
+
     Args:
         stripe_client: Stripe client instance
-        api_key_hash: Customer's hashed API key
-        usage_data: Aggregated usage data
-        period_start: Start of reporting period
-        period_end: End of reporting period
+        limiter: Shared Stripe rate limiter
+        usage: Rollup row joined with the customer's billing record
+        day: UTC day being reported
+
+    Returns:
+        Optional[int]: Tokens reported, or None if the customer cannot be
+        billed yet (no billing customer or no metered subscription item)
     """
-    try:
-        # Get billing customer information
-        billing_customer = await BillingCustomer.get_by_api_key_hash(api_key_hash)
-        if not billing_customer:
-            logger.warning(f"No billing customer found for API key hash: {api_key_hash}")
-            return
-        
-        # In a real implementation, you would:
-        # 1. Get the customer's Stripe subscription
-        # 2. Find the appropriate subscription item for usage-based billing
-        # 3. Report the usage to that subscription item
-        
-        # For this example, we'll assume you have a subscription item ID
-        # In practice, you'd store this in your billing_customers table
-        # or fetch it from Stripe using the customer ID
-        
-        # Example of reporting usage (this would need real subscription item IDs):
-        # stripe_client.report_usage(
-        #     subscription_item_id="si_example123", 
-        #     quantity=usage_data["total_tokens"]
-        # )
-        
+    api_key_hash = usage["api_key_hash"]
+    if not usage["stripe_customer_id"]:
+        logger.warning(f"No billing customer found for API key hash: {api_key_hash}")
+        return None
+
+    quantity = usage["tokens_total"] - usage["reported_tokens"]
+    subscription_item_id = usage["stripe_subscription_item_id"]
+    if not subscription_item_id:
         logger.info(
-            f"Would report {usage_data['total_tokens']} tokens "
-            f"(${usage_data['total_cost']:.6f}) for customer {billing_customer.stripe_customer_id}"
+            f"Would report {quantity} tokens "
+            f"(${float(usage['cost_total']):.6f}) for customer {usage['stripe_customer_id']}: "
+            f"no metered subscription item"
         )
-        
-    except Exception as e:
-        logger.error(f"Failed to report usage for customer {api_key_hash}: {e}")
-        raise
+        return None
+
+    await limiter.wait()
+    # The key changes whenever the outstanding amount does, so a retry of
+    # the same report is deduplicated by Stripe but new usage is not
+    idempotency_key = f"usage-{api_key_hash}-{day.isoformat()}-{usage['tokens_total']}"
+    await asyncio.to_thread(
+        stripe_client.report_usage, subscription_item_id, quantity, idempotency_key=idempotency_key
+    )
+    return quantity
+
+
+async def rebuild_daily_rollup(day: date) -> int:
+    """
+    Recompute one day of ``usage_daily_rollups`` from ``usage_events``.
+
+    The aggregation runs in Postgres (``GROUP BY api_key_hash``). Use it to
+    repair a day or to fill days recorded before the rollup existed;
+    reporting progress (``reported_tokens``) is kept.
+
+    Args:
+        day: UTC day to rebuild
+
+    Returns:
+        int: Number of customers in the rebuilt day
+    """
+    start = datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc)
+
+    pool = await get_database_connection()
+    async with pool.acquire() as connection:
+        status = await connection.execute("""
+            INSERT INTO usage_daily_rollups (
+                usage_date, api_key_hash, tokens_input, tokens_output, tokens_total, cost_total, request_count
+            )
+            SELECT $1::date, api_key_hash,
+                   SUM(tokens_input), SUM(tokens_output), SUM(tokens_total), SUM(cost_total), COUNT(*)
+            FROM usage_events
+            WHERE created_at >= $2 AND created_at < $3
+            GROUP BY api_key_hash
+            ON CONFLICT (usage_date, api_key_hash) DO UPDATE SET
+                tokens_input = EXCLUDED.tokens_input,
+                tokens_output = EXCLUDED.tokens_output,
+                tokens_total = EXCLUDED.tokens_total,
+                cost_total = EXCLUDED.cost_total,
+                request_count = EXCLUDED.request_count,
+                updated_at = NOW()
+        """, day, start, start + timedelta(days=1))
+
+    customers = int(status.split()[-1])
+    logger.info(f"Rebuilt usage rollup for {day.isoformat()}: {customers} customers")
+    return customers
 
 
 # Additional utility functions for cron jobs
 
+async def _usage_partitions(connection) -> Optional[List[Tuple[str, Optional[datetime], float]]]:
+    """
+    List ``usage_events`` partitions.
+
+    Returns:
+        Optional[List[Tuple]]: (name, exclusive upper bound or None for the
+        default partition, estimated rows) per partition, or None if
+        ``usage_events`` is not partitioned
+    """
+    partitioned = await connection.fetchrow("""
+        SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'usage_events'::regclass
+    """)
+    if not partitioned:
+        return None
+
+    rows = await connection.fetch("""
+        SELECT c.relname AS name, pg_get_expr(c.relpartbound, c.oid) AS bound, c.reltuples AS rows
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'usage_events'::regclass
+    """)
+    partitions = []
+    for row in rows:
+        match = _PARTITION_UPPER_BOUND.search(row["bound"])
+        upper = datetime.fromisoformat(match.group(1)).astimezone(timezone.utc) if match else None
+        partitions.append((row["name"], upper, max(float(row["rows"]), 0.0)))
+    return partitions
+
+
+async def ensure_usage_partitions(days_ahead: int = 7) -> Dict[str, Any]:
+    """
+    Create daily ``usage_events`` partitions for the coming days.
+
+    Rows for days without a partition land in ``usage_events_default``,
+    which cannot be dropped by retention, so run this at least weekly.
+
+    Args:
+        days_ahead: Days after today to create partitions for
+
+    Returns:
+        Dict[str, Any]: Created partition names
+    """
+    pool = await get_database_connection()
+    async with pool.acquire() as connection:
+        partitions = await _usage_partitions(connection)
+        if partitions is None:
+            return {"partitioned": False, "created": [], "success": True}
+
+        today = datetime.utcnow().date()
+        bounds = [upper.date() for _, upper, _ in partitions if upper is not None]
+        day = max(bounds + [today])
+        created = []
+        errors = []
+        while day <= today + timedelta(days=days_ahead):
+            name = f"usage_events_p{day:%Y%m%d}"
+            try:
+                await connection.execute(
+                    f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF usage_events '
+                    f"FOR VALUES FROM ('{day.isoformat()} 00:00:00+00') "
+                    f"TO ('{(day + timedelta(days=1)).isoformat()} 00:00:00+00')"
+                )
+                created.append(name)
+            except Exception as e:
+                # e.g. the default partition already holds rows for this day
+                error_msg = f"Failed to create partition {name}: {e}"
+                logger.error(error_msg)
+                errors.append(error_msg)
+            day += timedelta(days=1)
+
+    if created:
+        logger.info(f"Created usage_events partitions: {', '.join(created)}")
+    return {"partitioned": True, "created": created, "errors": errors, "success": not errors}
+
+
 async def cleanup_old_usage_events(days_to_keep: int = 90) -> Dict[str, Any]:
     """
     Clean up old usage events to manage database size.
-    
+
+    Drops every daily partition that ends on or before the cutoff, then
+    makes sure upcoming partitions exist. If ``usage_events`` is not
+    partitioned, deletes in batches of ``CLEANUP_DELETE_BATCH`` rows so no
+    single statement holds locks for long. Daily rollups are kept.
+
     Args:
         days_to_keep: Number of days of usage events to keep
-        
+
     Returns:
-        Dict[str, Any]: Cleanup results
+        Dict[str, Any]: Cleanup results; ``events_deleted`` is estimated
+        from table statistics when partitions are dropped
     """
-    cutoff_date = datetime.utcnow() - timedelta(days=days_to_keep)
-    
-    from ..database.connection import get_database_connection
-    
+    cutoff_date = datetime.combine(
+        datetime.utcnow().date() - timedelta(days=days_to_keep), datetime.min.time(), tzinfo=timezone.utc
+    )
+    events_deleted = 0
+    dropped = []
+
     pool = await get_database_connection()
     async with pool.acquire() as connection:
-        # Count events to be deleted
-        count_result = await connection.fetchrow("""
-            SELECT COUNT(*) as count FROM usage_events WHERE created_at < $1
-        """, cutoff_date)
-        
-        events_to_delete = count_result["count"]
-        
-        # Delete old events
-        await connection.execute("""
-            DELETE FROM usage_events WHERE created_at < $1
-        """, cutoff_date)
-        
-        logger.info(f"Cleaned up {events_to_delete} usage events older than {days_to_keep} days")
-        
-        return {
-            "cutoff_date": cutoff_date.isoformat(),
-            "events_deleted": events_to_delete,
-            "success": True
-        }
+        partitions = await _usage_partitions(connection)
+
+        if partitions is None:
+            while True:
+                status = await connection.execute("""
+                    DELETE FROM usage_events WHERE id IN (
+                        SELECT id FROM usage_events WHERE created_at < $1 LIMIT $2
+                    )
+                """, cutoff_date, CLEANUP_DELETE_BATCH)
+                deleted = int(status.split()[-1])
+                events_deleted += deleted
+                if deleted < CLEANUP_DELETE_BATCH:
+                    break
+        else:
+            for name, upper, rows in partitions:
+                if upper is None or upper > cutoff_date or not _PARTITION_NAME.match(name):
+                    continue
+                await connection.execute(f'DROP TABLE IF EXISTS "{name}"')
+                dropped.append(name)
+                events_deleted += int(rows)
+
+    if partitions is not None:
+        await ensure_usage_partitions()
+
+    logger.info(f"Cleaned up {events_deleted} usage events older than {days_to_keep} days")
+
+    return {
+        "cutoff_date": cutoff_date.isoformat(),
+        "events_deleted": events_deleted,
+        "partitions_dropped": dropped,
+        "success": True
+    }
@@ -76,13 +76,16 @@ class StripeClient:
             logger.error(f"Failed to create billing portal session: {e}")
             raise
     
-    def report_usage(self, subscription_item_id: str, quantity: int) -> Dict:
+    def report_usage(
+        self, subscription_item_id: str, quantity: int, idempotency_key: Optional[str] = None
+    ) -> Dict:
         """
         Report usage for a metered billing subscription item.
         
         Args:
             subscription_item_id: Stripe subscription item ID
             quantity: Usage quantity to report
+            idempotency_key: Makes a retried report a no-op on Stripe's side
             
         Returns:
             Dict: Usage record as returned by Stripe
@@ -92,7 +95,8 @@ class StripeClient:
                 subscription_item_id,
                 quantity=quantity,
                 timestamp="now",
-                action="increment"
+                action="increment",
+                idempotency_key=idempotency_key
             )
             
             logger.info(f"Reported usage for subscription item {subscription_item_id}: {quantity}")
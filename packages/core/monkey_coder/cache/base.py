@@ -1,6 +1,12 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Any, Optional, Dict
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+import contextlib
+import heapq
+import itertools
+import pickle
+import sys
+import threading
 import time
 from collections import OrderedDict
 
@@ -10,6 +16,19 @@ class CacheEntry:
     expires_at: float
     created_at: float
     hits: int = 0
+    size: int = 0
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate memory cost of a cached value in bytes (its pickled size)."""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value)
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
 
 CACHE_REGISTRY: Dict[str, "TTLRUCache"] = {}
 
@@ -40,50 +59,124 @@ def get_cache_registry_stats() -> Dict[str, Any]:
 class TTLRUCache:
     """Combined TTL + LRU cache.
 
-    Not thread-safe (assumes single-threaded async usage or external locking).
+    Entries are kept in LRU order in an ``OrderedDict``; expiry times live in
+    a min-heap so purging expired entries only touches entries that have
+    actually expired (amortised O(log n) per operation instead of a full
+    scan). Heap records for overwritten or evicted keys are skipped lazily
+    and the heap is rebuilt when stale records outnumber live ones.
+
+    Not thread-safe by default (assumes single-threaded async usage);
+    pass ``thread_safe=True`` to guard every operation with a lock.
+
+    Args:
+        max_entries: Maximum number of entries before LRU eviction
+        default_ttl: Seconds an entry lives when ``set`` gets no ``ttl``
+        register_as: Register under this name in ``CACHE_REGISTRY``
+        max_bytes: Optional memory cap; LRU entries are evicted to stay under it
+        size_fn: Per-entry size in bytes (defaults to :func:`estimate_size`);
+            sizes are only computed when ``max_bytes`` or ``size_fn`` is set
+        thread_safe: Guard operations with a re-entrant lock
     """
-    def __init__(self, max_entries: int = 256, default_ttl: float = 60.0, register_as: Optional[str] = None):
+    def __init__(
+        self,
+        max_entries: int = 256,
+        default_ttl: float = 60.0,
+        register_as: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        size_fn: Optional[Callable[[Any], int]] = None,
+        thread_safe: bool = False,
+    ):
         self.max_entries = max_entries
         self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self._size_fn = size_fn or (estimate_size if max_bytes is not None else None)
         self._store: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._expiry: List[Tuple[float, int, str]] = []
+        self._seq = itertools.count()
+        self._lock = threading.RLock() if thread_safe else contextlib.nullcontext()
+        self.thread_safe = thread_safe
+        self.total_bytes = 0
         self.hits = 0
         self.misses = 0
         self.evictions = 0
         self.expired = 0
+        self.invalidations = 0
         if register_as:
             # Delay registration until after construction to ensure attributes exist
             register_cache(register_as, self)
 
-    def _purge_expired(self):
-        now = time.time()
-        to_delete = [k for k, v in self._store.items() if v.expires_at < now]
-        for k in to_delete:
-            self._store.pop(k, None)
-            self.expired += 1
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def _remove(self, key: str) -> Optional[CacheEntry]:
+        entry = self._store.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry.size
+        return entry
+
+    def _purge_expired(self, now: Optional[float] = None):
+        now = time.time() if now is None else now
+        expiry = self._expiry
+        while expiry and expiry[0][0] < now:
+            expires_at, _, key = heapq.heappop(expiry)
+            entry = self._store.get(key)
+            # Skip stale heap records left behind by overwrites and evictions
+            if entry is not None and entry.expires_at == expires_at:
+                self._remove(key)
+                self.expired += 1
+
+    def _compact_expiry(self):
+        if len(self._expiry) > 2 * len(self._store) + 64:
+            self._expiry = [(e.expires_at, next(self._seq), k) for k, e in self._store.items()]
+            heapq.heapify(self._expiry)
 
     def _evict_lru(self):
-        while len(self._store) > self.max_entries:
-            _, _ = self._store.popitem(last=False)
+        while len(self._store) > self.max_entries or (
+            self.max_bytes is not None and self.total_bytes > self.max_bytes and self._store
+        ):
+            _, entry = self._store.popitem(last=False)
+            self.total_bytes -= entry.size
             self.evictions += 1
 
-    def set(self, key: str, value: Any, ttl: Optional[float] = None):
-        self._purge_expired()
-        ttl = self.default_ttl if ttl is None else ttl
-        entry = CacheEntry(value=value, expires_at=time.time() + ttl, created_at=time.time())
-        if key in self._store:
-            self._store.pop(key, None)
+    def _set(self, key: str, value: Any, ttl: float, now: float):
+        size = self._size_fn(value) if self._size_fn is not None else 0
+        self._remove(key)
+        if self.max_bytes is not None and size > self.max_bytes:
+            # Larger than the whole budget; caching it would evict everything else
+            return
+        entry = CacheEntry(value=value, expires_at=now + ttl, created_at=now, size=size)
         self._store[key] = entry
-        self._store.move_to_end(key, last=True)
-        self._evict_lru()
+        self.total_bytes += size
+        heapq.heappush(self._expiry, (entry.expires_at, next(self._seq), key))
 
-    def get(self, key: str) -> Optional[Any]:
-        self._purge_expired()
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        ttl = self.default_ttl if ttl is None else ttl
+        with self._lock:
+            now = time.time()
+            self._purge_expired(now)
+            self._set(key, value, ttl, now)
+            self._evict_lru()
+            self._compact_expiry()
+
+    def set_many(self, items: Union[Mapping[str, Any], Iterable[Tuple[str, Any]]], ttl: Optional[float] = None):
+        """Insert several entries with one purge and one eviction pass."""
+        ttl = self.default_ttl if ttl is None else ttl
+        pairs = items.items() if isinstance(items, Mapping) else items
+        with self._lock:
+            now = time.time()
+            self._purge_expired(now)
+            for key, value in pairs:
+                self._set(key, value, ttl, now)
+            self._evict_lru()
+            self._compact_expiry()
+
+    def _get(self, key: str, now: float) -> Optional[Any]:
         entry = self._store.get(key)
         if not entry:
             self.misses += 1
             return None
-        if entry.expires_at < time.time():
-            self._store.pop(key, None)
+        if entry.expires_at < now:
+            self._remove(key)
             self.expired += 1
             self.misses += 1
             return None
@@ -92,18 +185,53 @@ class TTLRUCache:
         self._store.move_to_end(key, last=True)
         return entry.value
 
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            now = time.time()
+            self._purge_expired(now)
+            return self._get(key, now)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Look up several keys at once; returns only the keys that were found."""
+        with self._lock:
+            now = time.time()
+            self._purge_expired(now)
+            found = {}
+            for key in keys:
+                value = self._get(key, now)
+                if value is not None:
+                    found[key] = value
+            return found
+
     def stats(self) -> Dict[str, Any]:
-        self._purge_expired()
-        return {
-            "size": len(self._store),
-            "hits": self.hits,
-            "misses": self.misses,
-            "evictions": self.evictions,
-            "expired": self.expired,
-            "max_entries": self.max_entries,
-            "default_ttl": self.default_ttl,
-        }
+        with self._lock:
+            self._purge_expired()
+            return {
+                "size": len(self._store),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expired": self.expired,
+                "invalidations": self.invalidations,
+                "max_entries": self.max_entries,
+                "default_ttl": self.default_ttl,
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def invalidate(self) -> int:
+        """Drop all entries without resetting counters; returns the number dropped."""
+        with self._lock:
+            removed = len(self._store)
+            self._store.clear()
+            self._expiry.clear()
+            self.total_bytes = 0
+            self.invalidations += 1
+            return removed
 
     def clear(self):
-        self._store.clear()
-        self.hits = self.misses = self.evictions = self.expired = 0
+        with self._lock:
+            self._store.clear()
+            self._expiry.clear()
+            self.total_bytes = 0
+            self.hits = self.misses = self.evictions = self.expired = self.invalidations = 0
@@ -0,0 +1,414 @@
+"""Persistent second-tier (L2) stores for ``ResultCache``.
+
+L1 is the per-process ``TTLRUCache``; an L2 store survives restarts and can
+be shared between workers. Stores hold opaque bytes under a byte budget with
+TTL expiry and least-recently-used eviction. Their ``get``/``set``/``delete``/
+``clear`` are coroutines so L2 I/O never blocks the event loop:
+
+- ``SQLiteStore``: a local SQLite file (WAL, memory-mapped reads) that all
+  workers on a host can share; queries run in a worker thread.
+- ``RedisStore``: a Redis database shared across hosts, through a
+  ``redis.asyncio`` client (or ``fakeredis.FakeAsyncRedis`` in tests).
+
+Values are JSON-encoded and zlib-compressed above a size threshold by
+``encode_value``/``decode_value``. ``l2_store_from_env`` builds a store from
+``RESULT_CACHE_L2`` (``sqlite:///path/to/cache.db`` or ``redis://...``) and
+``RESULT_CACHE_L2_MAX_BYTES``.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_L2_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_L2_TTL = 3600.0
+COMPRESS_THRESHOLD = 1024
+
+# One-byte payload header: raw JSON or zlib-compressed JSON
+_RAW = b"j"
+_ZLIB = b"z"
+
+
+def encode_value(value: Any, compress_threshold: int = COMPRESS_THRESHOLD) -> bytes:
+    """Serialise a cache value, compressing payloads larger than ``compress_threshold`` bytes.
+
+    Raises ``TypeError``/``ValueError`` for values that are not JSON-serialisable.
+    """
+    raw = json.dumps(value, separators=(",", ":")).encode()
+    if len(raw) > compress_threshold:
+        compressed = zlib.compress(raw, 6)
+        if len(compressed) < len(raw):
+            return _ZLIB + compressed
+    return _RAW + raw
+
+
+def decode_value(data: bytes) -> Any:
+    """Inverse of :func:`encode_value`."""
+    header, body = data[:1], data[1:]
+    if header == _ZLIB:
+        body = zlib.decompress(body)
+    elif header != _RAW:
+        raise ValueError(f"Unknown cache payload header {header!r}")
+    return json.loads(body)
+
+
+class L2Store(ABC):
+    """Byte-budgeted key/value store interface for the second cache tier."""
+
+    def __init__(self, max_bytes: int = DEFAULT_L2_MAX_BYTES, default_ttl: float = DEFAULT_L2_TTL):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.expired = 0
+        self.errors = 0
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        """Stored bytes for ``key``, or ``None`` if missing or expired."""
+
+    @abstractmethod
+    async def set(self, key: str, data: bytes, ttl: Optional[float] = None) -> None:
+        """Store ``data`` under ``key``, evicting LRU entries beyond the byte budget."""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Remove ``key`` if present."""
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """Remove every entry."""
+
+    @abstractmethod
+    def size(self) -> int:
+        """Number of stored entries."""
+
+    @abstractmethod
+    def total_bytes(self) -> int:
+        """Bytes currently stored."""
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self).__name__,
+            "size": self.size(),
+            "bytes": self.total_bytes(),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "expired": self.expired,
+            "errors": self.errors,
+            "default_ttl": self.default_ttl,
+        }
+
+
+class SQLiteStore(L2Store):
+    """L2 store in a local SQLite file shared by every worker on the host.
+
+    Each entry records its size and last access time; when the byte budget is
+    exceeded the least recently used entries are deleted. Reads go through
+    SQLite's memory map (``mmap_size``) so hot pages are served from the page
+    cache without copies.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS cache_entries (
+            key TEXT PRIMARY KEY,
+            value BLOB NOT NULL,
+            size INTEGER NOT NULL,
+            expires_at REAL NOT NULL,
+            accessed_at REAL NOT NULL
+        )
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = DEFAULT_L2_MAX_BYTES,
+        default_ttl: float = DEFAULT_L2_TTL,
+        mmap_bytes: int = 64 * 1024 * 1024,
+    ):
+        super().__init__(max_bytes=max_bytes, default_ttl=default_ttl)
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(f"PRAGMA mmap_size={int(mmap_bytes)}")
+        self._conn.execute(self._SCHEMA)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache_entries (accessed_at)")
+        self._bytes = self._sum_bytes()
+
+    def _sum_bytes(self) -> int:
+        return int(self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entries").fetchone()[0])
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, data: bytes, ttl: Optional[float] = None) -> None:
+        await asyncio.to_thread(self._set, key, data, ttl)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._delete, key)
+
+    async def clear(self) -> None:
+        await asyncio.to_thread(self._clear)
+
+    def _get(self, key: str) -> Optional[bytes]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            value, expires_at = row
+            if expires_at < now:
+                self._conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+                self._bytes = max(0, self._bytes - len(value))
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE cache_entries SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return bytes(value)
+
+    def _set(self, key: str, data: bytes, ttl: Optional[float] = None) -> None:
+        if len(data) > self.max_bytes:
+            return
+        now = time.time()
+        ttl = self.default_ttl if ttl is None else ttl
+        with self._lock:
+            previous = self._conn.execute("SELECT size FROM cache_entries WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, size, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, sqlite3.Binary(data), len(data), now + ttl, now),
+            )
+            self._bytes += len(data) - (previous[0] if previous else 0)
+            self.writes += 1
+            if self._bytes > self.max_bytes:
+                self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        # Other workers write to the same file, so re-read the true total before evicting
+        cursor = self._conn.execute("DELETE FROM cache_entries WHERE expires_at < ?", (now,))
+        self.expired += max(cursor.rowcount, 0)
+        self._bytes = self._sum_bytes()
+        while self._bytes > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM cache_entries ORDER BY accessed_at LIMIT 64"
+            ).fetchall()
+            if not rows:
+                break
+            excess = self._bytes - self.max_bytes
+            victims = []
+            for key, size in rows:
+                victims.append((key,))
+                excess -= size
+                self._bytes -= size
+                if excess <= 0:
+                    break
+            self._conn.executemany("DELETE FROM cache_entries WHERE key = ?", victims)
+            self.evictions += len(victims)
+
+    def _delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+            self._bytes = self._sum_bytes()
+
+    def _clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache_entries")
+            self._bytes = 0
+
+    def size(self) -> int:
+        with self._lock:
+            return int(self._conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0])
+
+    def total_bytes(self) -> int:
+        return self._bytes
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class RedisStore(L2Store):
+    """L2 store in Redis, shared by every worker that points at the same database.
+
+    Values live under ``{prefix}:v:{key}`` with a Redis TTL. A sorted set of
+    access times and a hash of entry sizes under the same prefix drive LRU
+    eviction against the byte budget; entries Redis has already expired are
+    dropped from both when they are next looked up or evicted. ``size()`` and
+    ``total_bytes()`` report the figures seen on the last write, so stats
+    never touch the network.
+
+    Args:
+        client: A ``redis.asyncio.Redis`` (or ``fakeredis.FakeAsyncRedis``) client
+        prefix: Key namespace, so several caches can share a database
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        prefix: str = "monkey_coder:result_cache",
+        max_bytes: int = DEFAULT_L2_MAX_BYTES,
+        default_ttl: float = DEFAULT_L2_TTL,
+    ):
+        super().__init__(max_bytes=max_bytes, default_ttl=default_ttl)
+        self.client = client
+        self.prefix = prefix
+        self._lru_key = f"{prefix}:lru"
+        self._sizes_key = f"{prefix}:sizes"
+        self._bytes_key = f"{prefix}:bytes"
+        self._size = 0
+        self._bytes = 0
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisStore":
+        import redis.asyncio as aioredis
+
+        return cls(aioredis.from_url(url), **kwargs)
+
+    def _value_key(self, key: str) -> str:
+        return f"{self.prefix}:v:{key}"
+
+    async def _forget(self, keys) -> int:
+        """Drop LRU/size bookkeeping for ``keys``; returns the bytes released."""
+        if not keys:
+            return 0
+        sizes = await self.client.hmget(self._sizes_key, keys)
+        released = sum(int(size) for size in sizes if size is not None)
+        pipe = self.client.pipeline()
+        pipe.zrem(self._lru_key, *keys)
+        pipe.hdel(self._sizes_key, *keys)
+        if released:
+            pipe.decrby(self._bytes_key, released)
+        pipe.zcard(self._lru_key)
+        results = await pipe.execute()
+        self._size = int(results[-1])
+        self._bytes = max(0, self._bytes - released)
+        return released
+
+    async def get(self, key: str) -> Optional[bytes]:
+        try:
+            value = await self.client.get(self._value_key(key))
+            if value is None:
+                if await self.client.zscore(self._lru_key, key) is not None:
+                    # Redis expired the value; drop its bookkeeping
+                    await self._forget([key])
+                    self.expired += 1
+                self.misses += 1
+                return None
+            await self.client.zadd(self._lru_key, {key: time.time()})
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Redis L2 cache read failed: %s", e)
+            return None
+        self.hits += 1
+        return bytes(value)
+
+    async def set(self, key: str, data: bytes, ttl: Optional[float] = None) -> None:
+        if len(data) > self.max_bytes:
+            return
+        ttl = self.default_ttl if ttl is None else ttl
+        try:
+            previous = await self.client.hget(self._sizes_key, key)
+            pipe = self.client.pipeline()
+            pipe.set(self._value_key(key), data, px=max(1, int(ttl * 1000)))
+            pipe.zadd(self._lru_key, {key: time.time()})
+            pipe.hset(self._sizes_key, key, len(data))
+            pipe.zcard(self._lru_key)
+            pipe.incrby(self._bytes_key, len(data) - int(previous or 0))
+            results = await pipe.execute()
+            self._size = int(results[-2])
+            self._bytes = total = int(results[-1])
+            self.writes += 1
+            if total > self.max_bytes:
+                await self._evict(total)
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Redis L2 cache write failed: %s", e)
+
+    async def _evict(self, total: int) -> None:
+        while total > self.max_bytes:
+            oldest = await self.client.zrange(self._lru_key, 0, 63)
+            if not oldest:
+                break
+            victims = []
+            excess = total - self.max_bytes
+            sizes = await self.client.hmget(self._sizes_key, oldest)
+            for key, size in zip(oldest, sizes):
+                victims.append(key.decode() if isinstance(key, bytes) else key)
+                excess -= int(size or 0)
+                if excess <= 0:
+                    break
+            await self.client.delete(*[self._value_key(key) for key in victims])
+            total -= await self._forget(victims)
+            self.evictions += len(victims)
+
+    async def delete(self, key: str) -> None:
+        try:
+            await self.client.delete(self._value_key(key))
+            await self._forget([key])
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Redis L2 cache delete failed: %s", e)
+
+    async def clear(self) -> None:
+        try:
+            keys = [
+                k.decode() if isinstance(k, bytes) else k
+                for k in await self.client.zrange(self._lru_key, 0, -1)
+            ]
+            if keys:
+                await self.client.delete(*[self._value_key(key) for key in keys])
+            await self.client.delete(self._lru_key, self._sizes_key, self._bytes_key)
+            self._size = self._bytes = 0
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Redis L2 cache clear failed: %s", e)
+
+    def size(self) -> int:
+        return self._size
+
+    def total_bytes(self) -> int:
+        return self._bytes
+
+
+def l2_store_from_env(prefix: str = "monkey_coder:result_cache") -> Optional[L2Store]:
+    """Build the L2 store configured by ``RESULT_CACHE_L2``, or ``None`` when unset or unavailable."""
+    spec = os.getenv("RESULT_CACHE_L2", "").strip()
+    if not spec:
+        return None
+    max_bytes = int(os.getenv("RESULT_CACHE_L2_MAX_BYTES", str(DEFAULT_L2_MAX_BYTES)))
+    default_ttl = float(os.getenv("RESULT_CACHE_L2_TTL", str(DEFAULT_L2_TTL)))
+    try:
+        if spec.startswith("sqlite:///"):
+            return SQLiteStore(spec[len("sqlite:///"):], max_bytes=max_bytes, default_ttl=default_ttl)
+        if spec.startswith(("redis://", "rediss://", "unix://")):
+            return RedisStore.from_url(spec, prefix=prefix, max_bytes=max_bytes, default_ttl=default_ttl)
+    except Exception as e:
+        logger.warning("Result cache L2 %s unavailable, using L1 only: %s", spec, e)
+        return None
+    logger.warning("Unsupported RESULT_CACHE_L2 value %r, using L1 only", spec)
+    return None
@@ -2,13 +2,41 @@ from __future__ import annotations
 from typing import Any, Dict, Optional
 import hashlib
 import json
-from .base import TTLRUCache
+import logging
+from .base import TTLRUCache, register_cache
+from .persistent import COMPRESS_THRESHOLD, L2Store, decode_value, encode_value
+
+logger = logging.getLogger(__name__)
+
 
 class ResultCache:
-    def __init__(self, max_entries: int = 256, default_ttl: float = 120.0, register: bool = True):
-        # Register so it appears in global cache stats
-        name = "result_cache" if register else None
-        self._cache = TTLRUCache(max_entries=max_entries, default_ttl=default_ttl, register_as=name)
+    """Two-tier result cache: in-process ``TTLRUCache`` (L1) over an optional persistent L2.
+
+    ``aget``/``aset`` use both tiers: L1 misses fall through to the L2 store
+    (see ``cache.persistent``) and L2 hits are promoted into L1. Writes go to
+    both tiers; values that are not JSON-serialisable stay in L1 only. L2
+    I/O is asynchronous, so the synchronous ``get``/``set`` only touch L1.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        default_ttl: float = 120.0,
+        register: bool = True,
+        l2: Optional[L2Store] = None,
+        l2_ttl: Optional[float] = None,
+        compress_threshold: int = COMPRESS_THRESHOLD,
+    ):
+        self._cache = TTLRUCache(max_entries=max_entries, default_ttl=default_ttl)
+        self.l2 = l2
+        self.l2_ttl = l2_ttl
+        self.compress_threshold = compress_threshold
+        self.l1_hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+        if register:
+            # Register so both tiers appear in global cache stats
+            register_cache("result_cache", self)
 
     @staticmethod
     def _stable_key(prompt: str, persona: str, provider: Optional[str] = None, model: Optional[str] = None, extra: Optional[Dict[str, Any]] = None) -> str:
@@ -23,15 +51,81 @@ class ResultCache:
         return hashlib.sha256(raw.encode()).hexdigest()
 
     def get(self, prompt: str, persona: str, provider: Optional[str] = None, model: Optional[str] = None, extra: Optional[Dict[str, Any]] = None) -> Optional[Any]:
+        """L1-only lookup, for synchronous callers."""
         key = self._stable_key(prompt, persona, provider, model, extra)
-        return self._cache.get(key)
+        value = self._cache.get(key)
+        if value is not None:
+            self.l1_hits += 1
+        else:
+            self.misses += 1
+        return value
 
     def set(self, prompt: str, persona: str, value: Any, provider: Optional[str] = None, model: Optional[str] = None, extra: Optional[Dict[str, Any]] = None):
+        """L1-only store, for synchronous callers."""
+        key = self._stable_key(prompt, persona, provider, model, extra)
+        self._cache.set(key, value)
+
+    async def aget(self, prompt: str, persona: str, provider: Optional[str] = None, model: Optional[str] = None, extra: Optional[Dict[str, Any]] = None) -> Optional[Any]:
+        """Look up L1, then L2 (promoting L2 hits into L1)."""
+        key = self._stable_key(prompt, persona, provider, model, extra)
+        value = self._cache.get(key)
+        if value is not None:
+            self.l1_hits += 1
+            return value
+        if self.l2 is not None:
+            try:
+                data = await self.l2.get(key)
+                if data is not None:
+                    value = decode_value(data)
+            except Exception as e:  # L2 problems must degrade to a miss, never an error
+                logger.warning("Result cache L2 read failed: %s", e)
+            if value is not None:
+                self.l2_hits += 1
+                self._cache.set(key, value)
+                return value
+        self.misses += 1
+        return None
+
+    async def aset(self, prompt: str, persona: str, value: Any, provider: Optional[str] = None, model: Optional[str] = None, extra: Optional[Dict[str, Any]] = None):
+        """Store in L1 and, when serialisable, in L2."""
         key = self._stable_key(prompt, persona, provider, model, extra)
         self._cache.set(key, value)
+        if self.l2 is not None:
+            try:
+                await self.l2.set(key, encode_value(value, self.compress_threshold), ttl=self.l2_ttl)
+            except (TypeError, ValueError) as e:
+                logger.debug("Result not JSON-serialisable, kept in L1 only: %s", e)
+            except Exception as e:
+                logger.warning("Result cache L2 write failed: %s", e)
 
     def stats(self) -> Dict[str, Any]:
-        return self._cache.stats()
+        l1 = self._cache.stats()
+        lookups = self.l1_hits + self.l2_hits + self.misses
+        tiers: Dict[str, Any] = {
+            "l1": {
+                **l1,
+                "hit_rate": self.l1_hits / lookups if lookups else 0.0,
+            },
+        }
+        if self.l2 is not None:
+            l2 = self.l2.stats()
+            # Share of all lookups served by L2 (the store's own hit_rate is per L2 lookup)
+            l2["tier_hit_rate"] = self.l2_hits / lookups if lookups else 0.0
+            tiers["l2"] = l2
+        return {
+            **l1,
+            "hits": self.l1_hits + self.l2_hits,
+            "misses": self.misses,
+            "hit_rate": (self.l1_hits + self.l2_hits) / lookups if lookups else 0.0,
+            "tiers": tiers,
+        }
 
     def clear(self):
+        """Drop L1 entries and reset counters; ``aclear`` also empties L2."""
         self._cache.clear()
+        self.l1_hits = self.l2_hits = self.misses = 0
+
+    async def aclear(self):
+        self.clear()
+        if self.l2 is not None:
+            await self.l2.clear()
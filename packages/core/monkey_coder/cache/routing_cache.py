@@ -2,12 +2,50 @@ from __future__ import annotations
 from typing import Any, Dict, Optional
 import hashlib
 import json
+import logging
+import weakref
 from .base import TTLRUCache
 
+logger = logging.getLogger(__name__)
+
+# Live routing caches, so manifest reloads and provider health changes can drop stale decisions
+_ROUTING_CACHES: "weakref.WeakSet[RoutingDecisionCache]" = weakref.WeakSet()
+
+
+def _file_count_bucket(count: int) -> str:
+    # Mirrors the file-count thresholds used by complexity analysis
+    if count > 8:
+        return "9+"
+    if count > 5:
+        return "6-8"
+    if count > 1:
+        return "2-5"
+    return "0-1"
+
+
+def _enum_value(value: Any) -> Any:
+    return getattr(value, "value", value)
+
+
+# ExecutionContext fields the quantum router turns into resource constraints and preferences
+_ROUTING_CONTEXT_FIELDS = ("timeout", "quality_threshold", "is_premium_user", "billing_tier")
+
+
+def invalidate_routing_caches(reason: str = "") -> int:
+    """Drop every cached routing decision in the process.
+
+    Returns the number of decisions removed.
+    """
+    removed = sum(cache.invalidate() for cache in list(_ROUTING_CACHES))
+    logger.info("Invalidated %d cached routing decisions%s", removed, f" ({reason})" if reason else "")
+    return removed
+
+
 class RoutingDecisionCache:
     def __init__(self, max_entries: int = 512, default_ttl: float = 30.0, register: bool = True):
         name = "routing_decision_cache" if register else None
         self._cache = TTLRUCache(max_entries=max_entries, default_ttl=default_ttl, register_as=name)
+        _ROUTING_CACHES.add(self)
 
     @staticmethod
     def _stable_key(prompt: str, context_type: str, complexity_bucket: str) -> str:
@@ -19,6 +57,31 @@ class RoutingDecisionCache:
         raw = json.dumps(payload, sort_keys=True, separators=(",", ":"))
         return hashlib.sha256(raw.encode()).hexdigest()
 
+    @staticmethod
+    def request_key(request: Any, slash_command: Optional[str] = None) -> str:
+        """Feature-normalised key for an ``ExecuteRequest``.
+
+        Keys on everything the router reads: a fingerprint of the full prompt,
+        task type, file-count bucket, slash command, the caller's provider,
+        model and persona preferences, and the context fields that feed
+        routing constraints (latency budget, quality threshold, billing tier).
+        """
+        context = getattr(request, "context", None)
+        persona_config = getattr(request, "persona_config", None)
+        model_preferences = getattr(request, "model_preferences", None) or {}
+        payload = {
+            "fp": hashlib.sha256(request.prompt.encode()).hexdigest(),
+            "task": _enum_value(request.task_type),
+            "files": _file_count_bucket(len(request.files or [])),
+            "slash": slash_command,
+            "providers": [_enum_value(p) for p in getattr(request, "preferred_providers", None) or []],
+            "models": {str(_enum_value(p)): m for p, m in model_preferences.items()},
+            "persona": _enum_value(getattr(persona_config, "persona", None)),
+            "ctx": {field: _enum_value(getattr(context, field, None)) for field in _ROUTING_CONTEXT_FIELDS},
+        }
+        raw = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(raw.encode()).hexdigest()
+
     def get(self, prompt: str, context_type: str, complexity_bucket: str) -> Optional[Any]:
         key = self._stable_key(prompt, context_type, complexity_bucket)
         return self._cache.get(key)
@@ -27,6 +90,16 @@ class RoutingDecisionCache:
         key = self._stable_key(prompt, context_type, complexity_bucket)
         self._cache.set(key, decision)
 
+    def get_for_request(self, request: Any, slash_command: Optional[str] = None) -> Optional[Any]:
+        return self._cache.get(self.request_key(request, slash_command))
+
+    def set_for_request(self, request: Any, decision: Any, slash_command: Optional[str] = None):
+        self._cache.set(self.request_key(request, slash_command), decision)
+
+    def invalidate(self) -> int:
+        """Drop all cached decisions, keeping hit/miss counters."""
+        return self._cache.invalidate()
+
     def stats(self) -> Dict[str, Any]:
         return self._cache.stats()
 
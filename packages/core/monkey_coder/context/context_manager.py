@@ -23,10 +23,13 @@ from sqlalchemy import create_engine, Column, Integer, String, ForeignKey, Text,
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship, Session
 from sqlalchemy.exc import SQLAlchemyError
-import tiktoken
-from sentence_transformers import SentenceTransformer, util
 import numpy as np
 
+from ..utils.lazy_imports import require
+
+# tiktoken and sentence-transformers (which pulls in torch) are imported on
+# first token count / embedding, not with this module.
+
 logger = logging.getLogger(__name__)
 
 Base = declarative_base()
@@ -130,10 +133,19 @@ class TokenCounter:
     """Handles token counting for different models."""
     
     def __init__(self, model_name: str = "gpt-4"):
-        try:
-            self.encoder = tiktoken.encoding_for_model(model_name)
-        except KeyError:
-            self.encoder = tiktoken.get_encoding("cl100k_base")
+        self.model_name = model_name
+        self._encoder = None
+    
+    @property
+    def encoder(self):
+        """tiktoken encoding for the model, loaded on first use."""
+        if self._encoder is None:
+            tiktoken = require("tiktoken", "token counting")
+            try:
+                self._encoder = tiktoken.encoding_for_model(self.model_name)
+            except KeyError:
+                self._encoder = tiktoken.get_encoding("cl100k_base")
+        return self._encoder
     
     def count_tokens(self, text: str) -> int:
         """Count tokens in text."""
@@ -157,9 +169,17 @@ class ContextManager:
         Base.metadata.create_all(self.engine)
         self.SessionLocal = sessionmaker(bind=self.engine)
         self.token_counter = TokenCounter()
-        self.embedding_model = SentenceTransformer(self.config.embedding_model)
+        self._embedding_model = None
         self._lock = asyncio.Lock()
     
+    @property
+    def embedding_model(self):
+        """SentenceTransformer for ``config.embedding_model``, loaded on first use."""
+        if self._embedding_model is None:
+            sentence_transformers = require("sentence_transformers", "context embeddings", "sentence-transformers")
+            self._embedding_model = sentence_transformers.SentenceTransformer(self.config.embedding_model)
+        return self._embedding_model
+    
     async def get_or_create_user(self, username: str) -> User:
         """Get or create a user."""
         async with self._lock:
@@ -442,12 +462,15 @@ class ContextManager:
             if not embeddings:
                 return []
             
-            # Calculate similarities
-            results = []
-            for embedding in embeddings:
-                stored_embedding = np.array(embedding.embedding)
-                similarity = util.pytorch_cos_sim(query_embedding, stored_embedding).item()
-                results.append((embedding.chunk_text, similarity))
+            # Cosine similarities against all stored chunks at once
+            stored = np.array([embedding.embedding for embedding in embeddings], dtype=np.float64)
+            query_vector = np.asarray(query_embedding, dtype=np.float64).reshape(-1)
+            norms = np.linalg.norm(stored, axis=1) * np.linalg.norm(query_vector)
+            similarities = stored @ query_vector / np.maximum(norms, 1e-8)
+            results = [
+                (embedding.chunk_text, float(similarity))
+                for embedding, similarity in zip(embeddings, similarities)
+            ]
             
             # Sort by similarity and return top k
             results.sort(key=lambda x: x[1], reverse=True)
@@ -0,0 +1,303 @@
+"""
+Batch routing for offline replay and capacity planning.
+
+Streams a JSONL file of requests through :class:`AdvancedRouter` and writes
+one JSONL routing decision per input line, in input order. Lines are routed
+in fixed-size chunks, optionally fanned out over a process pool, with a
+bounded number of chunks in flight so memory stays constant regardless of
+input size.
+
+Each input line is either a full ``ExecuteRequest`` payload or a looser
+record: the prompt is taken from ``prompt`` or, failing that, ``title`` and
+``body`` (the format of the repo-root ``requests.jsonl`` backlog), and
+``task_type``, ``context`` and ``persona_config`` get replay defaults.
+
+Usage::
+
+    python -m monkey_coder.core.batch_routing requests.jsonl -o decisions.jsonl --workers 4
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+from ..models import ExecuteRequest, PersonaType, TaskType
+from .routing import AdvancedRouter, RoutingDecision
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 256
+REPLAY_USER_ID = "batch-replay"
+
+# Per-process router used by pool workers (and by in-process routing)
+_worker_router: Optional[AdvancedRouter] = None
+_worker_options: Dict[str, Any] = {}
+
+
+def request_from_record(record: Dict[str, Any]) -> ExecuteRequest:
+    """
+    Build an ``ExecuteRequest`` from a JSONL record, filling replay defaults.
+
+    Args:
+        record: Decoded JSON object for one input line
+
+    Returns:
+        Validated ExecuteRequest
+    """
+    payload = dict(record)
+    if not payload.get("prompt"):
+        parts = [payload.get("title"), payload.get("body")]
+        payload["prompt"] = "\n\n".join(str(part) for part in parts if part)
+    payload.setdefault("task_type", TaskType.CUSTOM.value)
+    payload.setdefault("context", {"user_id": REPLAY_USER_ID})
+    payload.setdefault("persona_config", {"persona": PersonaType.DEVELOPER.value})
+    if "request_id" in payload and "task_id" not in payload:
+        payload["task_id"] = str(payload["request_id"])
+    fields = ExecuteRequest.model_fields
+    return ExecuteRequest(**{key: value for key, value in payload.items() if key in fields})
+
+
+def decision_to_record(
+    decision: RoutingDecision,
+    record_id: Any,
+    line: int,
+    include_scores: bool = False,
+) -> Dict[str, Any]:
+    """Compact JSON-serialisable view of a routing decision."""
+    metadata = decision.metadata or {}
+    result = {
+        "id": record_id,
+        "line": line,
+        "provider": decision.provider.value,
+        "model": decision.model,
+        "persona": decision.persona.value,
+        "complexity_score": decision.complexity_score,
+        "context_score": decision.context_score,
+        "capability_score": decision.capability_score,
+        "confidence": decision.confidence,
+        "context_type": metadata.get("context_type"),
+        "complexity_level": metadata.get("complexity_level"),
+        "cached": bool(metadata.get("cached", False)),
+    }
+    if include_scores:
+        result["model_scores"] = {
+            f"{provider.value}/{model}": score
+            for (provider, model), score in (metadata.get("model_scores") or {}).items()
+        }
+    return result
+
+
+def _init_worker(enable_cache: bool, include_scores: bool, log_level: Optional[int] = None):
+    global _worker_router, _worker_options
+    if log_level is not None:
+        # Spawned pool workers do not inherit the parent's logging configuration
+        logging.getLogger("monkey_coder").setLevel(log_level)
+    _worker_router = AdvancedRouter(enable_cache=enable_cache)
+    _worker_options = {"include_scores": include_scores}
+
+
+def _route_chunk(chunk: Sequence[Tuple[int, str]]) -> Tuple[List[str], int]:
+    """
+    Route one chunk of ``(line_number, raw_line)`` pairs; returns output lines and error count.
+
+    Lines that do not parse into an ``ExecuteRequest`` get an ``error`` entry;
+    the rest are routed with one ``route_batch`` call (scored together). If
+    the batch call raises, each request is routed on its own so one bad
+    request only fails its own line.
+    """
+    router = _worker_router
+    include_scores = _worker_options.get("include_scores", False)
+    results: List[Optional[Dict[str, Any]]] = []
+    valid: List[Tuple[int, Any, int, ExecuteRequest]] = []  # (result index, id, line, request)
+    errors = 0
+
+    def error_entry(record_id: Any, line_number: int, e: Exception) -> Dict[str, Any]:
+        return {"id": record_id, "line": line_number, "error": f"{type(e).__name__}: {e}"}
+
+    for line_number, raw in chunk:
+        record_id: Any = line_number
+        try:
+            record = json.loads(raw)
+            if not isinstance(record, dict):
+                raise ValueError("expected a JSON object")
+            record_id = record.get("request_id", record.get("task_id", record.get("id", line_number)))
+            request = request_from_record(record)
+        except Exception as e:
+            errors += 1
+            results.append(error_entry(record_id, line_number, e))
+            continue
+        valid.append((len(results), record_id, line_number, request))
+        results.append(None)
+
+    if valid:
+        try:
+            decisions = router.route_batch([request for _, _, _, request in valid])
+        except Exception as e:
+            logger.warning(f"Batch routing failed ({type(e).__name__}: {e}); routing chunk per request")
+            decisions = None
+        for position, (index, record_id, line_number, request) in enumerate(valid):
+            try:
+                decision = decisions[position] if decisions is not None else router.route_request(request)
+                results[index] = decision_to_record(decision, record_id, line_number, include_scores)
+            except Exception as e:
+                errors += 1
+                results[index] = error_entry(record_id, line_number, e)
+
+    return [json.dumps(result, separators=(",", ":")) for result in results], errors
+
+
+def _chunks(lines: Iterable[str], chunk_size: int) -> Iterator[List[Tuple[int, str]]]:
+    chunk: List[Tuple[int, str]] = []
+    for line_number, raw in enumerate(lines, 1):
+        if not raw.strip():
+            continue
+        chunk.append((line_number, raw))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class BatchStats:
+    """Running counts for a batch routing run."""
+
+    __slots__ = ("routed", "errors")
+
+    def __init__(self):
+        self.routed = 0
+        self.errors = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return {"routed": self.routed, "errors": self.errors}
+
+
+def route_jsonl(
+    lines: Iterable[str],
+    workers: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    enable_cache: bool = True,
+    include_scores: bool = False,
+    stats: Optional[BatchStats] = None,
+) -> Iterator[str]:
+    """
+    Route JSONL request lines, yielding JSONL decision lines in input order.
+
+    Args:
+        lines: Iterable of raw JSONL lines (e.g. an open file)
+        workers: Worker processes; 1 routes in-process
+        chunk_size: Lines per unit of work
+        enable_cache: Memoise decisions for repeated requests within a worker
+        include_scores: Include per-model scores in each decision
+        stats: Optional BatchStats updated as chunks complete
+
+    Yields:
+        One JSON line (without newline) per non-blank input line; records
+        that cannot be parsed or routed yield an ``error`` entry instead
+    """
+    stats = stats if stats is not None else BatchStats()
+    log_level = logging.getLogger("monkey_coder").getEffectiveLevel()
+    chunks = _chunks(lines, max(1, chunk_size))
+
+    def account(result: Tuple[List[str], int]) -> List[str]:
+        output, errors = result
+        stats.routed += len(output) - errors
+        stats.errors += errors
+        return output
+
+    if workers <= 1:
+        _init_worker(enable_cache, include_scores)
+        for chunk in chunks:
+            yield from account(_route_chunk(chunk))
+        return
+
+    # Keep a bounded window of chunks in flight so memory does not grow with input size
+    max_in_flight = workers * 2
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(enable_cache, include_scores, log_level),
+    ) as pool:
+        pending: Deque[Future] = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_route_chunk, chunk))
+            if len(pending) >= max_in_flight:
+                yield from account(pending.popleft().result())
+        while pending:
+            yield from account(pending.popleft().result())
+
+
+def _open_input(path: str) -> TextIO:
+    return sys.stdin if path == "-" else open(path, encoding="utf-8")
+
+
+def _open_output(path: str) -> TextIO:
+    return sys.stdout if path == "-" else open(path, "w", encoding="utf-8")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Command-line entry point for JSONL batch routing."""
+    parser = argparse.ArgumentParser(
+        prog="monkey-coder-route",
+        description="Route a JSONL file of requests and stream routing decisions as JSONL.",
+    )
+    parser.add_argument("input", help="JSONL request file ('-' for stdin)")
+    parser.add_argument("-o", "--output", default="-", help="JSONL decision file ('-' for stdout)")
+    parser.add_argument(
+        "-w", "--workers", type=int, default=1,
+        help=f"worker processes (default 1; up to {os.cpu_count() or 1} on this machine)",
+    )
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="lines per unit of work")
+    parser.add_argument("--no-cache", action="store_true", help="disable decision memoisation")
+    parser.add_argument("--include-scores", action="store_true", help="include per-model scores")
+    parser.add_argument(
+        "--log-level", type=str.upper, choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
+        help="log level for monkey_coder loggers (default WARNING)",
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING, stream=sys.stderr)
+    if args.log_level:
+        logging.getLogger("monkey_coder").setLevel(args.log_level)
+
+    stats = BatchStats()
+    try:
+        source = _open_input(args.input)
+    except OSError as e:
+        parser.error(f"cannot read input {args.input!r}: {e.strerror or e}")
+    try:
+        sink = _open_output(args.output)
+    except OSError as e:
+        if source is not sys.stdin:
+            source.close()
+        parser.error(f"cannot write output {args.output!r}: {e.strerror or e}")
+    try:
+        for line in route_jsonl(
+            source,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            enable_cache=not args.no_cache,
+            include_scores=args.include_scores,
+            stats=stats,
+        ):
+            sink.write(line)
+            sink.write("\n")
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+        else:
+            sink.flush()
+
+    print(json.dumps(stats.to_dict()), file=sys.stderr)
+    return 1 if stats.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,303 @@
+"""
+Compiled keyword matching for routing analysis.
+
+The router and the modular scorers all classify prompts by looking for
+keywords and phrases. Doing that with one ``kw in prompt`` or ``re.search``
+call per keyword means dozens of full scans of the prompt per request, which
+dominates routing time for long prompts.
+
+This module compiles the whole routing vocabulary into a single trie-shaped
+regular expression and collects every keyword hit, with its categories, in
+one pass over the (lowercased) prompt. Consumers then score from the
+resulting :class:`KeywordHits` table:
+
+- ``kw in hits`` has the same semantics as ``kw in prompt``
+- ``hits.has_word(kw)`` matches ``re.search(r'\\b' + re.escape(kw) + r'\\b', prompt)``
+- ``hits.has_word_end(kw)`` matches ``re.search(re.escape(kw) + r'\\b', prompt)``
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+# Occurrence flags recorded per keyword
+SUBSTRING = 1
+WORD_START = 2
+WORD_END = 4
+WORD = 8  # both boundaries on the same occurrence
+
+_CONTEXT_KEYWORDS = {
+    "code_generation": {
+        "primary": ('generate', 'create', 'write', 'implement', 'build', 'function', 'class'),
+        "secondary": ('code', 'develop', 'program', 'script'),
+    },
+    "code_review": {
+        "primary": ('review', 'analyze', 'check', 'evaluate', 'assess', 'examine'),
+        "secondary": ('bugs', 'issues', 'quality'),
+    },
+    "debugging": {
+        "primary": ('debug', 'fix', 'error', 'bug', 'issue', 'problem', 'traceback'),
+        "secondary": ('exception', 'crash', 'fault'),
+    },
+    "architecture": {
+        "primary": ('architecture', 'design', 'structure', 'pattern', 'overall'),
+        "secondary": ('system', 'component', 'framework', 'blueprint'),
+    },
+    "security": {
+        "primary": ('security', 'vulnerability', 'vulnerabilities', 'exploit', 'secure', 'auth', 'audit'),
+        "secondary": ('authentication', 'authorization', 'encryption', 'attack', 'threat'),
+    },
+    "performance": {
+        "primary": ('performance', 'optimize', 'speed', 'memory', 'efficient'),
+        "secondary": ('fast', 'slow', 'bottleneck', 'scalability'),
+    },
+    "documentation": {
+        "primary": ('document', 'explain', 'describe', 'comment', 'api'),
+        "secondary": ('readme', 'guide', 'manual', 'specification'),
+    },
+    "testing": {
+        "primary": ('test', 'unittest', 'spec', 'verify', 'validate', 'unit tests'),
+        "secondary": ('testing', 'assertion', 'mock', 'coverage'),
+    },
+    "refactoring": {
+        "primary": ('refactor', 'improve', 'clean', 'restructure'),
+        "secondary": ('optimize', 'reorganize', 'simplify'),
+    },
+}
+
+# The modular ContextClassifier predates a few router tweaks and keeps its own lists
+_SCORING_CONTEXT_OVERRIDES = {
+    "security": {
+        "primary": ('security', 'vulnerability', 'exploit', 'secure', 'auth', 'audit'),
+        "secondary": ('authentication', 'authorization', 'encryption', 'attack'),
+    },
+    "testing": {
+        "primary": ('test', 'tests', 'unittest', 'spec', 'verify', 'validate', 'unit test', 'unit tests'),
+        "secondary": ('testing', 'assertion', 'mock', 'coverage'),
+    },
+}
+
+
+def _context_categories(prefix: str, groups: Mapping[str, Mapping[str, Tuple[str, ...]]]) -> Dict[str, Tuple[str, ...]]:
+    categories = {}
+    for context_type, keyword_groups in groups.items():
+        for group, keywords in keyword_groups.items():
+            categories[f"{prefix}.{context_type}.{group}"] = keywords
+    return categories
+
+
+ROUTING_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    # Complexity analysis (AdvancedRouter._analyze_complexity, ComplexityScorer)
+    "complexity.base": ('function', 'class', 'method', 'code', 'implement', 'create'),
+    "complexity.simple": ('add two numbers', 'add two', 'sum two', 'calculate sum'),
+    "complexity.keywords": (
+        'architecture', 'design pattern', 'scalability', 'performance',
+        'optimization', 'algorithm', 'data structure', 'system design',
+        'distributed', 'microservices', 'database', 'security', 'concurrent',
+        'async', 'threading', 'machine learning', 'ai', 'neural network',
+        'authentication', 'session', 'validation', 'comprehensive', 'pipeline',
+        'fault tolerance', 'auto-scaling', 'real-time', 'serving',
+    ),
+    "complexity.steps": ('step', 'phase', 'first', 'then', 'next', 'finally', 'multi-step', 'multi-phase'),
+    "complexity.phrases": (
+        'requiring deep technical expertise',
+        'with methods for',
+        'include detailed',
+        'comprehensive',
+        'e-commerce platform',
+    ),
+    "complexity.boosts": ('scalable microservices architecture',),
+    # Context extraction (AdvancedRouter._extract_context_type)
+    "context.phrases": (
+        'design the overall architecture and structure',
+        'design the overall architecture',
+        'overall architecture and structure',
+        'overall architecture',
+        'analyze security vulnerabilities',
+        'security vulnerabilities',
+        'implement authentication',
+    ),
+    "context.security_phrases": (
+        'vulnerability', 'vulnerabilities', 'secure session',
+        'authentication system', 'audit this authentication system',
+    ),
+    "context.slash": ('/security', '/sec', '/arch', '/architect'),
+    **_context_categories("context", _CONTEXT_KEYWORDS),
+    # Context match indicators (AdvancedRouter._score_context_match)
+    "context_match.code_generation": ('function', 'class', 'method', 'create', 'implement'),
+    "context_match.debugging": ('error', 'exception', 'traceback', 'fix', 'debug'),
+    "context_match.architecture": ('design', 'pattern', 'structure', 'component', 'system'),
+    # Modular scorers (core.scoring.ContextClassifier)
+    **_context_categories("scoring.context", {**_CONTEXT_KEYWORDS, **_SCORING_CONTEXT_OVERRIDES}),
+}
+
+
+def _is_word_char(char: str) -> bool:
+    # Same definition as the ``\w`` class used by ``re`` for str patterns
+    return char.isalnum() or char == '_'
+
+
+def _build_trie_pattern(keywords: Iterable[str]) -> str:
+    """Build a regex alternation shaped like a trie so shared prefixes are matched once."""
+    root: Dict[str, dict] = {}
+    for keyword in keywords:
+        node = root
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def render(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + render(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            # Greedy optional group: the longest keyword at a position wins
+            return '(?:' + body + ')?'
+        return body
+
+    return render(root)
+
+
+class KeywordHits:
+    """
+    Keyword hit table for a single text produced by :class:`KeywordMatcher`.
+
+    Lookups are only meaningful for keywords that are part of the matcher's
+    vocabulary; anything else reports as not found.
+    """
+
+    __slots__ = ("text", "_flags", "_category_counts", "_category_word_counts")
+
+    def __init__(
+        self,
+        text: str,
+        flags: Dict[str, int],
+        category_counts: Dict[str, int],
+        category_word_counts: Dict[str, int],
+    ):
+        self.text = text
+        self._flags = flags
+        self._category_counts = category_counts
+        self._category_word_counts = category_word_counts
+
+    def __contains__(self, keyword: str) -> bool:
+        return bool(self._flags.get(keyword, 0) & SUBSTRING)
+
+    def has_word(self, keyword: str) -> bool:
+        """True if the keyword occurs with a word boundary on both sides."""
+        return bool(self._flags.get(keyword, 0) & WORD)
+
+    def has_word_end(self, keyword: str) -> bool:
+        """True if the keyword occurs followed by a word boundary."""
+        return bool(self._flags.get(keyword, 0) & WORD_END)
+
+    def any(self, category: str, words: bool = False) -> bool:
+        """True if any keyword of ``category`` was hit."""
+        return self.count(category, words) > 0
+
+    def count(self, category: str, words: bool = False) -> int:
+        """Number of distinct keywords of ``category`` that were hit.
+
+        Args:
+            category: Vocabulary category name
+            words: Only count whole-word occurrences
+        """
+        counts = self._category_word_counts if words else self._category_counts
+        return counts.get(category, 0)
+
+    def keywords(self) -> List[str]:
+        """All keywords that occur in the text."""
+        return list(self._flags)
+
+    def by_category(self, words: bool = False) -> Dict[str, int]:
+        """Hit counts for every category with at least one hit."""
+        return dict(self._category_word_counts if words else self._category_counts)
+
+
+class KeywordMatcher:
+    """
+    Precompiled multi-keyword matcher.
+
+    Builds a single trie-shaped regex over the whole vocabulary and finds every
+    keyword occurrence (including overlapping ones) in one left-to-right pass.
+    The most recent hit table is memoised so the several analysis phases of a
+    routing request share one scan of the prompt.
+    """
+
+    def __init__(self, vocabulary: Mapping[str, Sequence[str]]):
+        self.vocabulary: Dict[str, Tuple[str, ...]] = {
+            category: tuple(keywords) for category, keywords in vocabulary.items()
+        }
+
+        categories_by_keyword: Dict[str, List[str]] = {}
+        for category, keywords in self.vocabulary.items():
+            for keyword in keywords:
+                categories_by_keyword.setdefault(keyword, []).append(category)
+        self._categories: Dict[str, Tuple[str, ...]] = {
+            keyword: tuple(categories) for keyword, categories in categories_by_keyword.items()
+        }
+
+        keywords = sorted(self._categories)
+        self._pattern = re.compile(_build_trie_pattern(keywords)) if keywords else None
+
+        # The longest keyword matched at a position implies every vocabulary
+        # keyword that is a prefix of it, so precompute those prefix chains.
+        known = set(keywords)
+        self._prefix_chains: Dict[str, Tuple[str, ...]] = {
+            keyword: tuple(keyword[:i] for i in range(1, len(keyword) + 1) if keyword[:i] in known)
+            for keyword in keywords
+        }
+
+        self._last: Optional[Tuple[str, KeywordHits]] = None
+
+    def match(self, text: str) -> KeywordHits:
+        """Return the hit table for ``text`` (callers pass the lowercased prompt)."""
+        last = self._last
+        if last is not None and last[0] == text:
+            return last[1]
+
+        hits = self._scan(text)
+        self._last = (text, hits)
+        return hits
+
+    def _scan(self, text: str) -> KeywordHits:
+        flags: Dict[str, int] = {}
+        if self._pattern is not None:
+            search = self._pattern.search
+            prefix_chains = self._prefix_chains
+            length = len(text)
+            match = search(text)
+            while match is not None:
+                start = match.start()
+                left_word = start > 0 and _is_word_char(text[start - 1])
+                start_boundary = left_word != _is_word_char(text[start])
+                for keyword in prefix_chains[match.group()]:
+                    end = start + len(keyword)
+                    end_boundary = (end < length and _is_word_char(text[end])) != _is_word_char(text[end - 1])
+                    occurrence = SUBSTRING
+                    if start_boundary:
+                        occurrence |= WORD_START
+                    if end_boundary:
+                        occurrence |= WORD_END
+                        if start_boundary:
+                            occurrence |= WORD
+                    flags[keyword] = flags.get(keyword, 0) | occurrence
+                match = search(text, start + 1)
+
+        category_counts: Dict[str, int] = {}
+        category_word_counts: Dict[str, int] = {}
+        for keyword, keyword_flags in flags.items():
+            is_word = keyword_flags & WORD
+            for category in self._categories[keyword]:
+                category_counts[category] = category_counts.get(category, 0) + 1
+                if is_word:
+                    category_word_counts[category] = category_word_counts.get(category, 0) + 1
+
+        return KeywordHits(text, flags, category_counts, category_word_counts)
+
+
+@lru_cache(maxsize=None)
+def get_routing_matcher() -> KeywordMatcher:
+    """Return the process-wide matcher compiled from :data:`ROUTING_KEYWORDS`."""
+    return KeywordMatcher(ROUTING_KEYWORDS)
@@ -0,0 +1,138 @@
+"""
+Vectorized model scoring for the routers.
+
+Model capabilities are packed once into a ``models x features`` NumPy matrix
+so scoring every model against a requirement vector is a handful of array
+operations instead of a Python loop over ``(provider, model)`` pairs, and a
+whole batch of requirement vectors can be scored in one call (offline
+replays, the DQN training simulator).
+
+The fitness formula is the one ``AdvancedRouter._calculate_model_score``
+always used::
+
+    0.3 * min(code_generation / req, 1) + 0.3 * min(reasoning / req, 1)
+    + 0.2 * (1.0 if context_window >= req else 0.5)
+    + 0.2 * min(reliability / req, 1)
+
+Weighted terms are accumulated column by column in that order so vectorized
+scores are bit-identical to the scalar formula.
+"""
+
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Column order of ModelScoringMatrix.features
+FEATURES: Tuple[str, ...] = (
+    "code_generation",
+    "reasoning",
+    "context_window",
+    "latency_ms",
+    "cost_per_token",
+    "reliability",
+)
+
+# Requirement keys consumed by the fitness formula
+REQUIREMENTS: Tuple[str, ...] = ("code_generation", "reasoning", "context_window", "reliability")
+
+_CODE_GENERATION, _REASONING, _CONTEXT_WINDOW, _LATENCY, _COST, _RELIABILITY = range(len(FEATURES))
+
+
+class ModelScoringMatrix:
+    """
+    Model capability matrix with vectorized fitness scoring.
+
+    Args:
+        capabilities: ``(provider, model) -> ModelCapabilities`` mapping
+        order: Optional key order (e.g. ``MODEL_REGISTRY`` order); keys without
+            capabilities are skipped. Defaults to the mapping's own order.
+    """
+
+    def __init__(
+        self,
+        capabilities: Mapping[Tuple[Any, str], Any],
+        order: Optional[Iterable[Tuple[Any, str]]] = None,
+    ):
+        keys = list(capabilities) if order is None else [key for key in order if key in capabilities]
+        self.source = capabilities
+        self._source_size = len(capabilities)
+        self.keys: List[Tuple[Any, str]] = keys
+        self.index: Dict[Tuple[Any, str], int] = {key: i for i, key in enumerate(keys)}
+
+        self.features = np.array(
+            [[float(getattr(capabilities[key], name)) for name in FEATURES] for key in keys],
+            dtype=np.float64,
+        ).reshape(len(keys), len(FEATURES))
+
+        self.providers: List[Any] = []
+        provider_ids: Dict[Any, int] = {}
+        for provider, _ in keys:
+            if provider not in provider_ids:
+                provider_ids[provider] = len(self.providers)
+                self.providers.append(provider)
+        self.provider_index = np.array([provider_ids[p] for p, _ in keys], dtype=np.intp)
+        self.is_fast = np.array(
+            ["fast" in capabilities[key].specializations for key in keys], dtype=bool
+        )
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def is_stale(self, capabilities: Mapping[Tuple[Any, str], Any]) -> bool:
+        """True if ``capabilities`` is not the mapping this matrix was packed from."""
+        return capabilities is not self.source or len(capabilities) != self._source_size
+
+    def provider_mask(self, available_providers: Optional[Iterable[Any]] = None) -> np.ndarray:
+        """Boolean mask of models whose provider is available (all models if ``None``)."""
+        if available_providers is None:
+            return np.ones(len(self.keys), dtype=bool)
+        available = set(available_providers)
+        provider_available = np.array([p in available for p in self.providers], dtype=bool)
+        return provider_available[self.provider_index]
+
+    @staticmethod
+    def requirement_vector(requirements: Mapping[str, float]) -> np.ndarray:
+        """Pack a requirements dict into a vector ordered like :data:`REQUIREMENTS`."""
+        return np.array([float(requirements[name]) for name in REQUIREMENTS], dtype=np.float64)
+
+    def score_batch(self, requirements: np.ndarray) -> np.ndarray:
+        """
+        Score every model against a batch of requirement vectors.
+
+        Args:
+            requirements: ``(n, 4)`` array ordered like :data:`REQUIREMENTS`
+
+        Returns:
+            ``(n, models)`` score array
+        """
+        req = np.asarray(requirements, dtype=np.float64).reshape(-1, len(REQUIREMENTS))
+        caps = self.features
+        with np.errstate(divide="ignore"):
+            code_generation = np.minimum(caps[:, _CODE_GENERATION] / req[:, 0:1], 1.0)
+            reasoning = np.minimum(caps[:, _REASONING] / req[:, 1:2], 1.0)
+            reliability = np.minimum(caps[:, _RELIABILITY] / req[:, 3:4], 1.0)
+
+        context = np.where(caps[:, _CONTEXT_WINDOW] >= req[:, 2:3], 1.0, 0.5)
+
+        scores = code_generation * 0.3
+        scores += reasoning * 0.3
+        scores += context * 0.2
+        scores += reliability * 0.2
+        return scores
+
+    def score(self, requirements: Mapping[str, float]) -> np.ndarray:
+        """Score every model against one requirements dict."""
+        return self.score_batch(self.requirement_vector(requirements)[None, :])[0]
+
+    def score_many(self, requirements: Sequence[Mapping[str, float]]) -> np.ndarray:
+        """Score every model against a sequence of requirements dicts."""
+        if not requirements:
+            return np.empty((0, len(self.keys)), dtype=np.float64)
+        return self.score_batch(np.stack([self.requirement_vector(r) for r in requirements]))
+
+    def to_dict(self, scores: np.ndarray, mask: Optional[np.ndarray] = None) -> Dict[Tuple[Any, str], float]:
+        """Map a score row back to ``(provider, model) -> score``, dropping masked models."""
+        values = scores.tolist()
+        if mask is None:
+            return dict(zip(self.keys, values))
+        return {key: value for key, value, keep in zip(self.keys, values, mask.tolist()) if keep}
@@ -20,6 +20,7 @@ from datetime import datetime
 import numpy as np
 
 from ..monitoring.quantum_performance import execution_timer, inc_execution_error
+from ..cache.persistent import l2_store_from_env
 from ..cache.result_cache import ResultCache
 from .agent_executor import AgentExecutor
 from ..tools.web_search_tool import web_search_tool
@@ -61,7 +62,12 @@ class QuantumExecutor:
         # Result cache (Phase 1): in-memory TTL+LRU; optional via env flag
         # ENABLE_RESULT_CACHE=0 will disable usage
         self._result_cache_enabled = os.getenv("ENABLE_RESULT_CACHE", "1") not in ("0", "false", "False")
-        self._result_cache = ResultCache(max_entries=512, default_ttl=180.0) if self._result_cache_enabled else None
+        # RESULT_CACHE_L2 adds a persistent tier (SQLite file or Redis) shared across workers
+        self._result_cache = (
+            ResultCache(max_entries=512, default_ttl=180.0, l2=l2_store_from_env())
+            if self._result_cache_enabled
+            else None
+        )
 
     async def execute(self, task, parallel_futures: bool = True) -> Any:
         """
@@ -88,7 +94,7 @@ class QuantumExecutor:
         # Result cache lookup (general key: provider/model independent)
         if self._result_cache:
             try:
-                cached = self._result_cache.get(task_str, persona="developer")
+                cached = await self._result_cache.aget(task_str, persona="developer")
                 if cached:
                     logger.info("Result cache hit for task")
                     return cached
@@ -114,10 +120,10 @@ class QuantumExecutor:
                 provider = result.get("provider")
                 model = result.get("model")
                 # Generic key
-                self._result_cache.set(task_str, persona="developer", value=result)
+                await self._result_cache.aset(task_str, persona="developer", value=result)
                 # Provider/model specific key (if available)
                 if provider and model:
-                    self._result_cache.set(
+                    await self._result_cache.aset(
                         task_str,
                         persona="developer",
                         value=result,
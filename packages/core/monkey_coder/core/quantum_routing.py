@@ -11,13 +11,13 @@ This module extends the AdvancedRouter with quantum routing capabilities:
 
 import logging
 import numpy as np
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, Iterable, List, Tuple
 from datetime import datetime
 from dataclasses import dataclass
 
-from .routing import AdvancedRouter, RoutingDecision, ComplexityLevel, ModelCapabilities
+from .routing import AdvancedRouter, RoutingDecision, ComplexityLevel
+from .routing_history import DEFAULT_HISTORY_CAPACITY, RoutingHistory
 from ..monitoring.quantum_performance import routing_timer, inc_strategy
-from ..cache.routing_cache import RoutingDecisionCache
 from ..models import ExecuteRequest, PersonaType, ProviderType
 from ..quantum.state_encoder import (
     TaskContextProfile,
@@ -27,7 +27,7 @@ from ..quantum.state_encoder import (
     ContextComplexity,
     create_state_encoder
 )
-from ..quantum.router_integration import DQNRouterBridge, EnhancedRoutingDecision
+from ..quantum.router_integration import DQNRouterBridge
 
 logger = logging.getLogger(__name__)
 
@@ -60,7 +60,9 @@ class QuantumAdvancedRouter(AdvancedRouter):
     def __init__(self,
                  encoding_strategy: str = "comprehensive",
                  enable_quantum_features: bool = True,
-                 fallback_to_basic: bool = True):
+                 fallback_to_basic: bool = True,
+                 enable_cache: bool = True,
+                 history_capacity: int = DEFAULT_HISTORY_CAPACITY):
         """
         Initialize quantum-enhanced router.
 
@@ -68,8 +70,10 @@ class QuantumAdvancedRouter(AdvancedRouter):
             encoding_strategy: State encoding strategy (minimal, basic, standard, comprehensive)
             enable_quantum_features: Enable advanced quantum routing features
             fallback_to_basic: Fallback to basic routing if quantum features fail
+            enable_cache: Memoise routing decisions per normalised request features
+            history_capacity: Number of recent decisions retained in routing histories
         """
-        super().__init__()
+        super().__init__(enable_cache=enable_cache, history_capacity=history_capacity)
 
         self.encoding_strategy = encoding_strategy
         self.enable_quantum_features = enable_quantum_features
@@ -88,12 +92,10 @@ class QuantumAdvancedRouter(AdvancedRouter):
             self.dqn_bridge = None
 
         # Enhanced tracking
-        self.quantum_routing_history: List[EnhancedRoutingDecision] = []
+        self.quantum_routing_history = RoutingHistory(history_capacity)
         self.performance_metrics: List[QuantumRoutingMetrics] = []
         self.state_vector_cache: Dict[str, np.ndarray] = {}
         logger.info(f"Initialized QuantumAdvancedRouter with {self.encoding_strategy} encoding")
-        # Simple in-memory routing decision cache (Phase1)
-        self._routing_cache = RoutingDecisionCache()
 
     def route_request(self, request: ExecuteRequest) -> RoutingDecision:
         """
@@ -108,42 +110,27 @@ class QuantumAdvancedRouter(AdvancedRouter):
         start_time = datetime.now()
         # Metrics: time entire routing decision path
         with routing_timer():
-            # Attempt cache lookup (best-effort; no cache key if missing fields)
-            try:
-                complexity_probe = self._analyze_complexity(request)
-                complexity_bucket = (
-                    "critical" if complexity_probe >= 0.8 else
-                    "complex" if complexity_probe >= 0.6 else
-                    "moderate" if complexity_probe >= 0.4 else
-                    "simple" if complexity_probe >= 0.2 else
-                    "trivial"
-                )
-                if cached := self._routing_cache.get(
-                    request.prompt, "unknown", complexity_bucket
-                ):
-                    return cached
-            except Exception:  # pragma: no cover
-                pass
+            slash_command = self._parse_slash_commands(request.prompt)
+            cached = self._get_cached_decision(request, slash_command)
+            if cached is not None:
+                self.routing_history.record(cached)
+                return cached
             decision = self._route_request_with_metrics(request, start_time)
-            try:
-                context_type = decision.metadata.get("context_type")
-                complexity_level = decision.metadata.get("complexity_level")
-
-                # Validate context_type and complexity_level
-                if not isinstance(context_type, str) or not context_type:
-                    # Fallback: use a hash of the prompt to reduce collisions
-                    import hashlib
-                    context_type = f"unknown_{hashlib.md5(request.prompt.encode()).hexdigest()[:8]}"
-                if not isinstance(complexity_level, str) or not complexity_level:
-                    # Fallback: use a hash of the prompt to reduce collisions
-                    import hashlib
-                    complexity_level = f"unknown_{hashlib.sha1(request.prompt.encode()).hexdigest()[:8]}"
-
-                self._routing_cache.set(request.prompt, context_type, complexity_level, decision)
-            except Exception:  # pragma: no cover
-                pass
+            self._cache_decision(request, slash_command, decision)
             return decision
 
+    def route_batch(self, requests: Iterable[ExecuteRequest]) -> List[RoutingDecision]:
+        """
+        Route many requests in order.
+
+        Quantum routing encodes and decides per request, so batches go through
+        ``route_request``; with quantum features off the basic router's
+        vectorized batch path is used.
+        """
+        if self.enable_quantum_features and self.state_encoder:
+            return [self.route_request(request) for request in requests]
+        return super().route_batch(requests)
+
     def _route_request_with_metrics(self, request: ExecuteRequest, start_time: datetime) -> RoutingDecision:
         """Internal helper so context manager exits before fallback handling returns."""
 
@@ -153,15 +140,15 @@ class QuantumAdvancedRouter(AdvancedRouter):
                 return self._quantum_route_request(request, start_time)
             else:
                 # Fallback to basic routing
-                logger.info("Using basic routing (quantum features disabled)")
-                return super().route_request(request)
+                logger.debug("Using basic routing (quantum features disabled)")
+                return self._compute_routing_decision(request)
 
         except Exception as e:
             logger.error(f"Quantum routing failed: {e}")
 
             if self.fallback_to_basic:
                 logger.info("Falling back to basic routing")
-                return super().route_request(request)
+                return self._compute_routing_decision(request)
             else:
                 raise
 
@@ -169,9 +156,7 @@ class QuantumAdvancedRouter(AdvancedRouter):
         """Perform quantum-enhanced routing with 112-dimensional analysis."""
 
         # Phase 1: Generate 112-dimensional state representation
-        encoding_start = datetime.now()
         state_vector = self._generate_quantum_state_vector(request)
-        encoding_time = (datetime.now() - encoding_start).total_seconds() * 1000
 
         # Phase 2: Enhanced complexity analysis using state vector
         complexity_analysis = self._analyze_quantum_complexity(state_vector, request)
@@ -198,13 +183,8 @@ class QuantumAdvancedRouter(AdvancedRouter):
         except Exception:  # pragma: no cover - metrics should not break routing
             pass
 
-        # Phase 7: Enhanced decision with quantum metadata
-        enhanced_decision = self._create_enhanced_decision(
-            routing_decision, state_vector, request, start_time, encoding_time
-        )
-
         # Store for learning and analysis
-        self.quantum_routing_history.append(enhanced_decision)
+        self.quantum_routing_history.record(routing_decision, state_vector=state_vector)
 
         # Update performance tracking
         if self.dqn_bridge:
@@ -218,7 +198,7 @@ class QuantumAdvancedRouter(AdvancedRouter):
                 }
             )
 
-        logger.info(f"Quantum routing completed: {routing_decision.provider.value}/{routing_decision.model}")
+        logger.debug("Quantum routing completed: %s/%s", routing_decision.provider.value, routing_decision.model)
         return routing_decision
 
     def _generate_quantum_state_vector(self, request: ExecuteRequest) -> np.ndarray:
@@ -230,7 +210,7 @@ class QuantumAdvancedRouter(AdvancedRouter):
             return self.state_vector_cache[cache_key]
 
         # Get basic routing decision for context
-        basic_decision = super().route_request(request)
+        basic_decision = self._compute_routing_decision(request)
 
         # Convert to components needed by state encoder
         task_context = self._convert_to_task_context_profile(request, basic_decision)
@@ -501,40 +481,33 @@ class QuantumAdvancedRouter(AdvancedRouter):
         """Score models using quantum-enhanced analysis."""
 
         # Start with traditional model scoring
-        model_scores = self._score_models(capability_requirements)
+        matrix = self.scoring_matrix
+        scores = matrix.score(capability_requirements)
 
-        # Enhance scores using provider performance data
+        # Enhance scores using provider performance data (one bonus per provider)
         performance_data = provider_analysis.get("provider_performance_data", {})
         resource_constraints = resource_analysis.get("resource_constraints", {})
 
-        for (provider, model), base_score in model_scores.items():
-            enhanced_score = base_score
-
-            # Apply provider performance adjustments
-            if provider in performance_data:
-                perf = performance_data[provider]
-                success_rate_bonus = perf["success_rate"] * 0.1  # Up to 10% bonus
-                quality_bonus = perf["avg_quality"] * 0.1       # Up to 10% bonus
-                latency_penalty = min(perf["avg_latency"] / 10.0, 0.1)  # Up to 10% penalty
+        if performance_data:
+            bonus = np.zeros(len(matrix.providers))
+            for i, provider in enumerate(matrix.providers):
+                if provider in performance_data:
+                    perf = performance_data[provider]
+                    success_rate_bonus = perf["success_rate"] * 0.1  # Up to 10% bonus
+                    quality_bonus = perf["avg_quality"] * 0.1       # Up to 10% bonus
+                    latency_penalty = min(perf["avg_latency"] / 10.0, 0.1)  # Up to 10% penalty
+                    bonus[i] = success_rate_bonus + quality_bonus - latency_penalty
+            scores = scores + bonus[matrix.provider_index]
 
-                enhanced_score += success_rate_bonus + quality_bonus - latency_penalty
+        # Apply resource constraint adjustments
+        if resource_constraints.get("is_premium_user", False):
+            scores = scores + 0.05  # 5% bonus for premium users
 
-            # Apply resource constraint adjustments
-            if resource_constraints.get("is_premium_user", False):
-                enhanced_score += 0.05  # 5% bonus for premium users
+        max_latency = resource_constraints.get("max_latency_seconds", 30.0)
+        if max_latency < 5.0:  # Very tight latency requirements
+            scores = np.where(matrix.is_fast, scores + 0.15, scores)  # Bonus for fast models when speed is critical
 
-            max_latency = resource_constraints.get("max_latency_seconds", 30.0)
-            if max_latency < 5.0:  # Very tight latency requirements
-                if "fast" in self.model_capabilities.get((provider, model), ModelCapabilities(
-                    code_generation=0.5, reasoning=0.5, context_window=8000,
-                    latency_ms=2000, cost_per_token=0.001, reliability=0.8,
-                    specializations=[]
-                )).specializations:
-                    enhanced_score += 0.15  # Bonus for fast models when speed is critical
-
-            model_scores[(provider, model)] = max(0.0, min(1.0, enhanced_score))
-
-        return model_scores
+        return matrix.to_dict(np.clip(scores, 0.0, 1.0))
 
     def _select_optimal_model_quantum(self,
                                     model_scores: Dict[Tuple[ProviderType, str], float],
@@ -643,37 +616,6 @@ class QuantumAdvancedRouter(AdvancedRouter):
 
         return base_reasoning + " (quantum-enhanced analysis)"
 
-    def _create_enhanced_decision(self,
-                                routing_decision: RoutingDecision,
-                                state_vector: np.ndarray,
-                                request: ExecuteRequest,
-                                start_time: datetime,
-                                encoding_time_ms: float) -> EnhancedRoutingDecision:
-        """Create enhanced routing decision with quantum metadata."""
-
-        total_time_ms = (datetime.now() - start_time).total_seconds() * 1000
-
-        enhanced_decision = EnhancedRoutingDecision(
-            original_decision=routing_decision,
-            state_vector=state_vector,
-            state_dimensions=len(state_vector),
-            encoding_metadata={
-                "encoding_type": "advanced",
-                "encoding_strategy": self.encoding_strategy,
-                "dimensions": len(state_vector),
-                "task_type": request.task_type.value,
-                "complexity_category": routing_decision.metadata.get("complexity_level", "moderate"),
-                "temporal_features_enabled": self.state_encoder.enable_temporal_features if self.state_encoder else False,
-                "personalization_enabled": self.state_encoder.enable_user_personalization if self.state_encoder else False,
-                "dynamic_weighting_enabled": self.state_encoder.enable_dynamic_weighting if self.state_encoder else False,
-                "encoding_time_ms": encoding_time_ms,
-                "total_routing_time_ms": total_time_ms,
-                "quantum_features_used": True
-            }
-        )
-
-        return enhanced_decision
-
     def _convert_to_task_context_profile(self, request: ExecuteRequest, routing_decision: RoutingDecision) -> TaskContextProfile:
         """Convert request and routing decision to TaskContextProfile."""
 
@@ -789,24 +731,24 @@ class QuantumAdvancedRouter(AdvancedRouter):
     def get_quantum_routing_statistics(self) -> Dict[str, Any]:
         """Get comprehensive routing statistics including quantum features."""
 
+        quantum_stats = self.quantum_routing_history.stats()
         base_stats = {
-            "total_quantum_routes": len(self.quantum_routing_history),
-            "total_traditional_routes": len(self.routing_history) - len(self.quantum_routing_history),
+            "total_quantum_routes": self.quantum_routing_history.total,
+            "total_traditional_routes": self.routing_history.total - self.quantum_routing_history.total,
             "encoding_strategy": self.encoding_strategy,
             "quantum_features_enabled": self.enable_quantum_features,
             "state_vector_dimensions": 112 if self.state_encoder else 0,
+            "provider_counts": quantum_stats["provider_counts"],
+            "complexity_distribution": quantum_stats["complexity_distribution"],
+            "confidence_histogram": quantum_stats["confidence_histogram"],
         }
 
-        if self.quantum_routing_history:
-            # Calculate quantum routing statistics
-            complexity_scores = [d.original_decision.complexity_score for d in self.quantum_routing_history]
-            confidence_scores = [d.original_decision.confidence for d in self.quantum_routing_history]
-
+        if self.quantum_routing_history.total:
             base_stats.update({
-                "avg_complexity_score": float(np.mean(complexity_scores)),
-                "avg_confidence_score": float(np.mean(confidence_scores)),
-                "complexity_std": float(np.std(complexity_scores)),
-                "confidence_std": float(np.std(confidence_scores)),
+                "avg_complexity_score": quantum_stats["avg_complexity_score"],
+                "avg_confidence_score": quantum_stats["avg_confidence_score"],
+                "complexity_std": quantum_stats["complexity_std"],
+                "confidence_std": quantum_stats["confidence_std"],
                 "quantum_routing_success_rate": 1.0,  # This would be updated based on actual outcomes
             })
 
@@ -9,11 +9,13 @@ This module implements sophisticated routing logic with:
 - Slash-command parsing and routing
 """
 
+import copy
 import re
 import logging
+import numpy as np
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 from datetime import datetime, timezone
 
 from ..models import (
@@ -23,6 +25,10 @@ from ..models import (
     TaskType,
     MODEL_REGISTRY
 )
+from ..cache.routing_cache import RoutingDecisionCache
+from .keyword_matcher import KeywordHits, get_routing_matcher
+from .model_scoring import ModelScoringMatrix
+from .routing_history import DEFAULT_HISTORY_CAPACITY, RoutingHistory
 
 logger = logging.getLogger(__name__)
 
@@ -63,6 +69,18 @@ class RoutingDecision:
     metadata: Dict[str, Any]
 
 
+@dataclass
+class _RequestAnalysis:
+    """Routing analysis for one request, up to (not including) model scoring."""
+    slash_command: Optional[str]
+    complexity_score: float
+    complexity_level: ComplexityLevel
+    context_type: ContextType
+    context_score: float
+    persona: PersonaType
+    requirements: Dict[str, float]
+
+
 @dataclass
 class ModelCapabilities:
     """Model capability profile for matching."""
@@ -87,12 +105,17 @@ class AdvancedRouter:
     - Cost-performance optimization
     """
 
-    def __init__(self):
+    def __init__(self, enable_cache: bool = True, history_capacity: int = DEFAULT_HISTORY_CAPACITY):
         self._validate_providers()
         self.model_capabilities = self._initialize_model_capabilities()
+        self._scoring_matrix: Optional[ModelScoringMatrix] = None
         self.persona_mappings = self._initialize_persona_mappings()
         self.slash_commands = self._initialize_slash_commands()
-        self.routing_history = []
+        self.keyword_matcher = get_routing_matcher()
+        # Bounded compact history; aggregates cover every decision routed
+        self.routing_history = RoutingHistory(history_capacity)
+        # Memoised decisions; invalidated on manifest reload and provider health changes
+        self._routing_cache = RoutingDecisionCache() if enable_cache else None
 
     def route_request(self, request: ExecuteRequest) -> RoutingDecision:
         """
@@ -104,7 +127,129 @@ class AdvancedRouter:
         Returns:
             RoutingDecision with selected model, persona, and reasoning
         """
-        logger.info(f"Routing request: {request.task_type}")
+        logger.debug("Routing request: %s", request.task_type)
+
+        slash_command = self._parse_slash_commands(request.prompt)
+        cached = self._get_cached_decision(request, slash_command)
+        if cached is not None:
+            self.routing_history.record(cached)
+            return cached
+
+        decision = self._compute_routing_decision(request, slash_command)
+        self._cache_decision(request, slash_command, decision)
+        return decision
+
+    def route_batch(self, requests: Iterable[ExecuteRequest]) -> List[RoutingDecision]:
+        """
+        Route many requests in order (offline replay, capacity planning).
+
+        Decisions go through the same cache and history as ``route_request``
+        and match it request for request, but every uncached request is
+        scored in one ``score_models_batch`` call. Repeats of an uncached
+        request within the batch are analysed once and served from the
+        cache, as they would be when routed one at a time. For large JSONL
+        replays use ``monkey_coder.core.batch_routing``, which streams and
+        fans out over worker processes.
+
+        Args:
+            requests: Execution requests to route
+
+        Returns:
+            One RoutingDecision per request, in input order
+        """
+        requests = list(requests)
+        slash_commands = [self._parse_slash_commands(request.prompt) for request in requests]
+
+        # Pass 1: cache lookups and pre-scoring analysis for the misses
+        cached: List[Optional[RoutingDecision]] = []
+        analyses: Dict[int, _RequestAnalysis] = {}
+        repeats = set()
+        first_miss: Dict[str, int] = {}
+        for i, (request, slash_command) in enumerate(zip(requests, slash_commands)):
+            key = None
+            if self._routing_cache is not None:
+                key = self._routing_cache.request_key(request, slash_command)
+                if key in first_miss:
+                    repeats.add(i)
+                    cached.append(None)
+                    continue
+            hit = self._get_cached_decision(request, slash_command)
+            cached.append(hit)
+            if hit is None:
+                analyses[i] = self._analyze_request(request, slash_command)
+                if key is not None:
+                    first_miss[key] = i
+
+        # Pass 2: score every miss in one vectorized call
+        keys, scores = self.score_models_batch([analysis.requirements for analysis in analyses.values()])
+        model_scores = {
+            i: dict(zip(keys, row)) for i, row in zip(analyses, scores.tolist())
+        }
+
+        # Pass 3: decide in input order so history matches sequential routing
+        decisions: List[RoutingDecision] = []
+        for i, (request, slash_command) in enumerate(zip(requests, slash_commands)):
+            decision = cached[i]
+            if i in repeats:
+                decision = self._get_cached_decision(request, slash_command)
+            if decision is not None:
+                self.routing_history.record(decision)
+            elif i in analyses:
+                decision = self._decide(request, analyses[i], model_scores[i])
+                self._cache_decision(request, slash_command, decision)
+            else:
+                # Repeat whose first occurrence was evicted before it could be served
+                decision = self._compute_routing_decision(request, slash_command)
+                self._cache_decision(request, slash_command, decision)
+            decisions.append(decision)
+        return decisions
+
+    def _get_cached_decision(
+        self, request: ExecuteRequest, slash_command: Optional[str]
+    ) -> Optional[RoutingDecision]:
+        """Return a copy of a memoised decision tagged as cached, if present."""
+        if self._routing_cache is None:
+            return None
+        try:
+            cached = self._routing_cache.get_for_request(request, slash_command)
+        except Exception as e:  # pragma: no cover - cache must never break routing
+            logger.debug(f"Routing cache lookup failed: {e}")
+            return None
+        if cached is None:
+            return None
+        # Deep copy so callers cannot mutate nested metadata of the stored decision
+        decision = copy.deepcopy(cached)
+        decision.metadata["cached"] = True
+        return decision
+
+    def _cache_decision(
+        self, request: ExecuteRequest, slash_command: Optional[str], decision: RoutingDecision
+    ) -> None:
+        """Memoise a freshly computed decision."""
+        if self._routing_cache is None:
+            return
+        try:
+            self._routing_cache.set_for_request(request, decision, slash_command)
+        except Exception as e:  # pragma: no cover - cache must never break routing
+            logger.debug(f"Routing cache store failed: {e}")
+
+    def _compute_routing_decision(
+        self, request: ExecuteRequest, slash_command: Optional[str] = None
+    ) -> RoutingDecision:
+        """Run the full routing analysis without consulting the decision cache."""
+        analysis = self._analyze_request(request, slash_command)
+
+        # Phase 5: Score and rank models
+        model_scores = self._score_models(analysis.requirements)
+
+        return self._decide(request, analysis, model_scores)
+
+    def _analyze_request(
+        self, request: ExecuteRequest, slash_command: Optional[str] = None
+    ) -> _RequestAnalysis:
+        """Phases 1-4 of routing: everything needed before model scoring."""
+        if slash_command is None:
+            slash_command = self._parse_slash_commands(request.prompt)
 
         # Phase 1: Analyze request complexity
         complexity_score = self._analyze_complexity(request)
@@ -114,17 +259,33 @@ class AdvancedRouter:
         context_type = self._extract_context_type(request)
         context_score = self._score_context_match(request, context_type)
 
-        # Phase 3: Parse slash commands and determine persona
-        slash_command = self._parse_slash_commands(request.prompt)
+        # Phase 3: Determine persona (slash command parsed up front for the cache key)
         persona = self._select_persona(request, slash_command, context_type)
 
         # Phase 4: Calculate capability requirements
-        capability_requirements = self._calculate_capability_requirements(
+        requirements = self._calculate_capability_requirements(
             request, complexity_level, context_type, persona
         )
 
-        # Phase 5: Score and rank models
-        model_scores = self._score_models(capability_requirements)
+        return _RequestAnalysis(
+            slash_command=slash_command,
+            complexity_score=complexity_score,
+            complexity_level=complexity_level,
+            context_type=context_type,
+            context_score=context_score,
+            persona=persona,
+            requirements=requirements,
+        )
+
+    def _decide(
+        self,
+        request: ExecuteRequest,
+        analysis: _RequestAnalysis,
+        model_scores: Dict[Tuple[ProviderType, str], float],
+    ) -> RoutingDecision:
+        """Phases 6-7 of routing: pick a model from its scores and record the decision."""
+        complexity_score = analysis.complexity_score
+        context_score = analysis.context_score
 
         # Phase 6: Make final selection with optimization
         provider, model = self._select_optimal_model(
@@ -145,29 +306,33 @@ class AdvancedRouter:
         decision = RoutingDecision(
             provider=provider,
             model=model,
-            persona=persona,
+            persona=analysis.persona,
             complexity_score=complexity_score,
             context_score=context_score,
             capability_score=chosen_score,
             confidence=confidence,
             reasoning=self._generate_reasoning(
-                complexity_level, context_type, persona, provider, model
+                analysis.complexity_level, analysis.context_type, analysis.persona, provider, model
             ),
             metadata={
                 "timestamp": datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z'),
-                "slash_command": slash_command,
-                "context_type": context_type.value,
-                "complexity_level": complexity_level.value,
+                "slash_command": analysis.slash_command,
+                "context_type": analysis.context_type.value,
+                "complexity_level": analysis.complexity_level.value,
                 "model_scores": model_scores,
             }
         )
 
         # Store in history for learning
-        self.routing_history.append(decision)
+        self.routing_history.record(decision)
 
-        logger.info(f"Routing decision: {provider.value}/{model} ({persona.value})")
+        logger.debug("Routing decision: %s/%s (%s)", provider.value, model, analysis.persona.value)
         return decision
 
+    def _keyword_hits(self, request: ExecuteRequest) -> KeywordHits:
+        """Keyword hit table for the lowercased prompt (one scan shared by all phases)."""
+        return self.keyword_matcher.match(request.prompt.lower())
+
     def _analyze_complexity(self, request: ExecuteRequest) -> float:
         """
         Analyze request complexity using multiple signals.
@@ -175,14 +340,14 @@ class AdvancedRouter:
         Returns complexity score from 0.0 (trivial) to 1.0 (critical)
         """
         score = 0.0
-        prompt = request.prompt.lower()
+        hits = self._keyword_hits(request)
 
         # Base indicator
-        if any(ind in prompt for ind in ['function', 'class', 'method', 'code', 'implement', 'create']):
+        if hits.any('complexity.base'):
             score += 0.18
 
         # Length
-        word_count = len(prompt.split())
+        word_count = len(hits.text.split())
         if word_count > 100:
             score += 0.3
         elif word_count > 50:
@@ -193,25 +358,15 @@ class AdvancedRouter:
             score += 0.05
 
         # Simple arithmetic or small task indicators (helps ensure lower bound of SIMPLE range)
-        simple_indicators = ['add two numbers', 'add two', 'sum two', 'calculate sum']
-        if any(si in prompt for si in simple_indicators):
+        if hits.any('complexity.simple'):
             score += 0.04  # calibrated small bump
 
         # Technical keywords
-        complex_keywords = [
-            'architecture', 'design pattern', 'scalability', 'performance',
-            'optimization', 'algorithm', 'data structure', 'system design',
-            'distributed', 'microservices', 'database', 'security', 'concurrent',
-            'async', 'threading', 'machine learning', 'ai', 'neural network',
-            'authentication', 'session', 'validation', 'comprehensive', 'pipeline',
-            'fault tolerance', 'auto-scaling', 'real-time', 'serving'
-        ]
-        keyword_matches = sum(1 for kw in complex_keywords if kw in prompt)
+        keyword_matches = hits.count('complexity.keywords')
         score += min(keyword_matches * 0.061, 0.30)
 
         # Multi-step indicators
-        step_indicators = ['step', 'phase', 'first', 'then', 'next', 'finally', 'multi-step', 'multi-phase']
-        step_count = sum(1 for ind in step_indicators if ind in prompt)
+        step_count = hits.count('complexity.steps')
         if step_count >= 2:
             score += 0.22
         elif step_count >= 1:
@@ -228,22 +383,15 @@ class AdvancedRouter:
                 score += 0.09
 
         # Specific phrases
-        complex_phrases = [
-            'requiring deep technical expertise',
-            'with methods for',
-            'include detailed',
-            'comprehensive',
-            'e-commerce platform'
-        ]
-        phrase_matches = sum(1 for phrase in complex_phrases if phrase in prompt)
+        phrase_matches = hits.count('complexity.phrases')
         score += min(phrase_matches * 0.07, 0.16)
 
         # Conditional complexity boost for architecture/microservices design patterns cluster
-        if all(k in prompt for k in ['architecture', 'microservices']) and 'e-commerce platform' in prompt:
+        if 'architecture' in hits and 'microservices' in hits and 'e-commerce platform' in hits:
             score += 0.085  # targeted boost for complex test (adjusted)
 
         # Additional boost for scalable architecture with security & performance concerns
-        if 'scalable microservices architecture' in prompt and 'security' in prompt and 'performance' in prompt:
+        if 'scalable microservices architecture' in hits and 'security' in hits and 'performance' in hits:
             score = max(score, 0.62)  # ensure it crosses complex threshold
 
         return min(score, 1.0)
@@ -263,7 +411,8 @@ class AdvancedRouter:
 
     def _extract_context_type(self, request: ExecuteRequest) -> ContextType:
         """Extract primary context type from request."""
-        prompt = request.prompt.lower()
+        hits = self._keyword_hits(request)
+        prompt = hits.text
 
         # Task type mapping first
         task_context_map = {
@@ -279,72 +428,33 @@ class AdvancedRouter:
             return task_context_map[request.task_type]
 
         # Immediate phrase overrides (before any other heuristics)
-        if 'design the overall architecture and structure' in prompt or prompt.startswith('design the overall architecture'):
+        if 'design the overall architecture and structure' in hits or prompt.startswith('design the overall architecture'):
             return ContextType.ARCHITECTURE
-        if 'analyze security vulnerabilities' in prompt and 'implement authentication' in prompt:
+        if 'analyze security vulnerabilities' in hits and 'implement authentication' in hits:
             return ContextType.SECURITY
 
         # Slash command early overrides (ensure tests expecting /security etc. pass)
-        if re.search(r'/security\b', prompt) or re.search(r'/sec(\b|/)', prompt):
+        if hits.has_word_end('/security') or hits.has_word_end('/sec'):
             return ContextType.SECURITY
-        if re.search(r'/arch(itect)?\b', prompt):
+        if hits.has_word_end('/arch') or hits.has_word_end('/architect'):
             return ContextType.ARCHITECTURE
 
-        # Keyword-based detection with weighted scoring
-        context_keywords = {
-            ContextType.CODE_GENERATION: {
-                'primary': ['generate', 'create', 'write', 'implement', 'build', 'function', 'class'],
-                'secondary': ['code', 'develop', 'program', 'script']
-            },
-            ContextType.CODE_REVIEW: {
-                'primary': ['review', 'analyze', 'check', 'evaluate', 'assess', 'examine'],
-                'secondary': ['bugs', 'issues', 'quality']
-            },
-            ContextType.DEBUGGING: {
-                'primary': ['debug', 'fix', 'error', 'bug', 'issue', 'problem', 'traceback'],
-                'secondary': ['exception', 'crash', 'fault']
-            },
-            ContextType.ARCHITECTURE: {
-                'primary': ['architecture', 'design', 'structure', 'pattern', 'overall'],
-                'secondary': ['system', 'component', 'framework', 'blueprint']
-            },
-            ContextType.SECURITY: {
-                'primary': ['security', 'vulnerability', 'vulnerabilities', 'exploit', 'secure', 'auth', 'audit'],
-                'secondary': ['authentication', 'authorization', 'encryption', 'attack', 'threat']
-            },
-            ContextType.PERFORMANCE: {
-                'primary': ['performance', 'optimize', 'speed', 'memory', 'efficient'],
-                'secondary': ['fast', 'slow', 'bottleneck', 'scalability']
-            },
-            ContextType.DOCUMENTATION: {
-                'primary': ['document', 'explain', 'describe', 'comment', 'api'],
-                'secondary': ['readme', 'guide', 'manual', 'specification']
-            },
-            ContextType.TESTING: {
-                'primary': ['test', 'unittest', 'spec', 'verify', 'validate', 'unit tests'],
-                'secondary': ['testing', 'assertion', 'mock', 'coverage']
-            },
-            ContextType.REFACTORING: {
-                'primary': ['refactor', 'improve', 'clean', 'restructure'],
-                'secondary': ['optimize', 'reorganize', 'simplify']
-            },
-        }
-
         best_match: ContextType = ContextType.CODE_GENERATION
         max_score = 0
         scores: Dict[ContextType, int] = {}
 
         # Ultra-early phrase recognition to satisfy tests expecting specialty classification
-        if prompt.startswith('design the overall architecture') or 'overall architecture and structure' in prompt:
+        if prompt.startswith('design the overall architecture') or 'overall architecture and structure' in hits:
             return ContextType.ARCHITECTURE
-        if prompt.startswith('analyze security vulnerabilities') or ('security vulnerabilities' in prompt and 'implement authentication' in prompt):
+        if prompt.startswith('analyze security vulnerabilities') or ('security vulnerabilities' in hits and 'implement authentication' in hits):
             return ContextType.SECURITY
 
-        for context_type, keyword_groups in context_keywords.items():
+        # Keyword-based detection with weighted scoring
+        for context_type in ContextType:
             primary_weight = 3 if context_type in (ContextType.ARCHITECTURE, ContextType.SECURITY) else 2
             secondary_weight = 1
-            primary_score = sum(primary_weight for kw in keyword_groups['primary'] if kw in prompt)
-            secondary_score = sum(secondary_weight for kw in keyword_groups['secondary'] if kw in prompt)
+            primary_score = primary_weight * hits.count(f'context.{context_type.value}.primary')
+            secondary_score = secondary_weight * hits.count(f'context.{context_type.value}.secondary')
             total_score = primary_score + secondary_score
             scores[context_type] = total_score
             if total_score > max_score:
@@ -363,35 +473,24 @@ class AdvancedRouter:
                 best_match = ContextType.SECURITY
 
         # Phrase-based strong overrides
-        if ('overall architecture' in prompt or ('architecture' in prompt and 'structure' in prompt)) and scores.get(ContextType.ARCHITECTURE, 0) > 0:
+        if ('overall architecture' in hits or ('architecture' in hits and 'structure' in hits)) and scores.get(ContextType.ARCHITECTURE, 0) > 0:
             best_match = ContextType.ARCHITECTURE
-        if any(ph in prompt for ph in ['vulnerability', 'vulnerabilities', 'secure session', 'authentication system', 'audit this authentication system']):
+        if hits.any('context.security_phrases'):
             if scores.get(ContextType.SECURITY, 0) > 0:
                 best_match = ContextType.SECURITY
 
         # Absolute overrides if explicit multi-word patterns strongly indicate specialty
-        if re.search(r'design the overall architecture', prompt):
+        if 'design the overall architecture' in hits:
             return ContextType.ARCHITECTURE
-        if re.search(r'analyze security vulnerabilities', prompt):
+        if 'analyze security vulnerabilities' in hits:
             return ContextType.SECURITY
 
         return best_match
 
     def _score_context_match(self, request: ExecuteRequest, context_type: ContextType) -> float:
         """Score how well the request matches the identified context."""
-        prompt = request.prompt.lower()
-
-        # Context-specific scoring
-        if context_type == ContextType.CODE_GENERATION:
-            indicators = ['function', 'class', 'method', 'create', 'implement']
-        elif context_type == ContextType.DEBUGGING:
-            indicators = ['error', 'exception', 'traceback', 'fix', 'debug']
-        elif context_type == ContextType.ARCHITECTURE:
-            indicators = ['design', 'pattern', 'structure', 'component', 'system']
-        else:
-            indicators = []
-
-        matches = sum(1 for ind in indicators if ind in prompt)
+        # Context-specific scoring (code generation, debugging and architecture have indicators)
+        matches = self._keyword_hits(request).count(f'context_match.{context_type.value}')
         return min(matches * 0.2, 1.0)
 
     def _parse_slash_commands(self, prompt: str) -> Optional[str]:
@@ -487,18 +586,55 @@ class AdvancedRouter:
 
         return requirements
 
-    def _score_models(self, requirements: Dict[str, float]) -> Dict[Tuple[ProviderType, str], float]:
-        """Score all available models against requirements."""
-        scores = {}
+    def _score_models(
+        self,
+        requirements: Dict[str, float],
+        available_providers: Optional[Iterable[ProviderType]] = None,
+    ) -> Dict[Tuple[ProviderType, str], float]:
+        """Score all available models against requirements.
 
-        for provider, models in MODEL_REGISTRY.items():
-            for model in models:
-                if (provider, model) in self.model_capabilities:
-                    capabilities = self.model_capabilities[(provider, model)]
-                    score = self._calculate_model_score(capabilities, requirements)
-                    scores[(provider, model)] = score
+        Args:
+            requirements: Capability requirements from ``_calculate_capability_requirements``
+            available_providers: Restrict scoring to these providers (all when None)
 
-        return scores
+        Returns:
+            ``(provider, model) -> score`` in ``MODEL_REGISTRY`` order
+        """
+        matrix = self.scoring_matrix
+        mask = matrix.provider_mask(available_providers) if available_providers is not None else None
+        return matrix.to_dict(matrix.score(requirements), mask)
+
+    @property
+    def scoring_matrix(self) -> ModelScoringMatrix:
+        """Model capabilities packed for vectorized scoring, rebuilt if capabilities are replaced."""
+        matrix = self._scoring_matrix
+        if matrix is None or matrix.is_stale(self.model_capabilities):
+            order = [(provider, model) for provider, models in MODEL_REGISTRY.items() for model in models]
+            matrix = self._scoring_matrix = ModelScoringMatrix(self.model_capabilities, order)
+        return matrix
+
+    def score_models_batch(
+        self,
+        requirements: Sequence[Dict[str, float]],
+        available_providers: Optional[Iterable[ProviderType]] = None,
+    ) -> Tuple[List[Tuple[ProviderType, str]], np.ndarray]:
+        """
+        Score all models against many requirement dicts at once.
+
+        Args:
+            requirements: Capability requirements, one dict per request
+            available_providers: Restrict scoring to these providers (all when None)
+
+        Returns:
+            Tuple of the scored ``(provider, model)`` keys and an
+            ``(len(requirements), len(keys))`` score array
+        """
+        matrix = self.scoring_matrix
+        scores = matrix.score_many(requirements)
+        if available_providers is None:
+            return list(matrix.keys), scores
+        mask = matrix.provider_mask(available_providers)
+        return [key for key, keep in zip(matrix.keys, mask.tolist()) if keep], scores[:, mask]
 
     def _calculate_model_score(
         self,
@@ -812,5 +948,6 @@ class AdvancedRouter:
             },
             "metadata": decision.metadata,
             "available_models": list(self.model_capabilities.keys()),
-            "routing_history_count": len(self.routing_history),
+            "routing_history_count": self.routing_history.total,
+            "routing_statistics": self.routing_history.stats(),
         }
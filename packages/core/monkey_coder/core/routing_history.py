@@ -0,0 +1,250 @@
+"""
+Bounded routing history with running aggregates.
+
+Routers used to append every full ``RoutingDecision`` (including the
+per-model score table in its metadata) to an unbounded list, which grows
+for the lifetime of a worker. :class:`RoutingHistory` keeps a fixed number
+of compact :class:`RoutingRecord` entries in a ring buffer and maintains
+lifetime aggregates as decisions are recorded, so statistics are O(1)
+regardless of traffic.
+"""
+
+import math
+import time
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+DEFAULT_HISTORY_CAPACITY = 1000
+DEFAULT_CONFIDENCE_BINS = 10
+
+
+def _value(member: Any) -> Any:
+    return getattr(member, "value", member)
+
+
+class RoutingRecord:
+    """Compact per-decision record kept in :class:`RoutingHistory`."""
+
+    __slots__ = (
+        "timestamp",
+        "provider",
+        "model",
+        "persona",
+        "context_type",
+        "complexity_level",
+        "complexity_score",
+        "confidence",
+        "cached",
+        "state_vector",
+    )
+
+    def __init__(
+        self,
+        timestamp: float,
+        provider: Any,
+        model: str,
+        persona: Any,
+        context_type: Optional[str],
+        complexity_level: Optional[str],
+        complexity_score: float,
+        confidence: float,
+        cached: bool = False,
+        state_vector: Any = None,
+    ):
+        self.timestamp = timestamp
+        self.provider = provider
+        self.model = model
+        self.persona = persona
+        self.context_type = context_type
+        self.complexity_level = complexity_level
+        self.complexity_score = complexity_score
+        self.confidence = confidence
+        self.cached = cached
+        self.state_vector = state_vector
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable view of the record (without the state vector)."""
+        return {
+            "timestamp": self.timestamp,
+            "provider": _value(self.provider),
+            "model": self.model,
+            "persona": _value(self.persona),
+            "context_type": self.context_type,
+            "complexity_level": self.complexity_level,
+            "complexity_score": self.complexity_score,
+            "confidence": self.confidence,
+            "cached": self.cached,
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"RoutingRecord(provider={_value(self.provider)!r}, model={self.model!r}, "
+            f"confidence={self.confidence:.3f}, cached={self.cached})"
+        )
+
+
+class RoutingHistory:
+    """
+    Fixed-capacity ring buffer of routing records with running aggregates.
+
+    ``len()`` and iteration cover the retained window (oldest first); the
+    aggregates returned by :meth:`stats` cover every decision ever recorded.
+
+    Args:
+        capacity: Maximum number of records retained
+        confidence_bins: Number of equal-width confidence histogram bins over [0, 1]
+    """
+
+    __slots__ = (
+        "capacity",
+        "total",
+        "cached_count",
+        "provider_counts",
+        "complexity_distribution",
+        "confidence_histogram",
+        "_records",
+        "_next",
+        "_size",
+        "_complexity_sum",
+        "_complexity_sq_sum",
+        "_confidence_sum",
+        "_confidence_sq_sum",
+    )
+
+    def __init__(self, capacity: int = DEFAULT_HISTORY_CAPACITY, confidence_bins: int = DEFAULT_CONFIDENCE_BINS):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        if confidence_bins < 1:
+            raise ValueError("confidence_bins must be at least 1")
+        self.capacity = capacity
+        self._records: List[Optional[RoutingRecord]] = [None] * capacity
+        self.confidence_histogram: List[int] = [0] * confidence_bins
+        self._reset_counters()
+
+    def _reset_counters(self):
+        self._next = 0
+        self._size = 0
+        self.total = 0
+        self.cached_count = 0
+        self.provider_counts: Dict[str, int] = {}
+        self.complexity_distribution: Dict[str, int] = {}
+        for i in range(len(self.confidence_histogram)):
+            self.confidence_histogram[i] = 0
+        self._complexity_sum = 0.0
+        self._complexity_sq_sum = 0.0
+        self._confidence_sum = 0.0
+        self._confidence_sq_sum = 0.0
+
+    def record(self, decision: Any, state_vector: Any = None) -> RoutingRecord:
+        """
+        Record a routing decision.
+
+        Args:
+            decision: ``RoutingDecision`` to summarise
+            state_vector: Optional state vector kept with the record (quantum routing)
+
+        Returns:
+            The stored compact record
+        """
+        metadata = decision.metadata or {}
+        entry = RoutingRecord(
+            timestamp=time.time(),
+            provider=decision.provider,
+            model=decision.model,
+            persona=decision.persona,
+            context_type=metadata.get("context_type"),
+            complexity_level=metadata.get("complexity_level"),
+            complexity_score=float(decision.complexity_score),
+            confidence=float(decision.confidence),
+            cached=bool(metadata.get("cached", False)),
+            state_vector=state_vector,
+        )
+        self.append(entry)
+        return entry
+
+    def append(self, entry: RoutingRecord):
+        """Store a record, evicting the oldest one when full, and update aggregates."""
+        self._records[self._next] = entry
+        self._next = (self._next + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+
+        self.total += 1
+        if entry.cached:
+            self.cached_count += 1
+
+        provider = _value(entry.provider)
+        self.provider_counts[provider] = self.provider_counts.get(provider, 0) + 1
+        level = entry.complexity_level or "unknown"
+        self.complexity_distribution[level] = self.complexity_distribution.get(level, 0) + 1
+
+        bins = len(self.confidence_histogram)
+        index = min(max(int(entry.confidence * bins), 0), bins - 1)
+        self.confidence_histogram[index] += 1
+
+        self._complexity_sum += entry.complexity_score
+        self._complexity_sq_sum += entry.complexity_score * entry.complexity_score
+        self._confidence_sum += entry.confidence
+        self._confidence_sq_sum += entry.confidence * entry.confidence
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __bool__(self) -> bool:
+        return self._size > 0
+
+    def __iter__(self) -> Iterator[RoutingRecord]:
+        start = (self._next - self._size) % self.capacity
+        for i in range(self._size):
+            yield self._records[(start + i) % self.capacity]
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[RoutingRecord, List[RoutingRecord]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._size))]
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("routing history index out of range")
+        return self._records[(self._next - self._size + index) % self.capacity]
+
+    def recent(self, n: int) -> List[RoutingRecord]:
+        """The ``n`` most recent records, oldest first."""
+        n = min(max(n, 0), self._size)
+        return self[self._size - n:] if n else []
+
+    def clear(self):
+        """Drop all records and reset the aggregates."""
+        for i in range(self.capacity):
+            self._records[i] = None
+        self._reset_counters()
+
+    @staticmethod
+    def _mean_std(total: float, sq_total: float, count: int):
+        mean = total / count
+        # Population standard deviation, matching numpy.std
+        return mean, math.sqrt(max(sq_total / count - mean * mean, 0.0))
+
+    def stats(self) -> Dict[str, Any]:
+        """Lifetime aggregates, computed in O(1) from the running counters."""
+        result: Dict[str, Any] = {
+            "total": self.total,
+            "retained": self._size,
+            "capacity": self.capacity,
+            "cached": self.cached_count,
+            "provider_counts": dict(self.provider_counts),
+            "complexity_distribution": dict(self.complexity_distribution),
+            "confidence_histogram": list(self.confidence_histogram),
+        }
+        if self.total:
+            complexity_mean, complexity_std = self._mean_std(
+                self._complexity_sum, self._complexity_sq_sum, self.total
+            )
+            confidence_mean, confidence_std = self._mean_std(
+                self._confidence_sum, self._confidence_sq_sum, self.total
+            )
+            result.update({
+                "avg_complexity_score": complexity_mean,
+                "complexity_std": complexity_std,
+                "avg_confidence_score": confidence_mean,
+                "confidence_std": confidence_std,
+            })
+        return result
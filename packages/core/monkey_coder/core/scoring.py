@@ -5,12 +5,12 @@ This module implements pluggable scoring components to replace the monolithic
 routing logic, making the system more maintainable and extensible.
 """
 
-import re
 from abc import ABC, abstractmethod
 from typing import Dict, List, Optional, Tuple
 from enum import Enum
 
 from ..models import ExecuteRequest
+from .keyword_matcher import KeywordHits, ROUTING_KEYWORDS, get_routing_matcher
 
 
 class ComplexityLevel(str, Enum):
@@ -61,35 +61,27 @@ class ComplexityScorer(ScoringStrategy):
     """Scores task complexity based on various indicators."""
     
     def __init__(self):
-        self.base_indicators = ['function', 'class', 'method', 'code', 'implement', 'create']
-        self.complex_keywords = [
-            'architecture', 'design pattern', 'scalability', 'performance',
-            'optimization', 'algorithm', 'data structure', 'system design',
-            'distributed', 'microservices', 'database', 'security', 'concurrent',
-            'async', 'threading', 'machine learning', 'ai', 'neural network',
-            'authentication', 'session', 'validation', 'comprehensive', 'pipeline',
-            'fault tolerance', 'auto-scaling', 'real-time', 'serving'
-        ]
-        self.step_indicators = ['step', 'phase', 'first', 'then', 'next', 'finally', 'multi-step', 'multi-phase']
-        self.complex_phrases = [
-            'requiring deep technical expertise',
-            'with methods for',
-            'include detailed',
-            'comprehensive',
-            'e-commerce platform'
-        ]
+        self.matcher = get_routing_matcher()
+        # Keyword lists live in the shared routing vocabulary the matcher is compiled from
+        self.base_indicators = ROUTING_KEYWORDS['complexity.base']
+        self.complex_keywords = ROUTING_KEYWORDS['complexity.keywords']
+        self.step_indicators = ROUTING_KEYWORDS['complexity.steps']
+        self.complex_phrases = ROUTING_KEYWORDS['complexity.phrases']
     
     def score(self, request: ExecuteRequest) -> float:
         """Calculate complexity score from 0.0 (trivial) to 1.0 (critical)."""
+        return self.score_hits(self.matcher.match(request.prompt.lower()), request)
+    
+    def score_hits(self, hits: KeywordHits, request: ExecuteRequest) -> float:
+        """Calculate complexity score from a precomputed keyword hit table."""
         score = 0.0
-        prompt = request.prompt.lower()
         
         # Base score for any coding task - use word boundaries for accurate matching
-        if any(re.search(r'\b' + re.escape(indicator) + r'\b', prompt) for indicator in self.base_indicators):
+        if hits.any('complexity.base', words=True):
             score += 0.2
         
         # Text length indicators - adjusted for better distribution
-        word_count = len(prompt.split())
+        word_count = len(hits.text.split())
         if word_count > 100:
             score += 0.3
         elif word_count > 50:
@@ -100,12 +92,12 @@ class ComplexityScorer(ScoringStrategy):
             score += 0.05
             
         # Technical complexity keywords - expanded and weighted
-        keyword_matches = sum(1 for kw in self.complex_keywords if re.search(r'\b' + re.escape(kw) + r'\b', prompt))
+        keyword_matches = hits.count('complexity.keywords', words=True)
         # Adjusted weighting for better balance
         score += min(keyword_matches * 0.08, 0.3)
         
         # Multi-step process indicators - use word boundaries to avoid false matches
-        step_count = sum(1 for ind in self.step_indicators if re.search(r'\b' + re.escape(ind) + r'\b', prompt))
+        step_count = hits.count('complexity.steps', words=True)
         if step_count >= 2:
             score += 0.2
         elif step_count >= 1:
@@ -120,7 +112,7 @@ class ComplexityScorer(ScoringStrategy):
             score += 0.1
         
         # Specific complexity phrases
-        phrase_matches = sum(1 for phrase in self.complex_phrases if phrase in prompt)
+        phrase_matches = hits.count('complexity.phrases')
         score += min(phrase_matches * 0.1, 0.2)
             
         return min(score, 1.0)
@@ -147,43 +139,13 @@ class ContextClassifier(ScoringStrategy):
     """Classifies the context type of a request."""
     
     def __init__(self):
+        self.matcher = get_routing_matcher()
         self.context_keywords = {
-            ContextType.CODE_GENERATION: {
-                'primary': ['generate', 'create', 'write', 'implement', 'build', 'function', 'class'],
-                'secondary': ['code', 'develop', 'program', 'script']
-            },
-            ContextType.CODE_REVIEW: {
-                'primary': ['review', 'analyze', 'check', 'evaluate', 'assess', 'examine'],
-                'secondary': ['bugs', 'issues', 'quality']
-            },
-            ContextType.DEBUGGING: {
-                'primary': ['debug', 'fix', 'error', 'bug', 'issue', 'problem', 'traceback'],
-                'secondary': ['exception', 'crash', 'fault']
-            },
-            ContextType.ARCHITECTURE: {
-                'primary': ['architecture', 'design', 'structure', 'pattern', 'overall'],
-                'secondary': ['system', 'component', 'framework', 'blueprint']
-            },
-            ContextType.SECURITY: {
-                'primary': ['security', 'vulnerability', 'exploit', 'secure', 'auth', 'audit'],
-                'secondary': ['authentication', 'authorization', 'encryption', 'attack']
-            },
-            ContextType.PERFORMANCE: {
-                'primary': ['performance', 'optimize', 'speed', 'memory', 'efficient'],
-                'secondary': ['fast', 'slow', 'bottleneck', 'scalability']
-            },
-            ContextType.DOCUMENTATION: {
-                'primary': ['document', 'explain', 'describe', 'comment', 'api'],
-                'secondary': ['readme', 'guide', 'manual', 'specification']
-            },
-            ContextType.TESTING: {
-                'primary': ['test', 'tests', 'unittest', 'spec', 'verify', 'validate', 'unit test', 'unit tests'],
-                'secondary': ['testing', 'assertion', 'mock', 'coverage']
-            },
-            ContextType.REFACTORING: {
-                'primary': ['refactor', 'improve', 'clean', 'restructure'],
-                'secondary': ['optimize', 'reorganize', 'simplify']
-            },
+            context_type: {
+                group: ROUTING_KEYWORDS[f'scoring.context.{context_type.value}.{group}']
+                for group in ('primary', 'secondary')
+            }
+            for context_type in ContextType
         }
         
         # Task type mapping - used as fallback
@@ -197,19 +159,20 @@ class ContextClassifier(ScoringStrategy):
             TaskType.REFACTORING: ContextType.REFACTORING,
         }
     
+    def _keyword_score(self, hits: KeywordHits, context_type: ContextType) -> int:
+        """Weighted whole-word matches: primary keywords = 2 points, secondary = 1 point."""
+        primary_score = 2 * hits.count(f'scoring.context.{context_type.value}.primary', words=True)
+        secondary_score = hits.count(f'scoring.context.{context_type.value}.secondary', words=True)
+        return primary_score + secondary_score
+    
     def score(self, request: ExecuteRequest) -> float:
         """Score based on context type match confidence."""
-        context_type = self.classify_context(request)
+        hits = self.matcher.match(request.prompt.lower())
+        context_type = self.classify_hits(hits, request)
         
         # Return a confidence score based on keyword matches
-        prompt = request.prompt.lower()
         if context_type in self.context_keywords:
-            keyword_groups = self.context_keywords[context_type]
-            primary_score = sum(2 for kw in keyword_groups['primary'] 
-                              if re.search(r'\b' + re.escape(kw) + r'\b', prompt))
-            secondary_score = sum(1 for kw in keyword_groups['secondary'] 
-                                if re.search(r'\b' + re.escape(kw) + r'\b', prompt))
-            total_score = primary_score + secondary_score
+            total_score = self._keyword_score(hits, context_type)
             # Normalize to 0-1 range
             return min(total_score / 10.0, 1.0)
         
@@ -217,19 +180,16 @@ class ContextClassifier(ScoringStrategy):
     
     def classify_context(self, request: ExecuteRequest) -> ContextType:
         """Extract primary context type from request."""
-        prompt = request.prompt.lower()
-        
+        return self.classify_hits(self.matcher.match(request.prompt.lower()), request)
+    
+    def classify_hits(self, hits: KeywordHits, request: ExecuteRequest) -> ContextType:
+        """Extract primary context type from a precomputed keyword hit table."""
         # Keyword-based detection with weighted scoring - prioritize this over task type
         best_match = ContextType.CODE_GENERATION
         max_score = 0
         
-        for context_type, keyword_groups in self.context_keywords.items():
-            # Weighted scoring: primary keywords = 2 points, secondary = 1 point
-            primary_score = sum(2 for kw in keyword_groups['primary'] 
-                              if re.search(r'\b' + re.escape(kw) + r'\b', prompt))
-            secondary_score = sum(1 for kw in keyword_groups['secondary'] 
-                                if re.search(r'\b' + re.escape(kw) + r'\b', prompt))
-            total_score = primary_score + secondary_score
+        for context_type in self.context_keywords:
+            total_score = self._keyword_score(hits, context_type)
             
             if total_score > max_score:
                 max_score = total_score
@@ -176,6 +176,113 @@ MIGRATIONS = {
             CREATE INDEX IF NOT EXISTS idx_auth_tokens_token_hash ON auth_tokens(token_hash);
         """
     )
+    ,
+    "006_create_usage_daily_rollups_table": Migration(
+        version="006",
+        description="Create usage_daily_rollups table for per-day usage totals",
+        sql="""
+            CREATE TABLE IF NOT EXISTS usage_daily_rollups (
+                usage_date DATE NOT NULL,
+                api_key_hash VARCHAR(64) NOT NULL,
+
+                -- Totals, incremented with every usage_events insert
+                tokens_input BIGINT NOT NULL DEFAULT 0,
+                tokens_output BIGINT NOT NULL DEFAULT 0,
+                tokens_total BIGINT NOT NULL DEFAULT 0,
+                cost_total DECIMAL(14, 6) NOT NULL DEFAULT 0.0,
+                request_count BIGINT NOT NULL DEFAULT 0,
+
+                -- Stripe reporting progress
+                reported_tokens BIGINT NOT NULL DEFAULT 0,
+                reported_at TIMESTAMP WITH TIME ZONE,
+
+                updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+                PRIMARY KEY (usage_date, api_key_hash)
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_usage_daily_rollups_api_key_hash ON usage_daily_rollups(api_key_hash);
+
+            ALTER TABLE billing_customers ADD COLUMN IF NOT EXISTS stripe_subscription_item_id VARCHAR(100);
+
+            -- Backfill from existing events
+            INSERT INTO usage_daily_rollups (
+                usage_date, api_key_hash, tokens_input, tokens_output, tokens_total, cost_total, request_count
+            )
+            SELECT (created_at AT TIME ZONE 'UTC')::date, api_key_hash,
+                   SUM(tokens_input), SUM(tokens_output), SUM(tokens_total), SUM(cost_total), COUNT(*)
+            FROM usage_events
+            GROUP BY 1, 2
+            ON CONFLICT (usage_date, api_key_hash) DO NOTHING;
+        """
+    ),
+
+    "007_partition_usage_events_by_day": Migration(
+        version="007",
+        description="Partition usage_events by day so retention drops partitions",
+        sql="""
+            DO $$
+            DECLARE
+                split_day DATE := (NOW() AT TIME ZONE 'UTC')::date + 1;
+                partition_day DATE;
+                index_name TEXT;
+            BEGIN
+                IF EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'usage_events'::regclass) THEN
+                    RETURN;
+                END IF;
+
+                -- Existing rows become one partition covering everything before split_day
+                ALTER TABLE usage_events RENAME TO usage_events_legacy;
+                ALTER TABLE usage_events_legacy RENAME CONSTRAINT usage_events_pkey TO usage_events_legacy_pkey;
+                FOREACH index_name IN ARRAY ARRAY[
+                    'idx_usage_events_api_key_hash', 'idx_usage_events_created_at', 'idx_usage_events_provider',
+                    'idx_usage_events_model', 'idx_usage_events_status', 'idx_usage_events_api_key_created'
+                ] LOOP
+                    EXECUTE format('ALTER INDEX IF EXISTS %I RENAME TO %I', index_name, index_name || '_legacy');
+                END LOOP;
+
+                -- The partition key must be part of the primary key
+                CREATE TABLE usage_events (
+                    LIKE usage_events_legacy INCLUDING DEFAULTS,
+                    PRIMARY KEY (id, created_at)
+                ) PARTITION BY RANGE (created_at);
+
+                CREATE INDEX idx_usage_events_api_key_hash ON usage_events(api_key_hash);
+                CREATE INDEX idx_usage_events_created_at ON usage_events(created_at);
+                CREATE INDEX idx_usage_events_provider ON usage_events(provider);
+                CREATE INDEX idx_usage_events_model ON usage_events(model);
+                CREATE INDEX idx_usage_events_status ON usage_events(status);
+                CREATE INDEX idx_usage_events_api_key_created ON usage_events(api_key_hash, created_at);
+
+                -- A CHECK matching the partition bound lets ATTACH skip its own validation scan
+                EXECUTE format(
+                    'ALTER TABLE usage_events_legacy ADD CONSTRAINT usage_events_legacy_bound '
+                    'CHECK (created_at IS NOT NULL AND created_at < %L)',
+                    split_day::text || ' 00:00:00+00'
+                );
+
+                EXECUTE format(
+                    'ALTER TABLE usage_events ATTACH PARTITION usage_events_legacy FOR VALUES FROM (MINVALUE) TO (%L)',
+                    split_day::text || ' 00:00:00+00'
+                );
+
+                -- The partition bound now enforces the same rule
+                ALTER TABLE usage_events_legacy DROP CONSTRAINT usage_events_legacy_bound;
+
+                -- One partition per UTC day; billing.cron.ensure_usage_partitions keeps creating them
+                FOR partition_day IN SELECT generate_series(split_day, split_day + 7, INTERVAL '1 day')::date LOOP
+                    EXECUTE format(
+                        'CREATE TABLE IF NOT EXISTS %I PARTITION OF usage_events FOR VALUES FROM (%L) TO (%L)',
+                        'usage_events_p' || to_char(partition_day, 'YYYYMMDD'),
+                        partition_day::text || ' 00:00:00+00',
+                        (partition_day + 1)::text || ' 00:00:00+00'
+                    );
+                END LOOP;
+
+                -- Catches rows if the partition job falls behind
+                CREATE TABLE IF NOT EXISTS usage_events_default PARTITION OF usage_events DEFAULT;
+            END $$;
+        """
+    )
 }
 
 
@@ -7,7 +7,7 @@ billing information, and related data.
 
 import json
 import logging
-from datetime import datetime
+from datetime import date, datetime, timezone
 from typing import Any, Dict, List, Optional
 from uuid import UUID, uuid4
 
@@ -17,6 +17,75 @@ from .connection import get_database_connection
 
 logger = logging.getLogger(__name__)
 
+USAGE_EVENT_COLUMNS = (
+    "id", "api_key_hash", "execution_id", "task_type",
+    "tokens_input", "tokens_output", "tokens_total",
+    "provider", "model", "model_cost_input", "model_cost_output",
+    "cost_input", "cost_output", "cost_total",
+    "execution_time", "status", "error_message",
+    "created_at", "metadata",
+)
+
+# Per-day, per-key totals maintained alongside usage_events (migration 006)
+_ROLLUP_CONFLICT = """
+    ON CONFLICT (usage_date, api_key_hash) DO UPDATE SET
+        tokens_input = usage_daily_rollups.tokens_input + EXCLUDED.tokens_input,
+        tokens_output = usage_daily_rollups.tokens_output + EXCLUDED.tokens_output,
+        tokens_total = usage_daily_rollups.tokens_total + EXCLUDED.tokens_total,
+        cost_total = usage_daily_rollups.cost_total + EXCLUDED.cost_total,
+        request_count = usage_daily_rollups.request_count + EXCLUDED.request_count,
+        updated_at = NOW()
+"""
+
+_ROLLUP_UPSERT_VALUES = """
+    INSERT INTO usage_daily_rollups (
+        usage_date, api_key_hash, tokens_input, tokens_output, tokens_total, cost_total, request_count
+    ) VALUES ($1, $2, $3, $4, $5, $6, $7)
+""" + _ROLLUP_CONFLICT
+
+_INSERT_STAGED_WITH_ROLLUP = f"""
+    WITH inserted AS (
+        INSERT INTO usage_events ({", ".join(USAGE_EVENT_COLUMNS)})
+        SELECT {", ".join(USAGE_EVENT_COLUMNS)} FROM usage_events_staging
+        ON CONFLICT DO NOTHING
+        RETURNING api_key_hash, created_at, tokens_input, tokens_output, tokens_total, cost_total
+    )
+    INSERT INTO usage_daily_rollups (
+        usage_date, api_key_hash, tokens_input, tokens_output, tokens_total, cost_total, request_count
+    )
+    SELECT (created_at AT TIME ZONE 'UTC')::date, api_key_hash,
+           SUM(tokens_input), SUM(tokens_output), SUM(tokens_total), SUM(cost_total), COUNT(*)
+    FROM inserted
+    GROUP BY 1, 2
+""" + _ROLLUP_CONFLICT
+
+
+def usage_date(created_at: datetime) -> date:
+    """UTC calendar day a usage event is billed on (naive timestamps are UTC)."""
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc)
+    return created_at.date()
+
+
+def usage_rollup_rows(events: List["UsageEvent"]) -> List[tuple]:
+    """
+    Aggregate events into ``usage_daily_rollups`` increments.
+
+    Returns:
+        List[tuple]: (usage_date, api_key_hash, tokens_input, tokens_output,
+        tokens_total, cost_total, request_count) per day and key
+    """
+    totals: Dict[tuple, List[Any]] = {}
+    for event in events:
+        key = (usage_date(event.created_at), event.api_key_hash)
+        row = totals.setdefault(key, [0, 0, 0, 0.0, 0])
+        row[0] += event.tokens_input
+        row[1] += event.tokens_output
+        row[2] += event.tokens_total
+        row[3] += event.cost_total
+        row[4] += 1
+    return [key + tuple(row) for key, row in totals.items()]
+
 
 class UsageEvent(BaseModel):
     """
@@ -76,31 +145,64 @@ class UsageEvent(BaseModel):
             UsageEvent: Created usage event
         """
         event = cls(**kwargs)
+        await cls.create_many([event])
+
+        logger.info(f"Created usage event: {event.id}")
+        return event
+
+    def to_record(self) -> tuple:
+        """Column values in ``USAGE_EVENT_COLUMNS`` order."""
+        return (
+            self.id, self.api_key_hash, self.execution_id, self.task_type,
+            self.tokens_input, self.tokens_output, self.tokens_total,
+            self.provider, self.model, self.model_cost_input, self.model_cost_output,
+            self.cost_input, self.cost_output, self.cost_total,
+            self.execution_time, self.status, self.error_message,
+            self.created_at, json.dumps(self.metadata)
+        )
+
+    @classmethod
+    async def create_many(cls, events: List["UsageEvent"], use_copy: bool = True) -> int:
+        """
+        Insert a batch of usage events and add them to the daily rollup.
+
+        Both happen in one transaction, so ``usage_daily_rollups`` always
+        matches the rows in ``usage_events``.
+
+        Args:
+            events: Usage events to insert
+            use_copy: ``COPY`` the rows straight into ``usage_events``
+                (fastest). Otherwise stage them in a temporary table and
+                insert with ``ON CONFLICT DO NOTHING``, rolling up only the
+                rows actually inserted. That path is safe for events that may
+                already have been written (spill-file replay)
+
+        Returns:
+            int: Number of events sent
+        """
+        if not events:
+            return 0
+        records = [event.to_record() for event in events]
 
         pool = await get_database_connection()
         async with pool.acquire() as connection:
-            await connection.execute("""
-                INSERT INTO usage_events (
-                    id, api_key_hash, execution_id, task_type,
-                    tokens_input, tokens_output, tokens_total,
-                    provider, model, model_cost_input, model_cost_output,
-                    cost_input, cost_output, cost_total,
-                    execution_time, status, error_message,
-                    created_at, metadata
-                ) VALUES (
-                    $1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, $16, $17, $18, $19
-                )
-            """,
-                event.id, event.api_key_hash, event.execution_id, event.task_type,
-                event.tokens_input, event.tokens_output, event.tokens_total,
-                event.provider, event.model, event.model_cost_input, event.model_cost_output,
-                event.cost_input, event.cost_output, event.cost_total,
-                event.execution_time, event.status, event.error_message,
-                event.created_at, json.dumps(event.metadata)
-            )
+            async with connection.transaction():
+                if use_copy:
+                    await connection.copy_records_to_table(
+                        "usage_events", records=records, columns=USAGE_EVENT_COLUMNS
+                    )
+                    await connection.executemany(_ROLLUP_UPSERT_VALUES, usage_rollup_rows(events))
+                else:
+                    await connection.execute(
+                        "CREATE TEMP TABLE usage_events_staging (LIKE usage_events INCLUDING DEFAULTS) ON COMMIT DROP"
+                    )
+                    await connection.copy_records_to_table(
+                        "usage_events_staging", records=records, columns=USAGE_EVENT_COLUMNS
+                    )
+                    await connection.execute(_INSERT_STAGED_WITH_ROLLUP)
 
-        logger.info(f"Created usage event: {event.id}")
-        return event
+        logger.debug(f"Inserted {len(records)} usage events")
+        return len(records)
 
     @classmethod
     async def get_usage_by_api_key(
@@ -223,6 +325,9 @@ class BillingCustomer(BaseModel):
     id: Optional[str] = Field(default_factory=lambda: str(uuid4()))
     api_key_hash: str = Field(..., description="Hashed API key identifier")
     stripe_customer_id: str = Field(..., description="Stripe customer ID")
+    stripe_subscription_item_id: Optional[str] = Field(
+        None, description="Metered subscription item that usage is reported to"
+    )
 
     # Customer metadata
     email: Optional[str] = Field(None, description="Customer email")
@@ -261,15 +366,16 @@ class BillingCustomer(BaseModel):
         async with pool.acquire() as connection:
             await connection.execute("""
                 INSERT INTO billing_customers (
-                    id, api_key_hash, stripe_customer_id,
+                    id, api_key_hash, stripe_customer_id, stripe_subscription_item_id,
                     email, name, company,
                     billing_interval, is_active,
                     created_at, updated_at
                 ) VALUES (
-                    $1, $2, $3, $4, $5, $6, $7, $8, $9, $10
+                    $1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11
                 )
             """,
                 customer.id, customer.api_key_hash, customer.stripe_customer_id,
+                customer.stripe_subscription_item_id,
                 customer.email, customer.name, customer.company,
                 customer.billing_interval, customer.is_active,
                 customer.created_at, customer.updated_at
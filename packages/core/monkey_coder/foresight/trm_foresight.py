@@ -108,25 +108,31 @@ class TRMPredictiveForesightEngine(PredictiveForesightEngine):
         # Phase 1: Initialize foresight state from context
         initial_state = self._context_to_state_vector(context)
         
-        # Phase 2: TRM iterative refinement for each foresight type
-        refined_predictions = {}
+        # Phase 2: TRM iterative refinement for all foresight types in one batch
+        foresight_types = [ForesightType.LOGICAL, ForesightType.PROBABILISTIC,
+                           ForesightType.IMAGINATIVE, ForesightType.CAUSAL]
+        
+        # Initialize a prediction embedding and attention context per foresight type
+        type_embeddings = np.stack([
+            self._initialize_prediction_embedding(foresight_type, context)
+            for foresight_type in foresight_types
+        ])
+        attention_contexts = [
+            {'attention_context': self._prepare_prediction_context(foresight_type)}
+            for foresight_type in foresight_types
+        ]
+        
+        # Perform TRM refinement (each type halts independently)
+        final_states, final_predictions, all_steps = self.trm_module.refine_many(
+            np.tile(initial_state, (len(foresight_types), 1)),
+            type_embeddings,
+            context=attention_contexts
+        )
         
-        for foresight_type in [ForesightType.LOGICAL, ForesightType.PROBABILISTIC,
-                               ForesightType.IMAGINATIVE, ForesightType.CAUSAL]:
-            
-            # Initialize prediction embedding for this foresight type
-            type_embedding = self._initialize_prediction_embedding(foresight_type, context)
-            
-            # Prepare attention context from historical predictions
-            attention_context = self._prepare_prediction_context(foresight_type)
-            
-            # Perform TRM refinement
-            final_state, final_prediction, refinement_steps = self.trm_module.refine(
-                initial_state=initial_state,
-                initial_answer=type_embedding,
-                context={'attention_context': attention_context}
-            )
-            
+        refined_predictions = {}
+        for foresight_type, final_state, final_prediction, refinement_steps in zip(
+            foresight_types, final_states, final_predictions, all_steps
+        ):
             # Extract predictions from refined state
             predictions = self._extract_predictions(
                 foresight_type, final_state, final_prediction,
@@ -28,6 +28,8 @@ from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
+from .cache.routing_cache import invalidate_routing_caches
+
 logger = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
@@ -73,6 +75,8 @@ def reload() -> None:
     _load_raw.cache_clear()
     _build_indexes.cache_clear()
     logger.info("Manifest cache cleared — will reload on next access")
+    # Routing decisions were made against the old model set
+    invalidate_routing_caches("manifest reload")
 
 
 # ---------------------------------------------------------------------------
@@ -1,70 +1,252 @@
 """
 Production-grade Redis-based rate limiting middleware.
+
+Each check is a single ``EVALSHA`` on the asyncio Redis client: the Lua
+script prunes, counts and records the request atomically, so concurrent
+workers cannot both pass the last free slot, and the event loop is never
+blocked on Redis. Two modes (``RATE_LIMIT_MODE``):
+
+- ``sliding_window`` (default): at most ``RATE_LIMIT_MAX_REQUESTS`` requests
+  in any ``RATE_LIMIT_WINDOW_SECONDS`` window (sorted set per key)
+- ``token_bucket``: bursts of up to ``RATE_LIMIT_MAX_REQUESTS``, refilled at
+  ``max_requests / window_seconds`` per second (hash per key)
+
+When Redis is unreachable, checks fall back to an in-process limiter with
+the same semantics for ``RATE_LIMIT_REDIS_RETRY_SECONDS`` before Redis is
+tried again. The fallback keeps at most ``RATE_LIMIT_FALLBACK_MAX_KEYS``
+keys (least recently used are evicted) and sweeps idle keys periodically.
 """
+import logging
+import os
 import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, Optional
+from uuid import uuid4
+
 import redis
-import os
-from typing import Dict, Optional
+import redis.asyncio as aioredis
 from fastapi import HTTPException, Request
-import logging
 
 logger = logging.getLogger(__name__)
 
+SLIDING_WINDOW = "sliding_window"
+TOKEN_BUCKET = "token_bucket"
+
+# KEYS[1]: sorted set of request timestamps
+# ARGV: now_ms, window_ms, limit, member
+# Returns {allowed, requests in window, retry after ms}
+_SLIDING_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, now - window)
+local count = redis.call('ZCARD', KEYS[1])
+if count >= limit then
+    local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+    local retry = window
+    if oldest[2] then
+        retry = tonumber(oldest[2]) + window - now
+    end
+    return {0, count, retry}
+end
+redis.call('ZADD', KEYS[1], now, ARGV[4])
+redis.call('PEXPIRE', KEYS[1], window)
+return {1, count + 1, 0}
+"""
+
+# KEYS[1]: hash with the token count and last refill time
+# ARGV: now_ms, capacity, refill per ms
+# Returns {allowed, tokens left (floored), retry after ms}
+_TOKEN_BUCKET_SCRIPT = """
+local now = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local rate = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+if tokens == nil or ts == nil then
+    tokens = capacity
+    ts = now
+end
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry = math.ceil((1 - tokens) / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate))
+return {allowed, math.floor(tokens), retry}
+"""
+
+
+@dataclass
+class RateLimitDecision:
+    """Outcome of one rate limit check."""
+    allowed: bool
+    count: int  # requests in the window (sliding window) or tokens left (token bucket)
+    retry_after: float  # seconds until a request would be allowed; 0 if allowed
+    backend: str  # "redis" or "local"
+
+
+class _LocalRateLimiter:
+    """
+    In-process fallback with the same semantics as the Lua scripts.
+
+    Holds at most ``max_keys`` keys, evicting the least recently used, and
+    drops keys idle for a full window every ``sweep_interval`` seconds.
+    """
+
+    def __init__(self, mode: str, max_requests: int, window_seconds: float,
+                 max_keys: int, sweep_interval: float):
+        self.mode = mode
+        self.max_requests = max_requests
+        self.window_seconds = window_seconds
+        self.max_keys = max_keys
+        self.sweep_interval = sweep_interval
+        self.store: "OrderedDict[str, Any]" = OrderedDict()
+        self._next_sweep = 0.0
+
+    def hit(self, key: str, now: float) -> RateLimitDecision:
+        if now >= self._next_sweep:
+            self.sweep(now)
+        if self.mode == TOKEN_BUCKET:
+            decision = self._token_bucket(key, now)
+        else:
+            decision = self._sliding_window(key, now)
+        self.store.move_to_end(key)
+        while len(self.store) > self.max_keys:
+            self.store.popitem(last=False)
+        return decision
+
+    def _sliding_window(self, key: str, now: float) -> RateLimitDecision:
+        bucket = self.store.get(key)
+        if bucket is None:
+            bucket = self.store[key] = deque(maxlen=self.max_requests)
+        window_start = now - self.window_seconds
+        while bucket and bucket[0] <= window_start:
+            bucket.popleft()
+        if len(bucket) >= self.max_requests:
+            return RateLimitDecision(False, len(bucket), bucket[0] + self.window_seconds - now, "local")
+        bucket.append(now)
+        return RateLimitDecision(True, len(bucket), 0.0, "local")
+
+    def _token_bucket(self, key: str, now: float) -> RateLimitDecision:
+        rate = self.max_requests / self.window_seconds
+        tokens, last = self.store.get(key, (float(self.max_requests), now))
+        tokens = min(float(self.max_requests), tokens + max(0.0, now - last) * rate)
+        if tokens >= 1:
+            self.store[key] = (tokens - 1, now)
+            return RateLimitDecision(True, int(tokens - 1), 0.0, "local")
+        self.store[key] = (tokens, now)
+        return RateLimitDecision(False, 0, (1 - tokens) / rate, "local")
+
+    def sweep(self, now: float) -> int:
+        """Drop keys with no activity in the last window; returns how many."""
+        self._next_sweep = now + self.sweep_interval
+        idle_since = now - self.window_seconds
+        if self.mode == TOKEN_BUCKET:
+            idle = [key for key, (_, last) in self.store.items() if last <= idle_since]
+        else:
+            idle = [key for key, bucket in self.store.items() if not bucket or bucket[-1] <= idle_since]
+        for key in idle:
+            del self.store[key]
+        return len(idle)
+
+
 class RedisRateLimiter:
-    """Redis-based sliding window rate limiter."""
-    
-    def __init__(self, redis_url: Optional[str] = None):
+    """Redis-based sliding window (or token bucket) rate limiter."""
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        client: Optional[Any] = None,
+        mode: Optional[str] = None,
+        max_requests: Optional[int] = None,
+        window_seconds: Optional[float] = None,
+    ):
+        """
+        Args:
+            redis_url: Redis URL (default ``REDIS_URL``); ignored if ``client`` is given
+            client: A ``redis.asyncio`` client (or ``fakeredis.FakeAsyncRedis``)
+            mode: ``sliding_window`` or ``token_bucket`` (default ``RATE_LIMIT_MODE``)
+            max_requests: Requests per window, or bucket capacity
+            window_seconds: Window length, or time to refill an empty bucket
+        """
         self.redis_url = redis_url or os.getenv("REDIS_URL", "redis://localhost:6379")
-        self.redis_client = redis.from_url(self.redis_url, decode_responses=True)
-        self.window_seconds = int(os.getenv("RATE_LIMIT_WINDOW_SECONDS", "300"))  # 5 minutes
-        self.max_requests = int(os.getenv("RATE_LIMIT_MAX_REQUESTS", "8"))  # per IP+route window
-        
+        timeout = float(os.getenv("RATE_LIMIT_REDIS_TIMEOUT", "0.5"))
+        self.redis_client = client or aioredis.from_url(
+            self.redis_url, decode_responses=True, socket_timeout=timeout, socket_connect_timeout=timeout
+        )
+        self.mode = mode or os.getenv("RATE_LIMIT_MODE", SLIDING_WINDOW)
+        if self.mode not in (SLIDING_WINDOW, TOKEN_BUCKET):
+            raise ValueError(f"Unknown rate limit mode: {self.mode}")
+        self.window_seconds = window_seconds or float(os.getenv("RATE_LIMIT_WINDOW_SECONDS", "300"))  # 5 minutes
+        self.max_requests = max_requests or int(os.getenv("RATE_LIMIT_MAX_REQUESTS", "8"))  # per IP+route window
+        self.redis_retry_seconds = float(os.getenv("RATE_LIMIT_REDIS_RETRY_SECONDS", "5"))
+
+        script = _TOKEN_BUCKET_SCRIPT if self.mode == TOKEN_BUCKET else _SLIDING_WINDOW_SCRIPT
+        self._script = self.redis_client.register_script(script)
+        self._fallback = _LocalRateLimiter(
+            self.mode,
+            self.max_requests,
+            self.window_seconds,
+            max_keys=int(os.getenv("RATE_LIMIT_FALLBACK_MAX_KEYS", "10000")),
+            sweep_interval=float(os.getenv("RATE_LIMIT_FALLBACK_SWEEP_SECONDS", "60")),
+        )
+        self._redis_down_until = 0.0
+
+    @property
+    def _fallback_store(self) -> "OrderedDict[str, Any]":
+        """Keys held by the in-process fallback."""
+        return self._fallback.store
+
     def _get_key(self, ip: str, route_tag: str) -> str:
         """Generate Redis key for rate limiting."""
+        if self.mode == TOKEN_BUCKET:
+            return f"rate_limit:tb:{ip}:{route_tag}"
         return f"rate_limit:{ip}:{route_tag}"
-        
+
+    async def hit(self, ip: str, route_tag: str) -> RateLimitDecision:
+        """Check and record one request in a single atomic step."""
+        key = self._get_key(ip, route_tag)
+        now = time.time()
+        if now >= self._redis_down_until:
+            try:
+                return await self._redis_hit(key, now)
+            except redis.RedisError as e:
+                # Skip Redis for a while instead of paying a timeout per request
+                self._redis_down_until = now + self.redis_retry_seconds
+                logger.error(f"Redis rate limiting error, using in-process limits for "
+                             f"{self.redis_retry_seconds:.0f}s: {e}")
+        return self._fallback.hit(key, now)
+
+    async def _redis_hit(self, key: str, now: float) -> RateLimitDecision:
+        now_ms = int(now * 1000)
+        window_ms = int(self.window_seconds * 1000)
+        if self.mode == TOKEN_BUCKET:
+            args = [now_ms, self.max_requests, self.max_requests / window_ms]
+        else:
+            args = [now_ms, window_ms, self.max_requests, f"{now_ms}-{uuid4().hex[:12]}"]
+        allowed, count, retry_ms = await self._script(keys=[key], args=args)
+        return RateLimitDecision(bool(allowed), int(count), int(retry_ms) / 1000, "redis")
+
     async def check_rate_limit(self, request: Request, route_tag: str) -> None:
         """Check rate limit using Redis sliding window. Raises HTTPException(429) if exceeded."""
         ip = request.client.host if request.client else "unknown"
-        key = self._get_key(ip, route_tag)
-        now = time.time()
-        window_start = now - self.window_seconds
-        
-        try:
-            pipe = self.redis_client.pipeline()
-            
-            pipe.zremrangebyscore(key, 0, window_start)
-            
-            pipe.zcard(key)
-            
-            results = pipe.execute()
-            current_count = results[1]
-            
-            if current_count >= self.max_requests:
-                logger.warning(f"Rate limit exceeded for {ip}:{route_tag} - {current_count}/{self.max_requests}")
-                raise HTTPException(status_code=429, detail="Too many requests, slow down")
-            
-            self.redis_client.zadd(key, {str(now): now})
-            
-            self.redis_client.expire(key, self.window_seconds)
-            
-        except redis.RedisError as e:
-            logger.error(f"Redis rate limiting error: {e}")
-            if "Connection refused" in str(e):
-                key = f"fallback_{ip}_{route_tag}"
-                window_start = now - self.window_seconds
-                
-                if not hasattr(self, '_fallback_store'):
-                    self._fallback_store = {}
-                
-                bucket = self._fallback_store.setdefault(key, [])
-                bucket[:] = [ts for ts in bucket if ts > window_start]
-                
-                if len(bucket) >= self.max_requests:
-                    logger.warning(f"Rate limit exceeded (fallback) for {ip}:{route_tag} - {len(bucket)}/{self.max_requests}")
-                    raise HTTPException(status_code=429, detail="Too many requests, slow down")
-                
-                bucket.append(now)
+        decision = await self.hit(ip, route_tag)
+        if not decision.allowed:
+            logger.warning(f"Rate limit exceeded ({decision.backend}) for {ip}:{route_tag} - "
+                           f"{self.max_requests} per {self.window_seconds:.0f}s")
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests, slow down",
+                headers={"Retry-After": str(max(1, int(decision.retry_after + 0.999)))},
+            )
 
 _rate_limiter: Optional[RedisRateLimiter] = None
 
@@ -21,6 +21,10 @@ _ROUTING_LATENCY_BUCKETS = (
     0.1, 0.2, 0.5, 1.0, 2.0,
 )
 
+# Upper bounds (seconds) of the per-variation latency histogram buckets, shared with
+# QuantumManager's in-process histogram so both report the same distribution
+VARIATION_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
 if _PROM:
     _ROUTING_LATENCY = Histogram(
         "quantum_routing_latency_seconds",
@@ -42,11 +46,18 @@ if _PROM:
         "Number of execution errors by type",
         labelnames=("error_type",),
     )
+    _VARIATION_LATENCY = Histogram(
+        "quantum_variation_latency_seconds",
+        "QuantumManager task variation latency by outcome",
+        labelnames=("outcome",),
+        buckets=VARIATION_LATENCY_BUCKETS,
+    )
 else:  # No-op fallbacks
     _ROUTING_LATENCY = None
     _EXECUTION_LATENCY = None
     _STRATEGY_SELECTIONS = None
     _EXECUTION_ERRORS = None
+    _VARIATION_LATENCY = None
 
 
 def observe_routing_latency(seconds: float):
@@ -59,6 +70,11 @@ def observe_execution_latency(seconds: float):
         _EXECUTION_LATENCY.observe(seconds)
 
 
+def observe_variation_latency(seconds: float, outcome: str):
+    if _VARIATION_LATENCY:
+        _VARIATION_LATENCY.labels(outcome=outcome).observe(seconds)
+
+
 def inc_strategy(strategy: str):
     if _STRATEGY_SELECTIONS:
         _STRATEGY_SELECTIONS.labels(strategy=strategy).inc()
@@ -107,8 +123,10 @@ def get_summary() -> Dict[str, Any]:  # Minimal stub (Prometheus pulls raw detai
 
 
 __all__ = [
+    "VARIATION_LATENCY_BUCKETS",
     "observe_routing_latency",
     "observe_execution_latency",
+    "observe_variation_latency",
     "inc_strategy",
     "inc_execution_error",
     "routing_timer",
@@ -7,11 +7,15 @@ costs for token usage in billing and usage tracking.
 
 from .models import ModelPricing, get_model_pricing, update_pricing_data, load_pricing_from_file
 from .middleware import PricingMiddleware
+from .usage_writer import UsageEventWriter, get_usage_writer, close_usage_writer
 
 __all__ = [
     "ModelPricing",
     "get_model_pricing",
     "update_pricing_data",
     "PricingMiddleware",
+    "UsageEventWriter",
+    "get_usage_writer",
+    "close_usage_writer",
     "load_pricing_from_file",
 ]
@@ -1,8 +1,9 @@
 """
 Pricing middleware for automatic usage tracking.
 
-This middleware automatically records usage events to the database
-with pricing information for billing purposes.
+This middleware prices each execute request and hands the usage event to
+the write-behind ``UsageEventWriter``; the database write happens in
+batches off the request path.
 """
 
 import hashlib
@@ -16,6 +17,7 @@ from starlette.middleware.base import BaseHTTPMiddleware
 from ..database.models import UsageEvent
 from ..models import UsageMetrics
 from .models import get_model_pricing
+from .usage_writer import UsageEventWriter, get_usage_writer
 
 logger = logging.getLogger(__name__)
 
@@ -28,9 +30,17 @@ class PricingMiddleware(BaseHTTPMiddleware):
     usage information and record it for billing purposes.
     """
     
-    def __init__(self, app, enabled: bool = True):
+    def __init__(self, app, enabled: bool = True, writer: Optional[UsageEventWriter] = None):
         super().__init__(app)
         self.enabled = enabled
+        self._writer = writer
+
+    @property
+    def writer(self) -> UsageEventWriter:
+        """Usage writer; the process-wide one unless another was passed in."""
+        if self._writer is None:
+            self._writer = get_usage_writer()
+        return self._writer
     
     async def dispatch(self, request: Request, call_next):
         """
@@ -132,7 +142,7 @@ class PricingMiddleware(BaseHTTPMiddleware):
         start_time: datetime
     ) -> None:
         """
-        Record usage event to database.
+        Price the request and queue its usage event for writing.
         
         Args:
             request: FastAPI request
@@ -171,8 +181,8 @@ class PricingMiddleware(BaseHTTPMiddleware):
                 "response_status": response.status_code,
             }
             
-            # Create usage event
-            await UsageEvent.create(
+            # Queue usage event; written in the next batch
+            self.writer.submit(UsageEvent(
                 api_key_hash=api_key_hash,
                 execution_id=usage_info["execution_id"],
                 task_type=usage_info["task_type"],
@@ -203,9 +213,9 @@ class PricingMiddleware(BaseHTTPMiddleware):
                 
                 # Additional metadata
                 metadata=metadata
-            )
+            ))
             
-            logger.info(f"Recorded usage event: {usage_info['execution_id']} - ${total_cost:.6f}")
+            logger.debug(f"Queued usage event: {usage_info['execution_id']} - ${total_cost:.6f}")
             
         except Exception as e:
             logger.error(f"Failed to record usage event: {e}")
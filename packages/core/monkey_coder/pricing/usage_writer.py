@@ -0,0 +1,338 @@
+"""
+Write-behind queue for usage events.
+
+``PricingMiddleware`` used to insert every usage event into Postgres before
+returning the response, one round-trip per request. ``UsageEventWriter``
+takes events off the request path instead. ``submit()`` only appends to an
+in-memory buffer, and a background task writes the buffer with one ``COPY``
+per batch, at ``batch_size`` events or every ``flush_interval`` seconds,
+whichever comes first.
+
+If a batch cannot be written within ``flush_timeout`` (Postgres slow or
+down), or the buffer is full, events are appended to a local JSON-lines
+spill file instead of being dropped. After the next successful flush the
+spill file is replayed with ``INSERT ... ON CONFLICT DO NOTHING``, so
+a batch that reached the database after its timeout is not counted twice.
+
+Each worker process spills to its own file (the pid is part of the name),
+so appends and the rename-then-replay never race between workers. Files
+left behind by workers that are no longer running are claimed, by atomic
+rename, by the first live writer to replay.
+
+Environment:
+
+- ``USAGE_WRITER_BATCH_SIZE`` (default 500)
+- ``USAGE_WRITER_FLUSH_INTERVAL`` seconds (default 1.0)
+- ``USAGE_WRITER_MAX_BUFFER`` events held in memory (default 20000)
+- ``USAGE_WRITER_FLUSH_TIMEOUT`` seconds per batch write (default 5.0)
+- ``USAGE_SPILL_PATH`` (default ``<tmpdir>/monkey_coder_usage_spill.jsonl``);
+  the pid is inserted before the suffix, e.g. ``monkey_coder_usage_spill.4242.jsonl``
+"""
+
+import asyncio
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+from ..database.models import UsageEvent
+
+logger = logging.getLogger(__name__)
+
+# sink(events, use_copy) writes one batch; use_copy=False must be idempotent
+UsageSink = Callable[..., Awaitable[Any]]
+
+
+def _default_spill_base() -> Path:
+    return Path(os.getenv("USAGE_SPILL_PATH") or Path(tempfile.gettempdir()) / "monkey_coder_usage_spill.jsonl")
+
+
+def _process_path(base: Path, pid: int) -> Path:
+    return base.with_name(f"{base.stem}.{pid}{base.suffix}")
+
+
+def _pid_running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:  # exists, owned by another user
+        return True
+    except OSError:
+        return False
+    return True
+
+
+class UsageEventWriter:
+    """
+    Batches usage events and writes them in the background.
+
+    Args:
+        sink: Batch writer, ``UsageEvent.create_many`` by default
+        batch_size: Events per write; a full batch triggers a flush
+        flush_interval: Seconds between flushes of a partial batch
+        max_buffer: Events held in memory before new ones go to the spill file
+        flush_timeout: Seconds a batch write may take before it is spilled
+        spill_path: JSON-lines file for events that could not be written.
+            Defaults to a per-process file derived from ``USAGE_SPILL_PATH``.
+    """
+
+    def __init__(
+        self,
+        sink: Optional[UsageSink] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        max_buffer: Optional[int] = None,
+        flush_timeout: Optional[float] = None,
+        spill_path: Optional[Union[str, Path]] = None,
+    ):
+        self._sink = sink or UsageEvent.create_many
+        self.batch_size = batch_size or int(os.getenv("USAGE_WRITER_BATCH_SIZE", "500"))
+        self.flush_interval = flush_interval if flush_interval is not None else float(
+            os.getenv("USAGE_WRITER_FLUSH_INTERVAL", "1.0")
+        )
+        self.max_buffer = max_buffer or int(os.getenv("USAGE_WRITER_MAX_BUFFER", "20000"))
+        self.flush_timeout = flush_timeout if flush_timeout is not None else float(
+            os.getenv("USAGE_WRITER_FLUSH_TIMEOUT", "5.0")
+        )
+        # Shared base name of per-process spill files, for claiming files of dead workers
+        self._spill_base: Optional[Path] = None
+        if spill_path is not None:
+            self.spill_path = Path(spill_path)
+        else:
+            self._spill_base = _default_spill_base()
+            self.spill_path = _process_path(self._spill_base, os.getpid())
+        self._orphans_checked = self._spill_base is None
+
+        self._buffer: List[UsageEvent] = []
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._closed = False
+        self._stats: Dict[str, Any] = {
+            "submitted": 0,
+            "written": 0,
+            "batches": 0,
+            "failed_batches": 0,
+            "spilled": 0,
+            "replayed": 0,
+            "last_flush_ms": None,
+        }
+
+    @property
+    def _replay_path(self) -> Path:
+        return self.spill_path.with_name(self.spill_path.name + ".replay")
+
+    def submit(self, event: UsageEvent) -> None:
+        """
+        Queue an event for writing; never blocks on the database.
+
+        Must be called from the event loop that runs the writer.
+        """
+        self._stats["submitted"] += 1
+        if self._closed or len(self._buffer) >= self.max_buffer:
+            self._spill([event])
+            return
+        self._buffer.append(event)
+        self._ensure_running()
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    def _ensure_running(self) -> None:
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if self._closed:
+                break
+            try:
+                if await self.flush() and (self._has_spill() or not self._orphans_checked):
+                    await self.replay_spill()
+            except Exception as e:  # keep the writer alive whatever the sink raises
+                logger.error(f"Usage writer flush failed: {e}")
+
+    async def flush(self) -> bool:
+        """
+        Write everything buffered so far.
+
+        Returns:
+            bool: False if a batch failed and was spilled (the rest of the
+            buffer is spilled with it rather than retried against a slow
+            database)
+        """
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            while self._buffer:
+                batch = self._buffer[:self.batch_size]
+                del self._buffer[:self.batch_size]
+                if not await self._write(batch, use_copy=True):
+                    pending, self._buffer = self._buffer, []
+                    self._spill(batch + pending)
+                    return False
+            return True
+
+    async def _write(self, batch: List[UsageEvent], use_copy: bool) -> bool:
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._sink(batch, use_copy=use_copy), self.flush_timeout)
+        except Exception as e:
+            self._stats["failed_batches"] += 1
+            logger.warning(f"Writing {len(batch)} usage events failed ({type(e).__name__}: {e}); spilling to {self.spill_path}")
+            return False
+        self._stats["last_flush_ms"] = (time.perf_counter() - start) * 1000
+        self._stats["batches"] += 1
+        self._stats["written"] += len(batch)
+        return True
+
+    def _spill(self, events: List[UsageEvent]) -> None:
+        if not events:
+            return
+        try:
+            self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.spill_path, "a", encoding="utf-8") as f:
+                f.write("".join(event.model_dump_json() + "\n" for event in events))
+                f.flush()
+            self._stats["spilled"] += len(events)
+        except OSError as e:
+            logger.error(f"Could not spill {len(events)} usage events to {self.spill_path}: {e}")
+
+    def _has_spill(self) -> bool:
+        return self._replay_path.exists() or self.spill_path.exists()
+
+    def _orphaned_spills(self) -> List[Path]:
+        """Spill and replay files of other worker processes that are no longer running."""
+        base = self._spill_base
+        orphans = []
+        for path in base.parent.glob(f"{base.stem}.*{base.suffix}*"):
+            pid = path.name[len(base.stem) + 1:].split(".", 1)[0]
+            if path.name.endswith(".tmp") or not pid.isdigit() or int(pid) == os.getpid():
+                continue
+            if not _pid_running(int(pid)):
+                orphans.append(path)
+        return orphans
+
+    async def replay_spill(self) -> int:
+        """
+        Write spilled events back to the database.
+
+        The spill file is renamed before it is read so new spills do not
+        interleave with the replay. If a batch fails, the unreplayed lines
+        are kept for the next attempt.
+
+        Once per writer, spill files of dead worker processes are then
+        claimed (renamed to this writer's replay file) and replayed too.
+
+        Returns:
+            int: Number of events replayed
+        """
+        replayed = await self._replay_own()
+        if self._orphans_checked or replayed < 0:
+            return max(replayed, 0)
+        for orphan in self._orphaned_spills():
+            try:
+                os.replace(orphan, self._replay_path)  # atomic: only one live writer claims it
+            except OSError:
+                continue
+            logger.info(f"Claimed usage spill file {orphan} of a stopped worker")
+            more = await self._replay_own()
+            if more < 0:
+                return replayed
+            replayed += more
+        self._orphans_checked = True
+        return replayed
+
+    async def _replay_own(self) -> int:
+        """Replay this writer's spill file; -1 if a batch failed and lines were kept."""
+        replay = self._replay_path
+        if not replay.exists():
+            if not self.spill_path.exists():
+                return 0
+            os.replace(self.spill_path, replay)
+
+        replayed = 0
+        with open(replay, encoding="utf-8") as f:
+            lines: List[str] = []
+            while True:
+                line = f.readline()
+                if line.strip():
+                    lines.append(line)
+                if lines and (len(lines) >= self.batch_size or not line):
+                    events = []
+                    for raw in lines:
+                        try:
+                            events.append(UsageEvent.model_validate_json(raw))
+                        except ValueError as e:  # e.g. a line cut short by a crash
+                            logger.error(f"Dropping unreadable spilled usage event: {e}")
+                    if events and not await self._write(events, use_copy=False):
+                        self._keep_unreplayed(replay, lines + f.readlines())
+                        self._stats["replayed"] += replayed
+                        return -1
+                    replayed += len(events)
+                    lines = []
+                if not line:
+                    break
+        replay.unlink()
+        self._stats["replayed"] += replayed
+        if replayed:
+            logger.info(f"Replayed {replayed} spilled usage events")
+        return replayed
+
+    @staticmethod
+    def _keep_unreplayed(replay: Path, lines: List[str]) -> None:
+        tmp = replay.with_name(replay.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.writelines(lines)
+        os.replace(tmp, replay)
+
+    async def close(self) -> None:
+        """Stop the background task and write (or spill) what is left."""
+        self._closed = True
+        if self._task is not None and not self._task.done():
+            self._wakeup.set()
+            await self._task
+        await self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters for monitoring: submitted, written, batches, spilled, ..."""
+        return {
+            **self._stats,
+            "buffered": len(self._buffer),
+            "spill_pending": self._has_spill(),
+        }
+
+
+_writer: Optional[UsageEventWriter] = None
+
+
+def get_usage_writer() -> UsageEventWriter:
+    """Process-wide usage writer, created on first use."""
+    global _writer
+    if _writer is None:
+        _writer = UsageEventWriter()
+    return _writer
+
+
+async def close_usage_writer() -> None:
+    """Flush and close the process-wide writer (call on application shutdown)."""
+    global _writer
+    if _writer is not None:
+        writer, _writer = _writer, None
+        await writer.close()
+
+
+__all__ = [
+    "UsageEventWriter",
+    "get_usage_writer",
+    "close_usage_writer",
+]
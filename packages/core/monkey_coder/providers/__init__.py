@@ -10,19 +10,81 @@ This module provides adapters for different AI providers:
 
 All adapters validate model names against official documentation
 to ensure accuracy and compliance.
+
+Providers connect lazily by default: the registry registers them without
+touching the network and each adapter builds its client on first use.
+Startup probes are opt-in (``PROVIDER_VERIFY_ON_INIT=true``) and provider
+health is verified by a background task whose results are cached.
+
+Identical concurrent ``generate_completion`` calls are coalesced into one
+upstream request (``single_flight``).
+
+Environment:
+
+- ``PROVIDER_LAZY_INIT`` (default true): connect providers on first use
+- ``PROVIDER_VERIFY_ON_INIT`` (default false): probe the API while connecting
+- ``PROVIDER_HEALTH_CHECK_INTERVAL`` seconds (default 300, 0 disables)
+- ``PROVIDER_SINGLE_FLIGHT`` (default true): coalesce identical in-flight completions
 """
 
 import asyncio
+import functools
+import inspect
 import logging
+import os
+import time
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Type
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
 from contextlib import asynccontextmanager
 
+from ..cache.routing_cache import invalidate_routing_caches
 from ..models import ProviderType, ProviderError, ModelInfo
+from .single_flight import coalesce_completions
 
 logger = logging.getLogger(__name__)
 
+# Adapter methods that need a connected client; they connect the provider on first use
+LAZY_CONNECT_METHODS = (
+    "generate_completion",
+    "generate_completion_with_vision",
+    "generate_completion_with_tools",
+    "stream_completion",
+    "stream_chat",
+)
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _connect_on_first_use(method: Callable) -> Callable:
+    """Wrap an adapter method so it initializes the provider before the first call."""
+    if inspect.isasyncgenfunction(method):
+        @functools.wraps(method)
+        async def stream_wrapper(self, *args, **kwargs):
+            if not self._initialized:
+                await self.ensure_initialized()
+            async for item in method(self, *args, **kwargs):
+                yield item
+
+        wrapper = stream_wrapper
+    elif inspect.iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def call_wrapper(self, *args, **kwargs):
+            if not self._initialized:
+                await self.ensure_initialized()
+            return await method(self, *args, **kwargs)
+
+        wrapper = call_wrapper
+    else:
+        return method
+    wrapper._connects_lazily = True
+    return wrapper
+
 
 class BaseProvider(ABC):
     """
@@ -32,13 +94,63 @@ class BaseProvider(ABC):
     consistent behavior across different AI services.
     """
     
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name in LAZY_CONNECT_METHODS:
+            method = cls.__dict__.get(name)
+            if method is not None and not getattr(method, "_connects_lazily", False):
+                setattr(cls, name, _connect_on_first_use(method))
+        # Identical concurrent completions share one upstream call (see single_flight)
+        method = cls.__dict__.get("generate_completion")
+        if method is not None and not getattr(method, "_coalesced", False):
+            cls.generate_completion = coalesce_completions(method)
+
     def __init__(self, api_key: str, **kwargs):
         self.api_key = api_key
         self.config = kwargs
         self.client = None
+        # False while the SDK client's transport is borrowed from the shared HTTP pool
+        self._owns_http_client = True
         self._models_cache = None
         self._last_model_update = None
-        
+        # Live API probe while connecting; off by default so cold starts stay free and fast
+        self.verify_on_init = kwargs.get("verify_on_init", _env_flag("PROVIDER_VERIFY_ON_INIT", False))
+        self._initialized = False
+        self._init_lock: Optional[asyncio.Lock] = None
+        self.init_duration_ms: Optional[float] = None
+        self.init_error: Optional[str] = None
+
+    @property
+    def initialized(self) -> bool:
+        """Whether the provider client has been connected."""
+        return self._initialized
+
+    async def ensure_initialized(self) -> None:
+        """
+        Connect the provider if it has not been connected yet.
+
+        Concurrent callers share a single ``initialize()`` call; a failed
+        attempt is retried by the next caller.
+        """
+        if self._initialized:
+            return
+        if self._init_lock is None:
+            self._init_lock = asyncio.Lock()
+        async with self._init_lock:
+            if self._initialized:
+                return
+            start = time.perf_counter()
+            try:
+                await self.initialize()
+            except Exception as e:
+                self.init_error = str(e)
+                raise
+            finally:
+                self.init_duration_ms = (time.perf_counter() - start) * 1000
+            self._initialized = True
+            self.init_error = None
+            logger.debug("Connected provider %s in %.1fms", self.name, self.init_duration_ms)
+
     @property
     @abstractmethod
     def provider_type(self) -> ProviderType:
@@ -61,6 +173,12 @@ class BaseProvider(ABC):
         """Cleanup provider resources."""
         pass
     
+    async def _release_sdk_client(self) -> None:
+        """Drop the SDK client, closing it unless its transport is the shared pool's."""
+        client, self.client = self.client, None
+        if client is not None and self._owns_http_client:
+            await client.close()
+    
     @abstractmethod
     async def validate_model(self, model_name: str) -> bool:
         """Validate model name against official documentation."""
@@ -111,28 +229,61 @@ class ProviderRegistry:
     
     Handles initialization, validation, and lifecycle management
     of all supported AI providers.
+
+    Args:
+        lazy_init: Register providers without connecting them; they connect
+            on first use. Defaults to ``PROVIDER_LAZY_INIT`` (true).
+        health_check_interval: Seconds between background health checks
+            (0 disables). Defaults to ``PROVIDER_HEALTH_CHECK_INTERVAL`` (300).
     """
     
-    def __init__(self):
+    def __init__(
+        self,
+        lazy_init: Optional[bool] = None,
+        health_check_interval: Optional[float] = None,
+    ):
         self._providers: Dict[ProviderType, BaseProvider] = {}
+        self._health_status: Dict[ProviderType, str] = {}
+        self._health_results: Dict[ProviderType, Dict[str, Any]] = {}
+        self._health_task: Optional[asyncio.Task] = None
+        self._timeline: Dict[str, Dict[str, Any]] = {}
+        self._startup_ms: Optional[float] = None
         self._initialized = False
+        self.lazy_init = _env_flag("PROVIDER_LAZY_INIT", True) if lazy_init is None else lazy_init
+        if health_check_interval is None:
+            health_check_interval = float(os.getenv("PROVIDER_HEALTH_CHECK_INTERVAL", "300"))
+        self.health_check_interval = health_check_interval
     
-    async def register_provider(self, provider: BaseProvider) -> None:
-        """Register a new provider."""
+    async def register_provider(self, provider: BaseProvider, connect: Optional[bool] = None) -> None:
+        """
+        Register a new provider.
+
+        Args:
+            provider: Provider instance
+            connect: Connect before registering; defaults to ``not lazy_init``
+        """
+        connect = not self.lazy_init if connect is None else connect
+        entry = self._timeline.setdefault(provider.name, {"provider_type": provider.provider_type.value})
+        start = time.perf_counter()
         try:
-            await provider.initialize()
+            if connect:
+                await provider.ensure_initialized()
             self._providers[provider.provider_type] = provider
+            entry.update(status="connected" if connect else "registered", error=None)
             logger.info(f"Registered provider: {provider.name}")
         except Exception as e:
+            entry.update(status="failed", error=str(e))
             logger.error(f"Failed to register provider {provider.name}: {e}")
             raise ProviderError(
                 f"Provider registration failed: {e}",
                 provider=provider.name,
                 error_code="REGISTRATION_FAILED"
             )
+        finally:
+            entry["register_ms"] = round((time.perf_counter() - start) * 1000, 3)
     
-    async def initialize_all(self) -> None:
-        """Initialize all configured providers."""
+    def _configured_providers(self) -> List[Tuple[str, Callable[[], BaseProvider]]]:
+        """``(name, factory)`` pairs for every provider with credentials in the environment."""
         from .openai_adapter import OpenAIProvider
         from .gpt52_provider import GPT52Provider
         from .anthropic_adapter import AnthropicProvider  
@@ -141,37 +292,65 @@ class ProviderRegistry:
         from .groq_provider import GroqProvider
         from .grok_adapter import GrokProvider
         
-        # Get API keys from environment
-        import os
-        
-        providers_to_init = []
+        factories = []
         
         # OpenAI - Standard models
         if openai_key := os.getenv("OPENAI_API_KEY"):
-            providers_to_init.append(OpenAIProvider(openai_key))
+            factories.append(("openai", functools.partial(OpenAIProvider, openai_key)))
             # Add GPT-5.2 provider
-            providers_to_init.append(GPT52Provider(openai_key))
+            factories.append(("openai-gpt52", functools.partial(GPT52Provider, openai_key)))
         
         # Anthropic - Claude models with Opus 4.5 support
         if anthropic_key := os.getenv("ANTHROPIC_API_KEY"):
-            providers_to_init.append(AnthropicProvider(anthropic_key))
+            factories.append(("anthropic", functools.partial(AnthropicProvider, anthropic_key)))
         
         # Google - Standard Gemini models
         if google_key := os.getenv("GOOGLE_API_KEY"):
-            providers_to_init.append(GoogleProvider(google_key))
+            factories.append(("google", functools.partial(GoogleProvider, google_key)))
             # Add Gemini 3 Pro provider
-            providers_to_init.append(Gemini3Provider(google_key))
+            factories.append(("google-gemini3", functools.partial(Gemini3Provider, google_key)))
         
         # Groq - Hardware-accelerated inference for Llama, Qwen, and Kimi models
         if groq_key := os.getenv("GROQ_API_KEY"):
-            providers_to_init.append(GroqProvider(groq_key))
+            factories.append(("groq", functools.partial(GroqProvider, groq_key)))
         
         # Grok (xAI) - Grok models
         if grok_key := os.getenv("GROK_API_KEY"):
             grok_base_url = os.getenv("GROK_BASE_URL", "https://api.x.ai/v1")
-            providers_to_init.append(GrokProvider(grok_key, base_url=grok_base_url))
+            factories.append(("grok", functools.partial(GrokProvider, grok_key, base_url=grok_base_url)))
+        
+        return factories
+    
+    async def initialize_all(self) -> None:
+        """
+        Initialize all configured providers.
+
+        In lazy mode (the default) providers are only constructed and
+        registered, which needs no network; otherwise they connect
+        concurrently. Per-provider timings are kept for
+        :meth:`startup_timeline` and, when enabled, the background health
+        monitor is started.
+        """
+        start = time.perf_counter()
+        self._timeline.clear()
+        providers_to_init = []
         
-        # Initialize providers concurrently
+        for name, factory in self._configured_providers():
+            constructed = time.perf_counter()
+            try:
+                provider = factory()
+            except Exception as e:
+                # One broken adapter must not keep the others from starting
+                self._timeline[name] = {"status": "failed", "error": str(e)}
+                logger.warning(f"Failed to construct provider {name}: {e}")
+                continue
+            self._timeline[provider.name] = {
+                "provider_type": provider.provider_type.value,
+                "construct_ms": round((time.perf_counter() - constructed) * 1000, 3),
+            }
+            providers_to_init.append(provider)
+        
+        # Register (and, in eager mode, connect) providers concurrently
         results = await asyncio.gather(
             *[self.register_provider(provider) for provider in providers_to_init],
             return_exceptions=True
@@ -183,17 +362,89 @@ class ProviderRegistry:
                 logger.warning(f"Failed to initialize provider {providers_to_init[i].name}: {result}")
         
         self._initialized = True
-        logger.info(f"Provider registry initialized with {len(self._providers)} providers")
+        self._startup_ms = round((time.perf_counter() - start) * 1000, 3)
+        logger.info(
+            f"Provider registry initialized with {len(self._providers)} providers "
+            f"in {self._startup_ms:.1f}ms (lazy={self.lazy_init})"
+        )
+        if self.health_check_interval > 0:
+            self.start_health_monitor()
+    
+    def startup_timeline(self) -> Dict[str, Any]:
+        """Per-provider startup timings plus first-use connection times for lazy providers."""
+        providers = {}
+        for name, entry in self._timeline.items():
+            providers[name] = dict(entry)
+        for provider in self._providers.values():
+            entry = providers.setdefault(provider.name, {"provider_type": provider.provider_type.value})
+            entry.update(
+                connected=provider.initialized,
+                connect_ms=None if provider.init_duration_ms is None else round(provider.init_duration_ms, 3),
+                connect_error=provider.init_error,
+            )
+        return {
+            "lazy_init": self.lazy_init,
+            "total_ms": self._startup_ms,
+            "providers": providers,
+        }
+    
+    def start_health_monitor(self) -> None:
+        """Start periodic background health checks on the running event loop."""
+        if self._health_task is not None and not self._health_task.done():
+            return
+        self._health_task = asyncio.get_running_loop().create_task(self._health_monitor())
+    
+    async def stop_health_monitor(self) -> None:
+        """Cancel the background health monitor, if running."""
+        task, self._health_task = self._health_task, None
+        if task is None or task.done():
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    
+    async def _health_monitor(self) -> None:
+        # First probe after one interval, and only of providers already connected,
+        # so the monitor never connects lazy providers or adds startup API calls
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            try:
+                await self.health_check_all(initialized_only=True)
+            except Exception as e:
+                logger.warning(f"Background provider health check failed: {e}")
+    
+    def get_cached_health(self) -> Dict[str, Dict[str, Any]]:
+        """Last background health check result per provider, without calling any API."""
+        now = time.time()
+        results = {}
+        for provider_type in self._providers:
+            cached = self._health_results.get(provider_type)
+            if cached is None:
+                results[provider_type.value] = {"status": "unknown"}
+            else:
+                result = dict(cached)
+                result["age_seconds"] = round(now - result.pop("checked_at"), 3)
+                results[provider_type.value] = result
+        return results
     
     async def cleanup_all(self) -> None:
         """Cleanup all providers."""
+        await self.stop_health_monitor()
         cleanup_tasks = [
             provider.cleanup() for provider in self._providers.values()
         ]
         
         await asyncio.gather(*cleanup_tasks, return_exceptions=True)
+        for provider in self._providers.values():
+            provider._initialized = False
         self._providers.clear()
         self._initialized = False
+
+        # Adapters share pooled HTTP clients; close them once everyone has released theirs
+        from .http_pool import close_http_pool
+        await close_http_pool()
         logger.info("All providers cleaned up")
     
     def get_provider(self, provider_type: ProviderType) -> Optional[BaseProvider]:
@@ -206,7 +457,7 @@ class ProviderRegistry:
             provider_type.value: {
                 "name": provider.name,
                 "type": provider_type.value,
-                "initialized": True,
+                "initialized": getattr(provider, "initialized", True),
             }
             for provider_type, provider in self._providers.items()
         }
@@ -251,23 +502,51 @@ class ProviderRegistry:
             logger.error(f"Model validation failed for {provider.value}/{model_name}: {e}")
             return False
     
-    async def health_check_all(self) -> Dict[str, Dict[str, Any]]:
-        """Perform health checks on all providers."""
-        results = {}
+    async def _check_provider(self, provider: BaseProvider) -> Dict[str, Any]:
+        try:
+            # Lazily registered providers build their client first (no API call)
+            ensure_initialized = getattr(provider, "ensure_initialized", None)
+            if ensure_initialized is not None:
+                await ensure_initialized()
+            return await provider.health_check()
+        except Exception as e:
+            return {
+                "status": "error",
+                "error": str(e),
+                "last_updated": datetime.utcnow().isoformat(),
+            }
+    
+    async def health_check_all(self, initialized_only: bool = False) -> Dict[str, Dict[str, Any]]:
+        """
+        Perform health checks on all providers concurrently and cache the results.
+
+        Args:
+            initialized_only: Skip providers that have not connected yet, instead
+                of connecting them to check them
+        """
+        providers = [
+            (provider_type, provider)
+            for provider_type, provider in self._providers.items()
+            if not initialized_only or getattr(provider, "initialized", True)
+        ]
+        statuses = await asyncio.gather(*[self._check_provider(provider) for _, provider in providers])
         
-        for provider_type, provider in self._providers.items():
-            try:
-                health_status = await provider.health_check()
-                results[provider_type.value] = health_status
-            except Exception as e:
-                results[provider_type.value] = {
-                    "status": "error",
-                    "error": str(e),
-                    "last_updated": datetime.utcnow().isoformat(),
-                }
+        results = {}
+        checked_at = time.time()
+        for (provider_type, _), health_status in zip(providers, statuses):
+            results[provider_type.value] = health_status
+            self._health_results[provider_type] = {**health_status, "checked_at": checked_at}
+            self._record_health(provider_type, health_status.get("status", "unknown"))
         
         return results
     
+    def _record_health(self, provider_type: ProviderType, status: str) -> None:
+        """Track provider health and drop cached routing decisions when it changes."""
+        previous = self._health_status.get(provider_type, "healthy")
+        self._health_status[provider_type] = status
+        if status != previous:
+            invalidate_routing_caches(f"{provider_type.value} health {previous} -> {status}")
+    
     @property
     def is_initialized(self) -> bool:
         """Check if the registry is initialized."""
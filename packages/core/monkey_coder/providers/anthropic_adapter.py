@@ -31,6 +31,7 @@ except ImportError:
     )
 
 from . import BaseProvider
+from .http_pool import get_sdk_http_client
 from ..models import ProviderType, ProviderError, ModelInfo
 from ..logging_utils import monitor_api_calls
 
@@ -151,13 +152,17 @@ class AnthropicProvider(BaseProvider):
             )
 
         try:
+            http_client = get_sdk_http_client("anthropic", self.base_url, "https://api.anthropic.com")
+            self._owns_http_client = http_client is None
             self.client = AsyncAnthropic(
                 api_key=self.api_key,
                 base_url=self.base_url,
+                http_client=http_client,
             )
 
-            # Test the connection using Claude 3.5 Haiku (fastest model)
-            await self._test_connection()
+            # Probing the API on startup is opt-in; health is verified in the background
+            if self.verify_on_init:
+                await self._test_connection()
             logger.info("Anthropic provider initialized successfully")
 
         except Exception as e:
@@ -170,14 +175,12 @@ class AnthropicProvider(BaseProvider):
 
     async def cleanup(self) -> None:
         """Cleanup Anthropic client resources."""
-        if self.client:
-            await self.client.close()
-            self.client = None
+        await self._release_sdk_client()
         logger.info("Anthropic provider cleaned up")
 
     @monitor_api_calls("anthropic_connection_test")
     async def _test_connection(self) -> None:
-        """Test the Anthropic API connection using Claude 3.5 Haiku."""
+        """Test the Anthropic API connection by listing models (no billable completion)."""
         if not self.client:
             raise ProviderError(
                 "Anthropic client not available for testing",
@@ -186,12 +189,7 @@ class AnthropicProvider(BaseProvider):
             )
 
         try:
-            # Simple API call to test connection using fastest model
-            response = await self.client.messages.create(
-                model="claude-3-5-haiku-20241022",
-                messages=[{"role": "user", "content": "Hi"}],
-                max_tokens=1,
-            )
+            response = await self.client.models.list(limit=1)
             if not response:
                 raise ProviderError(
                     "No response from Anthropic API",
@@ -540,26 +538,14 @@ class AnthropicProvider(BaseProvider):
             }
 
         try:
-            # Test a simple completion using Claude 3.5 Haiku (fastest)
-            test_response = await self.client.messages.create(
-                model="claude-3-5-haiku-20241022",
-                messages=[{"role": "user", "content": "Hello"}],
-                max_tokens=5,
-            )
-
-            content = ""
-            for block in test_response.content:
-                block_any: Any = block
-                text_val = getattr(block_any, "text", None)
-                if isinstance(text_val, str):
-                    content += text_val
+            # Model listing verifies credentials and connectivity without billing a completion
+            await self.client.models.list(limit=1)
 
             return {
                 "status": "healthy",
                 "model_count": len(self.VALIDATED_MODELS),
                 "available_models": list(self.VALIDATED_MODELS.keys()),
                 "model_aliases": self.MODEL_ALIASES,
-                "test_completion": content,
                 "minimum_version": "3.5",
                 "last_updated": datetime.utcnow().isoformat(),
             }
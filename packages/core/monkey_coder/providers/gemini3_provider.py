@@ -35,7 +35,14 @@ except ImportError:
         "Google AI package not installed. Install it with: pip install google-genai>=1.41.0"
     )
 
+try:
+    # Lets the async client reuse the shared connection pool (newer google-genai releases)
+    from google.genai.types import HttpOptions
+except ImportError:
+    HttpOptions = None
+
 from . import BaseProvider
+from .http_pool import get_http_client
 from ..models import ProviderType, ProviderError, ModelInfo
 from ..logging_utils import monitor_api_calls
 
@@ -93,7 +100,12 @@ class Gemini3Provider(BaseProvider):
             )
         
         genai.configure(api_key=api_key)
-        self.client = genai.Client(api_key=api_key)
+        client_kwargs: Dict[str, Any] = {"api_key": api_key}
+        if HttpOptions is not None and "httpx_async_client" in getattr(HttpOptions, "model_fields", {}):
+            client_kwargs["http_options"] = HttpOptions(
+                httpx_async_client=get_http_client(None, "https://generativelanguage.googleapis.com")
+            )
+        self.client = genai.Client(**client_kwargs)
         self._cached_content = {}
 
     @property
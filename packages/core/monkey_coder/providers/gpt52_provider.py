@@ -29,6 +29,7 @@ except ImportError:
     logging.warning("OpenAI package not installed. Install it with: pip install openai>=2.1.0")
 
 from . import BaseProvider
+from .http_pool import get_sdk_http_client
 from ..models import ProviderType, ProviderError, ModelInfo
 from ..logging_utils import monitor_api_calls
 
@@ -152,7 +153,12 @@ class GPT52Provider(BaseProvider):
             raise ProviderError(
                 "OpenAI package not installed. Install it with: pip install openai>=2.1.0"
             )
-        self.client = AsyncOpenAI(api_key=api_key)
+        http_client = get_sdk_http_client("openai", None, "https://api.openai.com")
+        self._owns_http_client = http_client is None
+        self.client = AsyncOpenAI(
+            api_key=api_key,
+            http_client=http_client,
+        )
         self._use_responses_api = kwargs.get("use_responses_api", False)
 
     @property
@@ -171,9 +177,8 @@ class GPT52Provider(BaseProvider):
 
     async def cleanup(self) -> None:
         """Cleanup provider resources."""
-        if self.client:
-            await self.client.close()
-            logger.info("Closed GPT-5.2 provider client")
+        await self._release_sdk_client()
+        logger.info("Released GPT-5.2 provider client")
 
     async def get_available_models(self) -> List[ModelInfo]:
         """Get list of available GPT-5.2 models."""
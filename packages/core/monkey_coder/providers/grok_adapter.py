@@ -15,13 +15,13 @@ Features:
 """
 
 import os
-import aiohttp
 import json
 import logging
 from datetime import datetime
 from typing import Any, Dict, List, Optional, AsyncIterator
 
 from . import BaseProvider
+from .http_pool import get_http_client
 from ..models import ProviderType, ProviderError, ModelInfo
 
 logger = logging.getLogger(__name__)
@@ -130,6 +130,10 @@ class GrokProvider(BaseProvider):
         super().__init__(api_key, **kwargs)
         self.base_url = kwargs.get("base_url", "https://api.x.ai/v1")
         self.session = None
+        self._headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        }
 
     @property
     def provider_type(self) -> ProviderType:
@@ -146,16 +150,12 @@ class GrokProvider(BaseProvider):
     async def initialize(self) -> None:
         """Initialize the xAI/Grok client."""
         try:
-            # Create aiohttp session for async HTTP requests
-            self.session = aiohttp.ClientSession(
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json",
-                }
-            )
+            # Pooled keep-alive HTTP client shared with other users of the xAI host
+            self.session = get_http_client(self.base_url, "https://api.x.ai")
             
-            # Test the connection
-            await self._test_connection()
+            # Probing the API on startup is opt-in; health is verified in the background
+            if self.verify_on_init:
+                await self._test_connection()
             logger.info("xAI/Grok provider initialized successfully")
             
         except Exception as e:
@@ -168,9 +168,8 @@ class GrokProvider(BaseProvider):
 
     async def cleanup(self) -> None:
         """Cleanup xAI/Grok client resources."""
-        if self.session:
-            await self.session.close()
-            self.session = None
+        # The HTTP client belongs to the shared pool, so only drop the reference
+        self.session = None
         logger.info("xAI/Grok provider cleaned up")
 
     async def _test_connection(self) -> None:
@@ -184,17 +183,16 @@ class GrokProvider(BaseProvider):
         
         try:
             # Test with a minimal API call to list models
-            async with self.session.get(f"{self.base_url}/models") as response:
-                if response.status != 200:
-                    text = await response.text()
-                    raise ProviderError(
-                        f"xAI/Grok API test failed: {text}",
-                        provider="xAI/Grok",
-                        error_code="CONNECTION_FAILED",
-                    )
-                
-                data = await response.json()
-                logger.info(f"xAI/Grok models available: {len(data.get('data', []))} models")
+            response = await self.session.get(f"{self.base_url}/models", headers=self._headers)
+            if response.status_code != 200:
+                raise ProviderError(
+                    f"xAI/Grok API test failed: {response.text}",
+                    provider="xAI/Grok",
+                    error_code="CONNECTION_FAILED",
+                )
+
+            data = response.json()
+            logger.info(f"xAI/Grok models available: {len(data.get('data', []))} models")
                 
         except Exception as e:
             logger.warning(f"xAI/Grok API connection test failed: {e}")
@@ -303,20 +301,22 @@ class GrokProvider(BaseProvider):
                 logger.info(f"Starting streaming completion with {actual_model}")
                 
                 async def stream_generator():
-                    async with self.session.post(
+                    async with self.session.stream(
+                        "POST",
                         f"{self.base_url}/chat/completions",
-                        json=params
+                        json=params,
+                        headers=self._headers,
                     ) as response:
-                        if response.status != 200:
-                            text = await response.text()
+                        if response.status_code != 200:
+                            text = (await response.aread()).decode("utf-8", errors="replace")
                             raise ProviderError(
                                 f"xAI/Grok API error: {text}",
                                 provider="xAI/Grok",
                                 error_code="API_ERROR",
                             )
                         
-                        async for line in response.content:
-                            line = line.decode('utf-8').strip()
+                        async for line in response.aiter_lines():
+                            line = line.strip()
                             if line.startswith("data: "):
                                 data = line[6:]
                                 if data == "[DONE]":
@@ -348,19 +348,19 @@ class GrokProvider(BaseProvider):
             start_time = datetime.utcnow()
             logger.info(f"Making real API call to xAI/Grok with {actual_model}")
             
-            async with self.session.post(
+            response = await self.session.post(
                 f"{self.base_url}/chat/completions",
-                json=params
-            ) as response:
-                if response.status != 200:
-                    text = await response.text()
-                    raise ProviderError(
-                        f"xAI/Grok API error: {text}",
-                        provider="xAI/Grok",
-                        error_code="API_ERROR",
-                    )
-                
-                data = await response.json()
+                json=params,
+                headers=self._headers,
+            )
+            if response.status_code != 200:
+                raise ProviderError(
+                    f"xAI/Grok API error: {response.text}",
+                    provider="xAI/Grok",
+                    error_code="API_ERROR",
+                )
+
+            data = response.json()
             
             end_time = datetime.utcnow()
             execution_time = (end_time - start_time).total_seconds()
@@ -444,24 +444,23 @@ class GrokProvider(BaseProvider):
         
         try:
             # Test with a simple API call
-            async with self.session.get(f"{self.base_url}/models") as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return {
-                        "status": "healthy",
-                        "model_count": len(self.VALIDATED_MODELS),
-                        "available_models": list(self.VALIDATED_MODELS.keys()),
-                        "model_aliases": self.MODEL_ALIASES,
-                        "api_models": len(data.get("data", [])),
-                        "last_updated": datetime.utcnow().isoformat(),
-                    }
-                else:
-                    text = await response.text()
-                    return {
-                        "status": "unhealthy",
-                        "error": f"API returned status {response.status}: {text}",
-                        "last_updated": datetime.utcnow().isoformat(),
-                    }
+            response = await self.session.get(f"{self.base_url}/models", headers=self._headers)
+            if response.status_code == 200:
+                data = response.json()
+                return {
+                    "status": "healthy",
+                    "model_count": len(self.VALIDATED_MODELS),
+                    "available_models": list(self.VALIDATED_MODELS.keys()),
+                    "model_aliases": self.MODEL_ALIASES,
+                    "api_models": len(data.get("data", [])),
+                    "last_updated": datetime.utcnow().isoformat(),
+                }
+            else:
+                return {
+                    "status": "unhealthy",
+                    "error": f"API returned status {response.status_code}: {response.text}",
+                    "last_updated": datetime.utcnow().isoformat(),
+                }
                     
         except Exception as e:
             logger.error(f"xAI/Grok health check failed: {e}")
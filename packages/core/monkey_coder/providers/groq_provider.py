@@ -10,6 +10,7 @@ import logging
 from datetime import datetime
 from groq import AsyncGroq, Groq
 from . import BaseProvider
+from .http_pool import get_sdk_http_client
 from ..models import ProviderType, ProviderError, ModelInfo
 
 logger = logging.getLogger(__name__)
@@ -36,11 +37,17 @@ class GroqProvider(BaseProvider):
     async def initialize(self) -> None:
         """Initialize the Groq client."""
         try:
-            self.client = AsyncGroq(api_key=self.api_key)
+            http_client = get_sdk_http_client("groq", None, "https://api.groq.com")
+            self._owns_http_client = http_client is None
+            self.client = AsyncGroq(
+                api_key=self.api_key,
+                http_client=http_client,
+            )
             self.sync_client = Groq(api_key=self.api_key)
 
-            # Test the connection
-            await self._test_connection()
+            # Probing the API on startup is opt-in; health is verified in the background
+            if self.verify_on_init:
+                await self._test_connection()
             logger.info("Groq provider initialized successfully")
 
         except Exception as e:
@@ -53,12 +60,12 @@ class GroqProvider(BaseProvider):
 
     async def cleanup(self) -> None:
         """Cleanup Groq client resources."""
-        self.client = None
+        await self._release_sdk_client()
         self.sync_client = None
         logger.info("Groq provider cleaned up")
 
     async def _test_connection(self) -> None:
-        """Test the Groq API connection."""
+        """Test the Groq API connection by listing models (no billable completion)."""
         if not self.client:
             raise ProviderError(
                 "Groq client not available for testing",
@@ -67,12 +74,7 @@ class GroqProvider(BaseProvider):
             )
 
         try:
-            # Simple API call to test connection
-            response = await self.client.chat.completions.create(
-                model="llama-3.1-8b-instant",
-                messages=[{"role": "user", "content": "Hi"}],
-                max_tokens=1,
-            )
+            response = await self.client.models.list()
             if not response:
                 raise ProviderError(
                     "No response from Groq API",
@@ -335,18 +337,13 @@ class GroqProvider(BaseProvider):
             }
 
         try:
-            # Test a simple completion
-            test_response = await self.client.chat.completions.create(
-                model="llama-3.1-8b-instant",
-                messages=[{"role": "user", "content": "Hello"}],
-                max_tokens=5,
-            )
+            # Model listing verifies credentials and connectivity without billing a completion
+            await self.client.models.list()
 
             return {
                 "status": "healthy",
                 "model_count": len(self.VALIDATED_MODELS),
                 "available_models": list(self.VALIDATED_MODELS.keys()),
-                "test_completion": test_response.choices[0].message.content,
                 "hardware_accelerated": True,
                 "last_updated": datetime.utcnow().isoformat(),
             }
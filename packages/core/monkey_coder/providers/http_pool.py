@@ -0,0 +1,323 @@
+"""
+Process-wide pooled HTTP clients for provider adapters and SSE streaming.
+
+Creating an ``httpx.AsyncClient`` (or an SDK client with its own transport)
+per request or per adapter means a fresh TCP + TLS handshake for every
+completion, which dominates time-to-first-token on short prompts. This
+module keeps one long-lived ``httpx.AsyncClient`` per upstream host (and
+event loop) with keep-alive, HTTP/2 when the ``h2`` package is installed,
+per-host connection limits and configurable timeouts. Provider SDKs take
+these clients via their ``http_client`` argument; raw httpx callers use
+them directly.
+
+Configuration comes from the environment:
+
+- ``HTTP_POOL_MAX_CONNECTIONS`` (per host, default 100)
+- ``HTTP_POOL_MAX_KEEPALIVE`` (per host, default 20)
+- ``HTTP_POOL_KEEPALIVE_EXPIRY`` seconds (default 60)
+- ``HTTP_POOL_CONNECT_TIMEOUT`` / ``HTTP_POOL_READ_TIMEOUT`` /
+  ``HTTP_POOL_WRITE_TIMEOUT`` / ``HTTP_POOL_POOL_TIMEOUT`` seconds
+- ``HTTP_POOL_HTTP2`` (``true``/``false``, default true when ``h2`` is available)
+"""
+
+import asyncio
+import importlib
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+try:  # Optional dependency: HTTP/2 support for httpx
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:  # pragma: no cover - optional
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        logger.warning("Invalid value for %s, using %s", name, default)
+        return default
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(_env_float(name, default))
+
+
+@dataclass
+class HTTPPoolConfig:
+    """Connection pool settings applied to every pooled client."""
+
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 60.0
+    connect_timeout: float = 10.0
+    read_timeout: float = 300.0  # Reasoning models can take minutes to respond
+    write_timeout: float = 30.0
+    pool_timeout: float = 10.0
+    http2: bool = field(default_factory=lambda: HTTP2_AVAILABLE)
+
+    @classmethod
+    def from_env(cls) -> "HTTPPoolConfig":
+        """Build a config from ``HTTP_POOL_*`` environment variables."""
+        defaults = cls()
+        http2 = os.getenv("HTTP_POOL_HTTP2")
+        return cls(
+            max_connections=_env_int("HTTP_POOL_MAX_CONNECTIONS", defaults.max_connections),
+            max_keepalive_connections=_env_int("HTTP_POOL_MAX_KEEPALIVE", defaults.max_keepalive_connections),
+            keepalive_expiry=_env_float("HTTP_POOL_KEEPALIVE_EXPIRY", defaults.keepalive_expiry),
+            connect_timeout=_env_float("HTTP_POOL_CONNECT_TIMEOUT", defaults.connect_timeout),
+            read_timeout=_env_float("HTTP_POOL_READ_TIMEOUT", defaults.read_timeout),
+            write_timeout=_env_float("HTTP_POOL_WRITE_TIMEOUT", defaults.write_timeout),
+            pool_timeout=_env_float("HTTP_POOL_POOL_TIMEOUT", defaults.pool_timeout),
+            http2=defaults.http2 if http2 is None else http2.strip().lower() in ("1", "true", "yes", "on"),
+        )
+
+    @property
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    @property
+    def timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(
+            connect=self.connect_timeout,
+            read=self.read_timeout,
+            write=self.write_timeout,
+            pool=self.pool_timeout,
+        )
+
+    @property
+    def use_http2(self) -> bool:
+        return self.http2 and HTTP2_AVAILABLE
+
+
+class _ClientMetrics:
+    """Request/response counters for one pooled client."""
+
+    __slots__ = ("requests", "responses", "errors", "streams_open")
+
+    def __init__(self):
+        self.requests = 0
+        self.responses = 0
+        self.errors = 0
+        self.streams_open = 0
+
+
+def host_key(url: Optional[str], default: str) -> str:
+    """Pool key for a base URL: its ``scheme://host[:port]``, or ``default`` when unset."""
+    if not url:
+        return default
+    parts = urlsplit(url)
+    if not parts.netloc:
+        return default
+    return f"{parts.scheme or 'https'}://{parts.netloc}"
+
+
+class HTTPClientPool:
+    """
+    Registry of long-lived pooled ``httpx.AsyncClient`` instances.
+
+    Clients are keyed by upstream host and by the event loop they are used
+    from (connections cannot be shared across loops), so each host gets its
+    own connection limit. Callers must not close clients they obtain here;
+    use :meth:`aclose` at shutdown.
+
+    Args:
+        config: Pool settings; read from the environment when omitted
+    """
+
+    def __init__(self, config: Optional[HTTPPoolConfig] = None):
+        self.config = config or HTTPPoolConfig.from_env()
+        self._clients: Dict[Tuple[str, Optional[asyncio.AbstractEventLoop]], httpx.AsyncClient] = {}
+        self._metrics: Dict[str, _ClientMetrics] = {}
+        self._lock = threading.Lock()
+        self.clients_created = 0
+        self.client_reuses = 0
+
+    @staticmethod
+    def _current_loop() -> Optional[asyncio.AbstractEventLoop]:
+        try:
+            return asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+
+    def _drop_closed_loops(self):
+        stale = [key for key in self._clients if key[1] is not None and key[1].is_closed()]
+        for key in stale:
+            # The loop is gone, so the client's connections are unusable; just forget it
+            del self._clients[key]
+
+    def get_client(self, host: str) -> httpx.AsyncClient:
+        """
+        Return the pooled client for ``host``, creating it on first use.
+
+        Args:
+            host: Pool key, usually ``host_key(base_url, default)``
+
+        Returns:
+            Shared ``httpx.AsyncClient`` with pool limits and default timeouts
+        """
+        key = (host, self._current_loop())
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None and not client.is_closed:
+                self.client_reuses += 1
+                return client
+            self._drop_closed_loops()
+            client = self._create_client(host)
+            self._clients[key] = client
+            self.clients_created += 1
+        logger.debug("Created pooled HTTP client for %s (http2=%s)", host, self.config.use_http2)
+        return client
+
+    def get_client_for_url(self, url: Optional[str], default: str) -> httpx.AsyncClient:
+        """Pooled client for the host of ``url`` (``default`` host when ``url`` is unset)."""
+        return self.get_client(host_key(url, default))
+
+    def _create_client(self, host: str) -> httpx.AsyncClient:
+        metrics = self._metrics.setdefault(host, _ClientMetrics())
+
+        async def on_request(request: httpx.Request):
+            metrics.requests += 1
+
+        async def on_response(response: httpx.Response):
+            metrics.responses += 1
+            if response.status_code >= 500:
+                metrics.errors += 1
+
+        return httpx.AsyncClient(
+            http2=self.config.use_http2,
+            limits=self.config.limits,
+            timeout=self.config.timeout,
+            event_hooks={"request": [on_request], "response": [on_response]},
+        )
+
+    def record_stream(self, host: str, opened: bool):
+        """Track open streaming responses for ``host`` (used by the SSE handler)."""
+        metrics = self._metrics.setdefault(host, _ClientMetrics())
+        metrics.streams_open += 1 if opened else -1
+
+    @staticmethod
+    def _pool_usage(client: httpx.AsyncClient) -> Dict[str, int]:
+        # httpcore does not expose utilisation publicly; read it defensively
+        pool = getattr(getattr(client, "_transport", None), "_pool", None)
+        connections = list(getattr(pool, "connections", []) or [])
+        idle = sum(1 for connection in connections if connection.is_idle())
+        return {
+            "connections": len(connections),
+            "idle_connections": idle,
+            "active_connections": len(connections) - idle,
+            "queued_requests": len(getattr(pool, "_requests", []) or []),
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool utilisation and request counters per host."""
+        hosts: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            clients = list(self._clients.items())
+        for (host, _loop), client in clients:
+            entry = hosts.setdefault(host, {
+                "clients": 0,
+                "connections": 0,
+                "idle_connections": 0,
+                "active_connections": 0,
+                "queued_requests": 0,
+            })
+            entry["clients"] += 1
+            if not client.is_closed:
+                for name, value in self._pool_usage(client).items():
+                    entry[name] += value
+        for host, metrics in self._metrics.items():
+            entry = hosts.setdefault(host, {"clients": 0})
+            entry.update({
+                "requests": metrics.requests,
+                "responses": metrics.responses,
+                "server_errors": metrics.errors,
+                "streams_open": metrics.streams_open,
+            })
+        return {
+            "http2": self.config.use_http2,
+            "max_connections_per_host": self.config.max_connections,
+            "max_keepalive_per_host": self.config.max_keepalive_connections,
+            "clients_created": self.clients_created,
+            "client_reuses": self.client_reuses,
+            "hosts": hosts,
+        }
+
+    async def aclose(self):
+        """Close every pooled client owned by the running event loop (or with no loop)."""
+        loop = self._current_loop()
+        with self._lock:
+            owned = [key for key in self._clients if key[1] is None or key[1] is loop]
+            clients = [self._clients.pop(key) for key in owned]
+        for client in clients:
+            try:
+                await client.aclose()
+            except Exception as e:  # pragma: no cover - best effort on shutdown
+                logger.debug("Error closing pooled HTTP client: %s", e)
+
+
+_pool: Optional[HTTPClientPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_http_pool() -> HTTPClientPool:
+    """Return the process-wide HTTP client pool."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = HTTPClientPool()
+    return _pool
+
+
+def get_http_client(url: Optional[str], default: str) -> httpx.AsyncClient:
+    """Shorthand for ``get_http_pool().get_client_for_url(url, default)``."""
+    return get_http_pool().get_client_for_url(url, default)
+
+
+def get_sdk_http_client(sdk: str, url: Optional[str], default: str) -> Optional[httpx.AsyncClient]:
+    """
+    Pooled client to pass as an SDK's ``http_client``, if the SDK can use it.
+
+    Newer provider SDK releases are built on ``httpx2`` and reject ``httpx``
+    clients; for those this returns ``None`` so the SDK keeps its own pool.
+
+    Args:
+        sdk: SDK package name (``"openai"``, ``"anthropic"``, ``"groq"``)
+        url: Configured base URL, if any
+        default: Default API origin for the provider
+
+    Returns:
+        Shared client, or ``None`` when the SDK uses a different HTTP stack
+    """
+    try:
+        base_client = importlib.import_module(f"{sdk}._base_client")
+    except ImportError:
+        return None
+    if getattr(base_client, "httpx", None) is not httpx:
+        return None
+    return get_http_client(url, default)
+
+
+def get_http_pool_stats() -> Dict[str, Any]:
+    """Utilisation metrics for the process-wide pool."""
+    return get_http_pool().stats()
+
+
+async def close_http_pool():
+    """Close pooled clients for the running loop (call on application shutdown)."""
+    if _pool is not None:
+        await _pool.aclose()
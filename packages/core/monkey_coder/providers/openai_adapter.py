@@ -8,7 +8,7 @@ All model names are validated against official OpenAI documentation.
 
 import logging
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, AsyncIterator, Dict, List
 
 try:
     from openai import AsyncOpenAI  # type: ignore
@@ -22,6 +22,7 @@ except ImportError:
     logging.warning("OpenAI package not installed. Install it with: pip install openai")
 
 from . import BaseProvider
+from .http_pool import get_sdk_http_client
 from ..models import ProviderType, ProviderError, ModelInfo
 from ..logging_utils import monitor_api_calls
 
@@ -543,16 +544,20 @@ class OpenAIProvider(BaseProvider):
             )
 
         try:
+            http_client = get_sdk_http_client("openai", self.base_url, "https://api.openai.com")
+            self._owns_http_client = http_client is None
             self.client = AsyncOpenAI(
                 api_key=self.api_key,
                 base_url=self.base_url,
                 organization=self.organization,
                 project=self.project,
                 timeout=300.0,  # Extended timeout for reasoning models
+                http_client=http_client,
             )
 
-            # Test the connection
-            await self._test_connection()
+            # Probing the API on startup is opt-in; health is verified in the background
+            if self.verify_on_init:
+                await self._test_connection()
             logger.info(
                 "OpenAI provider initialized successfully with complete model family"
             )
@@ -567,14 +572,12 @@ class OpenAIProvider(BaseProvider):
 
     async def cleanup(self) -> None:
         """Cleanup OpenAI client resources."""
-        if hasattr(self, "client") and self.client:
-            await self.client.close()
-            self.client = None
+        await self._release_sdk_client()
         logger.info("OpenAI provider cleaned up")
 
     @monitor_api_calls("openai_connection_test")
     async def _test_connection(self) -> None:
-        """Test the OpenAI API connection with the most efficient model."""
+        """Test the OpenAI API connection by listing models (no billable completion)."""
         if not self.client:
             raise ProviderError(
                 "OpenAI client not available for testing",
@@ -583,7 +586,6 @@ class OpenAIProvider(BaseProvider):
             )
 
         try:
-            # Test with model listing first
             models = await self.client.models.list()
             if not models.data:
                 raise ProviderError(
@@ -592,25 +594,6 @@ class OpenAIProvider(BaseProvider):
                     error_code="NO_MODELS",
                 )
 
-            # Test with a simple completion using an actual available model
-            test_model = "gpt-4.1-mini"  # Use a real, available model for testing
-            actual_test_model = self._get_actual_model(test_model)
-            logger.info(f"Testing OpenAI API with {actual_test_model}")
-
-            test_response = await self.client.chat.completions.create(
-                model=actual_test_model,
-                messages=[{"role": "user", "content": "Hi"}],
-                max_tokens=5,
-                timeout=30,
-            )
-
-            if not test_response.choices:
-                raise ProviderError(
-                    "Empty response from OpenAI API test",
-                    provider="OpenAI",
-                    error_code="EMPTY_RESPONSE",
-                )
-
             logger.info("OpenAI API connection test successful")
 
         except Exception as e:
@@ -899,6 +882,9 @@ class OpenAIProvider(BaseProvider):
                 "presence_penalty": kwargs.get("presence_penalty", 0.0),
                 "stream": kwargs.get("stream", False),
             }
+            if params["stream"]:
+                # Token usage arrives in a final chunk with empty choices
+                params["stream_options"] = {"include_usage": True}
 
             # Add tools if provided
             if tools := kwargs.get("tools"):
@@ -981,6 +967,44 @@ class OpenAIProvider(BaseProvider):
                 error_code="COMPLETION_FAILED",
             )
 
+    async def stream_completion(
+        self, model: str, messages: List[Dict[str, Any]], **kwargs
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream completion tokens as they're generated."""
+        kwargs["stream"] = True
+        result = await self.generate_completion(model, messages, **kwargs)
+
+        if result.get("is_streaming"):
+            stream = result["stream"]
+            finish_reason = None
+            usage: Dict[str, Any] = {}
+            try:
+                # Read to the end: the usage chunk comes after the finish_reason chunk
+                async for chunk in stream:
+                    chunk_usage = getattr(chunk, "usage", None)
+                    if chunk_usage is not None:
+                        usage = chunk_usage.model_dump() if hasattr(chunk_usage, "model_dump") else dict(chunk_usage)
+                    if not chunk.choices:
+                        continue
+                    choice = chunk.choices[0]
+                    content = getattr(choice.delta, "content", None) if getattr(choice, "delta", None) else None
+                    if content:
+                        yield {"type": "delta", "content": content, "index": choice.index}
+                    if choice.finish_reason:
+                        finish_reason = choice.finish_reason
+            finally:
+                close = getattr(stream, "aclose", None) or getattr(stream, "close", None)
+                if close is not None:
+                    await close()
+            yield {"type": "done", "finish_reason": finish_reason or "stop", "usage": usage}
+        else:
+            # Non-streaming fallback
+            yield {
+                "type": "complete",
+                "content": result.get("content", ""),
+                "usage": result.get("usage", {})
+            }
+
     def _get_actual_model(self, resolved_model: str) -> str:
         """Resolve any alias / deprecated name to the canonical model ID."""
         from monkey_coder.manifest import resolve_model
@@ -1032,19 +1056,9 @@ class OpenAIProvider(BaseProvider):
             }
 
         try:
-            # Test API connectivity
+            # Test API connectivity (model listing is free, unlike a completion)
             models = await self.client.models.list()
 
-            # Test a simple completion with an actual available model
-            test_model = "gpt-4.1-mini"
-            actual_test_model = self._get_actual_model(test_model)
-            test_response = await self.client.chat.completions.create(
-                model=actual_test_model,
-                messages=[{"role": "user", "content": "Hello"}],
-                max_tokens=5,
-                timeout=30,
-            )
-
             # Count models by type
             model_stats = {
                 "total": len(self.VALIDATED_MODELS),
@@ -1090,7 +1104,6 @@ class OpenAIProvider(BaseProvider):
                     "streaming",
                     "multimodal",
                 ],
-                "test_completion": test_response.choices[0].message.content,
                 "default_model": self.default_model,
                 "last_updated": datetime.utcnow().isoformat(),
             }
@@ -0,0 +1,375 @@
+"""
+Single-flight coalescing for provider completions.
+
+When several callers send the same completion request at the same time (CI
+bots, client retries, parallel orchestration strategies) only the first one
+goes upstream; the others await the same in-flight call and receive a copy
+of its result. Requests are keyed like ``ResultCache._stable_key``: the
+conversation, the persona (system prompt), provider, model and remaining
+request parameters.
+
+Streaming responses (``{"is_streaming": True, "stream": ...}``) are fanned
+out: every caller gets its own iterator over one upstream stream, and
+callers that join after streaming has started replay the chunks seen so
+far. A streaming flight stays joinable until the upstream stream ends, its
+last subscriber leaves, or ``PROVIDER_SINGLE_FLIGHT_STREAM_TTL`` seconds
+(default 30) pass, so a stream nobody ever reads is not joined forever.
+
+Only calls made with the same API key are coalesced; the key is hashed into
+the coalescing key.
+
+Coalescing is on by default; set ``PROVIDER_SINGLE_FLIGHT=false`` to
+disable it, or pass ``single_flight=False`` to a single
+``generate_completion`` call.
+"""
+
+import asyncio
+import contextvars
+import functools
+import hashlib
+import json
+import logging
+import os
+import weakref
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from ..cache.result_cache import ResultCache
+
+logger = logging.getLogger(__name__)
+
+# Key of the flight the current task is executing, so nested provider calls bypass coalescing
+_active_flight: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "provider_single_flight", default=None
+)
+
+
+def completion_key(
+    provider: str,
+    model: Any,
+    messages: Any,
+    params: Dict[str, Any],
+    api_key: Optional[str] = None,
+) -> Optional[str]:
+    """
+    Coalescing key for a completion request.
+
+    Args:
+        provider: Provider name
+        model: Requested model
+        messages: Chat messages
+        params: Remaining keyword arguments of the call
+        api_key: Credential the call is made with; only its hash enters the key
+
+    Returns:
+        Stable hex key, or ``None`` if the request cannot be keyed reliably
+        (e.g. it carries callbacks or other non-JSON values)
+    """
+    try:
+        persona = [m.get("content") for m in messages if m.get("role") == "system"]
+        conversation = [m for m in messages if m.get("role") != "system"]
+        prompt = json.dumps(conversation, sort_keys=True, separators=(",", ":"))
+        if api_key:
+            provider = f"{provider}:{hashlib.sha256(api_key.encode()).hexdigest()[:16]}"
+        return ResultCache._stable_key(
+            prompt,
+            json.dumps(persona, separators=(",", ":")),
+            provider=provider,
+            model=model,
+            extra=params,
+        )
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+class StreamFanout:
+    """
+    Replays one upstream async stream to any number of subscribers.
+
+    A single pump task drives the upstream iterator (SDK streams must be
+    consumed from one task) and buffers its chunks, so a subscriber being
+    cancelled does not break the stream for the others and late
+    subscribers start from the first chunk. A subscriber counts from the
+    moment its iterator is handed out until the iterator is closed,
+    exhausted or garbage collected unread; the upstream stream is closed
+    once the last one leaves.
+
+    Args:
+        source: Upstream async iterable
+        on_done: Called once the upstream stream ends, fails or is abandoned
+    """
+
+    def __init__(self, source: Any, on_done: Optional[Callable[[], None]] = None):
+        self._source = source
+        self._buffer: List[Any] = []
+        self._pump: Optional[asyncio.Future] = None
+        self._changed = asyncio.Event()
+        self._error: Optional[BaseException] = None
+        self._on_done = on_done
+        self.done = False
+        self.subscribers = 0
+        self.total_subscribers = 0
+
+    def _wake(self):
+        event, self._changed = self._changed, asyncio.Event()
+        event.set()
+
+    def _finish(self):
+        if not self.done:
+            self.done = True
+            self._wake()
+            if self._on_done is not None:
+                self._on_done()
+
+    async def _run(self):
+        try:
+            async for item in self._source:
+                self._buffer.append(item)
+                self._wake()
+        except Exception as e:
+            self._error = e
+        finally:
+            self._finish()
+
+    async def _abandon(self):
+        # Nobody is listening any more; stop the upstream stream
+        pump, self._pump = self._pump, None
+        if pump is not None and not pump.done():
+            pump.cancel()
+            try:
+                await pump
+            except asyncio.CancelledError:
+                pass
+        self._finish()
+        aclose = getattr(self._source, "aclose", None)
+        if aclose is not None:
+            try:
+                await aclose()
+            except Exception as e:
+                logger.debug("Error closing abandoned upstream stream: %s", e)
+
+    def subscribe(self) -> AsyncIterator[Any]:
+        """Iterator over the stream from its first chunk; counts as a subscriber right away."""
+        self.subscribers += 1
+        self.total_subscribers += 1
+        released = [False]
+        iterator = self._iterate(released)
+        # A generator dropped before its first step never runs its finally block
+        weakref.finalize(iterator, self._release_unread, released)
+        return iterator
+
+    def _release(self, released: List[bool]) -> bool:
+        """Drop one subscriber; True if it was the last one of an unfinished stream."""
+        if released[0]:
+            return False
+        released[0] = True
+        self.subscribers -= 1
+        return self.subscribers == 0 and not self.done
+
+    def _release_unread(self, released: List[bool]) -> None:
+        if self._release(released):
+            try:
+                asyncio.get_running_loop().create_task(self._abandon())
+            except RuntimeError:  # no loop left to close the upstream stream from
+                pass
+
+    async def _iterate(self, released: List[bool]) -> AsyncIterator[Any]:
+        index = 0
+        try:
+            while True:
+                if index < len(self._buffer):
+                    yield self._buffer[index]
+                    index += 1
+                    continue
+                if self.done:
+                    if self._error is not None:
+                        raise self._error
+                    return
+                if self._pump is None:
+                    self._pump = asyncio.ensure_future(self._run())
+                await self._changed.wait()
+        finally:
+            if self._release(released):
+                await self._abandon()
+
+
+class _Flight:
+    """One in-flight upstream call and the callers waiting on it."""
+
+    __slots__ = ("task", "waiters", "fanout")
+
+    def __init__(self, task: asyncio.Future):
+        self.task = task
+        self.waiters = 0
+        self.fanout: Optional[StreamFanout] = None
+
+
+def _share(result: Any, fanout: Optional[StreamFanout]) -> Any:
+    # Each caller gets its own (shallow) copy so mutating a result does not leak to others
+    if isinstance(result, dict):
+        result = dict(result)
+        if fanout is not None:
+            result["stream"] = fanout.subscribe()
+    return result
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical async calls into one upstream call.
+
+    Not thread-safe; intended for use from a single event loop per key.
+
+    Args:
+        stream_join_ttl: Seconds a streaming flight stays joinable at most.
+            Defaults to ``PROVIDER_SINGLE_FLIGHT_STREAM_TTL`` (30).
+    """
+
+    def __init__(self, stream_join_ttl: Optional[float] = None):
+        if stream_join_ttl is None:
+            stream_join_ttl = float(os.getenv("PROVIDER_SINGLE_FLIGHT_STREAM_TTL", "30"))
+        self.stream_join_ttl = stream_join_ttl
+        self._flights: Dict[str, _Flight] = {}
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.streams_fanned_out = 0
+        self.stream_subscribers = 0
+        self.shared_errors = 0
+
+    def _discard(self, key: str, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    async def _lead(self, key: str, flight: _Flight, call: Callable[[], Awaitable[Any]]) -> Any:
+        token = _active_flight.set(key)
+        try:
+            result = await call()
+        finally:
+            _active_flight.reset(token)
+        if isinstance(result, dict) and result.get("is_streaming") and hasattr(result.get("stream"), "__aiter__"):
+            # Keep the flight joinable while the upstream stream is live, but no longer than
+            # the TTL: if no caller ever iterates the stream, nothing else would remove it
+            expiry = asyncio.get_running_loop().call_later(self.stream_join_ttl, self._discard, key, flight)
+
+            def on_done():
+                expiry.cancel()
+                self._discard(key, flight)
+
+            flight.fanout = StreamFanout(result["stream"], on_done=on_done)
+            self.streams_fanned_out += 1
+        else:
+            self._discard(key, flight)
+        return result
+
+    async def do(self, key: Optional[str], call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run ``call`` unless an identical call is already in flight.
+
+        Args:
+            key: Coalescing key; ``None`` runs ``call`` directly
+            call: Zero-argument coroutine factory for the upstream request
+
+        Returns:
+            The call's result (a shallow copy for dict results; streaming
+            results get their own subscriber iterator)
+        """
+        if key is None or _active_flight.get() is not None:
+            self.bypassed += 1
+            return await call()
+
+        flight = self._flights.get(key)
+        if flight is not None and (flight.fanout is None or not flight.fanout.done):
+            self.hits += 1
+        else:
+            self.misses += 1
+            flight = _Flight(None)
+            flight.task = asyncio.ensure_future(self._lead(key, flight, call))
+            flight.task.add_done_callback(
+                lambda task: self._discard(key, flight) if task.cancelled() or task.exception() else None
+            )
+            self._flights[key] = flight
+
+        flight.waiters += 1
+        try:
+            # Shielded so one caller being cancelled does not cancel the call for the others
+            result = await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()
+            raise
+        except Exception:
+            if flight.waiters > 1:
+                self.shared_errors += 1
+            raise
+        finally:
+            flight.waiters -= 1
+
+        if flight.fanout is not None:
+            self.stream_subscribers += 1
+        return _share(result, flight.fanout)
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    def stats(self) -> Dict[str, Any]:
+        """Coalescing counters: ``hits`` joined an in-flight call, ``misses`` went upstream."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.hits,
+            "bypassed": self.bypassed,
+            "hit_rate": self.hits / total if total else 0.0,
+            "in_flight": self.in_flight,
+            "streams_fanned_out": self.streams_fanned_out,
+            "stream_subscribers": self.stream_subscribers,
+            "shared_errors": self.shared_errors,
+        }
+
+    def reset_stats(self):
+        self.hits = self.misses = self.bypassed = 0
+        self.streams_fanned_out = self.stream_subscribers = self.shared_errors = 0
+
+
+def single_flight_enabled() -> bool:
+    return os.getenv("PROVIDER_SINGLE_FLIGHT", "true").strip().lower() in ("1", "true", "yes", "on")
+
+
+_completions = SingleFlight()
+
+
+def get_single_flight() -> SingleFlight:
+    """Process-wide single-flight group used for provider completions."""
+    return _completions
+
+
+def get_single_flight_stats() -> Dict[str, Any]:
+    """Coalescing counters for provider completions."""
+    return _completions.stats()
+
+
+def _split_call(args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Optional[Tuple[Any, Any, Dict[str, Any]]]:
+    params = dict(kwargs)
+    for name, value in zip(("model", "messages"), args):
+        if name in params:
+            return None
+        params[name] = value
+    if len(args) > 2 or "model" not in params or "messages" not in params:
+        return None
+    return params.pop("model"), params.pop("messages"), params
+
+
+def coalesce_completions(method: Callable) -> Callable:
+    """Wrap ``generate_completion`` so identical concurrent calls share one upstream request."""
+
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        enabled = kwargs.pop("single_flight", True)
+        if not enabled or not single_flight_enabled():
+            return await method(self, *args, **kwargs)
+        split = _split_call(args, kwargs)
+        key = None if split is None else completion_key(self.name, *split, api_key=getattr(self, "api_key", None))
+        return await _completions.do(key, lambda: method(self, *args, **kwargs))
+
+    wrapper._coalesced = True
+    return wrapper
@@ -3,18 +3,44 @@ Streaming Adapter for AI Provider Responses
 
 This module provides a unified streaming interface for all AI providers,
 enabling real-time response streaming via Server-Sent Events (SSE).
+
+``UnifiedStreamHandler.stream_completion`` is the single entry point: every
+provider adapter exposes ``stream_completion(model, messages, **kwargs)``
+yielding normalized events (``{"type": "delta", "content": ...}``,
+``{"type": "done"}``, or one ``{"type": "complete", "content": ...}`` when
+the provider answered without streaming), and the handler turns them into
+``StreamChunk`` objects while measuring time to first token (TTFT). No path
+adds artificial delays; ``FakeStreamProvider`` streams canned text locally
+for benchmarks and tests.
 """
 
 import asyncio
 import json
 import logging
+import statistics
 import time
-from typing import AsyncGenerator, Dict, Any, Optional, List
-from dataclasses import dataclass
+from collections import deque
+from typing import AsyncGenerator, AsyncIterable, Dict, Any, Optional, List
+from dataclasses import dataclass, field
 from datetime import datetime
 
+try:  # Optional dependency
+    from prometheus_client import Histogram
+
+    _TTFT_SECONDS = Histogram(
+        "provider_stream_ttft_seconds",
+        "Time from stream request to first content token by provider",
+        labelnames=("provider",),
+        buckets=(0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0, 30.0),
+    )
+except ImportError:  # pragma: no cover - optional
+    _TTFT_SECONDS = None
+
 logger = logging.getLogger(__name__)
 
+# Recent TTFT samples kept per provider for the percentiles in get_metrics()
+TTFT_SAMPLE_SIZE = 512
+
 
 @dataclass
 class StreamChunk:
@@ -24,19 +50,116 @@ class StreamChunk:
     tokens: int = 0
     finish_reason: Optional[str] = None
     metadata: Optional[Dict[str, Any]] = None
+    deltas: int = 1  # upstream deltas merged into this chunk
+
+
+@dataclass
+class StreamMetrics:
+    """Counters for one stream, folded into its adapter's totals when the stream ends."""
+    started_at: float = field(default_factory=time.time)
+    chunks: int = 0
+    tokens: int = 0
+    ttft: Optional[float] = None
 
 
 class StreamingAdapter:
     """
     Adapter to provide streaming capabilities for AI providers.
+    
+    One adapter serves every stream of its provider, so each stream counts
+    into its own ``StreamMetrics`` and the adapter only keeps totals.
     """
     
     def __init__(self, provider_name: str):
         self.provider_name = provider_name
+        self.streams = 0
+        self.active_streams = 0
         self.chunk_count = 0
         self.total_tokens = 0
-        self.start_time = None
+        self.stream_seconds = 0.0
+        self.ttft: Optional[float] = None
+        self.last_stream: Optional[StreamMetrics] = None
+        self._ttft_samples: deque = deque(maxlen=TTFT_SAMPLE_SIZE)
+    
+    def _begin_stream(self) -> StreamMetrics:
+        self.active_streams += 1
+        return StreamMetrics()
+    
+    def _end_stream(self, metrics: StreamMetrics) -> None:
+        """Add a finished stream's counters to the provider totals."""
+        self.active_streams -= 1
+        self.streams += 1
+        self.chunk_count += metrics.chunks
+        self.total_tokens += metrics.tokens
+        self.stream_seconds += time.time() - metrics.started_at
+        self.last_stream = metrics
+    
+    def record_ttft(self, seconds: float, metrics: Optional[StreamMetrics] = None) -> None:
+        """Record the time to first token of one stream."""
+        if metrics is not None:
+            metrics.ttft = seconds
+        self.ttft = seconds
+        self._ttft_samples.append(seconds)
+        if _TTFT_SECONDS is not None:
+            _TTFT_SECONDS.labels(provider=self.provider_name).observe(seconds)
+    
+    async def stream_events(
+        self,
+        events: AsyncIterable[Dict[str, Any]],
+        started: Optional[float] = None
+    ) -> AsyncGenerator[StreamChunk, None]:
+        """
+        Convert normalized provider events into StreamChunk objects.
         
+        Args:
+            events: Events from a provider's ``stream_completion``
+            started: ``time.perf_counter()`` when the request was sent;
+                TTFT is measured from here to the first non-empty content
+            
+        Yields:
+            One StreamChunk per content delta (the whole answer for a
+            ``complete`` event)
+        """
+        started = time.perf_counter() if started is None else started
+        metrics = self._begin_stream()
+        index = 0
+        first = True
+        metadata = {"provider": self.provider_name}
+        
+        try:
+            async for event in events:
+                kind = event.get("type")
+                if kind == "done":
+                    break
+                if kind not in ("delta", "complete"):
+                    continue
+                content = event.get("content") or ""
+                if not content:
+                    continue
+                if first:
+                    first = False
+                    self.record_ttft(time.perf_counter() - started, metrics)
+                index += 1
+                estimated_tokens = len(content.split()) // 4 + 1
+                metrics.chunks = index
+                metrics.tokens += estimated_tokens
+                
+                yield StreamChunk(
+                    content=content,
+                    index=index,
+                    tokens=estimated_tokens,
+                    finish_reason=event.get("finish_reason") or ("stop" if kind == "complete" else None),
+                    metadata=metadata,
+                )
+                if kind == "complete":
+                    break
+        finally:
+            self._end_stream(metrics)
+            # Stopping at "done" must still release the provider's connection
+            aclose = getattr(events, "aclose", None)
+            if aclose is not None:
+                await aclose()
+    
     async def stream_openai_response(
         self,
         stream_response: Any,
@@ -51,9 +174,7 @@ class StreamingAdapter:
         Yields:
             StreamChunk objects containing content and metadata
         """
-        self.start_time = time.time()
-        self.chunk_count = 0
-        self.total_tokens = 0
+        metrics = self._begin_stream()
         
         try:
             async for chunk in stream_response:
@@ -66,14 +187,14 @@ class StreamingAdapter:
                         content = choice.delta.content or ""
                     
                     if content:
-                        self.chunk_count += 1
+                        metrics.chunks += 1
                         # Estimate tokens (rough approximation)
                         estimated_tokens = len(content.split()) // 4 + 1
-                        self.total_tokens += estimated_tokens
+                        metrics.tokens += estimated_tokens
                         
                         yield StreamChunk(
                             content=content,
-                            index=self.chunk_count,
+                            index=metrics.chunks,
                             tokens=estimated_tokens,
                             finish_reason=choice.finish_reason,
                             metadata={
@@ -92,11 +213,13 @@ class StreamingAdapter:
             logger.error(f"Error streaming OpenAI response: {e}")
             yield StreamChunk(
                 content=f"[Error: {str(e)}]",
-                index=self.chunk_count + 1,
+                index=metrics.chunks + 1,
                 tokens=0,
                 finish_reason="error",
                 metadata={"error": str(e)}
             )
+        finally:
+            self._end_stream(metrics)
     
     async def stream_anthropic_response(
         self,
@@ -112,9 +235,7 @@ class StreamingAdapter:
         Yields:
             StreamChunk objects containing content and metadata
         """
-        self.start_time = time.time()
-        self.chunk_count = 0
-        self.total_tokens = 0
+        metrics = self._begin_stream()
         
         try:
             async for event in stream_response:
@@ -128,13 +249,13 @@ class StreamingAdapter:
                         content = event.delta.text or ""
                         
                         if content:
-                            self.chunk_count += 1
+                            metrics.chunks += 1
                             estimated_tokens = len(content.split()) // 4 + 1
-                            self.total_tokens += estimated_tokens
+                            metrics.tokens += estimated_tokens
                             
                             yield StreamChunk(
                                 content=content,
-                                index=self.chunk_count,
+                                index=metrics.chunks,
                                 tokens=estimated_tokens,
                                 finish_reason=None,
                                 metadata={
@@ -153,11 +274,13 @@ class StreamingAdapter:
             logger.error(f"Error streaming Anthropic response: {e}")
             yield StreamChunk(
                 content=f"[Error: {str(e)}]",
-                index=self.chunk_count + 1,
+                index=metrics.chunks + 1,
                 tokens=0,
                 finish_reason="error",
                 metadata={"error": str(e)}
             )
+        finally:
+            self._end_stream(metrics)
     
     async def stream_google_response(
         self,
@@ -173,9 +296,7 @@ class StreamingAdapter:
         Yields:
             StreamChunk objects containing content and metadata
         """
-        self.start_time = time.time()
-        self.chunk_count = 0
-        self.total_tokens = 0
+        metrics = self._begin_stream()
         
         try:
             async for chunk in stream_response:
@@ -183,13 +304,13 @@ class StreamingAdapter:
                     content = chunk.text or ""
                     
                     if content:
-                        self.chunk_count += 1
+                        metrics.chunks += 1
                         estimated_tokens = len(content.split()) // 4 + 1
-                        self.total_tokens += estimated_tokens
+                        metrics.tokens += estimated_tokens
                         
                         yield StreamChunk(
                             content=content,
-                            index=self.chunk_count,
+                            index=metrics.chunks,
                             tokens=estimated_tokens,
                             finish_reason=None,
                             metadata={
@@ -202,11 +323,13 @@ class StreamingAdapter:
             logger.error(f"Error streaming Google response: {e}")
             yield StreamChunk(
                 content=f"[Error: {str(e)}]",
-                index=self.chunk_count + 1,
+                index=metrics.chunks + 1,
                 tokens=0,
                 finish_reason="error",
                 metadata={"error": str(e)}
             )
+        finally:
+            self._end_stream(metrics)
     
     async def stream_groq_response(
         self,
@@ -222,9 +345,7 @@ class StreamingAdapter:
         Yields:
             StreamChunk objects containing content and metadata
         """
-        self.start_time = time.time()
-        self.chunk_count = 0
-        self.total_tokens = 0
+        metrics = self._begin_stream()
         
         try:
             async for chunk in stream_response:
@@ -237,13 +358,13 @@ class StreamingAdapter:
                         content = choice.delta.content or ""
                     
                     if content:
-                        self.chunk_count += 1
+                        metrics.chunks += 1
                         estimated_tokens = len(content.split()) // 4 + 1
-                        self.total_tokens += estimated_tokens
+                        metrics.tokens += estimated_tokens
                         
                         yield StreamChunk(
                             content=content,
-                            index=self.chunk_count,
+                            index=metrics.chunks,
                             tokens=estimated_tokens,
                             finish_reason=choice.finish_reason,
                             metadata={
@@ -260,21 +381,26 @@ class StreamingAdapter:
             logger.error(f"Error streaming Groq response: {e}")
             yield StreamChunk(
                 content=f"[Error: {str(e)}]",
-                index=self.chunk_count + 1,
+                index=metrics.chunks + 1,
                 tokens=0,
                 finish_reason="error",
                 metadata={"error": str(e)}
             )
+        finally:
+            self._end_stream(metrics)
     
     async def simulate_streaming(
         self,
         content: str,
         chunk_size: int = 50,
-        delay: float = 0.05,
+        delay: float = 0.0,
         **kwargs
     ) -> AsyncGenerator[StreamChunk, None]:
         """
-        Simulate streaming for providers that don't support it natively.
+        Split already generated content into chunks (demos and tests only).
+        
+        Production paths send a non-streamed answer as a single chunk;
+        ``FakeStreamProvider`` is the way to emulate a provider's timing.
         
         Args:
             content: Full content to stream
@@ -284,9 +410,7 @@ class StreamingAdapter:
         Yields:
             StreamChunk objects simulating streaming
         """
-        self.start_time = time.time()
-        self.chunk_count = 0
-        self.total_tokens = 0
+        metrics = self._begin_stream()
         
         # Split content into chunks
         words = content.split()
@@ -303,38 +427,56 @@ class StreamingAdapter:
             chunks.append(" ".join(current_chunk))
         
         # Stream chunks
-        for i, chunk_text in enumerate(chunks):
-            self.chunk_count += 1
-            estimated_tokens = len(chunk_text.split()) // 4 + 1
-            self.total_tokens += estimated_tokens
-            
-            yield StreamChunk(
-                content=chunk_text,
-                index=self.chunk_count,
-                tokens=estimated_tokens,
-                finish_reason="stop" if i == len(chunks) - 1 else None,
-                metadata={
-                    "provider": self.provider_name,
-                    "simulated": True,
-                    "timestamp": datetime.now().isoformat(),
-                }
-            )
-            
-            # Add delay between chunks
-            if i < len(chunks) - 1:
-                await asyncio.sleep(delay)
+        try:
+            for i, chunk_text in enumerate(chunks):
+                metrics.chunks += 1
+                estimated_tokens = len(chunk_text.split()) // 4 + 1
+                metrics.tokens += estimated_tokens
+                
+                yield StreamChunk(
+                    content=chunk_text,
+                    index=metrics.chunks,
+                    tokens=estimated_tokens,
+                    finish_reason="stop" if i == len(chunks) - 1 else None,
+                    metadata={
+                        "provider": self.provider_name,
+                        "simulated": True,
+                        "timestamp": datetime.now().isoformat(),
+                    }
+                )
+                
+                # Add delay between chunks
+                if delay and i < len(chunks) - 1:
+                    await asyncio.sleep(delay)
+        finally:
+            self._end_stream(metrics)
     
     def get_metrics(self) -> Dict[str, Any]:
-        """Get streaming metrics."""
-        duration = time.time() - self.start_time if self.start_time else 0
+        """Streaming totals over all finished streams; rates are per second spent streaming."""
+        duration = self.stream_seconds
         
         return {
             "provider": self.provider_name,
+            "streams": self.streams,
+            "active_streams": self.active_streams,
             "chunks": self.chunk_count,
             "total_tokens": self.total_tokens,
             "duration": duration,
             "chunks_per_second": self.chunk_count / duration if duration > 0 else 0,
             "tokens_per_second": self.total_tokens / duration if duration > 0 else 0,
+            **self.ttft_metrics(),
+        }
+    
+    def ttft_metrics(self) -> Dict[str, Any]:
+        """Time-to-first-token statistics over recent streams, in milliseconds."""
+        samples = sorted(self._ttft_samples)
+        if not samples:
+            return {"ttft_ms": None, "ttft_ms_p50": None, "ttft_ms_p95": None, "ttft_samples": 0}
+        return {
+            "ttft_ms": self.ttft * 1000,
+            "ttft_ms_p50": statistics.median(samples) * 1000,
+            "ttft_ms_p95": samples[min(len(samples) - 1, int(0.95 * len(samples)))] * 1000,
+            "ttft_samples": len(samples),
         }
 
 
@@ -361,16 +503,26 @@ class UnifiedStreamHandler:
         """
         Stream response from any provider.
         
+        Prefer ``stream_completion``, which also starts the request. This
+        adapts a response the caller already obtained from
+        ``generate_completion(stream=True)``.
+        
         Args:
             provider: Provider name (openai, anthropic, google, groq, xai)
-            stream_response: Provider-specific streaming response
+            stream_response: Provider-specific streaming response, or None
+                with the full answer in ``content`` for a non-streamed reply
             
         Yields:
             Unified StreamChunk objects
         """
         adapter = self.get_adapter(provider)
         
-        if provider == "openai":
+        if stream_response is None:
+            # Already complete: send it at once rather than replaying it in timed pieces
+            async for chunk in adapter.stream_events(_complete_event(kwargs.get("content", ""))):
+                yield chunk
+        
+        elif provider == "openai":
             async for chunk in adapter.stream_openai_response(stream_response, **kwargs):
                 yield chunk
                 
@@ -378,21 +530,53 @@ class UnifiedStreamHandler:
             async for chunk in adapter.stream_anthropic_response(stream_response, **kwargs):
                 yield chunk
                 
-        elif provider == "google":
-            async for chunk in adapter.stream_google_response(stream_response, **kwargs):
-                yield chunk
-                
         elif provider == "groq":
             async for chunk in adapter.stream_groq_response(stream_response, **kwargs):
                 yield chunk
                 
         else:
-            # Fallback to simulation if provider not supported
-            logger.warning(f"Provider {provider} not directly supported, simulating streaming")
-            content = kwargs.get("content", "")
-            async for chunk in adapter.simulate_streaming(content, **kwargs):
+            # Google and Grok adapters already yield normalized events
+            async for chunk in adapter.stream_events(stream_response):
                 yield chunk
     
+    async def stream_completion(
+        self,
+        provider: str,
+        provider_adapter: Any,
+        model: str,
+        messages: List[Dict[str, Any]],
+        **kwargs
+    ) -> AsyncGenerator[StreamChunk, None]:
+        """
+        Request a completion and stream it token by token.
+        
+        Uses the adapter's native ``stream_completion``; adapters without one
+        get a single chunk from ``generate_completion``. TTFT is recorded per
+        provider (see ``get_metrics``).
+        
+        Args:
+            provider: Provider name used for metrics
+            provider_adapter: Provider instance
+            model: Model name
+            messages: Conversation messages
+            **kwargs: Completion parameters (max_tokens, temperature, ...)
+            
+        Yields:
+            Unified StreamChunk objects
+        """
+        adapter = self.get_adapter(provider)
+        started = time.perf_counter()
+        if hasattr(provider_adapter, "stream_completion"):
+            events = provider_adapter.stream_completion(model, messages, **kwargs)
+        else:
+            events = _completion_events(provider_adapter, model, messages, **kwargs)
+        async for chunk in adapter.stream_events(events, started):
+            yield chunk
+    
+    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Streaming metrics, including TTFT percentiles, per provider."""
+        return {name: adapter.get_metrics() for name, adapter in self.adapters.items()}
+    
     async def stream_to_sse(
         self,
         provider: str,
@@ -443,11 +627,80 @@ class UnifiedStreamHandler:
         yield f"data: {json.dumps({'total_chunks': chunk_count, 'content': ''.join(total_content)})}\n\n"
 
 
+async def _complete_event(content: str) -> AsyncGenerator[Dict[str, Any], None]:
+    yield {"type": "complete", "content": content}
+
+
+async def _completion_events(
+    provider_adapter: Any,
+    model: str,
+    messages: List[Dict[str, Any]],
+    **kwargs
+) -> AsyncGenerator[Dict[str, Any], None]:
+    """Normalized events for an adapter that can only answer in one piece."""
+    kwargs.pop("stream", None)
+    result = await provider_adapter.generate_completion(model=model, messages=messages, **kwargs)
+    yield {"type": "complete", "content": result.get("content", ""), "usage": result.get("usage", {})}
+
+
+class FakeStreamProvider:
+    """
+    Local provider that streams canned text with configurable timing.
+    
+    Implements the ``stream_completion`` / ``generate_completion`` interface
+    of the real adapters without network access, for benchmarks and tests.
+    
+    Args:
+        content: Text to stream
+        chunk_chars: Characters per delta
+        first_token_delay: Seconds before the first delta
+        token_interval: Seconds between deltas
+    """
+    
+    name = "fake"
+    default_model = "fake-stream"
+    
+    def __init__(
+        self,
+        content: str,
+        chunk_chars: int = 4,
+        first_token_delay: float = 0.0,
+        token_interval: float = 0.0
+    ):
+        self.content = content
+        self.chunk_chars = max(1, chunk_chars)
+        self.first_token_delay = first_token_delay
+        self.token_interval = token_interval
+        self.requests = 0
+    
+    async def generate_completion(self, model: str, messages: List[Dict[str, Any]], **kwargs) -> Dict[str, Any]:
+        """Answer in one piece after the whole stream's worth of latency."""
+        self.requests += 1
+        deltas = -(-len(self.content) // self.chunk_chars)
+        await asyncio.sleep(self.first_token_delay + self.token_interval * max(0, deltas - 1))
+        return {"content": self.content, "usage": {}, "model": model, "provider": self.name}
+    
+    async def stream_completion(
+        self, model: str, messages: List[Dict[str, Any]], **kwargs
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """Stream the content in ``chunk_chars`` deltas."""
+        self.requests += 1
+        if self.first_token_delay:
+            await asyncio.sleep(self.first_token_delay)
+        for start in range(0, len(self.content), self.chunk_chars):
+            if start and self.token_interval:
+                await asyncio.sleep(self.token_interval)
+            yield {"type": "delta", "content": self.content[start:start + self.chunk_chars], "index": 0}
+        yield {"type": "done", "finish_reason": "stop"}
+
+
 # Global unified stream handler
 unified_stream_handler = UnifiedStreamHandler()
 
 __all__ = [
+    "FakeStreamProvider",
     "StreamChunk",
+    "StreamMetrics",
     "StreamingAdapter", 
     "UnifiedStreamHandler",
     "unified_stream_handler"
@@ -24,7 +24,9 @@ from .manager import (
     TaskVariation,
     CollapseStrategy,
     QuantumResult,
-    quantum_task
+    quantum_task,
+    set_max_concurrency,
+    variation_cancelled
 )
 
 # Phase 2: Enhanced DQN components
@@ -37,8 +39,10 @@ from .dqn_agent import (
 from .experience_buffer import (
     Experience,
     ExperienceReplayBuffer,
-    PrioritizedExperienceBuffer
+    PrioritizedExperienceBuffer,
+    ReplayBatch,
 )
+from .sum_tree import SumTree
 
 from .neural_network import (
     DQNNetwork,
@@ -101,6 +105,8 @@ __all__ = [
     "CollapseStrategy",
     "QuantumResult",
     "quantum_task",
+    "set_max_concurrency",
+    "variation_cancelled",
     
     # DQN components
     "DQNRoutingAgent",
@@ -111,6 +117,8 @@ __all__ = [
     "Experience",
     "ExperienceReplayBuffer", 
     "PrioritizedExperienceBuffer",
+    "ReplayBatch",
+    "SumTree",
     
     # Neural network components
     "DQNNetwork",
@@ -15,9 +15,10 @@ from dataclasses import dataclass
 import json
 import logging
 from pathlib import Path
-from collections import deque
 import random
 
+from .sum_tree import SumTree
+
 logger = logging.getLogger(__name__)
 
 class DQN(nn.Module):
@@ -118,7 +119,12 @@ class Transition:
     done: bool
 
 class PrioritizedReplayBuffer:
-    """Prioritized experience replay buffer for DQL."""
+    """Prioritized experience replay buffer for DQL.
+
+    Transitions live in a circular list; priorities (raised to ``alpha``)
+    live in a ``SumTree`` over the same slots, so sampling and priority
+    updates are O(log capacity).
+    """
     
     def __init__(self, capacity: int = 100000, alpha: float = 0.6, beta: float = 0.4):
         """
@@ -134,9 +140,9 @@ class PrioritizedReplayBuffer:
         self.beta = beta
         self.beta_increment = 0.00001
         
-        self.buffer = deque(maxlen=capacity)
-        self.priorities = deque(maxlen=capacity)
-        self.position = 0
+        self.buffer: List[Transition] = []
+        self.tree = SumTree(capacity)
+        self.position = 0  # next slot to write once the buffer is full
         self.max_priority = 1.0
     
     def add(self, transition: Transition, priority: Optional[float] = None):
@@ -144,8 +150,14 @@ class PrioritizedReplayBuffer:
         if priority is None:
             priority = self.max_priority
         
-        self.buffer.append(transition)
-        self.priorities.append(priority)
+        if len(self.buffer) < self.capacity:
+            slot = len(self.buffer)
+            self.buffer.append(transition)
+        else:
+            slot = self.position
+            self.buffer[slot] = transition
+        self.position = (slot + 1) % self.capacity
+        self.tree.update(slot, priority ** self.alpha)
         
         # Update max priority
         self.max_priority = max(self.max_priority, priority)
@@ -154,24 +166,19 @@ class PrioritizedReplayBuffer:
         """
         Sample a batch of transitions with importance sampling weights.
         
+        Weights are normalised by the smallest priority in the buffer, so
+        the least likely transition would get weight 1.
+        
         Returns:
             Tuple of (transitions, weights, indices)
         """
         if len(self.buffer) < batch_size:
             batch_size = len(self.buffer)
         
-        # Calculate sampling probabilities
-        priorities = np.array(self.priorities, dtype=np.float32)
-        probs = priorities ** self.alpha
-        probs /= probs.sum()
-        
-        # Sample indices
-        indices = np.random.choice(len(self.buffer), batch_size, p=probs)
+        indices, scaled = self.tree.sample(batch_size)
         
-        # Calculate importance sampling weights
-        total = len(self.buffer)
-        weights = (total * probs[indices]) ** (-self.beta)
-        weights /= weights.max()  # Normalize
+        # (N * P(i))^-beta / max_j (N * P(j))^-beta
+        weights = (scaled / self.tree.min) ** (-self.beta)
         
         # Get transitions
         transitions = [self.buffer[idx] for idx in indices]
@@ -183,9 +190,10 @@ class PrioritizedReplayBuffer:
     
     def update_priorities(self, indices: np.ndarray, priorities: np.ndarray):
         """Update priorities for sampled transitions."""
-        for idx, priority in zip(indices, priorities):
-            self.priorities[idx] = priority
-            self.max_priority = max(self.max_priority, priority)
+        priorities = np.asarray(priorities, dtype=np.float64).reshape(-1)
+        self.tree.update(indices, priorities ** self.alpha)
+        if priorities.size:
+            self.max_priority = max(self.max_priority, float(priorities.max()))
     
     def __len__(self):
         return len(self.buffer)
@@ -20,6 +20,7 @@ import numpy as np
 
 from monkey_coder.models import ProviderType
 from monkey_coder.manifest import PROVIDER_DEFAULTS
+from .inference import CompiledQNetwork, InferenceSlot
 from .prediction_constants import (
     PREDICTION_BUFFER_SIZE,
     PREDICTION_SEED,
@@ -161,6 +162,9 @@ class DQNRoutingAgent:
         batch_size: int = 64,
         target_update_frequency: int = 10,  # Update target network every N training steps
         random_seed: Optional[int] = PREDICTION_SEED,  # Use prediction constant as seed
+        double_dqn: bool = False,
+        loss: str = "mse",
+        huber_delta: float = 1.0,
     ):
         """
         Initialize the DQN routing agent.
@@ -177,7 +181,15 @@ class DQNRoutingAgent:
             batch_size: Batch size for training
             target_update_frequency: How often to update target network
             random_seed: Random seed for reproducibility (default: PREDICTION_SEED = 304805)
+            double_dqn: Pick next actions with the online network and evaluate
+                them with the target network (Double DQN) instead of max over target Q
+            loss: "mse" or "huber"; Huber clips each TD error to +/- huber_delta
+                before the (MSE) training step, which gives the Huber gradient
+            huber_delta: Threshold where the Huber loss turns linear
         """
+        if loss not in ("mse", "huber"):
+            raise ValueError(f"Unknown loss '{loss}', expected 'mse' or 'huber'")
+
         self.state_size = state_size
         self.action_size = action_size
         self.learning_rate = learning_rate
@@ -187,6 +199,9 @@ class DQNRoutingAgent:
         self.exploration_min = exploration_min
         self.batch_size = batch_size
         self.target_update_frequency = target_update_frequency
+        self.double_dqn = double_dqn
+        self.loss = loss
+        self.huber_delta = huber_delta
         
         # Set random seed for reproducibility
         if random_seed is not None:
@@ -219,12 +234,17 @@ class DQNRoutingAgent:
         self.q_network = None
         self.target_q_network = None
         
+        # Float32 snapshot of the online Q-network used by act/act_batch,
+        # recompiled after each training step (see refresh_inference)
+        self.inference = InferenceSlot()
+        
         logger.info(f"Initialized DQN routing agent with state_size={state_size}, action_size={action_size}")
     
     def initialize_networks(self) -> None:
         """Initialize the neural networks for training."""
         try:
             self.q_network, self.target_q_network = self.network_manager.create_networks()
+            self.refresh_inference()
             logger.info("Successfully initialized DQN neural networks")
         except ImportError as e:
             logger.warning(f"TensorFlow not available, neural networks disabled: {e}")
@@ -288,12 +308,66 @@ class DQNRoutingAgent:
             else:
                 # This will be implemented when neural network is ready (T2.1.3)
                 state_vector = state.to_vector().reshape(1, -1)
-                q_values = self.q_network.predict(state_vector)
+                q_values = self._predict_q(state_vector)
                 action_index = np.argmax(q_values[0])
                 logger.debug(f"Exploitation: selected action {action_index} with Q-value {q_values[0][action_index]:.3f}")
         
         return RoutingAction.from_action_index(action_index)
-    
+
+    def act_batch(self, state_vectors: np.ndarray) -> np.ndarray:
+        """
+        Epsilon-greedy action indices for a batch of encoded states.
+
+        Vectorised counterpart of ``act`` used by the batched training loop:
+        one Q-network forward pass covers every exploiting row.
+
+        Args:
+            state_vectors: (n, state_size) array of ``RoutingState.to_vector`` rows
+
+        Returns:
+            (n,) array of action indices
+        """
+        count = len(state_vectors)
+        actions = np.random.randint(self.action_size, size=count)
+        if self.q_network is None:
+            return actions
+
+        exploit = np.random.rand(count) > self.exploration_rate
+        if exploit.any():
+            q_values = self._predict_q(np.asarray(state_vectors)[exploit])
+            actions[exploit] = np.argmax(q_values, axis=1)
+        return actions
+
+    def _predict_q(self, states: np.ndarray) -> np.ndarray:
+        """Online Q-values for action selection, from the compiled snapshot when it is current."""
+        engine = self.inference.engine_for(self.q_network)
+        if engine is not None:
+            return engine.predict(states)
+        return self.q_network.predict(states)
+
+    def refresh_inference(self) -> bool:
+        """
+        Compile the online Q-network's current weights and publish them for ``act``.
+        
+        Called after every training step and model load; call it after
+        changing the network's weights any other way. Networks that cannot
+        be compiled are served through their own ``predict``.
+        
+        Returns:
+            True if a snapshot was published
+        """
+        if self.q_network is None:
+            self.inference.clear()
+            return False
+        try:
+            engine = CompiledQNetwork.from_network(self.q_network)
+        except (TypeError, ValueError) as e:
+            logger.debug(f"Serving Q-network without a compiled snapshot: {e}")
+            self.inference.clear()
+            return False
+        self.inference.publish(engine, source=self.q_network)
+        return True
+
     def calculate_reward(
         self,
         action: RoutingAction,
@@ -359,40 +433,27 @@ class DQNRoutingAgent:
         if len(self.memory) < self.batch_size:
             return None
         
-        if self.q_network is None or self.target_q_network is None:
+        if self.q_network is None:
             logger.warning("Neural networks not initialized, skipping replay")
             return None
         
-        # Sample random minibatch from experience buffer
+        # Sample random minibatch from experience buffer and stack it column-wise
         minibatch = random.sample(self.memory, self.batch_size)
-        
-        total_loss = 0.0
-        
-        for state, action, reward, next_state, done in minibatch:
-            # Calculate target Q-value
-            target = reward
-            if not done:
-                # Use target network for stable learning (Double DQN approach)
-                next_q_values = self.target_q_network.predict(
-                    next_state.reshape(1, -1)
-                )
-                target += self.discount_factor * np.amax(next_q_values[0])
-            
-            # Get current Q-values
-            current_q_values = self.q_network.predict(state.reshape(1, -1))
-            current_q_values[0][action] = target
-            
-            # Train the network
-            loss = self.q_network.train(
-                state.reshape(1, -1),
-                current_q_values
-            )
-            if hasattr(loss, 'item'):
-                loss = loss.item()
-            elif not isinstance(loss, (int, float)):
-                loss = float(loss) if loss is not None else 0.0
-            
-            total_loss += loss
+        states = np.stack([experience[0] for experience in minibatch])
+        actions = np.fromiter((experience[1] for experience in minibatch), dtype=np.int64, count=self.batch_size)
+        rewards = np.fromiter((experience[2] for experience in minibatch), dtype=np.float64, count=self.batch_size)
+        next_states = np.stack([experience[3] for experience in minibatch])
+        dones = np.fromiter((experience[4] for experience in minibatch), dtype=bool, count=self.batch_size)
+        
+        targets, _ = self.compute_targets(states, actions, rewards, next_states, dones)
+        
+        # One gradient step on the whole minibatch
+        loss = self.q_network.train(states, targets)
+        if hasattr(loss, 'item'):
+            loss = loss.item()
+        elif not isinstance(loss, (int, float)):
+            loss = float(loss) if loss is not None else 0.0
+        self.refresh_inference()
         
         # Decay exploration rate
         if self.exploration_rate > self.exploration_min:
@@ -404,7 +465,7 @@ class DQNRoutingAgent:
             self.update_target_network()
             logger.debug(f"Updated target network at training step {self.training_step}")
         
-        avg_loss = total_loss / self.batch_size
+        avg_loss = float(loss)
         self.training_history.append({
             "step": self.training_step,
             "loss": avg_loss,
@@ -415,9 +476,59 @@ class DQNRoutingAgent:
         logger.debug(f"Training step {self.training_step}: avg_loss={avg_loss:.4f}, exploration_rate={self.exploration_rate:.3f}")
         return avg_loss
     
+    def compute_targets(
+        self,
+        states: np.ndarray,
+        actions: np.ndarray,
+        rewards: np.ndarray,
+        next_states: np.ndarray,
+        dones: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Compute Q-learning training targets for a stacked minibatch.
+        
+        Uses one target-network forward pass over ``next_states`` and one
+        online forward pass (over ``states``, plus ``next_states`` for
+        Double DQN, concatenated into a single call).
+        
+        Returns:
+            Tuple of (targets, td_errors); targets equal the online Q-values
+            except at each taken action
+        """
+        batch_size = len(states)
+        next_target_q = np.asarray(self._predict_target(next_states))
+        
+        if self.double_dqn:
+            online_q = np.asarray(self.q_network.predict(np.concatenate([states, next_states])))
+            current_q, next_online_q = online_q[:batch_size], online_q[batch_size:]
+            next_actions = np.argmax(next_online_q, axis=1)
+            next_values = next_target_q[np.arange(batch_size), next_actions]
+        else:
+            current_q = np.asarray(self.q_network.predict(states))
+            next_values = np.max(next_target_q, axis=1)
+        
+        rows = np.arange(batch_size)
+        td_targets = rewards + self.discount_factor * next_values * (~dones)
+        td_errors = td_targets - current_q[rows, actions]
+        if self.loss == "huber":
+            td_errors = np.clip(td_errors, -self.huber_delta, self.huber_delta)
+        
+        targets = np.array(current_q, dtype=np.float64, copy=True)
+        targets[rows, actions] = current_q[rows, actions] + td_errors
+        return targets, td_errors
+    
+    def _predict_target(self, states: np.ndarray) -> np.ndarray:
+        """Q-values from the target network (or the online network's own target copy)."""
+        if self.target_q_network is None or self.target_q_network is self.q_network:
+            return self.q_network.predict_target(states)
+        return self.target_q_network.predict(states)
+    
     def update_target_network(self) -> None:
         """Update target Q-network with weights from main Q-network."""
-        if self.network_manager is not None:
+        if self.q_network is not None and (self.target_q_network is None or self.target_q_network is self.q_network):
+            # Networks like NumpyDQNNetwork keep their own target weights
+            self.q_network.update_target_network()
+        elif self.network_manager is not None:
             self.network_manager.update_target_network()
         else:
             logger.warning("Network manager not available for target network update")
@@ -486,6 +597,9 @@ class DQNRoutingAgent:
                 "exploration_min": self.exploration_min,
                 "batch_size": self.batch_size,
                 "target_update_frequency": self.target_update_frequency,
+                "double_dqn": self.double_dqn,
+                "loss": self.loss,
+                "huber_delta": self.huber_delta,
                 "training_step": self.training_step,
                 "routing_performance": self.routing_performance,
                 "training_history": self.training_history[-100:],  # Keep last 100 entries
@@ -524,6 +638,7 @@ class DQNRoutingAgent:
             if self.q_network is not None:
                 self.q_network.load_weights(f"{filepath}_weights.h5")
                 self.update_target_network()
+                self.refresh_inference()
             
             logger.info(f"Loaded DQN model from {filepath}")
             return True
@@ -3,15 +3,22 @@ Experience Replay Buffer for DQN Agent
 
 This module implements a configurable memory buffer for experience replay,
 supporting FIFO management and automatic cleanup as specified in T2.1.2.
+
+Experiences are stored column-wise in preallocated NumPy arrays arranged as
+a ring buffer, so adding is O(1) and sampling is O(batch) fancy indexing
+that yields ready-to-train arrays.
 """
 
 import random
 import logging
-from collections import deque
+import threading
+import time
 from dataclasses import dataclass
-from typing import List, Tuple, Optional, Any
+from typing import Dict, List, NamedTuple, Tuple, Optional, Any, Sequence, Union
 import numpy as np
 
+from .sum_tree import SumTree
+
 logger = logging.getLogger(__name__)
 
 
@@ -36,13 +43,35 @@ class Experience:
             raise ValueError("State and next_state must have the same shape")
 
 
+class ReplayBatch(NamedTuple):
+    """A sampled minibatch as stacked arrays.
+
+    ``indices`` are buffer slots (pass them back to ``update_priorities``);
+    ``weights`` are importance-sampling weights, ``None`` for uniform sampling.
+    """
+
+    states: np.ndarray
+    actions: np.ndarray
+    rewards: np.ndarray
+    next_states: np.ndarray
+    dones: np.ndarray
+    indices: np.ndarray
+    weights: Optional[np.ndarray] = None
+
+
 class ExperienceReplayBuffer:
     """
     Configurable memory buffer for experience replay with FIFO management.
 
     Supports automatic cleanup and efficient sampling for DQN training.
+    Storage is a structure-of-arrays ring buffer: float32 state/next_state
+    matrices plus action, reward, done and timestamp vectors, allocated on
+    the first ``add`` once the state shape is known. Operations are guarded
+    by a lock so producers and the trainer can share a buffer across threads.
     """
 
+    STATE_DTYPE = np.float32
+
     def __init__(self,
                  capacity: int = 2000,
                  min_size: int = 100,
@@ -66,8 +95,8 @@ class ExperienceReplayBuffer:
         self.min_size = min_size
         self.cleanup_threshold = cleanup_threshold
 
-        # Use deque for efficient FIFO operations
-        self._buffer: deque = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._allocate(capacity)
 
         # Statistics
         self._total_added = 0
@@ -76,6 +105,63 @@ class ExperienceReplayBuffer:
 
         logger.info(f"Initialized ExperienceReplayBuffer with capacity={capacity}")
 
+    def _allocate(self, capacity: int) -> None:
+        """(Re)create empty ring storage; state matrices wait for the first add."""
+        self.capacity = capacity
+        self._states: Optional[np.ndarray] = None
+        self._next_states: Optional[np.ndarray] = None
+        self._actions = np.zeros(capacity, dtype=np.int64)
+        self._rewards = np.zeros(capacity, dtype=np.float32)
+        self._dones = np.zeros(capacity, dtype=bool)
+        self._timestamps = np.zeros(capacity, dtype=np.float64)
+        self._head = 0  # slot of the oldest experience
+        self._size = 0
+
+    def _slots(self, positions: np.ndarray) -> np.ndarray:
+        """Map logical positions (0 = oldest) to ring slots."""
+        return (self._head + positions) % self.capacity
+
+    def _append(self, experience: Experience, priority: Optional[float] = None) -> int:
+        """Write one experience into the ring (caller holds the lock); returns its slot."""
+        if self._states is None:
+            shape = (self.capacity,) + experience.state.shape
+            self._states = np.zeros(shape, dtype=self.STATE_DTYPE)
+            self._next_states = np.zeros(shape, dtype=self.STATE_DTYPE)
+        elif experience.state.shape != self._states.shape[1:]:
+            raise ValueError(
+                f"State shape {experience.state.shape} does not match buffer state shape {self._states.shape[1:]}"
+            )
+
+        slot = (self._head + self._size) % self.capacity
+        if self._size == self.capacity:
+            # Full: overwrite the oldest experience
+            self._head = (self._head + 1) % self.capacity
+        else:
+            self._size += 1
+
+        self._states[slot] = experience.state
+        self._next_states[slot] = experience.next_state
+        self._actions[slot] = experience.action
+        self._rewards[slot] = experience.reward
+        self._dones[slot] = experience.done
+        self._timestamps[slot] = experience.timestamp
+        self._total_added += 1
+        self._on_added(slot, priority)
+
+        # Trigger cleanup if necessary
+        if self._size >= self.capacity * self.cleanup_threshold:
+            self._maybe_cleanup()
+        return slot
+
+    def _on_added(self, slot: int, priority: Optional[float]) -> None:
+        """Hook for subclasses keeping per-slot data; called before any cleanup."""
+
+    def _on_added_batch(self, slots: np.ndarray) -> None:
+        """Batch counterpart of ``_on_added`` (default priorities)."""
+
+    def _on_evicted(self, slots: np.ndarray) -> None:
+        """Hook for subclasses keeping per-slot data; called when cleanup drops slots."""
+
     def add(self, experience: Experience) -> None:
         """
         Add a new experience to the buffer.
@@ -86,41 +172,145 @@ class ExperienceReplayBuffer:
         if not isinstance(experience, Experience):
             raise TypeError("experience must be an Experience object")
 
-        # Add to buffer (automatically removes oldest if at capacity)
-        self._buffer.append(experience)
-        self._total_added += 1
+        # Add to buffer (overwrites oldest if at capacity)
+        with self._lock:
+            self._append(experience)
+
+    def add_batch(self,
+                  states: np.ndarray,
+                  actions: np.ndarray,
+                  rewards: np.ndarray,
+                  next_states: np.ndarray,
+                  dones: np.ndarray,
+                  timestamps: Optional[np.ndarray] = None) -> None:
+        """
+        Add many experiences at once from stacked arrays.
 
-        # Trigger cleanup if necessary
-        if len(self._buffer) >= self.capacity * self.cleanup_threshold:
-            self._maybe_cleanup()
+        Equivalent to calling ``add`` for each row in order, but writes each
+        column with one vectorised ring assignment.
 
-    def sample(self, batch_size: int) -> List[Experience]:
+        Args:
+            states: (n, *state_shape) array
+            actions: (n,) action indices
+            rewards: (n,) rewards
+            next_states: (n, *state_shape) array
+            dones: (n,) terminal flags
+            timestamps: Optional (n,) timestamps (defaults to now)
         """
-        Sample a random batch of experiences.
+        states = np.asarray(states)
+        next_states = np.asarray(next_states)
+        count = len(states)
+        if count == 0:
+            return
+        if next_states.shape != states.shape:
+            raise ValueError("State and next_state must have the same shape")
+        if timestamps is None:
+            timestamps = np.full(count, time.time())
+
+        with self._lock:
+            if self._states is None:
+                shape = (self.capacity,) + states.shape[1:]
+                self._states = np.zeros(shape, dtype=self.STATE_DTYPE)
+                self._next_states = np.zeros(shape, dtype=self.STATE_DTYPE)
+            elif states.shape[1:] != self._states.shape[1:]:
+                raise ValueError(
+                    f"State shape {states.shape[1:]} does not match buffer state shape {self._states.shape[1:]}"
+                )
+
+            # Rows that would be overwritten within this batch are never stored
+            keep = slice(max(0, count - self.capacity), None)
+            written = min(count, self.capacity)
+            slots = (self._head + self._size + np.arange(written)) % self.capacity
+            overflow = max(0, self._size + written - self.capacity)
+            self._head = (self._head + overflow) % self.capacity
+            self._size = min(self.capacity, self._size + written)
+
+            self._states[slots] = states[keep]
+            self._next_states[slots] = next_states[keep]
+            self._actions[slots] = np.asarray(actions)[keep]
+            self._rewards[slots] = np.asarray(rewards)[keep]
+            self._dones[slots] = np.asarray(dones)[keep]
+            self._timestamps[slots] = np.asarray(timestamps)[keep]
+            self._total_added += count
+            self._on_added_batch(slots)
+
+            # Per-row adds would each have triggered cleanup; repeat it until under threshold
+            while self._size > self.capacity * self.cleanup_threshold:
+                self._maybe_cleanup()
+
+    def _check_sample_size(self, batch_size: int) -> None:
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive")
+
+        if self._size < self.min_size:
+            raise ValueError(f"Insufficient experiences: {self._size} < {self.min_size}")
+
+        if batch_size > self._size:
+            raise ValueError(f"batch_size ({batch_size}) > buffer size ({self._size})")
+
+    def _gather(self, slots: np.ndarray, weights: Optional[np.ndarray] = None) -> ReplayBatch:
+        """Fancy-index every column at ``slots``."""
+        return ReplayBatch(
+            states=self._states[slots],
+            actions=self._actions[slots],
+            rewards=self._rewards[slots],
+            next_states=self._next_states[slots],
+            dones=self._dones[slots],
+            indices=slots,
+            weights=weights,
+        )
+
+    def _to_experiences(self, batch: ReplayBatch) -> List[Experience]:
+        """Materialise ``Experience`` objects for a gathered batch."""
+        timestamps = self._timestamps[batch.indices]
+        return [
+            Experience(
+                state=batch.states[i],
+                action=int(batch.actions[i]),
+                reward=float(batch.rewards[i]),
+                next_state=batch.next_states[i],
+                done=bool(batch.dones[i]),
+                timestamp=float(timestamps[i]),
+            )
+            for i in range(len(batch.indices))
+        ]
+
+    def sample_batch(self, batch_size: int) -> ReplayBatch:
+        """
+        Sample a random batch as stacked arrays, without replacement.
+
+        Cost is O(batch_size) regardless of how full the buffer is.
 
         Args:
             batch_size: Number of experiences to sample
 
         Returns:
-            List of randomly sampled experiences
+            ReplayBatch of arrays ready for training
 
         Raises:
             ValueError: If batch_size is invalid or insufficient experiences
         """
-        if batch_size <= 0:
-            raise ValueError("batch_size must be positive")
+        with self._lock:
+            self._check_sample_size(batch_size)
+            positions = np.fromiter(random.sample(range(self._size), batch_size), dtype=np.int64, count=batch_size)
+            batch = self._gather(self._slots(positions))
+            self._total_sampled += batch_size
+        return batch
 
-        if len(self._buffer) < self.min_size:
-            raise ValueError(f"Insufficient experiences: {len(self._buffer)} < {self.min_size}")
+    def sample(self, batch_size: int) -> List[Experience]:
+        """
+        Sample a random batch of experiences.
 
-        if batch_size > len(self._buffer):
-            raise ValueError(f"batch_size ({batch_size}) > buffer size ({len(self._buffer)})")
+        Args:
+            batch_size: Number of experiences to sample
 
-        # Random sampling without replacement
-        batch = random.sample(list(self._buffer), batch_size)
-        self._total_sampled += batch_size
+        Returns:
+            List of randomly sampled experiences
 
-        return batch
+        Raises:
+            ValueError: If batch_size is invalid or insufficient experiences
+        """
+        return self._to_experiences(self.sample_batch(batch_size))
 
     def sample_recent(self, batch_size: int, recent_fraction: float = 0.1) -> List[Experience]:
         """
@@ -136,42 +326,41 @@ class ExperienceReplayBuffer:
         if not 0.0 <= recent_fraction <= 1.0:
             raise ValueError("recent_fraction must be between 0.0 and 1.0")
 
-        if len(self._buffer) < self.min_size:
-            raise ValueError(f"Insufficient experiences: {len(self._buffer)} < {self.min_size}")
-
-        # Calculate split
-        recent_count = int(batch_size * recent_fraction)
-        random_count = batch_size - recent_count
+        with self._lock:
+            if self._size < self.min_size:
+                raise ValueError(f"Insufficient experiences: {self._size} < {self.min_size}")
 
-        # Get recent experiences (last 20% of buffer)
-        recent_start = max(0, len(self._buffer) - int(len(self._buffer) * 0.2))
-        recent_experiences = list(self._buffer)[recent_start:]
+            # Calculate split
+            recent_count = int(batch_size * recent_fraction)
 
-        # Sample components
-        batch = []
+            # Recent experiences are the last 20% of the buffer
+            recent_start = max(0, self._size - int(self._size * 0.2))
+            positions: List[int] = []
+            if recent_count > 0 and recent_start < self._size:
+                positions.extend(random.sample(range(recent_start, self._size),
+                                               min(recent_count, self._size - recent_start)))
 
-        if recent_count > 0 and recent_experiences:
-            batch.extend(random.sample(recent_experiences,
-                                     min(recent_count, len(recent_experiences))))
-
-        if random_count > 0:
-            remaining_needed = batch_size - len(batch)
+            remaining_needed = batch_size - len(positions)
             if remaining_needed > 0:
-                batch.extend(random.sample(list(self._buffer), remaining_needed))
+                positions.extend(random.sample(range(self._size), remaining_needed))
 
-        self._total_sampled += len(batch)
-        return batch
+            batch = self._gather(self._slots(np.asarray(positions, dtype=np.int64)))
+            self._total_sampled += len(positions)
+        return self._to_experiences(batch)
 
-    def get_batch_arrays(self, batch: List[Experience]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    def get_batch_arrays(self, batch: Union[ReplayBatch, Sequence[Experience]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
         """
         Convert a batch of experiences to numpy arrays for training.
 
         Args:
-            batch: List of Experience objects
+            batch: ReplayBatch from ``sample_batch`` (returned as-is) or a list of Experience objects
 
         Returns:
             Tuple of (states, actions, rewards, next_states, dones) as numpy arrays
         """
+        if isinstance(batch, ReplayBatch):
+            return batch.states, batch.actions, batch.rewards, batch.next_states, batch.dones
+
         if not batch:
             raise ValueError("Batch cannot be empty")
 
@@ -185,7 +374,9 @@ class ExperienceReplayBuffer:
 
     def clear(self) -> None:
         """Clear all experiences from the buffer."""
-        self._buffer.clear()
+        with self._lock:
+            self._head = 0
+            self._size = 0
         logger.info("Experience buffer cleared")
 
     def _maybe_cleanup(self) -> None:
@@ -195,17 +386,35 @@ class ExperienceReplayBuffer:
         Removes oldest experiences to free up space and maintain performance.
         """
         # Only cleanup if we exceed the threshold, not when we're exactly at it
-        if len(self._buffer) > self.capacity * self.cleanup_threshold:
-            # Remove oldest 10% of experiences
-            cleanup_count = max(1, int(self.capacity * 0.1))
-
-            for _ in range(cleanup_count):
-                if self._buffer:
-                    self._buffer.popleft()
+        if self._size > self.capacity * self.cleanup_threshold:
+            # Remove oldest 10% of experiences by advancing the head
+            cleanup_count = min(self._size, max(1, int(self.capacity * 0.1)))
+            self._on_evicted(self._slots(np.arange(cleanup_count)))
+            self._head = (self._head + cleanup_count) % self.capacity
+            self._size -= cleanup_count
 
             self._cleanup_count += 1
             logger.debug(f"Cleaned up {cleanup_count} old experiences")
 
+    def _logical_arrays(self) -> Dict[str, np.ndarray]:
+        """Live columns in insertion order (oldest first)."""
+        slots = self._slots(np.arange(self._size))
+        columns = {
+            'actions': self._actions[slots],
+            'rewards': self._rewards[slots],
+            'dones': self._dones[slots],
+            'timestamps': self._timestamps[slots],
+        }
+        if self._states is not None:
+            columns['states'] = self._states[slots]
+            columns['next_states'] = self._next_states[slots]
+        return columns
+
+    def memory_bytes(self) -> int:
+        """Bytes held by the preallocated storage arrays."""
+        arrays = [self._actions, self._rewards, self._dones, self._timestamps, self._states, self._next_states]
+        return sum(a.nbytes for a in arrays if a is not None)
+
     def get_statistics(self) -> dict:
         """
         Get buffer statistics and performance metrics.
@@ -214,14 +423,15 @@ class ExperienceReplayBuffer:
             Dictionary with buffer statistics
         """
         return {
-            'size': len(self._buffer),
+            'size': self._size,
             'capacity': self.capacity,
-            'utilization': len(self._buffer) / self.capacity,
+            'utilization': self._size / self.capacity,
             'total_added': self._total_added,
             'total_sampled': self._total_sampled,
             'cleanup_count': self._cleanup_count,
             'min_size': self.min_size,
-            'ready_for_sampling': len(self._buffer) >= self.min_size
+            'ready_for_sampling': self._size >= self.min_size,
+            'memory_bytes': self.memory_bytes(),
         }
 
     def save_buffer(self, filepath: str) -> bool:
@@ -237,13 +447,14 @@ class ExperienceReplayBuffer:
         try:
             import pickle
 
-            buffer_data = {
-                'experiences': list(self._buffer),
-                'capacity': self.capacity,
-                'min_size': self.min_size,
-                'cleanup_threshold': self.cleanup_threshold,
-                'stats': self.get_statistics()
-            }
+            with self._lock:
+                buffer_data = {
+                    'arrays': self._logical_arrays(),
+                    'capacity': self.capacity,
+                    'min_size': self.min_size,
+                    'cleanup_threshold': self.cleanup_threshold,
+                    'stats': self.get_statistics()
+                }
 
             with open(filepath, 'wb') as f:
                 pickle.dump(buffer_data, f)
@@ -255,10 +466,29 @@ class ExperienceReplayBuffer:
             logger.error(f"Failed to save buffer: {e}")
             return False
 
+    def _restore_arrays(self, arrays: Dict[str, np.ndarray]) -> None:
+        """Load insertion-ordered columns into freshly allocated storage."""
+        count = min(len(arrays['actions']), self.capacity)
+        keep = slice(len(arrays['actions']) - count, None)  # newest win, like a full ring
+        if 'states' in arrays:
+            shape = (self.capacity,) + arrays['states'].shape[1:]
+            self._states = np.zeros(shape, dtype=self.STATE_DTYPE)
+            self._next_states = np.zeros(shape, dtype=self.STATE_DTYPE)
+            self._states[:count] = arrays['states'][keep]
+            self._next_states[:count] = arrays['next_states'][keep]
+        self._actions[:count] = arrays['actions'][keep]
+        self._rewards[:count] = arrays['rewards'][keep]
+        self._dones[:count] = arrays['dones'][keep]
+        self._timestamps[:count] = arrays['timestamps'][keep]
+        self._size = count
+
     def load_buffer(self, filepath: str) -> bool:
         """
         Load buffer contents from file.
 
+        Files written before the array-backed storage (a pickled list of
+        ``Experience`` objects) are still accepted.
+
         Args:
             filepath: Path to load buffer data from
 
@@ -271,21 +501,26 @@ class ExperienceReplayBuffer:
             with open(filepath, 'rb') as f:
                 buffer_data = pickle.load(f)
 
-            # Restore configuration
-            self.capacity = buffer_data.get('capacity', self.capacity)
-            self.min_size = buffer_data.get('min_size', self.min_size)
-            self.cleanup_threshold = buffer_data.get('cleanup_threshold', self.cleanup_threshold)
-
-            # Restore experiences
-            self._buffer = deque(buffer_data['experiences'], maxlen=self.capacity)
-
-            # Update statistics
-            old_stats = buffer_data.get('stats', {})
-            self._total_added = old_stats.get('total_added', len(self._buffer))
-            self._total_sampled = old_stats.get('total_sampled', 0)
-            self._cleanup_count = old_stats.get('cleanup_count', 0)
-
-            logger.info(f"Buffer loaded from {filepath} with {len(self._buffer)} experiences")
+            with self._lock:
+                # Restore configuration
+                self.min_size = buffer_data.get('min_size', self.min_size)
+                self.cleanup_threshold = buffer_data.get('cleanup_threshold', self.cleanup_threshold)
+                self._allocate(buffer_data.get('capacity', self.capacity))
+
+                # Restore experiences
+                if 'arrays' in buffer_data:
+                    self._restore_arrays(buffer_data['arrays'])
+                else:
+                    for experience in buffer_data['experiences'][-self.capacity:]:
+                        self._append(experience)
+
+                # Update statistics
+                old_stats = buffer_data.get('stats', {})
+                self._total_added = old_stats.get('total_added', self._size)
+                self._total_sampled = old_stats.get('total_sampled', 0)
+                self._cleanup_count = old_stats.get('cleanup_count', 0)
+
+            logger.info(f"Buffer loaded from {filepath} with {self._size} experiences")
             return True
 
         except Exception as e:
@@ -294,12 +529,12 @@ class ExperienceReplayBuffer:
 
     def __len__(self) -> int:
         """Return the current number of experiences in the buffer."""
-        return len(self._buffer)
+        return self._size
 
     def __repr__(self) -> str:
         """Return string representation of the buffer."""
-        return (f"ExperienceReplayBuffer(size={len(self._buffer)}, "
-                f"capacity={self.capacity}, utilization={len(self._buffer)/self.capacity:.1%})")
+        return (f"ExperienceReplayBuffer(size={self._size}, "
+                f"capacity={self.capacity}, utilization={self._size/self.capacity:.1%})")
 
 
 class PrioritizedExperienceBuffer(ExperienceReplayBuffer):
@@ -307,6 +542,9 @@ class PrioritizedExperienceBuffer(ExperienceReplayBuffer):
     Extension of ExperienceReplayBuffer with prioritized sampling.
 
     Implements importance sampling based on TD error for more efficient learning.
+    Priorities (raised to ``alpha``) live in a ``SumTree`` indexed by ring slot,
+    so sampling and priority updates are O(log capacity) and importance
+    weights are normalised by the tracked minimum priority.
     """
 
     def __init__(self,
@@ -324,17 +562,52 @@ class PrioritizedExperienceBuffer(ExperienceReplayBuffer):
             beta: Importance sampling exponent (0 = no correction, 1 = full correction)
             beta_increment: Amount to increment beta per sample
         """
+        self.alpha = alpha
         super().__init__(capacity, min_size, cleanup_threshold)
 
-        self.alpha = alpha
         self.beta = beta
         self.beta_increment = beta_increment
         self.max_beta = 1.0
-
-        # Priority storage (parallel to buffer)
-        self._priorities: deque = deque(maxlen=capacity)
         self._max_priority = 1.0
 
+    def _allocate(self, capacity: int) -> None:
+        super()._allocate(capacity)
+        # Raw priorities per slot (for inspection and checkpoints) and the sampling tree
+        self._priority_slots = np.zeros(capacity, dtype=np.float64)
+        self._tree = SumTree(capacity)
+
+    def _set_priorities(self, slots: np.ndarray, priorities: np.ndarray) -> None:
+        self._priority_slots[slots] = priorities
+        self._tree.update(slots, np.asarray(priorities, dtype=np.float64) ** self.alpha)
+
+    def _on_added(self, slot: int, priority: Optional[float]) -> None:
+        prio = float(self._max_priority if priority is None else priority)
+        self._priority_slots[slot] = prio
+        self._tree.update(slot, prio ** self.alpha)
+
+    def _on_added_batch(self, slots: np.ndarray) -> None:
+        self._set_priorities(slots, np.full(len(slots), self._max_priority))
+
+    def _on_evicted(self, slots: np.ndarray) -> None:
+        self._priority_slots[slots] = 0.0
+        self._tree.update(slots, 0.0)
+
+    def _restore_arrays(self, arrays: Dict[str, np.ndarray]) -> None:
+        super()._restore_arrays(arrays)
+        self._set_priorities(np.arange(self._size), np.full(self._size, self._max_priority))
+
+    def clear(self) -> None:
+        """Clear all experiences and priorities from the buffer."""
+        with self._lock:
+            self._priority_slots.fill(0.0)
+            self._tree.clear()
+        super().clear()
+
+    @property
+    def _priorities(self) -> np.ndarray:
+        """Priorities of live experiences, oldest first."""
+        return self._priority_slots[self._slots(np.arange(self._size))]
+
     def add(self, experience: Experience, priority: Optional[float] = None) -> None:
         """
         Add experience with priority.
@@ -343,62 +616,73 @@ class PrioritizedExperienceBuffer(ExperienceReplayBuffer):
             experience: Experience to add
             priority: Priority value (defaults to max priority)
         """
+        if not isinstance(experience, Experience):
+            raise TypeError("experience must be an Experience object")
+
         # Normalize to float for type safety (avoid Optional comparisons)
         prio: float = float(self._max_priority) if priority is None else float(priority)
 
-        super().add(experience)
-        self._priorities.append(prio)
+        with self._lock:
+            self._append(experience, prio)
 
-        if prio > self._max_priority:
-            self._max_priority = prio
+            if prio > self._max_priority:
+                self._max_priority = prio
 
-
-    def sample(self, batch_size: int) -> Tuple[List[Experience], np.ndarray, np.ndarray]:
+    def sample_batch(self, batch_size: int) -> ReplayBatch:
         """
-        Sample experiences using prioritized sampling.
+        Sample a batch as arrays using prioritized sampling.
 
         Returns:
-            Tuple of (experiences, indices, importance_weights)
+            ReplayBatch whose ``indices`` are buffer slots and ``weights`` the
+            importance-sampling weights, normalised so the lowest-priority
+            experience in the buffer would get weight 1
         """
-        if len(self._buffer) < self.min_size:
-            raise ValueError(f"Insufficient experiences: {len(self._buffer)} < {self.min_size}")
+        with self._lock:
+            if self._size < self.min_size:
+                raise ValueError(f"Insufficient experiences: {self._size} < {self.min_size}")
 
-        # Calculate sampling probabilities
-        priorities = np.array(self._priorities)
-        probabilities = priorities ** self.alpha
-        probabilities /= probabilities.sum()
+            slots, scaled = self._tree.sample(batch_size)
 
-        # Sample indices
-        indices = np.random.choice(len(self._buffer), batch_size, p=probabilities)
+            # w_i = (N * P(i))^-beta / max_j w_j, and max_j w_j comes from the min priority
+            weights = (scaled / self._tree.min) ** (-self.beta)
 
-        # Get experiences
-        experiences = [self._buffer[i] for i in indices]
+            batch = self._gather(slots, weights)
 
-        # Calculate importance weights
-        total_samples = len(self._buffer)
-        weights = (total_samples * probabilities[indices]) ** (-self.beta)
-        weights /= weights.max()  # Normalize by max weight
+            # Update beta
+            self.beta = min(self.max_beta, self.beta + self.beta_increment)
 
-        # Update beta
-        self.beta = min(self.max_beta, self.beta + self.beta_increment)
+            self._total_sampled += batch_size
 
-        self._total_sampled += batch_size
+        return batch
+
+    def sample(self, batch_size: int) -> Tuple[List[Experience], np.ndarray, np.ndarray]:
+        """
+        Sample experiences using prioritized sampling.
 
-        return experiences, indices, weights
+        Returns:
+            Tuple of (experiences, indices, importance_weights)
+        """
+        batch = self.sample_batch(batch_size)
+        return self._to_experiences(batch), batch.indices, batch.weights
 
     def update_priorities(self, indices: np.ndarray, priorities: np.ndarray) -> None:
         """
         Update priorities for sampled experiences.
 
         Args:
-            indices: Indices of experiences to update
+            indices: Buffer slots of experiences to update (``ReplayBatch.indices``)
             priorities: New priority values
         """
-        for idx, priority in zip(indices, priorities):
-            if 0 <= idx < len(self._priorities):
-                self._priorities[idx] = priority
-                if priority > self._max_priority:
-                    self._max_priority = priority
+        indices = np.asarray(indices, dtype=np.int64)
+        priorities = np.asarray(priorities, dtype=np.float64)
+        with self._lock:
+            # Skip slots that were evicted since they were sampled
+            live = (indices - self._head) % self.capacity < self._size
+            valid = (indices >= 0) & (indices < self.capacity) & live
+            if not valid.any():
+                return
+            self._set_priorities(indices[valid], priorities[valid])
+            self._max_priority = max(self._max_priority, float(priorities[valid].max()))
 
 # Backward compatibility wrapper for legacy imports and args
 class ExperienceBuffer(ExperienceReplayBuffer):
@@ -0,0 +1,361 @@
+"""
+Inference-Only Q-Network Engine
+
+Serving-time counterpart of the DQN networks in ``neural_network`` and
+``neural_networks``. ``CompiledQNetwork`` snapshots a trained network's
+layers into contiguous float32 arrays and runs a fused forward pass:
+
+- no ``layer_outputs`` list or other backprop bookkeeping,
+- biases folded into the weight matrices, so each layer is one GEMM plus
+  an in-place activation, written into scratch buffers that are allocated
+  once per thread and reused for every call up to ``max_batch`` rows,
+- Keras ``BatchNormalization`` layers (inference statistics) folded into
+  the following dense layer and ``Dropout`` layers dropped, so Keras models
+  compile to the same plain dense stack.
+
+Snapshots are immutable. ``InferenceSlot`` holds the one currently served
+and replaces it with a single reference assignment, so a trainer can
+compile and publish new weights while routing threads keep predicting from
+the previous snapshot until their next read.
+
+This module only depends on NumPy; compiling a Keras model reads its
+weights through the model object and never imports TensorFlow itself.
+"""
+
+import logging
+import threading
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# float32 exp overflows above ~88.7
+_SIGMOID_CLIP = 88.0
+
+Layer = Tuple[np.ndarray, np.ndarray, str]
+
+
+def _relu(h: np.ndarray) -> None:
+    np.maximum(h, 0.0, out=h)
+
+
+def _tanh(h: np.ndarray) -> None:
+    np.tanh(h, out=h)
+
+
+def _sigmoid(h: np.ndarray) -> None:
+    np.clip(h, -_SIGMOID_CLIP, _SIGMOID_CLIP, out=h)
+    np.negative(h, out=h)
+    np.exp(h, out=h)
+    h += 1.0
+    np.reciprocal(h, out=h)
+
+
+def _linear(h: np.ndarray) -> None:
+    pass
+
+
+_ACTIVATIONS = {
+    "relu": _relu,
+    "tanh": _tanh,
+    "sigmoid": _sigmoid,
+    "linear": _linear,
+}
+
+
+class CompiledQNetwork:
+    """Immutable float32 snapshot of a dense Q-network with a fused forward pass."""
+
+    def __init__(self, layers: Sequence[Layer], max_batch: int = 64):
+        """
+        Initialize from (weight, bias, activation) triples.
+
+        Args:
+            layers: Per dense layer, a (fan_in, fan_out) weight matrix, a
+                bias of fan_out values and an activation name ("relu",
+                "tanh", "sigmoid" or "linear")
+            max_batch: Largest batch served from the preallocated scratch
+                buffers; bigger batches allocate per call
+        """
+        if not layers:
+            raise ValueError("A compiled network needs at least one layer")
+        if max_batch < 1:
+            raise ValueError(f"max_batch must be positive, got {max_batch}")
+
+        weights, biases, activations = [], [], []
+        width = None
+        for index, (weight, bias, activation) in enumerate(layers):
+            weight = np.array(weight, dtype=np.float32, order="C")
+            bias = np.array(bias, dtype=np.float32).reshape(-1)
+            if weight.ndim != 2:
+                raise ValueError(f"Layer {index}: expected a 2-D weight matrix, got shape {weight.shape}")
+            if width is not None and weight.shape[0] != width:
+                raise ValueError(f"Layer {index}: expects {weight.shape[0]} inputs, previous layer gives {width}")
+            if bias.shape != (weight.shape[1],):
+                raise ValueError(f"Layer {index}: bias of {bias.size} values for {weight.shape[1]} units")
+            if activation not in _ACTIVATIONS:
+                raise ValueError(f"Layer {index}: unsupported activation '{activation}'")
+            weight.flags.writeable = False
+            bias.flags.writeable = False
+            weights.append(weight)
+            biases.append(bias)
+            activations.append(activation)
+            width = weight.shape[1]
+
+        self._weights = tuple(weights)
+        self._biases = tuple(biases)
+        self.activations = tuple(activations)
+        self.input_size = weights[0].shape[0]
+        self.output_size = width
+        self.max_batch = max_batch
+        self._layers = self._augment()
+        self._local = threading.local()
+
+    def _augment(self) -> Tuple[Tuple[np.ndarray, Optional[Callable[[np.ndarray], None]], bool], ...]:
+        """
+        Fold each bias into its weight matrix.
+
+        Every layer input carries a trailing constant 1 column, so
+        ``[x, 1] @ [[W], [b]]`` is the whole affine step in one GEMM. Hidden
+        matrices get one more output column that copies the 1 through to
+        the next layer's input.
+        """
+        augmented = []
+        last = len(self._weights) - 1
+        for index, (weight, bias, name) in enumerate(zip(self._weights, self._biases, self.activations)):
+            fan_in, fan_out = weight.shape
+            matrix = np.zeros((fan_in + 1, fan_out + (index < last)), dtype=np.float32)
+            matrix[:fan_in, :fan_out] = weight
+            matrix[fan_in, :fan_out] = bias
+            if index < last:
+                matrix[fan_in, fan_out] = 1.0
+            matrix.flags.writeable = False
+            activate = None if name == "linear" else _ACTIVATIONS[name]
+            # relu keeps the constant 1 column, tanh and sigmoid must skip it
+            augmented.append((matrix, activate, name in ("tanh", "sigmoid") and index < last))
+        return tuple(augmented)
+
+    @property
+    def layer_sizes(self) -> List[int]:
+        """Input size followed by each layer's width."""
+        return [self.input_size] + [w.shape[1] for w in self._weights]
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the weight snapshot (scratch buffers excluded)."""
+        return sum(w.nbytes + b.nbytes for w, b in zip(self._weights, self._biases))
+
+    def layers(self) -> List[Layer]:
+        """The (weight, bias, activation) triples as read-only float32 arrays."""
+        return list(zip(self._weights, self._biases, self.activations))
+
+    def _allocate(self, rows: int) -> List[np.ndarray]:
+        """Input buffer followed by one output buffer per layer, each with its constant column."""
+        buffers = [np.empty((rows, matrix.shape[0]), dtype=np.float32) for matrix, _, _ in self._layers]
+        buffers[0][:, -1] = 1.0
+        buffers.append(np.empty((rows, self.output_size), dtype=np.float32))
+        return buffers
+
+    def _plan(self, buffers: List[np.ndarray], rows: int) -> Tuple[np.ndarray, tuple, np.ndarray]:
+        """Row views of ``buffers`` for a batch of ``rows``: (input view, layer steps, output)."""
+        views = [buffer[:rows] for buffer in buffers]
+        steps = []
+        for (matrix, activate, skip_constant), x, h in zip(self._layers, views, views[1:]):
+            steps.append((x, matrix, h, activate, h[:, :-1] if skip_constant else h))
+        return views[0][:, :self.input_size], tuple(steps), views[-1]
+
+    def _scratch_plan(self, rows: int) -> Tuple[np.ndarray, tuple, np.ndarray]:
+        """This thread's plan for ``rows``, over buffers allocated once per thread."""
+        local = self._local
+        plans = getattr(local, "plans", None)
+        if plans is None:
+            plans = local.plans = {}
+            local.buffers = self._allocate(self.max_batch)
+        plan = plans.get(rows)
+        if plan is None:
+            plan = plans[rows] = self._plan(local.buffers, rows)
+        return plan
+
+    def predict(self, states: Any, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Q-values for one state or a batch of states.
+
+        Args:
+            states: (input_size,) vector or (n, input_size) batch
+            out: Optional (n, output_size) array to write the Q-values into
+
+        Returns:
+            (n, output_size) float32 Q-values (``out`` when given); a single
+            state gives one row, as with the training networks
+        """
+        states = np.asarray(states)
+        shape = states.shape
+        rows = 1 if len(shape) == 1 else shape[0]
+        if shape[-1] != self.input_size or len(shape) > 2:
+            raise ValueError(f"Expected states with {self.input_size} features, got shape {shape}")
+
+        if rows <= self.max_batch:
+            inputs, steps, output = self._scratch_plan(rows)
+        else:
+            inputs, steps, output = self._plan(self._allocate(rows), rows)
+        inputs[...] = states
+        for x, matrix, h, activate, target in steps:
+            np.dot(x, matrix, out=h)
+            if activate is not None:
+                activate(target)
+
+        if out is None:
+            return output.copy()
+        out[...] = output
+        return out
+
+    def best_actions(self, states: Any) -> np.ndarray:
+        """Greedy action index per row of ``states``."""
+        return self.predict(states).argmax(axis=1)
+
+    @classmethod
+    def from_network(cls, network: Any, max_batch: int = 64) -> "CompiledQNetwork":
+        """
+        Compile a training network's current online weights.
+
+        Accepts ``NumpyDQNNetwork`` (hidden layers use its ``activation``,
+        the output layer is linear), ``TensorFlowDQNNetwork`` (its Keras
+        ``model``), a ``DQNNetwork`` wrapper of either, or a Keras
+        ``Sequential`` of Dense / BatchNormalization / Dropout layers as
+        built by ``neural_networks.QNetworkArchitecture``.
+
+        Raises:
+            TypeError: If the network is none of these
+        """
+        return cls(extract_layers(network), max_batch=max_batch)
+
+
+def extract_layers(network: Any) -> List[Layer]:
+    """
+    Read a network's dense layers as (weight, bias, activation) triples.
+
+    Raises:
+        TypeError: If the network's layout is not recognised
+    """
+    # DQNNetwork wraps the concrete implementation
+    for _ in range(4):
+        inner = getattr(network, "network", None)
+        if inner is None or inner is network:
+            break
+        network = inner
+
+    weights = getattr(network, "weights", None)
+    biases = getattr(network, "biases", None)
+    if isinstance(weights, list) and isinstance(biases, list) and weights and len(weights) == len(biases):
+        hidden = getattr(network, "activation", "linear")
+        hidden = hidden if hidden in _ACTIVATIONS else "linear"  # NumpyDQNNetwork treats unknown names as linear
+        return [
+            (w, b, hidden if i < len(weights) - 1 else "linear")
+            for i, (w, b) in enumerate(zip(weights, biases))
+        ]
+
+    model = getattr(network, "model", None)
+    if model is not None and isinstance(getattr(model, "layers", None), (list, tuple)):
+        network = model
+    keras_layers = getattr(network, "layers", None)
+    if isinstance(keras_layers, (list, tuple)) and keras_layers:
+        return _keras_layers(keras_layers)
+
+    raise TypeError(f"Cannot compile {type(network).__name__} for inference")
+
+
+def _keras_layers(keras_layers: Sequence[Any]) -> List[Layer]:
+    """Dense stack of a Keras model, with batch normalisation folded in."""
+    layers: List[Layer] = []
+    # Pending per-feature affine map (x * scale + shift) from batch normalisation
+    scale: Optional[np.ndarray] = None
+    shift: Optional[np.ndarray] = None
+
+    for layer in keras_layers:
+        kind = type(layer).__name__
+        if kind in ("Dropout", "InputLayer"):
+            continue
+        params = [np.asarray(p, dtype=np.float64) for p in layer.get_weights()]
+        if kind == "Dense":
+            weight = params[0]
+            bias = params[1] if len(params) > 1 else np.zeros(weight.shape[1])
+            if scale is not None:
+                bias = bias + shift @ weight
+                weight = scale[:, None] * weight
+                scale = shift = None
+            activation = getattr(getattr(layer, "activation", None), "__name__", "linear")
+            if activation not in _ACTIVATIONS:
+                raise TypeError(f"Cannot compile Dense activation '{activation}' for inference")
+            layers.append((weight, bias, activation))
+        elif kind == "BatchNormalization":
+            params = list(params)
+            gamma = params.pop(0) if getattr(layer, "scale", True) else 1.0
+            beta = params.pop(0) if getattr(layer, "center", True) else 0.0
+            mean, variance = params
+            layer_scale = gamma / np.sqrt(variance + getattr(layer, "epsilon", 1e-3))
+            layer_shift = beta - mean * layer_scale
+            if scale is None:
+                scale, shift = layer_scale, layer_shift
+            else:
+                scale, shift = scale * layer_scale, shift * layer_scale + layer_shift
+        else:
+            raise TypeError(f"Cannot compile {kind} layer for inference")
+
+    if scale is not None:
+        raise TypeError("Cannot compile a model that ends in batch normalisation")
+    if not layers:
+        raise TypeError("Model has no Dense layers")
+    return layers
+
+
+class InferenceSlot:
+    """
+    The snapshot currently served for one network.
+
+    Readers take the published (engine, source) pair with one attribute
+    read, so a concurrent ``publish`` is seen either entirely or not at all.
+    """
+
+    def __init__(self):
+        self._entry: Optional[Tuple[CompiledQNetwork, Any, int]] = None
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    @property
+    def engine(self) -> Optional[CompiledQNetwork]:
+        """The published snapshot, if any."""
+        entry = self._entry
+        return None if entry is None else entry[0]
+
+    @property
+    def generation(self) -> int:
+        """Number of snapshots published so far."""
+        return self._generation
+
+    def engine_for(self, source: Any) -> Optional[CompiledQNetwork]:
+        """The published snapshot if it was compiled from ``source``, else None."""
+        entry = self._entry
+        if entry is None or entry[1] is not source:
+            return None
+        return entry[0]
+
+    def publish(self, engine: CompiledQNetwork, source: Any = None) -> int:
+        """
+        Serve ``engine`` from now on.
+
+        Args:
+            engine: Compiled snapshot
+            source: Network the snapshot was compiled from (see ``engine_for``)
+
+        Returns:
+            Generation number of the published snapshot
+        """
+        with self._lock:
+            self._generation += 1
+            self._entry = (engine, source, self._generation)
+            return self._generation
+
+    def clear(self) -> None:
+        """Stop serving a snapshot."""
+        self._entry = None
@@ -8,27 +8,167 @@ Inspired by quantum computing principles:
 - Superposition: Multiple task variations executed in parallel
 - Entanglement: Task dependencies and relationships
 - Collapse: Selection of optimal results based on strategies
+
+Execution resources are shared process-wide: sync variations run on thread
+pools from a registry keyed by size (``get_shared_executor``), and every
+running variation holds a slot of one global concurrency limit
+(``QUANTUM_MAX_CONCURRENCY``, default 32; see ``set_max_concurrency``).
+Once a FIRST_SUCCESS collapse has its winner the remaining variations are
+cancelled: queued ones never start, async ones receive ``CancelledError``,
+and sync ones running in a thread can stop early by polling
+``variation_cancelled()``.
 """
 
 import asyncio
+import contextvars
+import functools
 import logging
+import os
+import threading
 import time
-from collections import defaultdict
+import weakref
+from bisect import bisect_left
+from collections import defaultdict, deque
 from enum import Enum
 from functools import wraps
-from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar, Union
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, TypeVar, Union
 from dataclasses import dataclass
 from concurrent.futures import ThreadPoolExecutor
 
-try:
-    import anyio
-except ImportError:
-    anyio = None
+from ..monitoring.quantum_performance import VARIATION_LATENCY_BUCKETS, observe_variation_latency
 
 logger = logging.getLogger(__name__)
 
 T = TypeVar("T")
 
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("QUANTUM_MAX_CONCURRENCY", "32"))
+# Recent executions kept per manager; quantum_task managers live for the whole process
+DEFAULT_EXECUTION_HISTORY = 1000
+
+_executor_lock = threading.Lock()
+_executors: Dict[int, ThreadPoolExecutor] = {}
+_max_concurrency = DEFAULT_MAX_CONCURRENCY
+# asyncio primitives belong to one event loop, so the global limit is one semaphore per running loop
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+# Sync variations wait for a free pool thread here rather than in the executor's queue, where they could not be cancelled
+_pool_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[int, asyncio.Semaphore]]" = weakref.WeakKeyDictionary()
+_cancel_event: contextvars.ContextVar[Optional[threading.Event]] = contextvars.ContextVar(
+    "quantum_variation_cancel_event", default=None
+)
+
+
+def get_shared_executor(max_workers: int) -> ThreadPoolExecutor:
+    """Process-wide thread pool with ``max_workers`` threads, created on first use."""
+    with _executor_lock:
+        executor = _executors.get(max_workers)
+        if executor is None or executor._shutdown:
+            executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"quantum-{max_workers}")
+            _executors[max_workers] = executor
+        return executor
+
+
+def shutdown_shared_executors(wait: bool = True) -> None:
+    """Shut down every shared thread pool (new ones are created on next use)."""
+    with _executor_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=wait)
+
+
+def set_max_concurrency(limit: int) -> None:
+    """
+    Change the global limit on concurrently running variations.
+
+    Executions already waiting keep the previous limit; new ones use this.
+    """
+    global _max_concurrency
+    if limit < 1:
+        raise ValueError(f"Concurrency limit must be positive, got {limit}")
+    _max_concurrency = limit
+    _semaphores.clear()
+
+
+def get_max_concurrency() -> int:
+    """Global limit on concurrently running variations."""
+    return _max_concurrency
+
+
+def _global_semaphore() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _semaphores[loop] = asyncio.Semaphore(_max_concurrency)
+    return semaphore
+
+
+def _pool_semaphore(max_workers: int) -> asyncio.Semaphore:
+    slots = _pool_slots.setdefault(asyncio.get_running_loop(), {})
+    semaphore = slots.get(max_workers)
+    if semaphore is None:
+        semaphore = slots[max_workers] = asyncio.Semaphore(max_workers)
+    return semaphore
+
+
+def _raise_if_settled(settled: Optional[asyncio.Event]) -> None:
+    if settled is not None and settled.is_set():
+        raise asyncio.CancelledError()
+
+
+def variation_cancelled() -> bool:
+    """
+    Whether the variation calling this has been cancelled.
+
+    Sync variations run in worker threads, where cancellation cannot
+    interrupt them; long-running ones can poll this and return early.
+    """
+    event = _cancel_event.get()
+    return event is not None and event.is_set()
+
+
+class LatencyHistogram:
+    """Bucketed latency counts in seconds (Prometheus ``le`` semantics, last bucket +Inf)."""
+
+    __slots__ = ("bounds", "counts", "count", "total", "max")
+
+    def __init__(self, bounds: Sequence[float] = VARIATION_LATENCY_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile (``max`` for the +Inf bucket)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        buckets = {str(bound): count for bound, count in zip(self.bounds, self.counts)}
+        buckets["+Inf"] = self.counts[-1]
+        return {
+            "buckets": buckets,
+            "count": self.count,
+            "sum": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+        }
+
 
 class CollapseStrategy(Enum):
     """Strategies for collapsing quantum execution results."""
@@ -79,17 +219,17 @@ class QuantumManager:
         self,
         max_workers: int = 4,
         timeout: float = 30.0,
-        default_strategy: CollapseStrategy = CollapseStrategy.FIRST_SUCCESS
+        default_strategy: CollapseStrategy = CollapseStrategy.FIRST_SUCCESS,
+        execution_history: int = DEFAULT_EXECUTION_HISTORY
     ):
         self.max_workers = max_workers
         self.timeout = timeout
         self.default_strategy = default_strategy
-        self._executor = ThreadPoolExecutor(max_workers=max_workers)
-        self._metrics = defaultdict(list)
-        
-        # Check if anyio is available
-        if anyio is None:
-            logger.warning("anyio not available, falling back to asyncio")
+        self._executor = get_shared_executor(max_workers)
+        self._executions: deque = deque(maxlen=execution_history)
+        self._execution_totals = {'total_executions': 0, 'successful_executions': 0}
+        # variation id -> outcome ("success", "error", "cancelled", "timeout") -> histogram
+        self._variation_latency: Dict[str, Dict[str, LatencyHistogram]] = defaultdict(dict)
     
     async def execute_quantum_task(
         self,
@@ -100,6 +240,10 @@ class QuantumManager:
         """
         Execute task variations in quantum superposition and collapse to optimal result.
         
+        Under FIRST_SUCCESS the other variations are cancelled as soon as
+        one succeeds; every strategy cancels what is still running at
+        ``timeout``.
+        
         Args:
             variations: List of task variations to execute in parallel
             collapse_strategy: Strategy for selecting final result
@@ -113,11 +257,7 @@ class QuantumManager:
         
         logger.info(f"Starting quantum execution with {len(variations)} variations")
         
-        # Execute variations in parallel using anyio if available
-        if anyio is not None:
-            results = await self._execute_with_anyio(variations)
-        else:
-            results = await self._execute_with_asyncio(variations)
+        results = await self._execute_variations(variations, stop_on_success=strategy == CollapseStrategy.FIRST_SUCCESS)
         
         # Collapse results based on strategy
         final_result = self._collapse_results(results, strategy, scoring_fn)
@@ -126,77 +266,112 @@ class QuantumManager:
         final_result.execution_time = execution_time
         
         # Record metrics
-        self._record_metrics(strategy, len(variations), execution_time, final_result.success)
+        cancelled = sum(1 for r in results if isinstance(r.error, asyncio.CancelledError))
+        self._record_metrics(strategy, len(variations), execution_time, final_result.success, cancelled=cancelled)
         
         logger.info(f"Quantum execution completed in {execution_time:.3f}s")
         return final_result
     
-    async def _execute_with_anyio(self, variations: List[TaskVariation]) -> List[QuantumResult]:
-        """Execute variations using anyio for structured concurrency."""
-        results = []
-        
-        async with anyio.create_task_group() as tg:
-            for variation in variations:
-                tg.start_soon(self._execute_variation, variation, results)
+    async def _execute_variations(
+        self,
+        variations: List[TaskVariation],
+        stop_on_success: bool = False
+    ) -> List[QuantumResult]:
+        """
+        Run variations concurrently and collect their results in variation order.
         
-        return results
-    
-    async def _execute_with_asyncio(self, variations: List[TaskVariation]) -> List[QuantumResult]:
-        """Execute variations using standard asyncio."""
-        tasks = [
-            self._execute_variation_async(variation) 
-            for variation in variations
-        ]
+        Variations still running when ``stop_on_success`` is satisfied (or at
+        the timeout) are cancelled and reported as failed results with a
+        ``CancelledError`` (or ``asyncio.TimeoutError``).
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        # Set by the first success, so variations still waiting for a slot do not start in the meantime
+        settled = asyncio.Event() if stop_on_success else None
+        tasks = {
+            asyncio.ensure_future(self._execute_variation_async(variation, settled)): index
+            for index, variation in enumerate(variations)
+        }
+        pending = set(tasks)
+        results: Dict[int, QuantumResult] = {}
+        timed_out = False
         
         try:
-            completed_results = await asyncio.wait_for(
-                asyncio.gather(*tasks, return_exceptions=True),
-                timeout=self.timeout
+            while pending:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    timed_out = True
+                    break
+                done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    results[tasks[task]] = task.result()
+                if stop_on_success and any(results[tasks[task]].success for task in done):
+                    break
+        finally:
+            # Also runs when the caller itself is cancelled
+            for task in pending:
+                task.cancel()
+            stopped = await asyncio.gather(*pending, return_exceptions=True) if pending else []
+        
+        if timed_out:
+            logger.warning(f"Quantum execution timed out after {self.timeout}s, cancelled {len(pending)} variations")
+        elif pending:
+            logger.debug(f"Cancelled {len(pending)} variations after the first success")
+        for task, stopped_result in zip(pending, stopped):
+            variation = variations[tasks[task]]
+            result = stopped_result if isinstance(stopped_result, QuantumResult) else QuantumResult(
+                value=None, success=False, variation_id=variation.id, metadata=variation.metadata
             )
-            
-            results = []
-            for i, result in enumerate(completed_results):
-                if isinstance(result, Exception):
-                    results.append(QuantumResult(
-                        value=None,
-                        success=False,
-                        error=result,
-                        variation_id=variations[i].id
-                    ))
-                else:
-                    results.append(result)
-            
-            return results
-            
-        except asyncio.TimeoutError:
-            logger.warning(f"Quantum execution timed out after {self.timeout}s")
-            return [QuantumResult(
-                value=None,
-                success=False,
-                error=asyncio.TimeoutError("Execution timed out"),
-                variation_id="timeout"
-            )]
-    
-    async def _execute_variation(self, variation: TaskVariation, results: List[QuantumResult]):
-        """Execute a single variation and append result to results list (for anyio)."""
-        result = await self._execute_variation_async(variation)
-        results.append(result)
+            result.error = asyncio.TimeoutError("Execution timed out") if timed_out else asyncio.CancelledError()
+            results[tasks[task]] = result
+        
+        ordered = [results[index] for index in sorted(results)]
+        for result in ordered:
+            if result.success:
+                outcome = "success"
+            elif isinstance(result.error, asyncio.TimeoutError):
+                outcome = "timeout"
+            elif isinstance(result.error, asyncio.CancelledError):
+                outcome = "cancelled"
+            else:
+                outcome = "error"
+            self._observe_variation(result.variation_id, outcome, result.execution_time)
+        return ordered
     
-    async def _execute_variation_async(self, variation: TaskVariation) -> QuantumResult:
-        """Execute a single task variation asynchronously."""
+    async def _execute_variation_async(
+        self,
+        variation: TaskVariation,
+        settled: Optional[asyncio.Event] = None
+    ) -> QuantumResult:
+        """
+        Execute a single task variation asynchronously.
+        
+        Waits for a global concurrency slot first, and gives up without
+        running if ``settled`` was set while it waited. Cancellation is turned
+        into a failed result carrying ``CancelledError``, and signalled to
+        sync tasks through ``variation_cancelled()``.
+        """
         start_time = time.time()
+        cancel_event = threading.Event()
+        _cancel_event.set(cancel_event)  # each asyncio task runs in its own context copy
         
         try:
-            # Handle both sync and async tasks
-            if asyncio.iscoroutinefunction(variation.task):
-                result_value = await variation.task(**variation.params)
-            else:
-                # Run sync function in thread pool
-                loop = asyncio.get_event_loop()
-                result_value = await loop.run_in_executor(
-                    self._executor,
-                    lambda: variation.task(**variation.params)
-                )
+            async with _global_semaphore():
+                # Handle both sync and async tasks
+                if asyncio.iscoroutinefunction(variation.task):
+                    _raise_if_settled(settled)
+                    result_value = await variation.task(**variation.params)
+                else:
+                    # Run sync function in the shared thread pool, in this task's context
+                    context = contextvars.copy_context()
+                    async with _pool_semaphore(self.max_workers):
+                        _raise_if_settled(settled)
+                        result_value = await asyncio.get_running_loop().run_in_executor(
+                            self._executor,
+                            functools.partial(context.run, variation.task, **variation.params)
+                        )
+                if settled is not None:
+                    settled.set()
             
             execution_time = time.time() - start_time
             
@@ -208,6 +383,17 @@ class QuantumManager:
                 metadata=variation.metadata
             )
             
+        except asyncio.CancelledError as e:
+            cancel_event.set()
+            return QuantumResult(
+                value=None,
+                execution_time=time.time() - start_time,
+                variation_id=variation.id,
+                success=False,
+                error=e,
+                metadata=variation.metadata
+            )
+            
         except Exception as e:
             execution_time = time.time() - start_time
             logger.error(f"Variation {variation.id} failed: {e}")
@@ -370,29 +556,46 @@ class QuantumManager:
         return variations
     
     def get_metrics(self) -> Dict[str, Any]:
-        """Get execution metrics."""
-        return dict(self._metrics)
+        """Get execution metrics, including per-variation latency histograms."""
+        metrics: Dict[str, Any] = {'executions': list(self._executions), **self._execution_totals}
+        metrics['variation_latency'] = self.get_variation_histograms()
+        metrics['max_concurrency'] = get_max_concurrency()
+        return metrics
+    
+    def get_variation_histograms(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Latency histograms by variation id and outcome (success, error, cancelled, timeout)."""
+        return {
+            variation_id: {outcome: histogram.to_dict() for outcome, histogram in outcomes.items()}
+            for variation_id, outcomes in self._variation_latency.items()
+        }
+    
+    def _observe_variation(self, variation_id: str, outcome: str, seconds: float) -> None:
+        histogram = self._variation_latency[variation_id].get(outcome)
+        if histogram is None:
+            histogram = self._variation_latency[variation_id][outcome] = LatencyHistogram()
+        histogram.observe(seconds)
+        observe_variation_latency(seconds, outcome)
     
     def _record_metrics(
         self,
         strategy: CollapseStrategy,
         variation_count: int,
         execution_time: float,
-        success: bool
+        success: bool,
+        cancelled: int = 0
     ):
-        """Record execution metrics."""
-        self._metrics['executions'].append({
+        """Record execution metrics (the last ``execution_history`` runs, plus running totals)."""
+        self._execution_totals['total_executions'] += 1
+        if success:
+            self._execution_totals['successful_executions'] += 1
+        self._executions.append({
             'strategy': strategy.value,
             'variation_count': variation_count,
+            'cancelled_variations': cancelled,
             'execution_time': execution_time,
             'success': success,
             'timestamp': time.time()
         })
-    
-    def __del__(self):
-        """Cleanup resources."""
-        if hasattr(self, '_executor'):
-            self._executor.shutdown(wait=False)
 
 
 def quantum_task(
@@ -427,21 +630,22 @@ def quantum_task(
     """
     
     def decorator(func: Callable[..., T]) -> Callable[..., Awaitable[T]]:
+        # One manager per decorated function; its thread pool is the shared one for max_workers
+        manager = QuantumManager(
+            max_workers=max_workers,
+            timeout=timeout,
+            default_strategy=collapse_strategy
+        )
+        
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            manager = QuantumManager(
-                max_workers=max_workers,
-                timeout=timeout,
-                default_strategy=collapse_strategy
-            )
-            
             # If no variations specified, just run the function normally
             if not variations:
                 if asyncio.iscoroutinefunction(func):
                     return await func(*args, **kwargs)
                 else:
-                    loop = asyncio.get_event_loop()
-                    return await loop.run_in_executor(None, lambda: func(*args, **kwargs))
+                    loop = asyncio.get_running_loop()
+                    return await loop.run_in_executor(manager._executor, lambda: func(*args, **kwargs))
             
             # Convert args to kwargs for variation generation
             import inspect
@@ -469,5 +673,6 @@ def quantum_task(
             
             return result.value
         
+        wrapper.quantum_manager = manager
         return wrapper
     return decorator
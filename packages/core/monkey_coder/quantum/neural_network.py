@@ -12,29 +12,33 @@ import json
 from typing import Optional, Tuple, List, Dict, Any
 from abc import ABC, abstractmethod
 
-# Try to import tensorflow, fallback to numpy implementation if not available
-try:
-    import tensorflow as tf
-    from tensorflow import keras
-    from tensorflow.keras import layers
-    TENSORFLOW_AVAILABLE = True
-
-    # Type aliases for when TensorFlow is available
-    KerasModel = keras.Model
-
-except ImportError:
-    TENSORFLOW_AVAILABLE = False
-    tf = None
-    keras = None
-    layers = None
-
-    # Dummy type for when TensorFlow is not available
-    class KerasModel:
-        pass
+from ..utils.lazy_imports import module_available, require
+
+# TensorFlow is imported the first time a TensorFlowDQNNetwork is built (see
+# _ensure_tensorflow), not with this module: routing workers that only serve
+# the numpy network or a compiled snapshot never load it.
+TENSORFLOW_AVAILABLE = module_available("tensorflow")
+tf = None
+keras = None
+layers = None
+
+# Keras model type (kept as Any so annotations do not need TensorFlow)
+KerasModel = Any
 
 logger = logging.getLogger(__name__)
 
 
+def _ensure_tensorflow() -> None:
+    """Import TensorFlow and Keras into this module on first use."""
+    global tf, keras, layers
+    if tf is None:
+        tensorflow = require("tensorflow", "TensorFlowDQNNetwork")
+        from tensorflow import keras as keras_module
+        from tensorflow.keras import layers as keras_layers
+
+        tf, keras, layers = tensorflow, keras_module, keras_layers
+
+
 class BaseDQNNetwork(ABC):
     """Abstract base class for DQN networks."""
 
@@ -89,6 +93,7 @@ class TensorFlowDQNNetwork(BaseDQNNetwork):
         """Initialize TensorFlow DQN network."""
         if not TENSORFLOW_AVAILABLE:
             raise ImportError("TensorFlow is required for TensorFlowDQNNetwork")
+        _ensure_tensorflow()
 
         self.state_size = state_size
         self.action_size = action_size
@@ -108,6 +113,7 @@ class TensorFlowDQNNetwork(BaseDQNNetwork):
         """Build the neural network model."""
         if not TENSORFLOW_AVAILABLE:
             raise ImportError("TensorFlow is required for TensorFlowDQNNetwork")
+        _ensure_tensorflow()
 
         model = keras.Sequential()
 
@@ -223,6 +229,7 @@ class TensorFlowDQNNetwork(BaseDQNNetwork):
     def load_model(self, filepath: str) -> bool:
         """Load model from file."""
         try:
+            _ensure_tensorflow()
             self.model = keras.models.load_model(f"{filepath}.h5")
             self.target_model = keras.models.load_model(f"{filepath}.h5")
 
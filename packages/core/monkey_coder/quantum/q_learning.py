@@ -13,7 +13,8 @@ from dataclasses import dataclass, asdict
 from datetime import datetime
 from pathlib import Path
 import asyncio
-from collections import defaultdict
+
+from .q_table import CompactQTable
 
 logger = logging.getLogger(__name__)
 
@@ -136,16 +137,19 @@ class QLearningRouter:
         epsilon_min: float = 0.01,
         save_path: Optional[str] = None
     ):
-        """Initialize Q-learning router."""
+        """
+        Initialize Q-learning router.
+
+        ``save_path`` names the binary ``.npz`` snapshot; a JSON path (the old
+        default) is mapped to the ``.npz`` next to it, and an existing JSON
+        Q-table there is imported when no snapshot exists yet.
+        """
         self.learning_rate = learning_rate
         self.discount_factor = discount_factor
         self.epsilon = epsilon
         self.epsilon_decay = epsilon_decay
         self.epsilon_min = epsilon_min
         
-        # Q-table for tabular Q-learning
-        self.q_table: Dict[tuple, Dict[tuple, float]] = defaultdict(lambda: defaultdict(float))
-        
         # Experience replay buffer for batch learning
         self.experience_buffer: List[Experience] = []
         self.max_buffer_size = 10000
@@ -154,13 +158,18 @@ class QLearningRouter:
         self.episode_rewards: List[float] = []
         self.success_rate_history: List[float] = []
         
-        # Save/load path
-        self.save_path = Path(save_path) if save_path else Path("data/q_learning/q_table.json")
+        # Save/load paths
+        self.save_path = Path(save_path) if save_path else Path("data/q_learning/q_table.npz")
         self.save_path.parent.mkdir(parents=True, exist_ok=True)
+        self.snapshot_path = self.save_path.with_suffix('.npz')
+        self.legacy_json_path = self.save_path.with_suffix('.json')
         
         # Action space definition
         self.action_space = self._build_action_space()
         
+        # Q-table for tabular Q-learning (action space interned as the first columns)
+        self.q_table = CompactQTable(action.to_tuple() for action in self.action_space)
+        
         # Load existing Q-table if available
         self.load_q_table()
     
@@ -198,15 +207,11 @@ class QLearningRouter:
     
     def get_q_value(self, state: State, action: Action) -> float:
         """Get Q-value for state-action pair."""
-        state_key = state.to_tuple()
-        action_key = action.to_tuple()
-        return self.q_table[state_key][action_key]
+        return self.q_table.get(state.to_tuple(), action.to_tuple())
     
     def set_q_value(self, state: State, action: Action, value: float):
         """Set Q-value for state-action pair."""
-        state_key = state.to_tuple()
-        action_key = action.to_tuple()
-        self.q_table[state_key][action_key] = value
+        self.q_table.set(state.to_tuple(), action.to_tuple(), value)
     
     def select_action(self, state: State, explore: bool = True) -> Action:
         """
@@ -222,22 +227,17 @@ class QLearningRouter:
         # Epsilon-greedy exploration
         if explore and np.random.random() < self.epsilon:
             # Random exploration
-            return np.random.choice(self.action_space)
+            return self.action_space[np.random.randint(len(self.action_space))]
         
         # Exploitation: choose best action based on Q-values
-        state_key = state.to_tuple()
+        best = self.q_table.best(state.to_tuple())
         
-        if state_key not in self.q_table or not self.q_table[state_key]:
+        if best is None:
             # No knowledge about this state, choose based on heuristics
             return self._heuristic_action_selection(state)
         
-        # Get action with maximum Q-value
-        best_action_key = max(
-            self.q_table[state_key].items(),
-            key=lambda x: x[1]
-        )[0]
-        
         # Reconstruct action from tuple
+        best_action_key = best[0]
         provider, model, strategy, temp, tokens = best_action_key
         return Action(
             provider=provider,
@@ -361,11 +361,7 @@ class QLearningRouter:
             target = reward
         else:
             # Get maximum Q-value for next state
-            next_state_key = next_state.to_tuple()
-            if next_state_key in self.q_table and self.q_table[next_state_key]:
-                max_next_q = max(self.q_table[next_state_key].values())
-            else:
-                max_next_q = 0.0
+            max_next_q = self.q_table.max_value(next_state.to_tuple())
             
             target = reward + self.discount_factor * max_next_q
         
@@ -422,51 +418,37 @@ class QLearningRouter:
         # Decay epsilon
         self.epsilon = max(self.epsilon_min, self.epsilon * self.epsilon_decay)
     
-    def save_q_table(self):
-        """Save Q-table to disk."""
+    def save_q_table(self, incremental: bool = True):
+        """
+        Save Q-table to disk as a binary snapshot.
+        
+        Incremental saves only write the states updated since the last save
+        (see ``CompactQTable.save``).
+        """
         try:
-            # Convert Q-table to serializable format
-            q_table_dict = {}
-            for state_key, actions in self.q_table.items():
-                state_str = json.dumps(state_key)
-                q_table_dict[state_str] = {}
-                for action_key, value in actions.items():
-                    action_str = json.dumps(action_key)
-                    q_table_dict[state_str][action_str] = value
-            
-            # Save with metadata
-            save_data = {
-                'q_table': q_table_dict,
+            metadata = {
                 'epsilon': self.epsilon,
                 'episode_count': len(self.episode_rewards),
                 'timestamp': datetime.now().isoformat()
             }
+            written = self.q_table.save(self.snapshot_path, metadata=metadata, incremental=incremental)
             
-            with open(self.save_path, 'w') as f:
-                json.dump(save_data, f, indent=2)
-            
-            logger.info(f"Q-table saved to {self.save_path}")
+            logger.info(f"Q-table saved to {written}")
             
         except Exception as e:
             logger.error(f"Failed to save Q-table: {e}")
     
     def load_q_table(self):
-        """Load Q-table from disk."""
-        if not self.save_path.exists():
-            logger.info("No saved Q-table found, starting fresh")
-            return
-        
+        """Load Q-table from disk (binary snapshot, or a legacy JSON Q-table)."""
+        actions = [action.to_tuple() for action in self.action_space]
         try:
-            with open(self.save_path, 'r') as f:
-                save_data = json.load(f)
-            
-            # Restore Q-table
-            q_table_dict = save_data.get('q_table', {})
-            for state_str, actions in q_table_dict.items():
-                state_key = tuple(json.loads(state_str))
-                for action_str, value in actions.items():
-                    action_key = tuple(json.loads(action_str))
-                    self.q_table[state_key][action_key] = value
+            if self.snapshot_path.exists():
+                self.q_table, save_data = CompactQTable.load(self.snapshot_path, actions)
+            elif self.legacy_json_path.exists():
+                save_data = self._load_legacy_json(actions)
+            else:
+                logger.info("No saved Q-table found, starting fresh")
+                return
             
             # Restore metadata
             self.epsilon = save_data.get('epsilon', self.epsilon)
@@ -477,6 +459,21 @@ class QLearningRouter:
         except Exception as e:
             logger.error(f"Failed to load Q-table: {e}")
     
+    def _load_legacy_json(self, actions: List[tuple]) -> Dict[str, Any]:
+        """Import a Q-table saved by the JSON writer used before binary snapshots."""
+        with open(self.legacy_json_path, 'r') as f:
+            save_data = json.load(f)
+        
+        q_table_dict = {
+            tuple(json.loads(state_str)): {
+                tuple(json.loads(action_str)): value
+                for action_str, value in action_values.items()
+            }
+            for state_str, action_values in save_data.get('q_table', {}).items()
+        }
+        self.q_table = CompactQTable.from_nested(q_table_dict, actions)
+        return save_data
+    
     async def route_task(
         self,
         task_type: str,
@@ -525,6 +522,8 @@ class QLearningRouter:
         """Get learning statistics."""
         stats = {
             'total_states': len(self.q_table),
+            'total_entries': self.q_table.num_entries,
+            'q_table_bytes': self.q_table.memory_bytes(),
             'total_experiences': len(self.experience_buffer),
             'epsilon': self.epsilon,
             'episodes': len(self.episode_rewards),
@@ -534,14 +533,13 @@ class QLearningRouter:
         
         # Get most confident routes
         top_routes = []
-        for state_key, actions in list(self.q_table.items())[:10]:
-            if actions:
-                best_action_key, best_q = max(actions.items(), key=lambda x: x[1])
-                top_routes.append({
-                    'state': state_key,
-                    'action': best_action_key,
-                    'q_value': best_q
-                })
+        for _, (state_key, _) in zip(range(10), self.q_table.items()):
+            best_action_key, best_q = self.q_table.best(state_key)
+            top_routes.append({
+                'state': state_key,
+                'action': best_action_key,
+                'q_value': best_q
+            })
         
         stats['top_routes'] = sorted(top_routes, key=lambda x: x['q_value'], reverse=True)[:5]
         
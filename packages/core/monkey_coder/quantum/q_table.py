@@ -0,0 +1,454 @@
+"""
+Compact Tabular Q-Store
+
+Q-values for ``QLearningRouter`` held in one dense NumPy matrix. State and
+action keys (the hashable tuples from ``State.to_tuple`` / ``Action.to_tuple``)
+are interned to integer row and column ids, so
+
+- a lookup is one dict probe plus an array read,
+- the greedy action of a state is an ``argmax`` over its row,
+- unset entries hold ``-inf`` (read back as 0.0), so they never win the
+  argmax and a state with no known actions is detected in O(1),
+- each row caches its greedy column; writes keep it current and only a
+  decrease of the current best forces a fresh ``argmax``.
+
+Snapshots are uncompressed ``.npz`` files written to a temporary file and
+moved into place with ``os.replace``; mostly-empty matrices are stored as
+(row, column, value) entries. Saves can be incremental: rows changed
+since the last save go to a small delta file next to the base snapshot, and
+a full snapshot (which starts a new generation and removes old deltas) is
+written once deltas pile up.
+"""
+
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+UNSET = -np.inf
+
+PathLike = Union[str, Path]
+
+
+def encode_keys(keys: List[tuple]) -> np.ndarray:
+    """
+    Pack key tuples into a structured array (one typed field per position).
+
+    Falls back to an array of JSON strings when positions mix types.
+    """
+    if keys:
+        width = len(keys[0])
+        fields = []
+        try:
+            if any(len(key) != width for key in keys):
+                raise TypeError("keys differ in length")
+            for position, column in enumerate(zip(*keys)):
+                types = set(map(type, column))
+                if types <= {bool, np.bool_}:
+                    dtype: Any = np.bool_
+                elif types <= {int, np.int32, np.int64}:
+                    dtype = np.int64
+                elif types <= {int, float, np.int32, np.int64, np.float32, np.float64}:
+                    dtype = np.float64
+                elif types == {str}:
+                    dtype = f"U{max(1, max(map(len, column)))}"
+                else:
+                    raise TypeError(f"mixed types at key position {position}")
+                fields.append((f"f{position}", dtype))
+            return np.array(keys, dtype=fields)
+        except (TypeError, ValueError):
+            pass
+    return np.array([json.dumps(list(key)) for key in keys], dtype=str)
+
+
+def decode_keys(packed: np.ndarray) -> List[tuple]:
+    """Inverse of ``encode_keys``."""
+    if packed.dtype.names:
+        return packed.tolist()
+    return [tuple(json.loads(item)) for item in packed.tolist()]
+
+
+class CompactQTable:
+    """Dense Q-matrix with interned state and action keys."""
+
+    def __init__(self, actions: Iterable[tuple] = (), initial_states: int = 1024):
+        """
+        Initialize an empty table.
+
+        Args:
+            actions: Action keys to intern up front (column order)
+            initial_states: Initial row capacity
+        """
+        self._state_ids: Dict[tuple, int] = {}
+        self._state_keys: List[tuple] = []
+        self._action_ids: Dict[tuple, int] = {}
+        self._action_keys: List[tuple] = []
+
+        actions = list(actions)
+        self._values = np.full((max(1, initial_states), max(8, len(actions))), UNSET)
+        self._known = np.zeros(self._values.shape[0], dtype=np.int32)  # set entries per row
+        self._best = np.full(self._values.shape[0], -1, dtype=np.int32)  # greedy column, -1 if stale
+        self._num_entries = 0
+        self._num_known_states = 0
+        for action in actions:
+            self._intern_action(action)
+
+        # Incremental snapshot bookkeeping
+        self._dirty: Set[int] = set()
+        self._saved_states = 0
+        self._saved_actions = 0
+        self._generation: Optional[int] = None
+        self._sequence = 0
+        self._snapshot_path: Optional[Path] = None
+
+    # ------------------------------------------------------------------
+    # Interning
+    # ------------------------------------------------------------------
+
+    def _intern_state(self, key: tuple) -> int:
+        state_id = self._state_ids.get(key)
+        if state_id is None:
+            state_id = len(self._state_keys)
+            if state_id == self._values.shape[0]:
+                self._grow(rows=state_id + 1)
+            self._state_ids[key] = state_id
+            self._state_keys.append(key)
+        return state_id
+
+    def _intern_action(self, key: tuple) -> int:
+        action_id = self._action_ids.get(key)
+        if action_id is None:
+            action_id = len(self._action_keys)
+            if action_id == self._values.shape[1]:
+                self._grow(columns=action_id + 1)
+            self._action_ids[key] = action_id
+            self._action_keys.append(key)
+        return action_id
+
+    def _grow(self, rows: int = 0, columns: int = 0) -> None:
+        """Make room for at least ``rows`` x ``columns`` (rows grow 1.5x, columns by 1/8)."""
+        old_rows, old_columns = self._values.shape
+        if rows <= old_rows and columns <= old_columns:
+            return
+        if rows > old_rows:
+            rows = max(rows, old_rows + old_rows // 2)
+        if columns > old_columns:
+            columns = max(columns, old_columns + max(8, old_columns // 8))
+        rows = max(rows, old_rows)
+        columns = max(columns, old_columns)
+        values = np.empty((rows, columns))
+        values[:old_rows, :old_columns] = self._values
+        values[:old_rows, old_columns:] = UNSET
+        values[old_rows:] = UNSET
+        self._values = values
+        if rows > old_rows:
+            known = np.zeros(rows, dtype=np.int32)
+            known[:old_rows] = self._known
+            self._known = known
+            best = np.full(rows, -1, dtype=np.int32)
+            best[:old_rows] = self._best
+            self._best = best
+
+    def state_id(self, key: tuple) -> int:
+        """Row id of a state key, or -1 if the state was never seen."""
+        return self._state_ids.get(key, -1)
+
+    def action_id(self, key: tuple) -> int:
+        """Column id of an action key, or -1 if unknown."""
+        return self._action_ids.get(key, -1)
+
+    # ------------------------------------------------------------------
+    # Q-values
+    # ------------------------------------------------------------------
+
+    def get(self, state_key: tuple, action_key: tuple) -> float:
+        """Q-value of a state-action pair (0.0 if never set)."""
+        state_id = self._state_ids.get(state_key)
+        action_id = self._action_ids.get(action_key)
+        if state_id is None or action_id is None:
+            return 0.0
+        value = self._values[state_id, action_id]
+        return 0.0 if value == UNSET else float(value)
+
+    def set(self, state_key: tuple, action_key: tuple, value: float) -> None:
+        """Set the Q-value of a state-action pair."""
+        action_id = self._intern_action(action_key)
+        state_id = self._intern_state(state_key)
+        row = self._values[state_id]
+        previous = row[action_id]
+        if previous == UNSET:
+            self._num_entries += 1
+            if self._known[state_id] == 0:
+                self._num_known_states += 1
+            self._known[state_id] += 1
+
+        best = self._best[state_id]
+        if best == action_id:
+            if value < previous:
+                self._best[state_id] = -1
+        elif best >= 0:
+            best_value = row[best]
+            # Ties go to the lower column, as with argmax
+            if value > best_value or (value == best_value and action_id < best):
+                self._best[state_id] = action_id
+
+        row[action_id] = value
+        self._dirty.add(state_id)
+
+    def best(self, state_key: tuple) -> Optional[Tuple[tuple, float]]:
+        """Greedy (action key, Q-value) for a state, or None with no known actions."""
+        state_id = self._state_ids.get(state_key)
+        if state_id is None or not self._known[state_id]:
+            return None
+        action_id = self._best[state_id]
+        if action_id < 0:
+            action_id = self._best[state_id] = self._values[state_id, :len(self._action_keys)].argmax()
+        return self._action_keys[action_id], float(self._values[state_id, action_id])
+
+    def max_value(self, state_key: tuple, default: float = 0.0) -> float:
+        """Largest known Q-value of a state (``default`` with no known actions)."""
+        best = self.best(state_key)
+        return default if best is None else best[1]
+
+    def actions_of(self, state_key: tuple) -> Dict[tuple, float]:
+        """Known action values of one state."""
+        state_id = self._state_ids.get(state_key)
+        if state_id is None:
+            return {}
+        row = self._values[state_id, :len(self._action_keys)]
+        return {self._action_keys[i]: float(row[i]) for i in np.flatnonzero(row != UNSET)}
+
+    def items(self) -> Iterator[Tuple[tuple, Dict[tuple, float]]]:
+        """Iterate (state key, known action values) for states with knowledge."""
+        for state_id in np.flatnonzero(self._known[:len(self._state_keys)]):
+            key = self._state_keys[state_id]
+            yield key, self.actions_of(key)
+
+    def __contains__(self, state_key: tuple) -> bool:
+        state_id = self._state_ids.get(state_key)
+        return state_id is not None and bool(self._known[state_id])
+
+    def __len__(self) -> int:
+        return self._num_known_states
+
+    @property
+    def num_entries(self) -> int:
+        """Number of set state-action values."""
+        return self._num_entries
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        """(interned states, interned actions)."""
+        return len(self._state_keys), len(self._action_keys)
+
+    def memory_bytes(self) -> int:
+        """Bytes held by the value matrix and row counters."""
+        return int(self._values.nbytes + self._known.nbytes)
+
+    @classmethod
+    def from_nested(cls, table: Dict[tuple, Dict[tuple, float]], actions: Iterable[tuple] = ()) -> "CompactQTable":
+        """Build from the ``{state: {action: value}}`` layout of the old dict Q-table."""
+        q_table = cls(actions, initial_states=max(1, len(table)))
+        for state_key, action_values in table.items():
+            for action_key, value in action_values.items():
+                q_table.set(state_key, action_key, value)
+        return q_table
+
+    # ------------------------------------------------------------------
+    # Snapshots
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _delta_glob(path: Path, generation: Any = "*") -> str:
+        return f"{path.stem}.delta-{generation}-*.npz"
+
+    @staticmethod
+    def _write_npz(path: Path, arrays: Dict[str, np.ndarray]) -> None:
+        """Write an uncompressed npz atomically (temporary file + rename)."""
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, **arrays)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def save(
+        self,
+        path: PathLike,
+        metadata: Optional[Dict[str, Any]] = None,
+        incremental: bool = True,
+        max_deltas: int = 16,
+        compact_fraction: float = 0.25,
+    ) -> Path:
+        """
+        Snapshot the table.
+
+        With ``incremental`` set and an existing base snapshot of this table at
+        ``path``, only rows changed since the last save (and newly interned
+        keys) are written, as a delta file. A full snapshot is written instead
+        when there is no base yet, ``max_deltas`` deltas already exist, or more
+        than ``compact_fraction`` of the rows changed.
+
+        Args:
+            path: Base snapshot path (``.npz``)
+            metadata: JSON-serialisable metadata stored with the snapshot
+            incremental: Allow delta saves
+            max_deltas: Deltas per generation before compacting
+            compact_fraction: Changed-row fraction that forces a full snapshot
+
+        Returns:
+            Path of the file written
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        meta = np.array(json.dumps(metadata or {}))
+        num_states, num_actions = self.shape
+
+        use_delta = (
+            incremental
+            and self._generation is not None
+            and self._snapshot_path == path
+            and path.exists()
+            and self._sequence < max_deltas
+            and len(self._dirty) <= compact_fraction * max(1, num_states)
+        )
+        if use_delta:
+            self._sequence += 1
+            rows = np.fromiter(sorted(self._dirty), dtype=np.int64, count=len(self._dirty))
+            target = path.with_name(f"{path.stem}.delta-{self._generation}-{self._sequence:06d}.npz")
+            self._write_npz(target, {
+                "format_version": np.array(FORMAT_VERSION),
+                "generation": np.array(self._generation),
+                "sequence": np.array(self._sequence),
+                "state_offset": np.array(self._saved_states),
+                "state_keys": encode_keys(self._state_keys[self._saved_states:]),
+                "action_offset": np.array(self._saved_actions),
+                "action_keys": encode_keys(self._action_keys[self._saved_actions:]),
+                "rows": rows,
+                "values": self._values[rows, :num_actions],
+                "metadata": meta,
+            })
+        else:
+            generation = time.time_ns()
+            target = path
+            arrays = {
+                "format_version": np.array(FORMAT_VERSION),
+                "generation": np.array(generation),
+                "state_keys": encode_keys(self._state_keys),
+                "action_keys": encode_keys(self._action_keys),
+                "metadata": meta,
+            }
+            values = self._values[:num_states, :num_actions]
+            if self._num_entries * 2 < values.size:
+                # 4 + 4 + 8 bytes per entry beats 8 bytes per cell below half occupancy
+                mask = values != UNSET
+                rows, columns = np.divmod(np.flatnonzero(mask), num_actions)
+                arrays["rows"] = rows.astype(np.int32)
+                arrays["columns"] = columns.astype(np.int32)
+                arrays["entries"] = values[mask]
+            else:
+                arrays["values"] = values
+            self._write_npz(path, arrays)
+            # Deltas of earlier generations no longer apply to this base
+            for stale in path.parent.glob(self._delta_glob(path)):
+                stale.unlink(missing_ok=True)
+            self._generation = generation
+            self._sequence = 0
+            self._snapshot_path = path
+
+        self._dirty.clear()
+        self._saved_states = num_states
+        self._saved_actions = num_actions
+        return target
+
+    def _adopt(self, state_keys: List[tuple], action_keys: List[tuple], values: np.ndarray) -> None:
+        """Take over a loaded value matrix as-is instead of growing into it."""
+        self._state_keys = list(state_keys)
+        self._state_ids = dict(zip(self._state_keys, range(len(self._state_keys))))
+        self._action_keys = list(action_keys)
+        self._action_ids = dict(zip(self._action_keys, range(len(self._action_keys))))
+        if values.shape[0] == 0 or values.shape[1] == 0:
+            values = np.full((max(1, values.shape[0]), max(8, values.shape[1])), UNSET)
+        self._values = values
+        self._known = np.count_nonzero(values != UNSET, axis=1).astype(np.int32)
+        self._best = np.full(values.shape[0], -1, dtype=np.int32)
+
+    def _load_keys(self, state_keys: List[tuple], action_keys: List[tuple]) -> None:
+        # Grow once for both dimensions rather than per interned key
+        rows = len(self._state_keys) + len(state_keys)
+        columns = len(self._action_keys) + len(action_keys)
+        self._grow(rows=rows, columns=columns)
+        for key in action_keys:
+            self._intern_action(key)
+        start = len(self._state_keys)
+        self._state_keys.extend(state_keys)
+        self._state_ids.update(zip(state_keys, range(start, start + len(state_keys))))
+
+    def _load_rows(self, rows: np.ndarray, values: np.ndarray) -> None:
+        self._values[rows, :values.shape[1]] = values
+        self._known[rows] = np.count_nonzero(values != UNSET, axis=1)
+        self._best[rows] = -1
+
+    @classmethod
+    def load(cls, path: PathLike, actions: Iterable[tuple] = ()) -> Tuple["CompactQTable", Dict[str, Any]]:
+        """
+        Load a base snapshot and the deltas of its generation.
+
+        Args:
+            path: Base snapshot path
+            actions: Action keys to intern before the stored ones (ignored if
+                the snapshot already lists them)
+
+        Returns:
+            Tuple of (table, metadata of the newest file applied)
+        """
+        path = Path(path)
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["format_version"]) > FORMAT_VERSION:
+                raise ValueError(f"Unsupported Q-table snapshot version {int(data['format_version'])}")
+            state_keys = decode_keys(data["state_keys"])
+            stored_actions = decode_keys(data["action_keys"])
+            if "values" in data:
+                values = data["values"]
+            else:
+                values = np.full((len(state_keys), len(stored_actions)), UNSET)
+                values[data["rows"], data["columns"]] = data["entries"]
+            generation = int(data["generation"])
+            metadata = json.loads(str(data["metadata"]))
+
+        table = cls(initial_states=1)
+        table._adopt(state_keys, stored_actions, values)
+
+        sequence = 0
+        for delta_path in sorted(path.parent.glob(cls._delta_glob(path, generation))):
+            with np.load(delta_path, allow_pickle=False) as delta:
+                # Deltas extend the key lists in order; a gap means a delta is missing
+                if (int(delta["state_offset"]) != len(table._state_keys)
+                        or int(delta["action_offset"]) != len(table._action_keys)):
+                    logger.warning(f"Stopping at out-of-sequence Q-table delta {delta_path.name}")
+                    break
+                table._load_keys(decode_keys(delta["state_keys"]), decode_keys(delta["action_keys"]))
+                table._load_rows(delta["rows"], delta["values"])
+                sequence = int(delta["sequence"])
+                metadata = json.loads(str(delta["metadata"]))
+
+        # Column ids must match the saved ones, so extra actions come last
+        for action in actions:
+            table._intern_action(action)
+
+        num_states, num_actions = table.shape
+        table._num_known_states = int(np.count_nonzero(table._known[:num_states]))
+        table._num_entries = int(table._known[:num_states].sum())
+        table._generation = generation
+        table._sequence = sequence
+        table._snapshot_path = path
+        table._saved_states = num_states
+        table._saved_actions = num_actions
+        return table, metadata
@@ -78,6 +78,8 @@ class DQNRouterBridge:
         # Training data collection
         self.training_data = []
         self.performance_history = {}  # Provider performance tracking
+        self._provider_history: Dict[ProviderType, ProviderPerformanceHistory] = {}
+        self._tracked_providers = set()
         
     def route_request(self, request: ExecuteRequest) -> EnhancedRoutingDecision:
         """
@@ -240,23 +242,31 @@ class DQNRouterBridge:
         )
     
     def _get_provider_performance_history(self) -> Dict[ProviderType, ProviderPerformanceHistory]:
-        """Get provider performance history for all providers."""
-        history = {}
+        """Get provider performance history for all providers.
+
+        The same history objects are returned on every call and updated in
+        place, so the state encoder can keep its cached provider section until
+        the tracked metrics actually change.
+        """
+        history = self._provider_history
         
         for provider in ProviderType:
             if provider.value in self.performance_history:
                 # Use tracked performance data
                 perf_data = self.performance_history[provider.value]
-                history[provider] = ProviderPerformanceHistory(
-                    recent_success_rate=perf_data.get("success_rate", 0.85),
-                    recent_avg_latency=perf_data.get("avg_latency", 2.0),
-                    recent_avg_quality=perf_data.get("avg_quality", 0.8),
-                    long_term_reputation=perf_data.get("reputation", 0.85),
-                    total_interactions=perf_data.get("interactions", 100)
-                )
-            else:
+                entry = history.get(provider)
+                if entry is None:
+                    entry = history[provider] = ProviderPerformanceHistory()
+                entry.recent_success_rate = perf_data.get("success_rate", 0.85)
+                entry.recent_avg_latency = perf_data.get("avg_latency", 2.0)
+                entry.recent_avg_quality = perf_data.get("avg_quality", 0.8)
+                entry.long_term_reputation = perf_data.get("reputation", 0.85)
+                entry.total_interactions = perf_data.get("interactions", 100)
+                self._tracked_providers.add(provider)
+            elif provider not in history or provider in self._tracked_providers:
                 # Use default performance metrics
                 history[provider] = ProviderPerformanceHistory()
+                self._tracked_providers.discard(provider)
         
         return history
     
@@ -388,7 +398,7 @@ class DQNRouterBridge:
             "state_dimensions": self.state_encoder.state_size if self.state_encoder else 21,
             "training_data_collected": len(self.training_data),
             "provider_performance_tracked": len(self.performance_history),
-            "advanced_router_history": len(self.advanced_router.routing_history)
+            "advanced_router_history": self.advanced_router.routing_history.total
         }
     
     def create_dqn_agent(
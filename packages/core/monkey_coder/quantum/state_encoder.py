@@ -15,15 +15,20 @@ Features:
 """
 
 import hashlib
+import math
 import time
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, Union
 from enum import Enum
 
 import numpy as np
 
 from monkey_coder.models import ProviderType, TaskType
 
+_UNSET = object()
+_PROVIDERS = tuple(ProviderType)  # Iterating the enum itself is slow on hot paths
+_NEUTRAL_SCORES = (0.5,) * len(_PROVIDERS)
+
 
 class ContextComplexity(Enum):
     """Context complexity categories for enhanced encoding."""
@@ -95,9 +100,25 @@ class ProviderPerformanceHistory:
     domain_expertise: Dict[str, float] = field(default_factory=dict)  # Domain-specific performance
     complexity_performance: Dict[ContextComplexity, float] = field(default_factory=dict)
 
-    def get_performance_vector(self) -> np.ndarray:
-        """Convert performance history to vector representation."""
-        return np.array([
+    def __setattr__(self, name: str, value: Any) -> None:
+        # Bump a version counter on every real change so encoders can cache the
+        # provider section of the state vector per (object, version).
+        current = self.__dict__.get(name, _UNSET)
+        if current is value or (
+            isinstance(value, (int, float)) and isinstance(current, (int, float)) and current == value
+        ):
+            return
+        object.__setattr__(self, name, value)
+        object.__setattr__(self, "_version", self.__dict__.get("_version", 0) + 1)
+
+    @property
+    def version(self) -> int:
+        """Change counter, incremented on every attribute assignment that changes a value."""
+        return self.__dict__.get("_version", 0)
+
+    def performance_values(self) -> Tuple[float, ...]:
+        """Performance history as a tuple of the 11 normalized metrics."""
+        return (
             self.recent_success_rate,
             self.recent_avg_latency / 10.0,  # Normalize to ~0-1 range
             self.recent_avg_quality,
@@ -109,7 +130,11 @@ class ProviderPerformanceHistory:
             self.medium_term_reliability,
             self.long_term_reputation,
             min(self.total_interactions / 1000.0, 1.0),  # Normalize experience
-        ], dtype=np.float32)
+        )
+
+    def get_performance_vector(self) -> np.ndarray:
+        """Convert performance history to vector representation."""
+        return np.array(self.performance_values(), dtype=np.float32)
 
 
 @dataclass
@@ -139,29 +164,25 @@ class UserPreferences:
     # Personalization strength
     personalization_strength: float = 0.3  # How much to weight user preferences
 
-    def get_preference_vector(self) -> np.ndarray:
-        """Convert preferences to vector representation."""
-        # Provider preference scores
-        provider_scores = []
-        for provider in ProviderType:
-            provider_scores.append(self.provider_preference_scores.get(provider, 0.5))
-
-        # Strategy preferences
-        strategy_scores = [
-            self.preferred_strategies["task_optimized"],
-            self.preferred_strategies["cost_efficient"],
-            self.preferred_strategies["performance"],
-            self.preferred_strategies["balanced"]
-        ]
-
-        return np.array([
-            *provider_scores,  # 5 provider scores
-            *strategy_scores,  # 4 strategy scores
+    def preference_values(self) -> Tuple[float, ...]:
+        """Preferences as a tuple of 13 values (5 providers, 4 strategies, 4 trade-offs)."""
+        scores = self.provider_preference_scores
+        strategies = self.preferred_strategies
+        return (
+            *([scores.get(provider, 0.5) for provider in _PROVIDERS] if scores else _NEUTRAL_SCORES),
+            strategies["task_optimized"],
+            strategies["cost_efficient"],
+            strategies["performance"],
+            strategies["balanced"],
             self.quality_vs_speed_preference,
             self.cost_sensitivity,
             self.risk_tolerance,
             self.personalization_strength
-        ], dtype=np.float32)
+        )
+
+    def get_preference_vector(self) -> np.ndarray:
+        """Convert preferences to vector representation."""
+        return np.array(self.preference_values(), dtype=np.float32)
 
 
 @dataclass
@@ -186,9 +207,9 @@ class ResourceConstraints:
     has_priority_access: bool = False
     billing_tier: str = "standard"  # "free", "standard", "premium", "enterprise"
 
-    def get_constraint_vector(self) -> np.ndarray:
-        """Convert constraints to vector representation."""
-        return np.array([
+    def constraint_values(self) -> Tuple[float, ...]:
+        """Constraints as a tuple of 10 normalized values."""
+        return (
             self.max_cost_per_request / 10.0 if self.max_cost_per_request else 1.0,  # Normalized
             self.max_latency_seconds / 60.0 if self.max_latency_seconds else 1.0,   # Normalized
             self.min_quality_threshold if self.min_quality_threshold else 0.0,
@@ -198,8 +219,33 @@ class ResourceConstraints:
             self.constraint_flexibility,
             1.0 if self.is_premium_user else 0.0,
             1.0 if self.has_priority_access else 0.0,
-            {"free": 0.0, "standard": 0.33, "premium": 0.66, "enterprise": 1.0}.get(self.billing_tier, 0.33)
-        ], dtype=np.float32)
+            _BILLING_TIERS.get(self.billing_tier, 0.33)
+        )
+
+    def get_constraint_vector(self) -> np.ndarray:
+        """Convert constraints to vector representation."""
+        return np.array(self.constraint_values(), dtype=np.float32)
+
+
+_BILLING_TIERS = {"free": 0.0, "standard": 0.33, "premium": 0.66, "enterprise": 1.0}
+
+
+def _one_hot(members: List[Enum]) -> Dict[Any, Tuple[float, ...]]:
+    """One-hot rows by member (and by value for str enums, which compare equal to it)."""
+    table: Dict[Any, Tuple[float, ...]] = {}
+    for member in members:
+        row = tuple(1.0 if other == member else 0.0 for other in members)
+        table[member] = row
+        if isinstance(member, str):
+            table[member.value] = row
+    return table
+
+
+_COMPLEXITY_ONE_HOT = _one_hot([ContextComplexity.SIMPLE, ContextComplexity.MODERATE,
+                                ContextComplexity.COMPLEX, ContextComplexity.CRITICAL])
+_TASK_TYPE_ONE_HOT = _one_hot([TaskType.CODE_GENERATION, TaskType.CODE_ANALYSIS,
+                               TaskType.DEBUGGING, TaskType.TESTING])
+_NO_MATCH = (0.0,) * 4
 
 
 class AdvancedStateEncoder:
@@ -252,6 +298,22 @@ class AdvancedStateEncoder:
             self.context_dimensions
         )
 
+        # Section slices of the state vector, in encoding order
+        offset = 0
+        sections = []
+        for size in (self.base_dimensions, self.provider_dimensions, self.preference_dimensions,
+                     self.constraint_dimensions, self.temporal_dimensions, self.context_dimensions):
+            sections.append(slice(offset, offset + size))
+            offset += size
+        (self._task_slice, self._provider_slice, self._preference_slice,
+         self._constraint_slice, self._temporal_slice, self._context_slice) = sections
+        self._tail_slice = slice(self._preference_slice.start, self.total_dimensions)
+        self._neutral_preferences = (0.5,) * self.preference_dimensions
+
+        self._weight_table = self._build_weight_table()
+        self._provider_cache_key: Optional[Tuple[Any, ...]] = None
+        self._provider_cache: Optional[np.ndarray] = None
+
     def encode_state(
         self,
         task_context: TaskContextProfile,
@@ -273,81 +335,204 @@ class AdvancedStateEncoder:
         Returns:
             High-dimensional state vector for DQN
         """
-        state_components = []
-
-        # 1. Core task features (15 dimensions)
-        task_features = self._encode_task_context(task_context)
-        state_components.append(task_features)
-
-        # 2. Provider performance features (55 dimensions: 5 providers × 11 metrics)
-        provider_features = self._encode_provider_history(provider_history, provider_availability)
-        state_components.append(provider_features)
-
-        # 3. User preference features (13 dimensions)
-        if self.enable_user_personalization:
-            preference_features = user_preferences.get_preference_vector()
-            state_components.append(preference_features)
-        else:
-            # Use neutral preferences if personalization disabled
-            neutral_prefs = np.full(self.preference_dimensions, 0.5, dtype=np.float32)
-            state_components.append(neutral_prefs)
-
-        # 4. Resource constraint features (10 dimensions)
-        constraint_features = resource_constraints.get_constraint_vector()
-        state_components.append(constraint_features)
+        out = np.empty(self.total_dimensions, dtype=np.float32)
+        return self.encode_into(
+            out, task_context, provider_history, user_preferences,
+            resource_constraints, provider_availability
+        )
 
-        # 5. Temporal features (8 dimensions)
-        if self.enable_temporal_features:
-            temporal_features = self._encode_temporal_context(task_context)
-            state_components.append(temporal_features)
+    def encode_into(
+        self,
+        out: np.ndarray,
+        task_context: TaskContextProfile,
+        provider_history: Dict[ProviderType, ProviderPerformanceHistory],
+        user_preferences: UserPreferences,
+        resource_constraints: ResourceConstraints,
+        provider_availability: Dict[ProviderType, bool]
+    ) -> np.ndarray:
+        """
+        Encode the state into a preallocated float32 buffer.
 
-        # 6. Contextual features (6 dimensions)
-        context_features = self._encode_contextual_factors(task_context, provider_availability)
-        state_components.append(context_features)
+        Each section is written straight into its slice of ``out`` (a 1-D
+        float32 array of ``state_size``, e.g. a row of a batch buffer), and
+        the provider section is reused from cache while the histories and
+        availability are unchanged. Produces exactly the values of
+        ``encode_state``.
 
-        # Combine all features
-        complete_state = np.concatenate(state_components)
+        Returns:
+            ``out``
+        """
+        if out.shape != (self.total_dimensions,) or out.dtype != np.float32:
+            raise ValueError(
+                f"out must be a float32 array of shape ({self.total_dimensions},), "
+                f"got {out.dtype} {out.shape}"
+            )
+
+        out[self._task_slice] = self._task_values(task_context)
+        out[self._provider_slice] = self._provider_section(provider_history, provider_availability)
+
+        # Preference, constraint, temporal and context sections are contiguous: one write
+        available = sum(1 for available in provider_availability.values() if available)
+        out[self._tail_slice] = (
+            *(user_preferences.preference_values() if self.enable_user_personalization
+              else self._neutral_preferences),
+            *resource_constraints.constraint_values(),
+            *(self._temporal_values(task_context, self._current_hour()) if self.enable_temporal_features
+              else ()),
+            *self._context_values(task_context, available, len(provider_availability)),
+        )
 
-        # Apply dynamic weighting if enabled
         if self.enable_dynamic_weighting:
-            complete_state = self._apply_dynamic_weighting(complete_state, task_context)
+            weight_index = self._weight_index(task_context)
+            if weight_index:
+                out *= self._weight_table[weight_index]
+        return out
 
-        # Ensure correct dimensionality
-        assert len(complete_state) == self.total_dimensions, \
-            f"State vector has {len(complete_state)} dimensions, expected {self.total_dimensions}"
+    def encode_batch(
+        self,
+        task_contexts: Sequence[TaskContextProfile],
+        provider_history: Union[Dict[ProviderType, ProviderPerformanceHistory],
+                                Sequence[Dict[ProviderType, ProviderPerformanceHistory]]],
+        user_preferences: Union[UserPreferences, Sequence[UserPreferences]],
+        resource_constraints: Union[ResourceConstraints, Sequence[ResourceConstraints]],
+        provider_availability: Union[Dict[ProviderType, bool], Sequence[Dict[ProviderType, bool]]],
+        out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Encode many requests at once into a ``(len(task_contexts), state_size)`` array.
 
-        return complete_state
+        The provider history, preferences, constraints and availability may
+        each be a single object shared by every request (written once and
+        broadcast) or a sequence with one entry per request. Row ``i`` equals
+        ``encode_state`` for request ``i``.
 
-    def _encode_task_context(self, task_context: TaskContextProfile) -> np.ndarray:
-        """Encode task context into feature vector."""
-        features = []
+        Args:
+            task_contexts: One task context per request
+            provider_history: Shared provider histories or one mapping per request
+            user_preferences: Shared preferences or one per request
+            resource_constraints: Shared constraints or one per request
+            provider_availability: Shared availability or one mapping per request
+            out: Optional preallocated float32 buffer of the result shape
+
+        Returns:
+            The encoded states (``out`` when given)
+        """
+        n = len(task_contexts)
+        if out is None:
+            out = np.empty((n, self.total_dimensions), dtype=np.float32)
+        elif out.shape != (n, self.total_dimensions) or out.dtype != np.float32:
+            raise ValueError(
+                f"out must be a float32 array of shape ({n}, {self.total_dimensions}), "
+                f"got {out.dtype} {out.shape}"
+            )
+        if n == 0:
+            return out
+
+        histories = self._per_request(provider_history, dict, n, "provider_history")
+        availabilities = self._per_request(provider_availability, dict, n, "provider_availability")
+        preferences = self._per_request(user_preferences, UserPreferences, n, "user_preferences")
+        constraints = self._per_request(resource_constraints, ResourceConstraints, n, "resource_constraints")
+
+        out[:, self._task_slice] = [self._task_values(ctx) for ctx in task_contexts]
+
+        if histories is None and availabilities is None:
+            out[:, self._provider_slice] = self._provider_section(provider_history, provider_availability)
+        else:
+            out[:, self._provider_slice] = [
+                self._provider_section(
+                    provider_history if histories is None else histories[i],
+                    provider_availability if availabilities is None else availabilities[i],
+                )
+                for i in range(n)
+            ]
+
+        if not self.enable_user_personalization:
+            out[:, self._preference_slice] = 0.5
+        elif preferences is None:
+            out[:, self._preference_slice] = user_preferences.preference_values()
+        else:
+            out[:, self._preference_slice] = [p.preference_values() for p in preferences]
 
-        # Basic complexity
-        features.append(task_context.estimated_complexity)
+        if constraints is None:
+            out[:, self._constraint_slice] = resource_constraints.constraint_values()
+        else:
+            out[:, self._constraint_slice] = [c.constraint_values() for c in constraints]
 
-        # Complexity category (one-hot)
-        complexity_categories = [ContextComplexity.SIMPLE, ContextComplexity.MODERATE,
-                               ContextComplexity.COMPLEX, ContextComplexity.CRITICAL]
-        for category in complexity_categories:
-            features.append(1.0 if task_context.complexity_category == category else 0.0)
+        if self.enable_temporal_features:
+            current_hour = self._current_hour()
+            out[:, self._temporal_slice] = [
+                self._temporal_values(ctx, current_hour) for ctx in task_contexts
+            ]
 
-        # Task type (one-hot encoding for major types)
-        task_types = [TaskType.CODE_GENERATION, TaskType.CODE_ANALYSIS,
-                     TaskType.DEBUGGING, TaskType.TESTING]
-        for task_type in task_types:
-            features.append(1.0 if task_context.task_type == task_type else 0.0)
+        if availabilities is None:
+            counts = [(sum(1 for a in provider_availability.values() if a), len(provider_availability))] * n
+        else:
+            counts = [(sum(1 for a in avail.values() if a), len(avail)) for avail in availabilities]
+        out[:, self._context_slice] = [
+            self._context_values(ctx, available, total)
+            for ctx, (available, total) in zip(task_contexts, counts)
+        ]
 
-        # Requirements
-        features.extend([
+        if self.enable_dynamic_weighting:
+            weight_index = np.fromiter(
+                (self._weight_index(ctx) for ctx in task_contexts), dtype=np.intp, count=n
+            )
+            if weight_index.any():
+                out *= self._weight_table[weight_index]
+        return out
+
+    @staticmethod
+    def _per_request(value: Any, shared_type: type, n: int, name: str) -> Optional[Sequence[Any]]:
+        """None for a value shared by the whole batch, else the per-request sequence."""
+        if isinstance(value, shared_type):
+            return None
+        if len(value) != n:
+            raise ValueError(f"{name} has {len(value)} entries for a batch of {n}")
+        return value
+
+    def _task_values(self, task_context: TaskContextProfile) -> Tuple[float, ...]:
+        """Core task features (15 values)."""
+        return (
+            task_context.estimated_complexity,
+            *_COMPLEXITY_ONE_HOT.get(task_context.complexity_category, _NO_MATCH),  # Complexity category
+            *_TASK_TYPE_ONE_HOT.get(task_context.task_type, _NO_MATCH),  # Major task types (one-hot)
+            # Requirements
             task_context.quality_threshold,
             min(task_context.latency_requirement / 30.0, 1.0),  # Normalize to 30s max
             task_context.cost_sensitivity,
             1.0 if task_context.requires_reasoning else 0.0,
             1.0 if task_context.requires_creativity else 0.0,
             1.0 if task_context.is_production else 0.0
-        ])
+        )
 
-        return np.array(features, dtype=np.float32)
+    def _encode_task_context(self, task_context: TaskContextProfile) -> np.ndarray:
+        """Encode task context into feature vector."""
+        return np.array(self._task_values(task_context), dtype=np.float32)
+
+    def _provider_section(
+        self,
+        provider_history: Dict[ProviderType, ProviderPerformanceHistory],
+        provider_availability: Dict[ProviderType, bool]
+    ) -> np.ndarray:
+        """Provider section, reused while the histories and availability are unchanged."""
+        # Histories are compared by identity first (the key holds them, so ids
+        # can't be reused) and fall back to field equality for fresh objects.
+        try:
+            key = (
+                tuple(provider_availability.items()),
+                tuple(provider_history.items()),
+                tuple([history.version for history in provider_history.values()]),
+            )
+        except AttributeError:
+            # Not versioned, so changes can't be detected
+            return self._encode_provider_history(provider_history, provider_availability)
+
+        if key != self._provider_cache_key:
+            section = self._encode_provider_history(provider_history, provider_availability)
+            section.flags.writeable = False
+            self._provider_cache_key = key
+            self._provider_cache = section
+        return self._provider_cache
 
     def _encode_provider_history(
         self,
@@ -357,7 +542,7 @@ class AdvancedStateEncoder:
         """Encode provider performance history."""
         features = []
 
-        for provider in ProviderType:
+        for provider in _PROVIDERS:
             # Provider availability
             is_available = provider_availability.get(provider, True)
             features.append(1.0 if is_available else 0.0)
@@ -372,21 +557,43 @@ class AdvancedStateEncoder:
 
         return np.array(features, dtype=np.float32)
 
-    def _encode_temporal_context(self, task_context: TaskContextProfile) -> np.ndarray:
-        """Encode temporal context features."""
-        current_time = time.time()
-        current_hour = (current_time // 3600) % 24 / 24.0  # Normalize to 0-1
+    @staticmethod
+    def _current_hour() -> float:
+        return (time.time() // 3600) % 24 / 24.0  # Normalize to 0-1
 
-        return np.array([
+    @staticmethod
+    def _temporal_values(task_context: TaskContextProfile, current_hour: float) -> Tuple[float, ...]:
+        """Temporal features (8 values)."""
+        return (
             task_context.time_of_day,
             task_context.day_of_week / 7.0,  # Normalize to 0-1
             task_context.timezone_offset / 12.0,  # Normalize to -1 to 1 range
             current_hour,
-            np.sin(2 * np.pi * current_hour),  # Cyclical time encoding
-            np.cos(2 * np.pi * current_hour),
-            np.sin(2 * np.pi * task_context.day_of_week / 7.0),  # Cyclical day encoding
-            np.cos(2 * np.pi * task_context.day_of_week / 7.0)
-        ], dtype=np.float32)
+            math.sin(2 * math.pi * current_hour),  # Cyclical time encoding
+            math.cos(2 * math.pi * current_hour),
+            math.sin(2 * math.pi * task_context.day_of_week / 7.0),  # Cyclical day encoding
+            math.cos(2 * math.pi * task_context.day_of_week / 7.0)
+        )
+
+    def _encode_temporal_context(self, task_context: TaskContextProfile) -> np.ndarray:
+        """Encode temporal context features."""
+        return np.array(self._temporal_values(task_context, self._current_hour()), dtype=np.float32)
+
+    @staticmethod
+    def _context_values(
+        task_context: TaskContextProfile,
+        available_providers: int,
+        total_providers: int
+    ) -> Tuple[float, ...]:
+        """Contextual decision factors (6 values)."""
+        return (
+            available_providers / max(total_providers, 1),  # Provider availability ratio
+            len(task_context.domain_requirements) / 5.0,    # Domain complexity (normalize to 5 max)
+            1.0 if task_context.requires_accuracy else 0.0,
+            task_context.estimated_complexity ** 2,         # Non-linear complexity
+            min(task_context.latency_requirement / 120.0, 1.0),  # Extended latency normalization
+            1.0 if available_providers >= 3 else 0.5       # High availability indicator
+        )
 
     def _encode_contextual_factors(
         self,
@@ -395,16 +602,45 @@ class AdvancedStateEncoder:
     ) -> np.ndarray:
         """Encode additional contextual decision factors."""
         available_providers = sum(1 for available in provider_availability.values() if available)
-        total_providers = len(provider_availability)
+        return np.array(
+            self._context_values(task_context, available_providers, len(provider_availability)),
+            dtype=np.float32
+        )
 
-        return np.array([
-            available_providers / max(total_providers, 1),  # Provider availability ratio
-            len(task_context.domain_requirements) / 5.0,    # Domain complexity (normalize to 5 max)
-            1.0 if task_context.requires_accuracy else 0.0,
-            task_context.estimated_complexity ** 2,         # Non-linear complexity
-            min(task_context.latency_requirement / 120.0, 1.0),  # Extended latency normalization
-            1.0 if available_providers >= 3 else 0.5       # High availability indicator
-        ], dtype=np.float32)
+    def _weight_index(self, task_context: TaskContextProfile) -> int:
+        """Row of ``_weight_table`` for the task: bit 2 production, bit 1 accuracy, bit 0 latency."""
+        index = 4 if task_context.is_production else 0
+        if task_context.requires_accuracy and task_context.quality_threshold > 0.8:
+            index |= 2
+        if self.enable_temporal_features and task_context.latency_requirement < 10.0:
+            index |= 1
+        return index
+
+    def _build_weight_table(self) -> np.ndarray:
+        """Precompute the weight vector for each combination of weighting conditions."""
+        table = np.ones((8, self.total_dimensions), dtype=np.float32)
+        for index in range(8):
+            weights = table[index]
+
+            # Boost provider performance features for production tasks
+            if index & 4:
+                provider_start = self.base_dimensions
+                provider_end = provider_start + self.provider_dimensions
+                weights[provider_start:provider_end] *= 1.2
+
+            # Boost quality features for high-accuracy tasks
+            if index & 2:
+                # Emphasize quality-related provider metrics
+                for i in range(5):  # 5 providers
+                    base_idx = self.base_dimensions + i * 11  # 11 metrics per provider
+                    weights[base_idx + 2] *= 1.3  # Quality metric
+
+            # Boost temporal features for time-sensitive tasks
+            if index & 1:
+                weights[self._temporal_slice] *= 1.1
+
+        table.flags.writeable = False
+        return table
 
     def _apply_dynamic_weighting(
         self,
@@ -412,30 +648,7 @@ class AdvancedStateEncoder:
         task_context: TaskContextProfile
     ) -> np.ndarray:
         """Apply dynamic weighting based on task characteristics."""
-        # Create weighting factors based on task requirements
-        weights = np.ones_like(state_vector)
-
-        # Boost provider performance features for production tasks
-        if task_context.is_production:
-            provider_start = self.base_dimensions
-            provider_end = provider_start + self.provider_dimensions
-            weights[provider_start:provider_end] *= 1.2
-
-        # Boost quality features for high-accuracy tasks
-        if task_context.requires_accuracy and task_context.quality_threshold > 0.8:
-            # Emphasize quality-related provider metrics
-            for i in range(5):  # 5 providers
-                base_idx = self.base_dimensions + i * 11  # 11 metrics per provider
-                weights[base_idx + 2] *= 1.3  # Quality metric
-
-        # Boost temporal features for time-sensitive tasks
-        if self.enable_temporal_features and task_context.latency_requirement < 10.0:
-            temporal_start = (self.base_dimensions + self.provider_dimensions +
-                            self.preference_dimensions + self.constraint_dimensions)
-            temporal_end = temporal_start + self.temporal_dimensions
-            weights[temporal_start:temporal_end] *= 1.1
-
-        return state_vector * weights
+        return state_vector * self._weight_table[self._weight_index(task_context)]
 
     def create_routing_state(
         self,
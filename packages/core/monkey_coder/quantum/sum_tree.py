@@ -0,0 +1,166 @@
+"""
+Sum/Min Segment Tree for Prioritized Experience Replay
+
+Array-backed binary segment tree over a fixed number of slots. Each slot
+holds a non-negative priority (already raised to ``alpha`` by the caller);
+internal nodes keep the sum and the minimum of their children, so
+
+- updating a priority is O(log n),
+- drawing a slot proportionally to its priority is an O(log n) prefix-sum
+  descent,
+- the total and the minimum live priority are O(1) reads of the root.
+
+Every operation is vectorised over a batch of slots or prefix sums, so one
+call costs O(log n) NumPy operations of batch length. Shared by
+``PrioritizedExperienceBuffer`` and the DQL ``PrioritizedReplayBuffer``.
+"""
+
+from typing import Optional, Tuple, Union
+
+import numpy as np
+
+ArrayLike = Union[np.ndarray, list, int, float]
+
+
+class SumTree:
+    """Segment tree with sum and min aggregates over ``capacity`` slots."""
+
+    def __init__(self, capacity: int):
+        """
+        Initialize an empty tree (all priorities zero).
+
+        Args:
+            capacity: Number of slots
+        """
+        if capacity <= 0:
+            raise ValueError("Capacity must be positive")
+
+        self.capacity = capacity
+        leaves = 1
+        while leaves < capacity:
+            leaves <<= 1
+        self._leaves = leaves
+        self._depth = leaves.bit_length() - 1
+        self._sum = np.zeros(2 * leaves, dtype=np.float64)
+        # Empty slots must not drag the minimum down, so they hold +inf here
+        self._min = np.full(2 * leaves, np.inf, dtype=np.float64)
+        # Buffer views for the scalar path; element access is far cheaper than ndarray indexing
+        self._sum_view = memoryview(self._sum)
+        self._min_view = memoryview(self._min)
+
+    @property
+    def total(self) -> float:
+        """Sum of all slot priorities."""
+        return float(self._sum[1])
+
+    @property
+    def min(self) -> float:
+        """Smallest non-zero slot priority (``inf`` when the tree is empty)."""
+        return float(self._min[1])
+
+    def get(self, slots: ArrayLike) -> np.ndarray:
+        """Priorities stored at ``slots``."""
+        return self._sum[np.asarray(slots, dtype=np.int64) + self._leaves]
+
+    def update(self, slots: ArrayLike, priorities: ArrayLike) -> None:
+        """
+        Set the priority of one or more slots.
+
+        A priority of zero removes the slot from sampling and from ``min``.
+        When ``slots`` repeats, the last value wins.
+
+        Args:
+            slots: Slot indices in ``[0, capacity)``
+            priorities: New priorities (scalar or one per slot)
+        """
+        if isinstance(slots, (int, np.integer)) and isinstance(priorities, (int, float, np.number)):
+            self._update_one(int(slots) + self._leaves, float(priorities))
+            return
+
+        nodes = np.atleast_1d(np.asarray(slots, dtype=np.int64)) + self._leaves
+        values = np.broadcast_to(np.asarray(priorities, dtype=np.float64), nodes.shape)
+        if nodes.size == 0:
+            return
+        if np.any(values < 0):
+            raise ValueError("Priorities must be non-negative")
+
+        if nodes.size == 1:
+            self._update_one(int(nodes[0]), float(values[0]))
+            return
+
+        self._sum[nodes] = values
+        self._min[nodes] = np.where(values > 0, values, np.inf)
+
+        for _ in range(self._depth):
+            # Duplicate parents just recompute the same value, so no dedup is needed
+            nodes = nodes >> 1
+            left = nodes << 1
+            self._sum[nodes] = self._sum[left] + self._sum[left + 1]
+            self._min[nodes] = np.minimum(self._min[left], self._min[left + 1])
+
+    def _update_one(self, node: int, value: float) -> None:
+        """Scalar update path; a Python walk beats batch NumPy calls for one slot."""
+        if value < 0:
+            raise ValueError("Priorities must be non-negative")
+        sums, mins = self._sum_view, self._min_view
+        sums[node] = value
+        mins[node] = value if value > 0 else np.inf
+        node >>= 1
+        while node:
+            left = node << 1
+            sums[node] = sums[left] + sums[left + 1]
+            left_min, right_min = mins[left], mins[left + 1]
+            mins[node] = left_min if left_min < right_min else right_min
+            node >>= 1
+
+    def clear(self) -> None:
+        """Reset every slot to zero priority."""
+        self._sum.fill(0.0)
+        self._min.fill(np.inf)
+
+    def find(self, prefix_sums: ArrayLike) -> np.ndarray:
+        """
+        Locate the slots whose cumulative priority range contains each value.
+
+        Args:
+            prefix_sums: Values in ``[0, total)``
+
+        Returns:
+            Slot indices, one per value; never a zero-priority slot
+        """
+        values = np.array(prefix_sums, dtype=np.float64, ndmin=1)
+        nodes = np.ones(values.shape, dtype=np.int64)
+        for _ in range(self._depth):
+            left = nodes << 1
+            left_sum = self._sum[left]
+            # Rounding can leave a value just past the left subtree; never descend into an empty one
+            go_right = ((values >= left_sum) & (self._sum[left + 1] > 0)) | (left_sum <= 0)
+            values = np.where(go_right, values - left_sum, values)
+            nodes = left + go_right
+        return nodes - self._leaves
+
+    def sample(self, batch_size: int, rng: Optional[np.random.Generator] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Draw slots with probability proportional to priority.
+
+        Uses stratified sampling: the total mass is split into ``batch_size``
+        equal segments and one value is drawn uniformly from each.
+
+        Args:
+            batch_size: Number of slots to draw (with replacement)
+            rng: Random generator (defaults to the global NumPy RNG)
+
+        Returns:
+            Tuple of (slots, priorities at those slots)
+        """
+        total = self.total
+        if total <= 0:
+            raise ValueError("Cannot sample from an empty tree")
+
+        uniform = rng.random(batch_size) if rng is not None else np.random.random_sample(batch_size)
+        segment = total / batch_size
+        slots = self.find((np.arange(batch_size) + uniform) * segment)
+        return slots, self._sum[slots + self._leaves]
+
+    def __len__(self) -> int:
+        return self.capacity
@@ -4,18 +4,24 @@ Training Pipeline for DQN Routing Agent
 This module implements the training pipeline that coordinates the DQN agent,
 experience replay buffer, and neural networks to learn optimal routing decisions.
 Implements batch processing, epsilon-greedy exploration, and reward calculation.
+
+Besides the one-episode-at-a-time loop, the pipeline can step many simulated
+environments in lockstep (``TrainingConfig.num_envs``) and collect experience
+in parallel worker processes (``TrainingConfig.num_workers``).
 """
 
 import logging
+import multiprocessing
 import numpy as np
 import time
-from typing import Dict, List, Tuple, Optional, Any
+from typing import Dict, List, Tuple, Optional, Any, Sequence
 from dataclasses import dataclass
 from enum import Enum
 
 from .dqn_agent import DQNRoutingAgent, RoutingState, RoutingAction
 from .experience_buffer import ExperienceReplayBuffer, PrioritizedExperienceBuffer, Experience
-from .neural_network import create_dqn_network, DQNNetwork
+from .inference import CompiledQNetwork
+from .neural_network import create_dqn_network, DQNNetwork, NumpyDQNNetwork
 from ..models import ProviderType
 
 logger = logging.getLogger(__name__)
@@ -64,6 +70,12 @@ class TrainingConfig:
     target_performance: float = 0.9  # Success rate target
     patience: int = 100  # Episodes without improvement
 
+    # Batched / parallel experience collection
+    num_envs: int = 1  # Environments stepped in lockstep (per worker when num_workers > 0)
+    num_workers: int = 0  # Collector processes; 0 collects in the training process
+    rollout_steps: int = 16  # Lockstep steps per worker round
+    seed: Optional[int] = None
+
 
 @dataclass
 class TrainingMetrics:
@@ -298,6 +310,350 @@ class RoutingEnvironmentSimulator:
         }
 
 
+class VectorizedRoutingEnvironment:
+    """
+    ``num_envs`` routing simulators stepped in lockstep.
+
+    Follows the dynamics and reward model of ``RoutingEnvironmentSimulator``,
+    but keeps the hidden state of every environment column-wise in NumPy
+    arrays and emits ``RoutingState.to_vector`` rows directly, so a step
+    costs a handful of array operations regardless of ``num_envs``.
+    Environments whose episode ends are reset automatically.
+    """
+
+    # Providers the simulator tracks availability and history for, in vector order
+    PROVIDERS = ("openai", "anthropic", "google", "groq")
+    OUTAGE_RATES = (0.05, 0.08, 0.03, 0.02)
+    STATE_SIZE = 21
+
+    def __init__(
+        self,
+        num_envs: int = 8,
+        state_size: int = 21,
+        action_size: int = 12,
+        max_steps: int = 10,
+        seed: Optional[int] = None,
+    ):
+        """
+        Initialize and reset all environments.
+
+        Args:
+            num_envs: Number of environments stepped together
+            state_size: Must be 21 (the ``RoutingState.to_vector`` layout)
+            action_size: Number of discrete actions
+            max_steps: Episode length limit
+            seed: Seed for the environment's own random generator
+        """
+        if num_envs <= 0:
+            raise ValueError("num_envs must be positive")
+        if state_size != self.STATE_SIZE:
+            raise ValueError(f"VectorizedRoutingEnvironment emits {self.STATE_SIZE}-dim states, got {state_size}")
+
+        self.num_envs = num_envs
+        self.state_size = state_size
+        self.action_size = action_size
+        self.max_steps = max_steps
+        self.rng = np.random.default_rng(seed)
+
+        # Share the scalar simulator's profiles so both environments stay in sync
+        reference = RoutingEnvironmentSimulator(state_size, action_size)
+        self.task_types = list(reference.task_profiles)
+        self._task_complexity = np.array([p["complexity"] for p in reference.task_profiles.values()])
+        self._creative_task = self.task_types.index("creative")
+        performance = {provider.value: perf for provider, perf in reference.provider_performance.items()}
+        self._base_success = np.array([performance[name]["base_success"] for name in self.PROVIDERS])
+        self._outage_rates = np.array(self.OUTAGE_RATES)
+
+        # Per-action lookup tables replacing the scalar per-step dictionary lookups
+        self._action_success = np.empty(action_size)
+        self._action_latency = np.empty(action_size)
+        self._action_cost = np.empty(action_size)
+        self._action_strategy_bonus = np.empty(action_size)
+        self._action_provider = np.empty(action_size, dtype=np.int64)  # -1: always available
+        for index in range(action_size):
+            action = RoutingAction.from_action_index(index)
+            perf = reference.provider_performance.get(action.provider, {})
+            self._action_success[index] = perf.get("base_success", 0.5)
+            self._action_latency[index] = perf.get("latency", 1.0)
+            self._action_cost[index] = perf.get("cost", 0.02)
+            self._action_strategy_bonus[index] = reference._get_strategy_bonus(action)
+            key = action.provider.value if hasattr(action.provider, "value") else str(action.provider)
+            self._action_provider[index] = self.PROVIDERS.index(key) if key in self.PROVIDERS else -1
+
+        self._rows = np.arange(num_envs)
+        self.task_type = np.zeros(num_envs, dtype=np.int64)
+        self.complexity = np.zeros(num_envs)
+        self.availability = np.ones((num_envs, len(self.PROVIDERS)), dtype=bool)
+        self.historical = np.zeros((num_envs, len(self.PROVIDERS)))
+        self.max_cost = np.zeros(num_envs)
+        self.max_latency = np.zeros(num_envs)
+        self.step_count = np.zeros(num_envs, dtype=np.int64)
+        self.episode_success = np.zeros(num_envs, dtype=bool)
+        self.episode_reward = np.zeros(num_envs)
+        self.reset()
+
+    def reset(self, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Start new episodes.
+
+        Args:
+            mask: Boolean (num_envs,) array of environments to reset (default: all)
+
+        Returns:
+            Current (num_envs, state_size) observations
+        """
+        rows = self._rows if mask is None else np.flatnonzero(mask)
+        count = len(rows)
+        rng = self.rng
+
+        task = rng.integers(len(self.task_types), size=count)
+        self.task_type[rows] = task
+        self.complexity[rows] = self._task_complexity[task] + rng.normal(0, 0.1, count)
+        self.availability[rows] = rng.random((count, len(self.PROVIDERS))) > self._outage_rates
+        self.historical[rows] = self._base_success + rng.normal(0, 0.05, (count, len(self.PROVIDERS)))
+        self.max_cost[rows] = rng.uniform(0.01, 0.10, count)
+        self.max_latency[rows] = rng.uniform(0.5, 3.0, count)
+        self.step_count[rows] = 0
+        self.episode_success[rows] = False
+        self.episode_reward[rows] = 0.0
+        return self.observe()
+
+    def observe(self) -> np.ndarray:
+        """Current states as ``RoutingState.to_vector`` rows."""
+        states = np.zeros((self.num_envs, self.state_size), dtype=np.float32)
+        states[:, 0] = self.complexity
+        # Of the simulator's task types only "creative" has a context one-hot column (index 8)
+        states[:, 8] = self.task_type == self._creative_task
+        states[:, 11:11 + len(self.PROVIDERS)] = self.availability
+        states[:, 16] = self.historical.mean(axis=1)
+        states[:, 17:20] = 0.33
+        states[:, 20] = 0.5
+        return states
+
+    def routing_state(self, index: int) -> RoutingState:
+        """Hidden state of one environment as a ``RoutingState``."""
+        return RoutingState(
+            task_complexity=float(self.complexity[index]),
+            context_type=self.task_types[self.task_type[index]],
+            provider_availability={
+                name: bool(self.availability[index, i]) for i, name in enumerate(self.PROVIDERS)
+            },
+            historical_performance={
+                name: float(self.historical[index, i]) for i, name in enumerate(self.PROVIDERS)
+            },
+            resource_constraints={
+                "max_cost": float(self.max_cost[index]),
+                "max_latency": float(self.max_latency[index]),
+            },
+            user_preferences={},
+        )
+
+    def step(self, actions: Sequence[int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Execute one action per environment.
+
+        Args:
+            actions: (num_envs,) action indices
+
+        Returns:
+            Tuple of (next_states, rewards, dones, info). ``next_states`` are the
+            successors of the stepped states even for finished environments;
+            those are reset afterwards, so call ``observe`` for the states to act
+            on next. ``info`` holds ``episode_reward``, ``episode_success`` and
+            ``episode_length`` as they stood at the end of this step.
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        rng = self.rng
+        self.step_count += 1
+
+        provider = self._action_provider[actions]
+        available = np.where(provider < 0, True, self.availability[self._rows, np.maximum(provider, 0)])
+        rewards = (
+            0.4 * (1.0 - np.abs(self.complexity - self._action_success[actions]))
+            + 0.2 * np.where(self._action_cost[actions] <= self.max_cost, 1.0, 0.5)
+            + 0.2 * np.where(self._action_latency[actions] <= self.max_latency, 1.0, 0.7)
+            + 0.1 * self._action_strategy_bonus[actions]
+            + 0.1 * np.where(available, 1.0, 0.1)
+        )
+        rewards = np.clip(rewards + rng.normal(0, 0.05, self.num_envs), 0.0, 1.0)
+
+        solved = rewards > 0.8
+        dones = (self.step_count >= self.max_steps) | solved
+        self.episode_success |= solved
+        self.episode_reward += rewards
+
+        # Small perturbations of the hidden state, as in the scalar simulator
+        self.complexity = np.clip(self.complexity + rng.normal(0, 0.02, self.num_envs), 0.0, 1.0)
+        self.availability &= rng.random(self.availability.shape) > 0.01
+        self.historical = np.clip(self.historical + rng.normal(0, 0.01, self.historical.shape), 0.0, 1.0)
+        next_states = self.observe()
+
+        info = {
+            "episode_reward": self.episode_reward.copy(),
+            "episode_success": self.episode_success.copy(),
+            "episode_length": self.step_count.copy(),
+        }
+        if dones.any():
+            self.reset(dones)
+        return next_states, rewards, dones, info
+
+
+def _collector_worker(
+    conn,
+    seed: int,
+    num_envs: int,
+    action_size: int,
+    max_steps: int,
+    hidden_layers: List[int],
+    activation: str,
+) -> None:
+    """
+    Experience collection loop run in a ``ParallelExperienceCollector`` process.
+
+    Each request carries (weights, epsilon, steps); the worker loads the
+    weights into a local numpy Q-network, runs ``steps`` lockstep steps of its
+    own vectorized environment and replies with stacked transition arrays.
+    A ``None`` request shuts the worker down.
+    """
+    env_seed, policy_seed = np.random.SeedSequence(seed).spawn(2)
+    env = VectorizedRoutingEnvironment(num_envs=num_envs, action_size=action_size,
+                                       max_steps=max_steps, seed=env_seed)
+    rng = np.random.default_rng(policy_seed)
+    network = NumpyDQNNetwork(env.state_size, action_size, hidden_layers=hidden_layers, activation=activation)
+    states = env.observe()
+
+    while True:
+        request = conn.recv()
+        if request is None:
+            break
+        weights, epsilon, steps = request
+        network.set_weights(weights)
+        policy = CompiledQNetwork.from_network(network, max_batch=num_envs)
+
+        columns: Dict[str, List[np.ndarray]] = {
+            key: [] for key in ("states", "actions", "rewards", "next_states", "dones",
+                                "episode_rewards", "episode_successes", "episode_lengths", "final_states")
+        }
+        for _ in range(steps):
+            actions = rng.integers(action_size, size=num_envs)
+            exploit = rng.random(num_envs) > epsilon
+            if exploit.any():
+                actions[exploit] = policy.best_actions(states[exploit])
+
+            next_states, rewards, dones, info = env.step(actions)
+            columns["states"].append(states)
+            columns["actions"].append(actions)
+            columns["rewards"].append(rewards)
+            columns["next_states"].append(next_states)
+            columns["dones"].append(dones)
+            columns["episode_rewards"].append(info["episode_reward"][dones])
+            columns["episode_successes"].append(info["episode_success"][dones])
+            columns["episode_lengths"].append(info["episode_length"][dones])
+            columns["final_states"].append(next_states[dones])
+            states = env.observe()
+
+        conn.send({key: np.concatenate(parts) for key, parts in columns.items()})
+    conn.close()
+
+
+class ParallelExperienceCollector:
+    """
+    Pool of processes that each step a ``VectorizedRoutingEnvironment``.
+
+    Workers keep their environments between rounds. ``request`` broadcasts the
+    current policy to every worker without waiting; ``gather`` collects one
+    rollout per worker. Issuing the next ``request`` before training on the
+    gathered rollouts overlaps collection with learning.
+    """
+
+    def __init__(
+        self,
+        num_workers: int,
+        envs_per_worker: int = 8,
+        action_size: int = 12,
+        max_steps: int = 10,
+        hidden_layers: Sequence[int] = (64, 32),
+        activation: str = "relu",
+        seed: Optional[int] = None,
+        start_method: Optional[str] = None,
+    ):
+        """
+        Start the worker processes.
+
+        Args:
+            num_workers: Number of collector processes
+            envs_per_worker: Environments stepped in lockstep by each worker
+            action_size: Number of discrete actions
+            max_steps: Episode length limit
+            hidden_layers: Hidden layer sizes of the policy network
+            activation: Activation of the policy network
+            seed: Base seed; each worker gets an independent stream
+            start_method: multiprocessing start method (platform default if None)
+        """
+        if num_workers <= 0:
+            raise ValueError("num_workers must be positive")
+
+        context = multiprocessing.get_context(start_method)
+        worker_seeds = np.random.SeedSequence(seed).generate_state(num_workers)
+        self._connections = []
+        self._processes = []
+        self._pending = [False] * num_workers
+        for worker_seed in worker_seeds:
+            parent_conn, child_conn = context.Pipe()
+            process = context.Process(
+                target=_collector_worker,
+                args=(child_conn, int(worker_seed), envs_per_worker, action_size,
+                      max_steps, list(hidden_layers), activation),
+                daemon=True,
+            )
+            process.start()
+            child_conn.close()
+            self._connections.append(parent_conn)
+            self._processes.append(process)
+
+    @property
+    def num_workers(self) -> int:
+        return len(self._processes)
+
+    def request(self, weights: List[np.ndarray], epsilon: float, steps: int) -> None:
+        """Ask every worker for ``steps`` lockstep steps under the given policy."""
+        for i, conn in enumerate(self._connections):
+            conn.send((weights, epsilon, steps))
+            self._pending[i] = True
+
+    def gather(self) -> List[Dict[str, np.ndarray]]:
+        """Wait for and return the outstanding rollout of every worker."""
+        rollouts = []
+        for i, conn in enumerate(self._connections):
+            if self._pending[i]:
+                rollouts.append(conn.recv())
+                self._pending[i] = False
+        return rollouts
+
+    def close(self) -> None:
+        """Stop the workers, draining any outstanding rollouts first."""
+        self.gather()
+        for conn in self._connections:
+            try:
+                conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        for conn in self._connections:
+            conn.close()
+        self._connections = []
+        self._processes = []
+
+    def __enter__(self) -> "ParallelExperienceCollector":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
 class DQNTrainingPipeline:
     """
     Complete training pipeline for the DQN routing agent.
@@ -327,6 +683,7 @@ class DQNTrainingPipeline:
             learning_rate=config.learning_rate,
             force_numpy=True
         )
+        self.agent.refresh_inference()
 
         # Initialize experience buffer
         if config.training_mode == TrainingMode.PRIORITIZED:
@@ -366,6 +723,11 @@ class DQNTrainingPipeline:
         """
         logger.info(f"Starting DQN training for {self.config.max_episodes} episodes")
 
+        if self.config.num_workers > 0:
+            return self._train_parallel()
+        if self.config.num_envs > 1:
+            return self._train_vectorized()
+
         start_time = time.time()
 
         for episode in range(self.config.max_episodes):
@@ -478,40 +840,212 @@ class DQNTrainingPipeline:
 
         return metrics
 
+    def _train_vectorized(self) -> List[TrainingMetrics]:
+        """Training loop stepping ``num_envs`` environments in lockstep in this process."""
+        start_time = time.time()
+        env = VectorizedRoutingEnvironment(
+            num_envs=self.config.num_envs,
+            action_size=self.agent.action_size,
+            max_steps=min(10, self.config.max_steps_per_episode),
+            seed=self.config.seed,
+        )
+        states = env.observe()
+
+        done_training = False
+        while not done_training:
+            step_start = time.time()
+            actions = self.agent.act_batch(states)
+            next_states, rewards, dones, info = env.step(actions)
+            training_time = self._ingest_transitions(states, actions, rewards, next_states, dones)
+            states = env.observe()
+
+            if dones.any():
+                done_training = self._finish_episodes(
+                    info["episode_reward"][dones],
+                    info["episode_success"][dones],
+                    info["episode_length"][dones],
+                    next_states[dones],
+                    step_time=time.time() - step_start,
+                    training_time=training_time,
+                )
+
+        logger.info(f"Vectorized training ({env.num_envs} envs) completed in {time.time() - start_time:.2f} seconds")
+        return self.training_metrics
+
+    def _train_parallel(self) -> List[TrainingMetrics]:
+        """Training loop learning from experience collected by worker processes."""
+        start_time = time.time()
+        network = getattr(self.agent.q_network, "network", self.agent.q_network)
+        collector = ParallelExperienceCollector(
+            num_workers=self.config.num_workers,
+            envs_per_worker=self.config.num_envs,
+            action_size=self.agent.action_size,
+            max_steps=min(10, self.config.max_steps_per_episode),
+            hidden_layers=network.hidden_layers,
+            activation=network.activation,
+            seed=self.config.seed,
+        )
+
+        with collector:
+            collector.request(self.agent.q_network.get_weights(), self.agent.exploration_rate,
+                              self.config.rollout_steps)
+            done_training = False
+            while not done_training:
+                round_start = time.time()
+                rollouts = collector.gather()
+                # Workers collect the next round with the current policy while this one trains
+                collector.request(self.agent.q_network.get_weights(), self.agent.exploration_rate,
+                                  self.config.rollout_steps)
+
+                for rollout in rollouts:
+                    training_time = self._ingest_transitions(
+                        rollout["states"], rollout["actions"], rollout["rewards"],
+                        rollout["next_states"], rollout["dones"],
+                    )
+                    if len(rollout["episode_rewards"]) and not done_training:
+                        done_training = self._finish_episodes(
+                            rollout["episode_rewards"],
+                            rollout["episode_successes"],
+                            rollout["episode_lengths"],
+                            rollout["final_states"],
+                            step_time=(time.time() - round_start) / self.config.rollout_steps,
+                            training_time=training_time,
+                        )
+
+        logger.info(
+            f"Parallel training ({collector.num_workers} workers x {self.config.num_envs} envs) "
+            f"completed in {time.time() - start_time:.2f} seconds"
+        )
+        return self.training_metrics
+
+    def _ingest_transitions(
+        self,
+        states: np.ndarray,
+        actions: np.ndarray,
+        rewards: np.ndarray,
+        next_states: np.ndarray,
+        dones: np.ndarray,
+    ) -> float:
+        """
+        Store a block of transitions and run the training steps they are due.
+
+        Keeps the single-environment schedule: one training step for every
+        ``training_frequency`` environment steps once the buffer is warm, and a
+        soft target update each time ``target_update_frequency`` steps pass.
+
+        Returns:
+            Seconds spent training
+        """
+        count = len(states)
+        self.experience_buffer.add_batch(states, actions, rewards, next_states, dones)
+
+        first_step = self.current_step
+        self.current_step += count
+        frequency = self.config.training_frequency
+        # Steps s in [first_step, current_step) with s % frequency == 0
+        due = (self.current_step - 1) // frequency - (first_step - 1) // frequency
+
+        training_time = 0.0
+        if len(self.experience_buffer) >= self.config.min_buffer_size:
+            train_start = time.time()
+            for _ in range(due):
+                self._train_agent()
+            training_time = time.time() - train_start
+
+        target_frequency = self.config.target_update_frequency
+        if self.current_step // target_frequency > first_step // target_frequency:
+            self.agent.q_network.update_target_network(tau=self.config.soft_update_tau)
+
+        return training_time
+
+    def _finish_episodes(
+        self,
+        rewards: np.ndarray,
+        successes: np.ndarray,
+        lengths: np.ndarray,
+        final_states: np.ndarray,
+        step_time: float,
+        training_time: float,
+    ) -> bool:
+        """
+        Record episodes finished by a batched step.
+
+        Applies the per-episode bookkeeping of ``train`` (metrics, epsilon decay,
+        evaluation, early stopping) to each finished episode in turn.
+
+        Returns:
+            True when training should stop
+        """
+        q_value_means = self.agent.q_network.predict(final_states).mean(axis=1)
+
+        for reward, success, length, q_value_mean in zip(rewards, successes, lengths, q_value_means):
+            episode = self.current_episode
+            self.episode_rewards.append(float(reward))
+            self.episode_successes.append(bool(success))
+            self.training_metrics.append(TrainingMetrics(
+                episode=episode,
+                step=self.current_step,
+                episode_reward=float(reward),
+                episode_success=bool(success),
+                routing_accuracy=self._calculate_routing_accuracy(),
+                loss=self.training_losses[-1] if self.training_losses else 0.0,
+                epsilon=self.agent.exploration_rate,
+                q_value_mean=float(q_value_mean),
+                # Wall time of the episode's steps at the batched throughput
+                episode_time=step_time * int(length),
+                training_time=training_time,
+                buffer_size=len(self.experience_buffer),
+                buffer_utilization=len(self.experience_buffer) / self.config.buffer_size
+            ))
+            self.current_episode += 1
+
+            self._update_epsilon()
+
+            if episode % self.config.evaluation_frequency == 0:
+                self._evaluate_performance(episode)
+
+            if self._should_stop_early():
+                logger.info(f"Early stopping at episode {episode}")
+                return True
+
+            if episode % 50 == 0:
+                recent_reward = np.mean(self.episode_rewards[-50:])
+                recent_success = np.mean(self.episode_successes[-50:])
+                logger.info(
+                    f"Episode {episode}: avg_reward={recent_reward:.3f}, "
+                    f"success_rate={recent_success:.3f}, epsilon={self.agent.exploration_rate:.3f}"
+                )
+
+            if self.current_episode >= self.config.max_episodes:
+                return True
+
+        return False
+
     def _train_agent(self) -> float:
         """Train the agent using experience replay."""
-        # Sample batch from experience buffer
-        if isinstance(self.experience_buffer, PrioritizedExperienceBuffer):
-            experiences, indices, weights = self.experience_buffer.sample(self.config.batch_size)
-        else:
-            experiences = self.experience_buffer.sample(self.config.batch_size)
-            indices = None
-            weights = None
-
-        # Convert to arrays
-        states, actions, rewards, next_states, dones = self.experience_buffer.get_batch_arrays(experiences)
+        # Sample batch from experience buffer as ready-to-train arrays
+        batch = self.experience_buffer.sample_batch(self.config.batch_size)
+        states, actions, rewards, next_states, dones = self.experience_buffer.get_batch_arrays(batch)
+        indices = batch.indices if isinstance(self.experience_buffer, PrioritizedExperienceBuffer) else None
+        weights = batch.weights
 
         # Compute target Q-values
         next_q_values = self.agent.q_network.predict_target(next_states)
         max_next_q = np.max(next_q_values, axis=1)
 
-        # Compute targets
+        # Compute targets (terminal transitions keep only the reward)
         targets = self.agent.q_network.predict(states).copy()
-
-        for i in range(len(experiences)):
-            if dones[i]:
-                targets[i, actions[i]] = rewards[i]
-            else:
-                targets[i, actions[i]] = rewards[i] + self.config.discount_factor * max_next_q[i]
+        continuing = ~np.asarray(dones, dtype=bool)
+        targets[np.arange(len(states)), actions] = rewards + self.config.discount_factor * max_next_q * continuing
 
         # Apply importance sampling weights if using prioritized replay
         if weights is not None:
             # Scale targets by importance weights
-            for i in range(len(experiences)):
-                targets[i] *= weights[i]
+            targets *= np.asarray(weights)[:, None]
 
         # Train network
         loss = self.agent.q_network.train(states, targets)
+        self.agent.refresh_inference()
         self.training_losses.append(loss)
 
         # Update priorities if using prioritized replay
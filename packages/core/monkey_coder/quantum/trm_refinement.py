@@ -13,7 +13,8 @@ Based on the principles of:
 
 import logging
 import random
-from typing import Any, Dict, List, Optional, Tuple
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple, Union
 from dataclasses import dataclass
 from datetime import datetime
 
@@ -34,15 +35,22 @@ class TRMConfig:
     gradient_clip: float = 1.0
     enable_attention: bool = True
     random_seed: Optional[int] = 42
+    record_steps: str = "full"  # "full": z/y on every step, "summary": only on the final step
+    history_size: int = 1000  # Step lists kept in refinement_history (oldest dropped first)
 
 
 @dataclass
 class RefinementStep:
-    """Records details of a single refinement step."""
+    """Records details of a single refinement step.
+
+    With ``record_steps="summary"`` only the final step of a refinement
+    carries ``latent_state`` and ``answer_embedding``; earlier steps keep
+    their scalars and leave both as ``None``.
+    """
     step_number: int
     cycle_type: str  # 'inner' or 'outer'
-    latent_state: np.ndarray
-    answer_embedding: np.ndarray
+    latent_state: Optional[np.ndarray]
+    answer_embedding: Optional[np.ndarray]
     halt_probability: float
     confidence: float
     timestamp: datetime = None
@@ -93,8 +101,8 @@ class TRMRefinementModule:
                 self.config.latent_dim, self.config.latent_dim
             )
         
-        # Tracking
-        self.refinement_history: List[List[RefinementStep]] = []
+        # Tracking (bounded: the oldest refinements are dropped first)
+        self.refinement_history: Deque[List[RefinementStep]] = deque(maxlen=self.config.history_size)
         self.performance_metrics: Dict[str, Any] = {
             "total_refinements": 0,
             "avg_steps_to_halt": 0.0,
@@ -115,7 +123,8 @@ class TRMRefinementModule:
         self,
         initial_state: np.ndarray,
         initial_answer: Optional[np.ndarray] = None,
-        context: Optional[Dict[str, Any]] = None
+        context: Optional[Dict[str, Any]] = None,
+        record_steps: Optional[str] = None
     ) -> Tuple[np.ndarray, np.ndarray, List[RefinementStep]]:
         """
         Perform iterative refinement with learned halting.
@@ -124,99 +133,158 @@ class TRMRefinementModule:
             initial_state: Initial latent state vector (z0)
             initial_answer: Initial answer embedding (y0), if None uses zeros
             context: Optional context for attention mechanism
+            record_steps: "full" or "summary", overrides ``config.record_steps``
             
         Returns:
             Tuple of (final_latent_state, final_answer_embedding, refinement_steps)
         """
-        # Initialize latent state and answer
-        z = initial_state.copy()
+        z, y, steps = self.refine_many(
+            np.asarray(initial_state)[np.newaxis],
+            None if initial_answer is None else np.asarray(initial_answer)[np.newaxis],
+            context=context,
+            record_steps=record_steps
+        )
+        return z[0], y[0], steps[0]
+    
+    def refine_many(
+        self,
+        initial_states: np.ndarray,
+        initial_answers: Optional[np.ndarray] = None,
+        context: Union[None, Dict[str, Any], Sequence[Optional[Dict[str, Any]]]] = None,
+        record_steps: Optional[str] = None
+    ) -> Tuple[np.ndarray, np.ndarray, List[List[RefinementStep]]]:
+        """
+        Refine a batch of states in lockstep, each with its own halting.
         
-        if initial_answer is None:
-            y = np.zeros(self.config.answer_dim)
-        else:
-            y = initial_answer.copy()
+        Row ``i`` follows exactly the schedule ``refine`` would give it:
+        inner cycles update the rows still running, a row whose halting
+        probability crosses the threshold stops (and skips the outer update),
+        and the outer answer update runs for the rows that finished all
+        inner cycles. Each row's step list is recorded in
+        ``refinement_history`` and counted in the metrics.
         
-        steps: List[RefinementStep] = []
+        Args:
+            initial_states: Initial latent states, shape (N, latent_dim)
+            initial_answers: Initial answer embeddings (N, answer_dim), zeros if None
+            context: One attention context shared by every row, or one per row
+            record_steps: "full" or "summary", overrides ``config.record_steps``
+            
+        Returns:
+            Tuple of (final latent states (N, latent_dim), final answers
+            (N, answer_dim), refinement steps per row)
+        """
+        record_steps = record_steps or self.config.record_steps
+        if record_steps not in ("full", "summary"):
+            raise ValueError(f"record_steps must be 'full' or 'summary', got {record_steps!r}")
+        full = record_steps == "full"
+        
+        z_all = np.array(initial_states, dtype=np.float64)
+        if z_all.ndim != 2:
+            raise ValueError(f"initial_states must be 2-D (N, latent_dim), got shape {z_all.shape}")
+        n = len(z_all)
+        if initial_answers is None:
+            y_all = np.zeros((n, self.config.answer_dim))
+        else:
+            y_all = np.array(initial_answers, dtype=np.float64)
+            if y_all.shape[0] != n:
+                raise ValueError(f"{y_all.shape[0]} initial answers for {n} states")
+        
+        # Attention keys per row (or one set shared by all rows), prepared once
+        if context is None or isinstance(context, dict):
+            attention = self._attention_for(context)
+            row_attention = None
+        else:
+            if len(context) != n:
+                raise ValueError(f"{len(context)} contexts for {n} states")
+            attention = None
+            row_attention = self._stack_attention([self._attention_for(ctx) for ctx in context])
+        
+        steps: List[List[RefinementStep]] = [[] for _ in range(n)]
+        active = np.ones(n, dtype=bool)
+        halted = np.zeros(n, dtype=bool)
+        halt_prob = np.zeros(n)
+        confidence = np.zeros(n)
+        y_recorded = y_all.copy()  # Answers as of the last outer update, never mutated
+        clip = self.config.gradient_clip
         total_inner_cycles = 0
-        halted = False
         
         # Outer cycles (K steps)
         for outer_step in range(self.config.max_outer_steps):
             # Inner cycles (H refinement steps per outer cycle)
             for inner_step in range(self.config.max_inner_steps):
                 total_inner_cycles += 1
+                rows = np.flatnonzero(active)
+                z = z_all[rows]
                 
-                # Compute attention if enabled
-                if self.config.enable_attention and context:
-                    attention_context = self._compute_attention(z, context)
-                    z_input = np.concatenate([z, attention_context])
+                # Attention over context, or self-attention (z with itself)
+                if row_attention is None:
+                    attended = self._attend(z, attention)
                 else:
-                    # Self-attention: concatenate z with itself
-                    z_input = np.concatenate([z, z])
-                
-                # Inner refinement: update latent state
-                z_delta = self._forward_pass(z_input, self.latent_refine_weights)
-                z = z + z_delta  # Residual connection
-                
-                # Clip gradients (simulate gradient clipping)
-                z = np.clip(z, -self.config.gradient_clip, self.config.gradient_clip)
+                    attended = self._attend_rows(z, rows, row_attention)
+                z_input = np.concatenate([z, attended], axis=1)
                 
-                # Compute halting probability
-                halt_prob = self._compute_halt_probability(z)
+                # Inner refinement with residual connection and clipping
+                z = np.clip(z + self._forward_pass(z_input, self.latent_refine_weights), -clip, clip)
+                z_all[rows] = z
                 
-                # Compute confidence from state coherence
-                confidence = self._compute_confidence(z, y)
+                row_halt = self._halt_probabilities(z)
+                row_confidence = self._confidences(z, y_all[rows])
+                halt_prob[rows] = row_halt
+                confidence[rows] = row_confidence
                 
-                # Record step
-                step = RefinementStep(
-                    step_number=total_inner_cycles,
-                    cycle_type='inner',
-                    latent_state=z.copy(),
-                    answer_embedding=y.copy(),
-                    halt_probability=halt_prob,
-                    confidence=confidence
-                )
-                steps.append(step)
+                for j, row in enumerate(rows):
+                    steps[row].append(RefinementStep(
+                        step_number=total_inner_cycles,
+                        cycle_type='inner',
+                        latent_state=z[j] if full else None,
+                        answer_embedding=y_recorded[row] if full else None,
+                        halt_probability=float(row_halt[j]),
+                        confidence=float(row_confidence[j])
+                    ))
                 
-                # Check halting condition
-                if halt_prob > self.config.halt_threshold:
-                    halted = True
+                # Rows past the halting threshold stop here
+                stop = rows[row_halt > self.config.halt_threshold]
+                halted[stop] = True
+                active[stop] = False
+                if not active.any():
                     break
             
-            if halted:
+            if not active.any():
                 break
             
-            # Outer cycle: update answer embedding
-            zy_input = np.concatenate([y, z])
-            y_delta = self._forward_pass(zy_input, self.answer_refine_weights)
-            y = y + y_delta  # Residual connection
-            
-            # Clip gradients
-            y = np.clip(y, -self.config.gradient_clip, self.config.gradient_clip)
-            
-            # Record outer step
-            step = RefinementStep(
-                step_number=len(steps) + 1,
-                cycle_type='outer',
-                latent_state=z.copy(),
-                answer_embedding=y.copy(),
-                halt_probability=halt_prob,
-                confidence=confidence
+            # Outer cycle: update answer embedding of the rows still running
+            rows = np.flatnonzero(active)
+            zy_input = np.concatenate([y_all[rows], z_all[rows]], axis=1)
+            y_all[rows] = np.clip(
+                y_all[rows] + self._forward_pass(zy_input, self.answer_refine_weights), -clip, clip
             )
-            steps.append(step)
-        
-        # Update metrics
-        self._update_metrics(steps, halted)
-        
-        # Store history
-        self.refinement_history.append(steps)
+            y_recorded = y_all.copy()
+            
+            for row in rows:
+                previous = steps[row][-1]
+                steps[row].append(RefinementStep(
+                    step_number=len(steps[row]) + 1,
+                    cycle_type='outer',
+                    latent_state=previous.latent_state,
+                    answer_embedding=y_recorded[row] if full else None,
+                    halt_probability=float(halt_prob[row]),
+                    confidence=float(confidence[row])
+                ))
+        
+        for row in range(n):
+            row_steps = steps[row]
+            if not full and row_steps:
+                row_steps[-1].latent_state = z_all[row].copy()
+                row_steps[-1].answer_embedding = y_all[row].copy()
+            self._update_metrics(row_steps, bool(halted[row]))
+            self.refinement_history.append(row_steps)
         
         logger.debug(
-            f"Refinement completed in {len(steps)} steps, "
-            f"halted={halted}, final_confidence={confidence:.3f}"
+            f"Refined {n} states in {total_inner_cycles} inner cycles, "
+            f"halted={int(halted.sum())}, mean_confidence={confidence.mean() if n else 0.0:.3f}"
         )
         
-        return z, y, steps
+        return z_all, y_all, steps
     
     def _forward_pass(self, x: np.ndarray, weights: np.ndarray) -> np.ndarray:
         """
@@ -249,13 +317,13 @@ class TRMRefinementModule:
         Returns:
             Probability of halting (0-1)
         """
-        # Forward pass through halting head
-        logit = np.dot(z, self.halt_weights).item()
-        
-        # Sigmoid activation
-        halt_prob = 1.0 / (1.0 + np.exp(-logit))
-        
-        return float(halt_prob)
+        return float(self._halt_probabilities(z[np.newaxis])[0])
+    
+    def _halt_probabilities(self, z: np.ndarray) -> np.ndarray:
+        """Halting probabilities for a batch of latent states (N, latent_dim)."""
+        # Forward pass through halting head, then sigmoid
+        logits = np.dot(z, self.halt_weights)[:, 0]
+        return 1.0 / (1.0 + np.exp(-logits))
     
     def _compute_confidence(self, z: np.ndarray, y: np.ndarray) -> float:
         """
@@ -268,16 +336,18 @@ class TRMRefinementModule:
         Returns:
             Confidence score (0-1)
         """
+        return float(self._confidences(z[np.newaxis], y[np.newaxis])[0])
+    
+    def _confidences(self, z: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """Confidence scores for a batch of latent states and answers."""
         # State coherence: inverse of standard deviation (lower std = more coherent)
-        state_coherence = 1.0 / (1.0 + np.std(z))
+        state_coherence = 1.0 / (1.0 + np.std(z, axis=1))
         
         # Answer magnitude (normalized)
-        answer_strength = np.linalg.norm(y) / np.sqrt(len(y))
+        answer_strength = np.linalg.norm(y, axis=1) / np.sqrt(y.shape[1])
         
         # Combined confidence
-        confidence = 0.7 * state_coherence + 0.3 * answer_strength
-        
-        return float(np.clip(confidence, 0.0, 1.0))
+        return np.clip(0.7 * state_coherence + 0.3 * answer_strength, 0.0, 1.0)
     
     def _compute_attention(
         self,
@@ -294,37 +364,107 @@ class TRMRefinementModule:
         Returns:
             Attention-weighted context vector
         """
-        if 'attention_context' not in context:
-            # No attention context available, return zero vector
-            return np.zeros_like(z)
-        
-        attention_contexts = context['attention_context']
+        return self._attend(z[np.newaxis], self._prepare_attention(context))[0]
+    
+    def _attention_for(
+        self,
+        context: Optional[Dict[str, Any]]
+    ) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Prepared attention keys, or None for self-attention (disabled or no context)."""
+        if self.config.enable_attention and context:
+            return self._prepare_attention(context)
+        return None
+    
+    def _prepare_attention(self, context: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Stack a context's attention vectors once per refinement.
         
+        Returns ``(keys, valid)``: the context vectors as rows (zeros where an
+        entry is not an array of ``latent_dim``) and a mask of the usable
+        ones. No usable list gives zero keys, which attends to nothing.
+        """
+        dim = self.config.latent_dim
+        attention_contexts = context.get('attention_context')
         if not isinstance(attention_contexts, list) or len(attention_contexts) == 0:
+            return np.zeros((0, dim)), np.zeros(0, dtype=bool)
+        
+        keys = np.zeros((len(attention_contexts), dim))
+        valid = np.zeros(len(attention_contexts), dtype=bool)
+        for i, ctx_vec in enumerate(attention_contexts):
+            if isinstance(ctx_vec, np.ndarray) and len(ctx_vec) == dim:
+                keys[i] = ctx_vec
+                valid[i] = True
+        return keys, valid
+    
+    def _stack_attention(
+        self,
+        prepared: List[Optional[Tuple[np.ndarray, np.ndarray]]]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Pad per-row attention keys into one (N, M, latent_dim) tensor.
+        
+        Returns ``(keys, valid, present, self_rows)``. ``present`` marks real
+        entries (padding is excluded from the softmax, unusable entries are
+        not). A row with no entries gets one zero key, which attends to
+        nothing; ``self_rows`` marks rows using self-attention.
+        """
+        n = len(prepared)
+        width = max([1] + [len(p[0]) for p in prepared if p is not None])
+        keys = np.zeros((n, width, self.config.latent_dim))
+        valid = np.zeros((n, width), dtype=bool)
+        present = np.zeros((n, width), dtype=bool)
+        self_rows = np.zeros(n, dtype=bool)
+        for row, entry in enumerate(prepared):
+            if entry is None:
+                self_rows[row] = True
+                present[row, 0] = True
+                continue
+            row_keys, row_valid = entry
+            m = len(row_keys)
+            keys[row, :m] = row_keys
+            valid[row, :m] = row_valid
+            present[row, :max(m, 1)] = True
+        return keys, valid, present, self_rows
+    
+    def _attend_rows(
+        self,
+        z: np.ndarray,
+        rows: np.ndarray,
+        stacked: Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+    ) -> np.ndarray:
+        """Attention for queries ``z`` of ``rows``, each over its own keys."""
+        keys, valid, present, self_rows = (part[rows] for part in stacked)
+        
+        scores = np.matmul(keys, z[:, :, np.newaxis])[:, :, 0] / np.sqrt(z.shape[1])
+        scores = np.where(present, np.where(valid, scores, 0.0), -np.inf)
+        exp_scores = np.exp(scores - np.max(scores, axis=1, keepdims=True))
+        attention_weights = exp_scores / np.sum(exp_scores, axis=1, keepdims=True)
+        
+        attended = np.matmul(attention_weights[:, np.newaxis, :], keys)[:, 0, :]
+        attended[self_rows] = z[self_rows]
+        return attended
+    
+    def _attend(
+        self,
+        z: np.ndarray,
+        prepared: Optional[Tuple[np.ndarray, np.ndarray]]
+    ) -> np.ndarray:
+        """Attention-weighted context for a batch of queries (N, latent_dim)."""
+        if prepared is None:
+            return z  # Self-attention: z is concatenated with itself
+        keys, valid = prepared
+        if len(keys) == 0:
             return np.zeros_like(z)
         
-        # Compute attention scores
-        scores = []
-        for ctx_vec in attention_contexts:
-            if isinstance(ctx_vec, np.ndarray) and len(ctx_vec) == len(z):
-                # Dot product attention
-                score = np.dot(z, ctx_vec) / np.sqrt(len(z))
-                scores.append(score)
-            else:
-                scores.append(0.0)
+        # Dot product attention; unusable entries score 0 but add nothing
+        scores = np.where(valid, np.dot(z, keys.T) / np.sqrt(z.shape[1]), 0.0)
         
         # Softmax normalization
-        scores = np.array(scores)
-        exp_scores = np.exp(scores - np.max(scores))  # Numerical stability
-        attention_weights = exp_scores / np.sum(exp_scores)
+        exp_scores = np.exp(scores - np.max(scores, axis=1, keepdims=True))  # Numerical stability
+        attention_weights = exp_scores / np.sum(exp_scores, axis=1, keepdims=True)
         
         # Weighted sum of context vectors
-        attended_context = np.zeros_like(z)
-        for weight, ctx_vec in zip(attention_weights, attention_contexts):
-            if isinstance(ctx_vec, np.ndarray) and len(ctx_vec) == len(z):
-                attended_context += weight * ctx_vec
-        
-        return attended_context
+        return np.dot(attention_weights, keys)
     
     def _update_metrics(self, steps: List[RefinementStep], halted: bool):
         """Update performance metrics."""
@@ -6,8 +6,9 @@ for adaptive, efficient routing decisions with learned halting.
 """
 
 import logging
+from collections import deque
 import numpy as np
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from datetime import datetime
 
 from ..core.quantum_routing import QuantumAdvancedRouter, QuantumRoutingMetrics
@@ -74,8 +75,8 @@ class TRMRouter(QuantumAdvancedRouter):
             self.trm_module = None
             logger.info("TRM refinement disabled, using standard quantum routing")
         
-        # TRM-specific tracking
-        self.trm_routing_history: list = []
+        # TRM-specific tracking (bounded like the base routing history)
+        self.trm_routing_history: deque = deque(maxlen=self.routing_history.capacity)
         self.trm_feedback_buffer: list = []
     
     def _quantum_route_request(
@@ -92,55 +93,109 @@ class TRMRouter(QuantumAdvancedRouter):
             # Fall back to standard quantum routing
             return super()._quantum_route_request(request, start_time)
         
-        # Phase 1: Generate initial 112-dimensional state representation
-        encoding_start = datetime.now()
-        state_vector = self._generate_quantum_state_vector(request)
-        encoding_time = (datetime.now() - encoding_start).total_seconds() * 1000
-        
-        # Phase 2: TRM iterative refinement
-        refinement_start = datetime.now()
-        
-        # Initialize answer embedding with provider logits
-        initial_answer = self._initialize_answer_embedding(request)
-        
-        # Prepare attention context
-        attention_context = self._prepare_attention_context(request, state_vector)
-        
-        # Perform TRM refinement
-        final_state, final_answer, refinement_steps = self.trm_module.refine(
-            initial_state=state_vector,
-            initial_answer=initial_answer,
-            context={'attention_context': attention_context}
-        )
+        return self._trm_route_many([request])[0]
+    
+    def route_batch(self, requests: Iterable[ExecuteRequest]) -> List[RoutingDecision]:
+        """
+        Route many requests, refining all uncached ones in one TRM call.
         
-        refinement_time = (datetime.now() - refinement_start).total_seconds() * 1000
+        Cached decisions are returned as by ``route_request``; the remaining
+        requests are encoded one by one and then refined together with
+        ``TRMRefinementModule.refine_many`` (each keeps its own attention
+        context and halting), instead of one refinement per request.
+        """
+        requests = list(requests)
+        if not (self.enable_trm and self.trm_module is not None
+                and self.enable_quantum_features and self.state_encoder):
+            return super().route_batch(requests)
+        
+        decisions: List[Optional[RoutingDecision]] = [None] * len(requests)
+        pending = []
+        for i, request in enumerate(requests):
+            slash_command = self._parse_slash_commands(request.prompt)
+            cached = self._get_cached_decision(request, slash_command)
+            if cached is not None:
+                self.routing_history.record(cached)
+                decisions[i] = cached
+            else:
+                pending.append((i, slash_command))
+        
+        if pending:
+            batch = [requests[i] for i, _ in pending]
+            try:
+                routed = self._trm_route_many(batch)
+            except Exception as e:
+                logger.error(f"TRM batch routing failed: {e}")
+                if not self.fallback_to_basic:
+                    raise
+                logger.info("Falling back to basic routing")
+                routed = [self._compute_routing_decision(request) for request in batch]
+            
+            for (i, slash_command), decision in zip(pending, routed):
+                self._cache_decision(requests[i], slash_command, decision)
+                decisions[i] = decision
         
-        # Phase 3: Extract routing decision from refined state
-        routing_decision = self._extract_routing_decision(
-            request, final_state, final_answer, refinement_steps
-        )
+        return decisions
+    
+    def _trm_route_many(self, requests: List[ExecuteRequest]) -> List[RoutingDecision]:
+        """Encode each request, refine all states in one batch, then extract decisions."""
+        # Phase 1: Generate initial 112-dimensional state representations
+        encoding_times = []
+        state_vectors = []
+        for request in requests:
+            encoding_start = datetime.now()
+            state_vectors.append(self._generate_quantum_state_vector(request))
+            encoding_times.append((datetime.now() - encoding_start).total_seconds() * 1000)
         
-        # Phase 4: Enhanced decision with TRM metadata
-        enhanced_decision = self._create_trm_enhanced_decision(
-            routing_decision, final_state, final_answer,
-            refinement_steps, encoding_time, refinement_time
-        )
+        # Phase 2: TRM iterative refinement
+        refinement_start = datetime.now()
         
-        # Store for learning
-        self.trm_routing_history.append({
-            'request': request,
-            'decision': enhanced_decision,
-            'refinement_steps': refinement_steps,
-            'timestamp': datetime.now()
-        })
+        # Initialize answer embeddings with provider logits and attention contexts
+        initial_answers = np.stack([self._initialize_answer_embedding(request) for request in requests])
+        contexts = [
+            {'attention_context': self._prepare_attention_context(request, state_vector)}
+            for request, state_vector in zip(requests, state_vectors)
+        ]
         
-        logger.info(
-            f"TRM routing completed in {len(refinement_steps)} steps, "
-            f"provider={routing_decision.provider.value}, "
-            f"confidence={routing_decision.confidence:.3f}"
+        # Perform TRM refinement for all requests at once
+        final_states, final_answers, all_steps = self.trm_module.refine_many(
+            np.stack(state_vectors), initial_answers, context=contexts
         )
         
-        return routing_decision
+        # One refinement call serves the whole batch; attribute it evenly
+        refinement_time = (datetime.now() - refinement_start).total_seconds() * 1000 / len(requests)
+        
+        decisions = []
+        for request, final_state, final_answer, refinement_steps, encoding_time in zip(
+            requests, final_states, final_answers, all_steps, encoding_times
+        ):
+            # Phase 3: Extract routing decision from refined state
+            routing_decision = self._extract_routing_decision(
+                request, final_state, final_answer, refinement_steps
+            )
+            
+            # Phase 4: Enhanced decision with TRM metadata
+            enhanced_decision = self._create_trm_enhanced_decision(
+                routing_decision, final_state, final_answer,
+                refinement_steps, encoding_time, refinement_time
+            )
+            
+            # Store for learning
+            self.trm_routing_history.append({
+                'request': request,
+                'decision': enhanced_decision,
+                'refinement_steps': refinement_steps,
+                'timestamp': datetime.now()
+            })
+            
+            logger.info(
+                f"TRM routing completed in {len(refinement_steps)} steps, "
+                f"provider={routing_decision.provider.value}, "
+                f"confidence={routing_decision.confidence:.3f}"
+            )
+            decisions.append(routing_decision)
+        
+        return decisions
     
     def _initialize_answer_embedding(self, request: ExecuteRequest) -> np.ndarray:
         """
@@ -194,8 +249,8 @@ class TRMRouter(QuantumAdvancedRouter):
         if self.quantum_routing_history:
             # Get last 5 successful routings
             recent_successes = [
-                h for h in self.quantum_routing_history[-10:]
-                if h.original_decision.confidence > 0.7
+                h for h in self.quantum_routing_history.recent(10)
+                if h.confidence > 0.7
             ][-5:]
             
             for history_item in recent_successes:
@@ -7,8 +7,16 @@ from .sse_handler import (
     stream_response,
     format_sse_event,
 )
+from .sse_encoder import (
+    SSEEncoder,
+    coalesce_chunks,
+    encode_event,
+)
 
 __all__ = [
     "stream_response",
     "format_sse_event",
+    "SSEEncoder",
+    "coalesce_chunks",
+    "encode_event",
 ]
@@ -0,0 +1,221 @@
+"""
+Pre-framed Server-Sent Events encoding and delta coalescing.
+
+Token streams produce many tiny deltas, and framing each one as several
+separately written strings with ``json.dumps`` costs more CPU than the rest
+of the pipeline. This module provides the two stages the streaming
+endpoints run provider output through:
+
+- ``SSEEncoder`` encodes each event as one pre-framed ``bytes`` object
+  (``id``/``event``/``data`` lines and the terminating blank line), using
+  orjson when it is installed. The per-stream ``id:`` prefix and the
+  ``event:`` lines are built once.
+- ``coalesce_chunks`` merges consecutive ``StreamChunk`` deltas into frames
+  bounded by size (``max_chars``) and age (``max_delay``). Upstream chunks
+  are read by a producer task into a queue of at most ``max_pending``
+  chunks. When the client reads slowly, frames get larger. Once the queue
+  is full the producer stops reading from the provider, so a slow client
+  cannot make the server buffer without limit.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Any, AsyncGenerator, AsyncIterable, Dict, List, Optional
+
+from ..providers.streaming_adapter import StreamChunk
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Coalescing defaults: flush a frame at this many characters or this many seconds after its first delta
+COALESCE_MAX_CHARS = 512
+COALESCE_MAX_DELAY = 0.02
+# Upstream chunks read ahead of the client before the provider stream is paused
+MAX_PENDING_CHUNKS = 256
+
+_json_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def dumps(data: Any) -> bytes:
+    """Compact JSON as UTF-8 bytes (never contains a raw newline)."""
+    if orjson is not None:
+        return orjson.dumps(data, default=str)
+    return _json_encoder.encode(data).encode("utf-8")
+
+
+def encode_event(event: str, data: Any, event_id: Optional[str] = None) -> bytes:
+    """Frame a single SSE event as bytes."""
+    head = f"id: {event_id}\nevent: {event}\ndata: " if event_id is not None else f"event: {event}\ndata: "
+    return b"".join((head.encode("utf-8"), dumps(data), b"\n\n"))
+
+
+class SSEEncoder:
+    """
+    Encodes the events of one stream as pre-framed bytes.
+
+    Event ids are ``<stream_id>`` or ``<stream_id>-<suffix>``, matching the
+    ids the streaming endpoints have always sent.
+    """
+
+    __slots__ = ("stream_id", "_id_prefix", "_event_lines")
+
+    def __init__(self, stream_id: str):
+        self.stream_id = stream_id
+        self._id_prefix = f"id: {stream_id}".encode("utf-8")
+        self._event_lines: Dict[str, bytes] = {}
+
+    def _event_line(self, event: str) -> bytes:
+        line = self._event_lines.get(event)
+        if line is None:
+            line = self._event_lines[event] = f"event: {event}\ndata: ".encode("utf-8")
+        return line
+
+    def event(self, event: str, data: Any, suffix: Optional[Any] = None, with_id: bool = True) -> bytes:
+        """Frame ``data`` as ``event``; ``suffix`` is appended to the stream id."""
+        parts: List[bytes] = []
+        if with_id:
+            parts.append(self._id_prefix)
+            if suffix is not None:
+                parts.append(b"-" + str(suffix).encode("utf-8"))
+            parts.append(b"\n")
+        parts += (self._event_line(event), dumps(data), b"\n\n")
+        return b"".join(parts)
+
+    def message(self, content: str, index: int) -> bytes:
+        """A ``message`` event carrying one content frame."""
+        return b"".join((
+            self._id_prefix, b"-", str(index).encode("ascii"), b"\n",
+            self._event_line("message"), dumps({"content": content, "index": index}), b"\n\n",
+        ))
+
+    @staticmethod
+    def comment(text: str = "") -> bytes:
+        """An SSE comment line, e.g. a heartbeat."""
+        return f": {text}\n\n".encode("utf-8")
+
+
+class _Failure:
+    __slots__ = ("error",)
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+_END = object()
+
+
+def _merge(parts: List[StreamChunk], index: int) -> StreamChunk:
+    last = parts[-1]
+    if len(parts) == 1:
+        content = last.content
+    else:
+        content = "".join(part.content for part in parts)
+    return StreamChunk(
+        content=content,
+        index=index,
+        tokens=sum(part.tokens for part in parts),
+        finish_reason=last.finish_reason,
+        metadata=last.metadata,
+        deltas=sum(part.deltas for part in parts),
+    )
+
+
+async def coalesce_chunks(
+    chunks: AsyncIterable[StreamChunk],
+    max_chars: int = COALESCE_MAX_CHARS,
+    max_delay: float = COALESCE_MAX_DELAY,
+    max_pending: int = MAX_PENDING_CHUNKS,
+) -> AsyncGenerator[StreamChunk, None]:
+    """
+    Merge stream deltas into size- and time-bounded frames.
+
+    A frame is flushed once it holds ``max_chars`` characters, ``max_delay``
+    seconds after its first delta arrived, or at a chunk with a
+    ``finish_reason`` (which also ends the stream). With ``max_delay=0`` only
+    deltas already queued are merged. Frames are numbered from 1 and
+    ``deltas`` counts the upstream chunks in each.
+
+    Errors raised by ``chunks`` are re-raised after the buffered frame.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, max_pending))
+
+    async def produce() -> None:
+        try:
+            async for chunk in chunks:
+                await queue.put(chunk)
+        except Exception as e:
+            await queue.put(_Failure(e))
+            return
+        await queue.put(_END)
+
+    producer = asyncio.ensure_future(produce())
+    index = 0
+    try:
+        while True:
+            item = await queue.get()
+            if item is _END:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+
+            parts = [item]
+            size = len(item.content)
+            deadline = loop.time() + max_delay
+            tail: Any = None
+            while size < max_chars and parts[-1].finish_reason is None:
+                try:
+                    item = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                if item is _END or isinstance(item, _Failure):
+                    tail = item
+                    break
+                parts.append(item)
+                size += len(item.content)
+
+            index += 1
+            frame = _merge(parts, index)
+            yield frame
+            if frame.finish_reason is not None or tail is _END:
+                return
+            if isinstance(tail, _Failure):
+                raise tail.error
+    finally:
+        producer.cancel()
+        try:
+            await producer
+        except BaseException:
+            pass
+        aclose = getattr(chunks, "aclose", None)
+        if aclose is not None:
+            try:
+                await aclose()
+            except Exception as e:
+                logger.debug(f"Closing upstream stream failed: {e}")
+
+
+__all__ = [
+    "ORJSON_AVAILABLE",
+    "COALESCE_MAX_CHARS",
+    "COALESCE_MAX_DELAY",
+    "MAX_PENDING_CHUNKS",
+    "SSEEncoder",
+    "coalesce_chunks",
+    "dumps",
+    "encode_event",
+]
@@ -1,12 +1,15 @@
 import asyncio
 import json
 import logging
-from typing import AsyncGenerator, Dict, Set, Optional
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, AsyncIterator, Dict, Set, Optional
 
 import httpx
 from fastapi import FastAPI, Request, HTTPException, status
 from sse_starlette.sse import EventSourceResponse
 
+from ..providers.http_pool import get_http_pool, get_http_pool_stats, host_key
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("sse")
@@ -27,8 +30,27 @@ def format_sse_event(event_type: str, data: dict) -> str:
 # Heartbeat interval (seconds)
 HEARTBEAT_INTERVAL = 15
 
+# Per-request timeout for upstream provider streams (seconds)
+STREAM_TIMEOUT = 60
+
 # --- Provider Streaming Integration ---
 
+@asynccontextmanager
+async def pooled_stream(url: str, headers: dict, payload: dict) -> AsyncIterator[httpx.Response]:
+    """
+    POST ``payload`` to ``url`` and stream the response over the shared
+    keep-alive connection pool instead of a fresh client per request.
+    """
+    pool = get_http_pool()
+    host = host_key(url, url)
+    client = pool.get_client(host)
+    pool.record_stream(host, opened=True)
+    try:
+        async with client.stream("POST", url, headers=headers, json=payload, timeout=STREAM_TIMEOUT) as response:
+            yield response
+    finally:
+        pool.record_stream(host, opened=False)
+
 async def openai_stream(
     prompt: str,
     model: str,
@@ -50,29 +72,32 @@ async def openai_stream(
         "stream": stream,
         **kwargs
     }
-    async with httpx.AsyncClient(timeout=60) as client:
-        async with client.stream("POST", url, headers=headers, json=payload) as response:
-            async for line in response.aiter_lines():
-                if line.startswith("data: "):
-                    data = line[len("data: "):].strip()
-                    if data == "[DONE]":
-                        yield {"event": "done"}
-                        break
-                    try:
-                        chunk = json.loads(data)
-                        # OpenAI returns choices[0].delta.content for streamed tokens
-                        token = chunk.get("choices", [{}])[0].get("delta", {}).get("content")
-                        if token:
-                            yield {
-                                "event": "token",
-                                "token": token,
-                                "model": model,
-                                "provider": "openai"
-                            }
-                    except Exception as e:
-                        logger.exception("Error parsing OpenAI stream chunk")
-                        yield {"event": "error", "error": str(e)}
-                        break
+    done = False
+    async with pooled_stream(url, headers, payload) as response:
+        async for line in response.aiter_lines():
+            if line.startswith("data: "):
+                data = line[len("data: "):].strip()
+                if data == "[DONE]":
+                    # Read to the end of the body so the connection goes back to the pool
+                    done = True
+                    continue
+                try:
+                    chunk = json.loads(data)
+                    # OpenAI returns choices[0].delta.content for streamed tokens
+                    token = chunk.get("choices", [{}])[0].get("delta", {}).get("content")
+                    if token:
+                        yield {
+                            "event": "token",
+                            "token": token,
+                            "model": model,
+                            "provider": "openai"
+                        }
+                except Exception as e:
+                    logger.exception("Error parsing OpenAI stream chunk")
+                    yield {"event": "error", "error": str(e)}
+                    break
+    if done:
+        yield {"event": "done"}
 
 async def anthropic_stream(
     prompt: str,
@@ -97,29 +122,32 @@ async def anthropic_stream(
         "messages": [{"role": "user", "content": prompt}],
         **kwargs
     }
-    async with httpx.AsyncClient(timeout=60) as client:
-        async with client.stream("POST", url, headers=headers, json=payload) as response:
-            async for line in response.aiter_lines():
-                if line.startswith("data: "):
-                    data = line[len("data: "):].strip()
-                    if data == "[DONE]":
-                        yield {"event": "done"}
-                        break
-                    try:
-                        chunk = json.loads(data)
-                        # Anthropic returns content_block.delta.text for streamed tokens
-                        token = chunk.get("delta", {}).get("text")
-                        if token:
-                            yield {
-                                "event": "token",
-                                "token": token,
-                                "model": model,
-                                "provider": "anthropic"
-                            }
-                    except Exception as e:
-                        logger.exception("Error parsing Anthropic stream chunk")
-                        yield {"event": "error", "error": str(e)}
-                        break
+    done = False
+    async with pooled_stream(url, headers, payload) as response:
+        async for line in response.aiter_lines():
+            if line.startswith("data: "):
+                data = line[len("data: "):].strip()
+                if data == "[DONE]":
+                    # Read to the end of the body so the connection goes back to the pool
+                    done = True
+                    continue
+                try:
+                    chunk = json.loads(data)
+                    # Anthropic returns content_block.delta.text for streamed tokens
+                    token = chunk.get("delta", {}).get("text")
+                    if token:
+                        yield {
+                            "event": "token",
+                            "token": token,
+                            "model": model,
+                            "provider": "anthropic"
+                        }
+                except Exception as e:
+                    logger.exception("Error parsing Anthropic stream chunk")
+                    yield {"event": "error", "error": str(e)}
+                    break
+    if done:
+        yield {"event": "done"}
 
 async def generate_completion(
     provider: str,
@@ -238,4 +266,9 @@ async def stream_response(
 
 @app.get("/connections")
 async def list_connections():
-    return {"active_connections": list(active_connections.keys())}
\ No newline at end of file
+    return {"active_connections": list(active_connections.keys())}
+
+@app.get("/http-pool")
+async def http_pool_stats():
+    """Upstream connection pool utilisation."""
+    return get_http_pool_stats()
\ No newline at end of file
@@ -0,0 +1,90 @@
+"""Deferred imports for heavy optional dependencies.
+
+TensorFlow, PyTorch, sentence-transformers and tiktoken each add from
+hundreds of milliseconds to seconds of import time (and a lot of RSS) to a
+process. Serving workers only route requests and never train or embed, so
+modules that use these stacks check for them with ``module_available``
+(a ``find_spec`` lookup that does not execute the package) and import them
+with ``optional_import`` / ``require`` the first time the feature runs.
+
+``HEAVY_MODULES`` lists the packages that must stay out of the startup
+import graph; ``loaded_heavy_modules`` reports which of them a process has
+imported, for tests and the ``benchmark_import_time.py`` budget check.
+"""
+
+from __future__ import annotations
+
+import importlib
+import importlib.util
+import logging
+import sys
+import threading
+from types import ModuleType
+from typing import Dict, List, Optional
+
+__all__ = [
+    "HEAVY_MODULES",
+    "module_available",
+    "optional_import",
+    "require",
+    "loaded_heavy_modules",
+]
+
+logger = logging.getLogger(__name__)
+
+HEAVY_MODULES = ("tensorflow", "torch", "sentence_transformers", "tiktoken", "transformers")
+
+_available: Dict[str, bool] = {}
+_imported: Dict[str, Optional[ModuleType]] = {}
+_lock = threading.Lock()
+
+
+def module_available(name: str) -> bool:
+    """Whether ``name`` can be imported, without importing it.
+
+    Only the top-level package is located, so a broken installation is
+    reported as available and fails later in ``optional_import``.
+    """
+    cached = _available.get(name)
+    if cached is None:
+        if name in sys.modules:
+            cached = sys.modules[name] is not None
+        else:
+            try:
+                cached = importlib.util.find_spec(name.partition(".")[0]) is not None
+            except (ImportError, ValueError):
+                cached = False
+        _available[name] = cached
+    return cached
+
+
+def optional_import(name: str) -> Optional[ModuleType]:
+    """Import ``name`` on first call and cache it; None if it cannot be imported."""
+    if name in _imported:
+        return _imported[name]
+    with _lock:
+        if name not in _imported:
+            module: Optional[ModuleType] = None
+            if module_available(name):
+                try:
+                    module = importlib.import_module(name)
+                except Exception as e:  # broken installs raise more than ImportError
+                    logger.warning(f"Optional dependency '{name}' failed to import: {e}")
+            _imported[name] = module
+    return _imported[name]
+
+
+def require(name: str, feature: str, install: Optional[str] = None) -> ModuleType:
+    """Import ``name`` for ``feature`` or raise ImportError with an install hint."""
+    module = optional_import(name)
+    if module is None:
+        raise ImportError(
+            f"{name} is required for {feature}. "
+            f"Install with: pip install {install or name.partition('.')[0]}"
+        )
+    return module
+
+
+def loaded_heavy_modules() -> List[str]:
+    """Entries of ``HEAVY_MODULES`` already imported in this process."""
+    return [name for name in HEAVY_MODULES if name in sys.modules]
@@ -0,0 +1,149 @@
+import time
+
+import pytest
+
+from monkey_coder.cache.base import CACHE_REGISTRY, get_cache_registry_stats
+from monkey_coder.cache.persistent import (
+    RedisStore,
+    SQLiteStore,
+    decode_value,
+    encode_value,
+    l2_store_from_env,
+)
+from monkey_coder.cache.result_cache import ResultCache
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def store(request, tmp_path):
+    if request.param == "sqlite":
+        store = SQLiteStore(str(tmp_path / "cache.db"), max_bytes=4096, default_ttl=60.0)
+        yield store
+        store.close()
+    else:
+        fakeredis = pytest.importorskip("fakeredis")
+        yield RedisStore(fakeredis.FakeAsyncRedis(), prefix="test", max_bytes=4096, default_ttl=60.0)
+
+
+def test_encode_compresses_large_values():
+    small = {"content": "hi"}
+    large = {"content": "x" * 10_000}
+
+    assert encode_value(small)[:1] == b"j"
+    encoded = encode_value(large)
+    assert encoded[:1] == b"z"
+    assert len(encoded) < 1000
+    assert decode_value(encoded) == large
+    assert decode_value(encode_value(small)) == small
+
+
+@pytest.mark.asyncio
+async def test_store_round_trip_and_ttl(store):
+    await store.set("a", b"payload")
+    assert await store.get("a") == b"payload"
+    assert await store.get("missing") is None
+
+    await store.set("short", b"gone", ttl=0.001)
+    if isinstance(store, SQLiteStore):
+        time.sleep(0.01)
+    else:
+        await store.client.delete(store._value_key("short"))  # what Redis does on expiry
+    assert await store.get("short") is None
+
+    stats = store.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["expired"] == 1
+    assert stats["size"] == 1
+    assert stats["bytes"] == len(b"payload")
+
+
+@pytest.mark.asyncio
+async def test_store_evicts_least_recently_used_within_budget(store):
+    for i in range(4):
+        await store.set(f"k{i}", bytes(1000))
+    await store.get("k0")  # k0 becomes most recently used
+    await store.set("k4", bytes(1000))
+
+    assert store.total_bytes() <= store.max_bytes
+    assert await store.get("k0") is not None
+    assert await store.get("k1") is None
+    assert await store.get("k4") is not None
+    assert store.stats()["evictions"] >= 1
+
+
+@pytest.mark.asyncio
+async def test_redis_outage_degrades_without_raising():
+    class DownRedis:
+        def __getattr__(self, name):
+            async def fail(*args, **kwargs):
+                raise ConnectionError("redis down")
+
+            return fail
+
+    store = RedisStore(DownRedis(), prefix="down")
+    assert await store.get("k") is None
+    await store.set("k", b"v")
+    await store.delete("k")
+    await store.clear()
+    assert store.stats()["errors"] == 4
+
+
+@pytest.mark.asyncio
+async def test_l2_survives_a_new_process_level_cache(tmp_path):
+    path = str(tmp_path / "shared.db")
+    first = ResultCache(register=False, l2=SQLiteStore(path))
+    await first.aset("prompt", "developer", value={"content": "answer"}, provider="openai", model="gpt-4.1")
+
+    # A fresh worker starts with an empty L1 but a warm L2
+    second = ResultCache(register=False, l2=SQLiteStore(path))
+    assert await second.aget("prompt", "developer", provider="openai", model="gpt-4.1") == {"content": "answer"}
+    assert await second.aget("prompt", "developer", provider="openai", model="gpt-4.1") == {"content": "answer"}
+    assert await second.aget("other", "developer") is None
+
+    stats = second.stats()
+    assert stats["tiers"]["l2"]["backend"] == "SQLiteStore"
+    assert second.l2_hits == 1
+    assert second.l1_hits == 1
+    assert stats["misses"] == 1
+    assert stats["hits"] == 2
+
+
+@pytest.mark.asyncio
+async def test_unserialisable_values_stay_in_l1(tmp_path):
+    cache = ResultCache(register=False, l2=SQLiteStore(str(tmp_path / "c.db")))
+    value = {"obj": object()}
+    await cache.aset("p", "persona", value=value)
+
+    assert await cache.aget("p", "persona") is value
+    assert cache.l2.size() == 0
+
+
+@pytest.mark.asyncio
+async def test_tier_hit_rates_in_registry_stats():
+    fakeredis = pytest.importorskip("fakeredis")
+    CACHE_REGISTRY.clear()
+    cache = ResultCache(max_entries=4, l2=RedisStore(fakeredis.FakeAsyncRedis(), prefix="registry"))
+    await cache.aset("p", "persona", value={"v": 1})
+    cache._cache.clear()  # simulate an L1 eviction
+    assert await cache.aget("p", "persona") == {"v": 1}
+    assert await cache.aget("p", "persona") == {"v": 1}
+
+    stats = get_cache_registry_stats()
+    tiers = stats["caches"]["result_cache"]["tiers"]
+    assert tiers["l1"]["hit_rate"] == pytest.approx(0.5)
+    assert tiers["l2"]["tier_hit_rate"] == pytest.approx(0.5)
+    assert stats["aggregate"]["total_hits"] >= 2
+
+
+def test_l2_from_env(monkeypatch, tmp_path):
+    monkeypatch.delenv("RESULT_CACHE_L2", raising=False)
+    assert l2_store_from_env() is None
+
+    monkeypatch.setenv("RESULT_CACHE_L2", f"sqlite:///{tmp_path}/env.db")
+    monkeypatch.setenv("RESULT_CACHE_L2_MAX_BYTES", "1234")
+    store = l2_store_from_env()
+    assert isinstance(store, SQLiteStore)
+    assert store.max_bytes == 1234
+
+    monkeypatch.setenv("RESULT_CACHE_L2", "memcached://nope")
+    assert l2_store_from_env() is None
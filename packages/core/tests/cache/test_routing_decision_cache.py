@@ -0,0 +1,138 @@
+import asyncio
+
+from monkey_coder import manifest
+from monkey_coder.cache.base import CACHE_REGISTRY, get_cache_registry_stats
+from monkey_coder.cache.routing_cache import RoutingDecisionCache, invalidate_routing_caches
+from monkey_coder.core.routing import AdvancedRouter
+from monkey_coder.models import (
+    ExecuteRequest,
+    ExecutionContext,
+    PersonaConfig,
+    PersonaType,
+    ProviderType,
+    TaskType,
+)
+from monkey_coder.providers import ProviderRegistry
+
+
+def _request(prompt="Write a function to add two numbers", task_type=TaskType.CODE_GENERATION, context=None, **kwargs):
+    return ExecuteRequest(
+        prompt=prompt,
+        task_type=task_type,
+        context=context or ExecutionContext(user_id="cache_test"),
+        persona_config=PersonaConfig(persona=PersonaType.DEVELOPER),
+        **kwargs,
+    )
+
+
+def test_route_request_short_circuits_on_hit(monkeypatch):
+    CACHE_REGISTRY.clear()
+    router = AdvancedRouter()
+    first = router.route_request(_request())
+    assert "cached" not in first.metadata
+
+    def fail(*args, **kwargs):
+        raise AssertionError("model scoring should be skipped on a cache hit")
+
+    monkeypatch.setattr(router, "_score_models", fail)
+    second = router.route_request(_request())
+
+    assert second.metadata["cached"] is True
+    assert (second.provider, second.model, second.persona) == (first.provider, first.model, first.persona)
+    assert "cached" not in first.metadata  # cached copy does not mutate the stored decision
+    assert len(router.routing_history) == 2
+
+    stats = get_cache_registry_stats()["caches"]["routing_decision_cache"]
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_request_key_normalises_features():
+    base = RoutingDecisionCache.request_key(_request(), None)
+
+    # Same features, different request ids and file contents -> same key
+    assert RoutingDecisionCache.request_key(_request(files=[{"name": "a.py"}]), None) == base
+    assert RoutingDecisionCache.request_key(
+        _request(files=[{"name": "a.py"}, {"name": "b.py"}]), None
+    ) == RoutingDecisionCache.request_key(_request(files=[{"name": "c.py"}, {"name": "d.py"}]), None)
+
+    # Any routing-relevant feature changes the key
+    assert RoutingDecisionCache.request_key(_request(task_type=TaskType.TESTING), None) != base
+    assert RoutingDecisionCache.request_key(_request(files=[{"name": str(i)} for i in range(9)]), None) != base
+    assert RoutingDecisionCache.request_key(_request(), "dev") != base
+    assert RoutingDecisionCache.request_key(
+        _request(preferred_providers=[ProviderType.ANTHROPIC]), None
+    ) != base
+    assert RoutingDecisionCache.request_key(_request(prompt="Write a function to add three numbers"), None) != base
+    assert RoutingDecisionCache.request_key(
+        _request(context=ExecutionContext(user_id="cache_test", timeout=30)), None
+    ) != base
+
+
+def test_cached_copy_does_not_share_nested_metadata():
+    router = AdvancedRouter()
+    router.route_request(_request())
+    hit = router.route_request(_request())
+    hit.metadata.setdefault("nested", {})["mutated"] = True
+    for value in hit.metadata.values():
+        if isinstance(value, dict):
+            value["mutated"] = True
+
+    again = router.route_request(_request())
+    assert "nested" not in again.metadata
+    assert not any(isinstance(v, dict) and v.get("mutated") for v in again.metadata.values())
+
+
+def test_preferred_provider_is_not_served_from_other_entry():
+    router = AdvancedRouter()
+    router.route_request(_request())
+    decision = router.route_request(_request(preferred_providers=[ProviderType.ANTHROPIC]))
+
+    assert "cached" not in decision.metadata
+    assert decision.provider == ProviderType.ANTHROPIC
+
+
+def test_manifest_reload_invalidates_decisions():
+    router = AdvancedRouter()
+    router.route_request(_request())
+    manifest.reload()
+
+    decision = router.route_request(_request())
+    assert "cached" not in decision.metadata
+    assert router._routing_cache.stats()["invalidations"] >= 1
+
+
+def test_provider_health_change_invalidates_decisions():
+    router = AdvancedRouter()
+    router.route_request(_request())
+
+    class FlakyProvider:
+        name = "flaky"
+        status = "healthy"
+
+        async def health_check(self):
+            return {"status": self.status}
+
+    registry = ProviderRegistry()
+    provider = FlakyProvider()
+    registry._providers[ProviderType.OPENAI] = provider
+
+    asyncio.run(registry.health_check_all())
+    assert router.route_request(_request()).metadata.get("cached") is True
+
+    provider.status = "unhealthy"
+    asyncio.run(registry.health_check_all())
+    assert "cached" not in router.route_request(_request()).metadata
+
+
+def test_invalidate_keeps_counters():
+    CACHE_REGISTRY.clear()
+    cache = RoutingDecisionCache(max_entries=4, default_ttl=10.0)
+    cache.set_for_request(_request(), {"decision": 1})
+    assert cache.get_for_request(_request()) == {"decision": 1}
+
+    assert invalidate_routing_caches("test") >= 1
+    assert cache.get_for_request(_request()) is None
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["size"] == 0
@@ -0,0 +1,100 @@
+import threading
+import time
+
+import pytest
+
+from monkey_coder.cache.base import TTLRUCache
+
+
+def test_expired_entries_are_purged_without_touching_live_ones():
+    cache = TTLRUCache(max_entries=100, default_ttl=60.0)
+    cache.set("short", 1, ttl=0.01)
+    cache.set("long", 2)
+    time.sleep(0.02)
+
+    assert cache.get("long") == 2
+    assert "short" not in cache._store
+    stats = cache.stats()
+    assert stats["expired"] == 1
+    assert stats["size"] == 1
+
+
+def test_overwrite_leaves_stale_heap_record_that_is_skipped():
+    cache = TTLRUCache(max_entries=10, default_ttl=60.0)
+    cache.set("k", "old", ttl=0.01)
+    cache.set("k", "new", ttl=60.0)
+    time.sleep(0.02)
+
+    assert cache.get("k") == "new"
+    assert cache.stats()["expired"] == 0
+
+
+def test_expiry_heap_is_compacted():
+    cache = TTLRUCache(max_entries=4, default_ttl=60.0)
+    for i in range(1000):
+        cache.set(f"k{i % 8}", i)
+
+    assert len(cache) == 4
+    assert len(cache._expiry) <= 2 * len(cache) + 64
+
+
+def test_byte_budget_evicts_lru_and_skips_oversized():
+    cache = TTLRUCache(max_entries=100, max_bytes=100)
+    cache.set("a", "x" * 40)
+    cache.set("b", "x" * 40)
+    cache.get("a")
+    cache.set("c", "x" * 40)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.total_bytes == 80
+
+    cache.set("huge", "x" * 500)
+    assert cache.get("huge") is None
+    assert cache.stats()["bytes"] == 80
+
+
+def test_set_many_and_get_many():
+    cache = TTLRUCache(max_entries=3)
+    cache.set_many({"a": 1, "b": 2})
+    cache.set_many([("c", 3), ("d", 4)])
+
+    assert cache.get_many(["a", "b", "c", "d", "missing"]) == {"b": 2, "c": 3, "d": 4}
+    stats = cache.stats()
+    assert stats["hits"] == 3
+    assert stats["misses"] == 2
+    assert stats["evictions"] == 1
+
+
+def test_thread_safe_mode_under_contention():
+    cache = TTLRUCache(max_entries=50, default_ttl=60.0, thread_safe=True)
+
+    def worker(n):
+        for i in range(500):
+            cache.set(f"{n}-{i % 80}", i)
+            cache.get(f"{(n + 1) % 4}-{i % 80}")
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(cache) == 50
+    assert cache.stats()["hits"] + cache.stats()["misses"] == 2000
+
+
+@pytest.mark.slow
+def test_operation_cost_does_not_grow_with_size():
+    def per_op(size):
+        cache = TTLRUCache(max_entries=size, default_ttl=3600.0)
+        cache.set_many((f"k{i}", i) for i in range(size))
+        start = time.perf_counter()
+        for i in range(5000):
+            cache.get(f"k{i % size}")
+            cache.set(f"n{i}", i)
+        return time.perf_counter() - start
+
+    small, large = per_op(1_000), per_op(100_000)
+    # A full scan per call would make the large cache ~100x slower
+    assert large < small * 10
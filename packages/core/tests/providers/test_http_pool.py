@@ -0,0 +1,212 @@
+"""
+Tests for the shared pooled HTTP client layer.
+
+A tiny local HTTP/1.1 server counts TCP connections so keep-alive reuse can
+be checked without network access.
+"""
+
+import asyncio
+import importlib
+
+import httpx
+import pytest
+
+from monkey_coder.providers.http_pool import (
+    HTTPClientPool,
+    HTTPPoolConfig,
+    get_http_pool,
+    get_sdk_http_client,
+    host_key,
+)
+
+sse_handler = pytest.importorskip("monkey_coder.streaming.sse_handler")
+
+SSE_BODY = (
+    'data: {"choices": [{"delta": {"content": "hi"}}]}\n\n'
+    "data: [DONE]\n\n"
+).encode()
+
+
+async def _start_server():
+    """Keep-alive HTTP/1.1 server that answers every request with an SSE body."""
+    state = {"connections": 0, "requests": 0}
+
+    async def handle(reader, writer):
+        state["connections"] += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.decode().split("\r\n"):
+                    if line.lower().startswith("content-length:"):
+                        length = int(line.split(":", 1)[1])
+                if length:
+                    await reader.readexactly(length)
+                state["requests"] += 1
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                    + f"Content-Length: {len(SSE_BODY)}\r\n\r\n".encode()
+                    + SSE_BODY
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    return server, f"http://127.0.0.1:{port}", state
+
+
+def test_host_key_normalises_urls():
+    assert host_key("https://api.x.ai/v1", "https://default") == "https://api.x.ai"
+    assert host_key(None, "https://api.openai.com") == "https://api.openai.com"
+    assert host_key("not a url", "https://default") == "https://default"
+
+
+def test_config_from_env(monkeypatch):
+    monkeypatch.setenv("HTTP_POOL_MAX_CONNECTIONS", "7")
+    monkeypatch.setenv("HTTP_POOL_READ_TIMEOUT", "12.5")
+    monkeypatch.setenv("HTTP_POOL_HTTP2", "false")
+
+    config = HTTPPoolConfig.from_env()
+
+    assert config.max_connections == 7
+    assert config.timeout.read == 12.5
+    assert config.use_http2 is False
+
+
+def test_requests_reuse_one_connection_per_host():
+    async def scenario():
+        server, base_url, state = await _start_server()
+        pool = HTTPClientPool(HTTPPoolConfig(http2=False))
+        try:
+            for _ in range(5):
+                client = pool.get_client(host_key(base_url, base_url))
+                response = await client.post(f"{base_url}/v1/chat", json={"n": 1})
+                assert response.status_code == 200
+            stats = pool.stats()
+        finally:
+            await pool.aclose()
+            server.close()
+            await server.wait_closed()
+        return state, stats
+
+    state, stats = asyncio.run(scenario())
+
+    assert state == {"connections": 1, "requests": 5}
+    host = next(iter(stats["hosts"].values()))
+    assert host["requests"] == 5
+    assert host["responses"] == 5
+    assert host["connections"] == 1
+    assert host["idle_connections"] == 1
+    assert stats["clients_created"] == 1
+    assert stats["client_reuses"] == 4
+
+
+def test_clients_are_per_event_loop():
+    pool = HTTPClientPool(HTTPPoolConfig(http2=False))
+
+    async def grab():
+        return pool.get_client("https://example.test")
+
+    first = asyncio.run(grab())
+    second = asyncio.run(grab())
+
+    assert first is not second
+    assert len(pool._clients) == 1  # client of the closed loop was dropped
+
+
+def test_sse_stream_uses_pooled_connection(monkeypatch):
+    async def scenario():
+        server, base_url, state = await _start_server()
+        original = sse_handler.pooled_stream
+
+        def local_stream(url, headers, payload):
+            return original(url.replace("https://api.openai.com", base_url), headers, payload)
+
+        monkeypatch.setattr(sse_handler, "pooled_stream", local_stream)
+        try:
+            runs = []
+            for _ in range(3):
+                runs.append([event async for event in sse_handler.openai_stream("hi", "gpt-4.1", "key")])
+        finally:
+            await get_http_pool().aclose()
+            server.close()
+            await server.wait_closed()
+        return state, runs
+
+    state, runs = asyncio.run(scenario())
+
+    assert state["connections"] == 1
+    assert state["requests"] == 3
+    assert all([event["event"] for event in run] == ["token", "done"] for run in runs)
+    assert all(
+        entry.get("streams_open", 0) == 0 for entry in get_http_pool().stats()["hosts"].values()
+    )
+
+
+def test_sdk_http_client_matches_sdk_http_stack():
+    """SDKs built on httpx get the shared client; SDKs on another stack keep their own."""
+    for sdk in ("openai", "anthropic", "groq"):
+        try:
+            base_client = importlib.import_module(f"{sdk}._base_client")
+        except ImportError:
+            continue
+        client = get_sdk_http_client(sdk, None, f"https://api.{sdk}.test")
+        if getattr(base_client, "httpx", None) is httpx:
+            assert client is get_http_pool().get_client(f"https://api.{sdk}.test")
+        else:
+            assert client is None
+
+    assert get_sdk_http_client("not_an_sdk", None, "https://example.test") is None
+
+
+@pytest.mark.asyncio
+async def test_sdk_clients_share_pooled_transport(monkeypatch):
+    pytest.importorskip("groq")
+    if getattr(importlib.import_module("groq._base_client"), "httpx", None) is not httpx:
+        pytest.skip("installed groq SDK does not use httpx")
+    from monkey_coder.providers.groq_provider import GroqProvider
+
+    async def no_probe(self):
+        return None
+
+    monkeypatch.setattr(GroqProvider, "_test_connection", no_probe)
+    first = GroqProvider("test-key")
+    second = GroqProvider("test-key")
+    await first.initialize()
+    await second.initialize()
+
+    assert isinstance(first.client._client, httpx.AsyncClient)
+    assert first.client._client is second.client._client
+
+
+@pytest.mark.asyncio
+async def test_cleanup_closes_only_sdk_owned_clients(monkeypatch):
+    pytest.importorskip("groq")
+    from monkey_coder.providers import groq_provider
+    from monkey_coder.providers.groq_provider import GroqProvider
+
+    async def no_probe(self):
+        return None
+
+    monkeypatch.setattr(GroqProvider, "_test_connection", no_probe)
+
+    # SDK on another HTTP stack: it owns its transport, so cleanup closes it
+    monkeypatch.setattr(groq_provider, "get_sdk_http_client", lambda *args: None)
+    owned = GroqProvider("test-key")
+    await owned.initialize()
+    client = owned.client
+    await owned.cleanup()
+    assert owned.client is None
+    assert client.is_closed()
+
+    # Pooled transport: cleanup leaves the shared client open
+    pooled_client = get_http_pool().get_client("https://api.groq.com")
+    monkeypatch.setattr(groq_provider, "get_sdk_http_client", lambda *args: pooled_client)
+    pooled = GroqProvider("test-key")
+    await pooled.initialize()
+    await pooled.cleanup()
+    assert not pooled_client.is_closed
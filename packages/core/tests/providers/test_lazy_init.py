@@ -0,0 +1,188 @@
+"""
+Tests for lazy provider initialization, background health checks and the
+startup timeline.
+"""
+
+import asyncio
+
+import pytest
+
+from monkey_coder.models import ModelInfo, ProviderType
+from monkey_coder.providers import BaseProvider, ProviderRegistry
+
+
+class FakeProvider(BaseProvider):
+    """Provider that counts connections instead of calling an API."""
+
+    def __init__(self, api_key="test-key", fail_first=False, **kwargs):
+        super().__init__(api_key, **kwargs)
+        self.init_calls = 0
+        self.fail_first = fail_first
+
+    @property
+    def provider_type(self) -> ProviderType:
+        return ProviderType.GROQ
+
+    @property
+    def name(self) -> str:
+        return "fake"
+
+    async def initialize(self) -> None:
+        self.init_calls += 1
+        await asyncio.sleep(0.01)
+        if self.fail_first and self.init_calls == 1:
+            raise RuntimeError("upstream unavailable")
+        self.client = object()
+
+    async def cleanup(self) -> None:
+        self.client = None
+
+    async def validate_model(self, model_name: str) -> bool:
+        return True
+
+    async def get_available_models(self):
+        return []
+
+    async def get_model_info(self, model_name: str) -> ModelInfo:
+        raise NotImplementedError
+
+    async def generate_completion(self, model, messages, **kwargs):
+        assert self.client is not None
+        return {"content": "ok"}
+
+    async def stream_completion(self, model, messages, **kwargs):
+        assert self.client is not None
+        for token in ("a", "b"):
+            yield token
+
+    async def health_check(self):
+        return {"status": "healthy" if self.client else "unhealthy"}
+
+
+@pytest.mark.asyncio
+async def test_lazy_registration_connects_once_on_first_use():
+    registry = ProviderRegistry(lazy_init=True, health_check_interval=0)
+    provider = FakeProvider()
+
+    await registry.register_provider(provider)
+    assert registry.get_provider(ProviderType.GROQ) is provider
+    assert provider.init_calls == 0
+    assert not provider.initialized
+
+    results = await asyncio.gather(*[provider.generate_completion("m", []) for _ in range(5)])
+
+    assert results == [{"content": "ok"}] * 5
+    assert provider.init_calls == 1
+    assert provider.initialized
+    assert provider.init_duration_ms is not None
+
+
+@pytest.mark.asyncio
+async def test_streaming_methods_connect_on_first_use():
+    provider = FakeProvider()
+
+    tokens = [token async for token in provider.stream_completion("m", [])]
+
+    assert tokens == ["a", "b"]
+    assert provider.init_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_connection_is_retried_by_next_caller():
+    provider = FakeProvider(fail_first=True)
+
+    with pytest.raises(RuntimeError):
+        await provider.generate_completion("m", [])
+    assert provider.init_error == "upstream unavailable"
+
+    assert await provider.generate_completion("m", []) == {"content": "ok"}
+    assert provider.init_calls == 2
+    assert provider.init_error is None
+
+
+@pytest.mark.asyncio
+async def test_eager_registration_connects_immediately():
+    registry = ProviderRegistry(lazy_init=False, health_check_interval=0)
+    provider = FakeProvider()
+
+    await registry.register_provider(provider)
+
+    assert provider.init_calls == 1
+    assert registry.startup_timeline()["providers"]["fake"]["status"] == "connected"
+
+
+@pytest.mark.asyncio
+async def test_initialize_all_makes_no_api_calls_in_lazy_mode(monkeypatch):
+    pytest.importorskip("openai")
+    pytest.importorskip("anthropic")
+    from monkey_coder.providers.anthropic_adapter import AnthropicProvider
+    from monkey_coder.providers.openai_adapter import OpenAIProvider
+
+    for name in ("OPENAI_API_KEY", "ANTHROPIC_API_KEY", "GOOGLE_API_KEY", "GROQ_API_KEY", "GROK_API_KEY"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+
+    async def no_network(self):
+        raise AssertionError("startup must not call the provider API")
+
+    monkeypatch.setattr(OpenAIProvider, "_test_connection", no_network)
+    monkeypatch.setattr(AnthropicProvider, "_test_connection", no_network)
+
+    registry = ProviderRegistry(lazy_init=True, health_check_interval=0)
+    await registry.initialize_all()
+
+    timeline = registry.startup_timeline()
+    assert timeline["lazy_init"] is True
+    assert timeline["total_ms"] is not None
+    assert timeline["providers"]["OpenAI"]["status"] == "registered"
+    assert timeline["providers"]["Anthropic"]["connected"] is False
+
+    # Connecting builds the SDK client but, without verify_on_init, does not probe the API
+    anthropic = registry.get_provider(ProviderType.ANTHROPIC)
+    await anthropic.ensure_initialized()
+    assert anthropic.client is not None
+    assert registry.startup_timeline()["providers"]["Anthropic"]["connected"] is True
+
+
+@pytest.mark.asyncio
+async def test_background_health_results_are_cached():
+    registry = ProviderRegistry(lazy_init=True, health_check_interval=0.02)
+    provider = FakeProvider()
+    await registry.register_provider(provider)
+
+    assert registry.get_cached_health() == {"groq": {"status": "unknown"}}
+
+    # Monitor waits an interval and never connects lazy providers itself
+    registry.start_health_monitor()
+    await asyncio.sleep(0.1)
+    assert registry.get_cached_health()["groq"] == {"status": "unknown"}
+    assert provider.init_calls == 0
+
+    await provider.ensure_initialized()
+    for _ in range(100):
+        if registry.get_cached_health()["groq"]["status"] != "unknown":
+            break
+        await asyncio.sleep(0.01)
+
+    health = registry.get_cached_health()["groq"]
+    assert health["status"] == "healthy"
+    assert health["age_seconds"] >= 0
+    assert provider.init_calls == 1
+
+    await registry.cleanup_all()
+    assert registry._health_task is None
+    assert not provider.initialized
+
+
+@pytest.mark.asyncio
+async def test_health_monitor_waits_one_interval_before_first_probe():
+    registry = ProviderRegistry(lazy_init=False, health_check_interval=3600)
+    provider = FakeProvider()
+    await registry.register_provider(provider)
+
+    registry.start_health_monitor()
+    await asyncio.sleep(0.05)
+    assert registry.get_cached_health()["groq"] == {"status": "unknown"}
+
+    await registry.cleanup_all()
@@ -0,0 +1,304 @@
+"""
+Tests for single-flight coalescing of provider completions.
+"""
+
+import asyncio
+
+import pytest
+
+from monkey_coder.models import ModelInfo, ProviderType
+from monkey_coder.providers import BaseProvider
+from monkey_coder.providers.single_flight import SingleFlight, StreamFanout, completion_key, get_single_flight
+
+
+class CountingProvider(BaseProvider):
+    """Provider whose completions are slow enough to overlap and count upstream calls."""
+
+    def __init__(self, api_key="test-key", **kwargs):
+        super().__init__(api_key, **kwargs)
+        self.upstream_calls = 0
+
+    @property
+    def provider_type(self) -> ProviderType:
+        return ProviderType.GROQ
+
+    @property
+    def name(self) -> str:
+        return "counting"
+
+    async def initialize(self) -> None:
+        self.client = object()
+
+    async def cleanup(self) -> None:
+        self.client = None
+
+    async def validate_model(self, model_name: str) -> bool:
+        return True
+
+    async def get_available_models(self):
+        return []
+
+    async def get_model_info(self, model_name: str) -> ModelInfo:
+        raise NotImplementedError
+
+    async def generate_completion(self, model, messages, **kwargs):
+        self.upstream_calls += 1
+        await asyncio.sleep(0.02)
+        if kwargs.get("fail"):
+            raise RuntimeError("upstream failed")
+        if kwargs.get("stream"):
+            async def tokens():
+                for token in ("a", "b", "c"):
+                    await asyncio.sleep(0.01)
+                    yield token
+
+            return {"is_streaming": True, "stream": tokens(), "model": model}
+        return {"content": messages[-1]["content"].upper(), "model": model}
+
+
+MESSAGES = [{"role": "system", "content": "You are a developer"}, {"role": "user", "content": "hello"}]
+
+
+@pytest.fixture(autouse=True)
+def reset_counters():
+    get_single_flight().reset_stats()
+    yield
+
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_calls_share_one_upstream_call():
+    provider = CountingProvider()
+
+    results = await asyncio.gather(*[
+        provider.generate_completion("m", MESSAGES, temperature=0.2) for _ in range(5)
+    ])
+
+    assert provider.upstream_calls == 1
+    assert all(result == {"content": "HELLO", "model": "m"} for result in results)
+    # Callers get independent copies
+    results[0]["content"] = "changed"
+    assert results[1]["content"] == "HELLO"
+    stats = get_single_flight().stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == stats["coalesced"] == 4
+    assert stats["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_different_requests_are_not_coalesced():
+    provider = CountingProvider()
+
+    await asyncio.gather(
+        provider.generate_completion("m", MESSAGES),
+        provider.generate_completion("other", MESSAGES),
+        provider.generate_completion("m", MESSAGES, temperature=0.9),
+        provider.generate_completion("m", [{"role": "user", "content": "hello"}]),
+        provider.generate_completion("m", MESSAGES, single_flight=False),
+    )
+
+    assert provider.upstream_calls == 5
+
+
+@pytest.mark.asyncio
+async def test_sequential_calls_go_upstream_each_time():
+    provider = CountingProvider()
+
+    await provider.generate_completion("m", MESSAGES)
+    await provider.generate_completion("m", MESSAGES)
+
+    assert provider.upstream_calls == 2
+
+
+@pytest.mark.asyncio
+async def test_errors_are_shared_and_not_remembered():
+    provider = CountingProvider()
+
+    results = await asyncio.gather(
+        *[provider.generate_completion("m", MESSAGES, fail=True) for _ in range(3)],
+        return_exceptions=True,
+    )
+
+    assert provider.upstream_calls == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert get_single_flight().stats()["shared_errors"] == 2
+    assert get_single_flight().in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_shared_call():
+    provider = CountingProvider()
+
+    first = asyncio.ensure_future(provider.generate_completion("m", MESSAGES))
+    second = asyncio.ensure_future(provider.generate_completion("m", MESSAGES))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == {"content": "HELLO", "model": "m"}
+    assert provider.upstream_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_is_fanned_out_to_all_subscribers():
+    provider = CountingProvider()
+
+    responses = await asyncio.gather(*[
+        provider.generate_completion("m", MESSAGES, stream=True) for _ in range(3)
+    ])
+
+    async def drain(response):
+        return [token async for token in response["stream"]]
+
+    streams = await asyncio.gather(*[drain(response) for response in responses])
+
+    assert provider.upstream_calls == 1
+    assert streams == [["a", "b", "c"]] * 3
+    assert get_single_flight().stats()["streams_fanned_out"] == 1
+    assert get_single_flight().in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_late_stream_subscriber_replays_from_start():
+    provider = CountingProvider()
+
+    first = await provider.generate_completion("m", MESSAGES, stream=True)
+    iterator = first["stream"].__aiter__()
+    assert await iterator.__anext__() == "a"
+
+    late = await provider.generate_completion("m", MESSAGES, stream=True)
+    late_tokens = [token async for token in late["stream"]]
+    rest = [token async for token in iterator]
+
+    assert provider.upstream_calls == 1
+    assert late_tokens == ["a", "b", "c"]
+    assert rest == ["b", "c"]
+
+
+@pytest.mark.asyncio
+async def test_abandoned_stream_closes_upstream():
+    closed = asyncio.Event()
+
+    async def source():
+        try:
+            while True:
+                await asyncio.sleep(0.01)
+                yield "x"
+        finally:
+            closed.set()
+
+    fanout = StreamFanout(source())
+    subscription = fanout.subscribe()
+    assert await subscription.__anext__() == "x"
+    await subscription.aclose()
+
+    assert fanout.done
+    await asyncio.wait_for(closed.wait(), 1)
+
+
+@pytest.mark.asyncio
+async def test_follower_reads_whole_stream_after_leader_breaks():
+    provider = CountingProvider()
+    leader, follower = await asyncio.gather(
+        provider.generate_completion("m", MESSAGES, stream=True),
+        provider.generate_completion("m", MESSAGES, stream=True),
+    )
+
+    # The leader stops after one chunk before the follower has started iterating
+    async for token in leader["stream"]:
+        assert token == "a"
+        break
+    await leader["stream"].aclose()
+
+    assert [token async for token in follower["stream"]] == ["a", "b", "c"]
+    assert provider.upstream_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_unread_subscriber_is_released_when_dropped():
+    closed = asyncio.Event()
+
+    async def source():
+        try:
+            while True:
+                await asyncio.sleep(0.01)
+                yield "x"
+        finally:
+            closed.set()
+
+    fanout = StreamFanout(source())
+    reader, unread = fanout.subscribe(), fanout.subscribe()
+    assert fanout.subscribers == 2
+    assert await reader.__anext__() == "x"
+    await reader.aclose()
+    assert not fanout.done
+
+    del unread
+    await asyncio.wait_for(closed.wait(), 1)
+    assert fanout.done and fanout.subscribers == 0
+
+
+@pytest.mark.asyncio
+async def test_unread_stream_flight_expires():
+    group = SingleFlight(stream_join_ttl=0.05)
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+
+        async def tokens():
+            yield "a"
+
+        return {"is_streaming": True, "stream": tokens()}
+
+    # The leader's caller drops the stream without ever reading it
+    await group.do("key", call)
+    assert group.in_flight == 1
+
+    await asyncio.sleep(0.1)
+    assert group.in_flight == 0
+    response = await group.do("key", call)
+    assert calls == 2
+    assert [token async for token in response["stream"]] == ["a"]
+
+
+@pytest.mark.asyncio
+async def test_calls_with_different_api_keys_are_not_coalesced():
+    first = CountingProvider(api_key="key-a")
+    second = CountingProvider(api_key="key-b")
+
+    await asyncio.gather(
+        first.generate_completion("m", MESSAGES),
+        second.generate_completion("m", MESSAGES),
+    )
+
+    assert first.upstream_calls == 1
+    assert second.upstream_calls == 1
+    assert get_single_flight().stats()["hits"] == 0
+
+
+@pytest.mark.asyncio
+async def test_nested_calls_inside_a_flight_bypass_coalescing():
+    group = SingleFlight()
+
+    async def outer():
+        # Re-entering with the same key must not wait on itself
+        return await group.do("key", inner)
+
+    async def inner():
+        return "done"
+
+    assert await asyncio.wait_for(group.do("key", outer), 1) == "done"
+    assert group.stats()["bypassed"] == 1
+
+
+def test_completion_key_matches_result_cache_fields():
+    key = completion_key("openai", "gpt-4.1", MESSAGES, {"temperature": 0.2})
+
+    assert key == completion_key("openai", "gpt-4.1", list(MESSAGES), {"temperature": 0.2})
+    assert key != completion_key("openai", "gpt-4.1", MESSAGES, {"temperature": 0.3})
+    assert key != completion_key("anthropic", "gpt-4.1", MESSAGES, {"temperature": 0.2})
+    assert key != completion_key("openai", "gpt-4.1", MESSAGES, {"temperature": 0.2}, api_key="sk-a")
+    assert completion_key("openai", "gpt-4.1", MESSAGES, {}, api_key="sk-a") != completion_key(
+        "openai", "gpt-4.1", MESSAGES, {}, api_key="sk-b"
+    )
+    assert completion_key("openai", "gpt-4.1", MESSAGES, {"callback": object()}) is None
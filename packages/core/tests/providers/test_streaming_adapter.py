@@ -0,0 +1,187 @@
+"""
+Tests for the unified native streaming path and its time-to-first-token metric.
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from monkey_coder.providers.openai_adapter import OpenAIProvider
+from monkey_coder.providers.streaming_adapter import FakeStreamProvider, UnifiedStreamHandler
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+async def collect(stream):
+    return [chunk async for chunk in stream]
+
+
+def sdk_chunk(content, finish_reason=None):
+    choice = SimpleNamespace(index=0, delta=SimpleNamespace(content=content), finish_reason=finish_reason)
+    return SimpleNamespace(id="c", choices=[choice], usage=None)
+
+
+@pytest.mark.asyncio
+async def test_native_stream_records_time_to_first_token():
+    handler = UnifiedStreamHandler()
+    provider = FakeStreamProvider("streamed tokens", chunk_chars=4, first_token_delay=0.05)
+
+    chunks = await collect(handler.stream_completion("fake", provider, "m", MESSAGES))
+
+    assert "".join(c.content for c in chunks) == "streamed tokens"
+    assert [c.index for c in chunks] == [1, 2, 3, 4]
+    metrics = handler.get_metrics()["fake"]
+    assert 50 <= metrics["ttft_ms"] < 500
+    assert metrics["ttft_samples"] == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_streams_keep_their_own_metrics():
+    handler = UnifiedStreamHandler()
+    fast = FakeStreamProvider("abcdefgh", chunk_chars=4, token_interval=0.02)
+    slow = FakeStreamProvider("abcdefghijkl", chunk_chars=4, first_token_delay=0.05, token_interval=0.02)
+
+    results = await asyncio.gather(
+        collect(handler.stream_completion("fake", fast, "m", MESSAGES)),
+        collect(handler.stream_completion("fake", slow, "m", MESSAGES)),
+    )
+
+    # Interleaved streams on one adapter do not reset each other's chunk indexes or counts
+    assert [[c.index for c in chunks] for chunks in results] == [[1, 2], [1, 2, 3]]
+    metrics = handler.get_metrics()["fake"]
+    assert metrics["streams"] == 2
+    assert metrics["active_streams"] == 0
+    assert metrics["chunks"] == 5
+    assert metrics["ttft_samples"] == 2
+    assert handler.get_adapter("fake").last_stream.chunks in (2, 3)
+
+
+@pytest.mark.asyncio
+async def test_non_streaming_answers_arrive_in_one_chunk_without_delay():
+    handler = UnifiedStreamHandler()
+    content = "word " * 400
+
+    class OneShotProvider:
+        async def generate_completion(self, model, messages, **kwargs):
+            assert "stream" not in kwargs
+            return {"content": content}
+
+    start = time.perf_counter()
+    chunks = await collect(handler.stream_completion("oneshot", OneShotProvider(), "m", MESSAGES, stream=True))
+    replayed = await collect(handler.stream_response("grok", None, content=content))
+
+    assert [c.content for c in chunks] == [content]
+    assert [c.content for c in replayed] == [content]
+    assert chunks[0].finish_reason == "stop"
+    assert time.perf_counter() - start < 0.05
+
+
+@pytest.mark.asyncio
+async def test_normalized_events_stop_at_done_and_close_the_stream():
+    handler = UnifiedStreamHandler()
+    closed = []
+
+    async def events():
+        try:
+            yield {"type": "delta", "content": "a"}
+            yield {"type": "delta", "content": ""}
+            yield {"type": "done"}
+            yield {"type": "delta", "content": "ignored"}
+        finally:
+            closed.append(True)
+
+    chunks = await collect(handler.stream_response("google", events()))
+
+    assert [c.content for c in chunks] == ["a"]
+    assert closed == [True]
+
+
+@pytest.mark.asyncio
+async def test_openai_adapter_streams_through_the_common_interface():
+    provider = OpenAIProvider("test-key")
+    provider._initialized = True
+    requests = []
+
+    async def create(**params):
+        requests.append(params)
+
+        async def stream():
+            for chunk in (sdk_chunk("Hel"), sdk_chunk(None), sdk_chunk("lo"), sdk_chunk(None, "stop")):
+                yield chunk
+
+        return stream()
+
+    provider.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+    chunks = await collect(UnifiedStreamHandler().stream_completion("openai", provider, "gpt-4.1", MESSAGES))
+
+    assert [c.content for c in chunks] == ["Hel", "lo"]
+    assert requests[0]["stream"] is True
+    assert requests[0]["stream_options"] == {"include_usage": True}
+
+
+@pytest.mark.asyncio
+async def test_openai_done_event_carries_usage_from_the_final_chunk():
+    pydantic = pytest.importorskip("pydantic")
+
+    class Usage(pydantic.BaseModel):
+        prompt_tokens: int
+        completion_tokens: int
+        total_tokens: int
+
+    class Stream:
+        closed = False
+
+        def __aiter__(self):
+            return self._chunks()
+
+        async def _chunks(self):
+            yield sdk_chunk("hi")
+            yield sdk_chunk(None, "stop")
+            yield SimpleNamespace(id="c", choices=[], usage=Usage(prompt_tokens=3, completion_tokens=1, total_tokens=4))
+
+        async def close(self):
+            self.closed = True
+
+    stream = Stream()
+    provider = OpenAIProvider("test-key")
+    provider._initialized = True
+
+    async def create(**params):
+        return stream
+
+    provider.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+    events = await collect(provider.stream_completion("gpt-4.1", MESSAGES, single_flight=False))
+
+    assert events[-1] == {
+        "type": "done",
+        "finish_reason": "stop",
+        "usage": {"prompt_tokens": 3, "completion_tokens": 1, "total_tokens": 4},
+    }
+    assert stream.closed
+
+
+@pytest.mark.asyncio
+async def test_provider_stream_defaults_to_the_providers_manifest_model():
+    from monkey_coder.app.streaming_endpoints import ProviderStream
+    from monkey_coder.manifest import PROVIDER_DEFAULTS
+
+    models = []
+
+    class Adapter(FakeStreamProvider):
+        default_model = None
+
+        async def stream_completion(self, model, messages, **kwargs):
+            models.append(model)
+            async for event in super().stream_completion(model, messages, **kwargs):
+                yield event
+
+    stream = ProviderStream("grok", Adapter("ok"))
+    assert [chunk async for chunk in stream.stream_response("hi")] == ["ok"]
+    assert models == [PROVIDER_DEFAULTS["xai"]]
+
+    with pytest.raises(ValueError, match="no default model"):
+        await collect(ProviderStream("custom", object()).stream_response("hi"))
@@ -20,6 +20,7 @@ from monkey_coder.quantum.dqn_agent import (
     RoutingAction,
     RoutingState,
 )
+from monkey_coder.quantum.neural_network import NumpyDQNNetwork
 
 
 class TestRoutingState(unittest.TestCase):
@@ -458,8 +459,10 @@ class TestDQNAgentIntegration(unittest.TestCase):
         # Mock neural networks to enable replay
         self.agent.q_network = Mock()
         self.agent.target_q_network = Mock()
-        self.agent.q_network.predict.return_value = np.array([[0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0, 1.1, 1.2]])
-        self.agent.target_q_network.predict.return_value = np.array([[0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0, 1.1, 1.2]])
+        q_row = np.array([[0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0, 1.1, 1.2]])
+        # replay predicts on the whole stacked minibatch at once
+        self.agent.q_network.predict.side_effect = lambda states: np.repeat(q_row, len(states), axis=0)
+        self.agent.target_q_network.predict.side_effect = lambda states: np.repeat(q_row, len(states), axis=0)
         self.agent.q_network.train.return_value = 0.1
         self.agent.q_network.get_weights.return_value = "mock_weights"
         
@@ -470,6 +473,81 @@ class TestDQNAgentIntegration(unittest.TestCase):
         # Exploration rate should have decayed
         self.assertLess(self.agent.exploration_rate, initial_exploration)
         self.assertGreaterEqual(self.agent.exploration_rate, self.agent.exploration_min)
+        self.assertEqual(self.agent.q_network.predict.call_count, 10)
+        self.assertEqual(self.agent.target_q_network.predict.call_count, 10)
+        self.assertEqual(self.agent.q_network.train.call_count, 10)
+
+
+class TestBatchedReplay(unittest.TestCase):
+    """Minibatch replay against the numpy network backend."""
+
+    def setUp(self):
+        self.agent = DQNRoutingAgent(memory_size=500, batch_size=32, random_seed=7)
+        network = NumpyDQNNetwork(state_size=21, action_size=12, learning_rate=0.01)
+        self.agent.q_network = self.agent.target_q_network = network
+
+        rng = np.random.default_rng(0)
+        for i in range(200):
+            self.agent.memory.append((
+                rng.random(21),
+                int(rng.integers(12)),
+                float(rng.normal()),
+                rng.random(21),
+                i % 10 == 9,
+            ))
+
+    def _batch(self, n=16):
+        experiences = list(self.agent.memory)[:n]
+        return [np.array(column) for column in zip(*experiences)]
+
+    def test_targets_match_per_sample_computation(self):
+        states, actions, rewards, next_states, dones = self._batch()
+        targets, _ = self.agent.compute_targets(states, actions, rewards, next_states, dones)
+
+        network = self.agent.q_network
+        for i in range(len(states)):
+            expected = network.predict(states[i])[0].copy()
+            value = rewards[i]
+            if not dones[i]:
+                value += self.agent.discount_factor * np.max(network.predict_target(next_states[i])[0])
+            expected[actions[i]] = value
+            np.testing.assert_allclose(targets[i], expected)
+
+    def test_double_dqn_evaluates_online_argmax_with_target_network(self):
+        network = self.agent.q_network
+        network.weights[-1] += 0.5  # make online and target networks disagree
+        self.agent.double_dqn = True
+        states, actions, rewards, next_states, dones = self._batch()
+
+        targets, _ = self.agent.compute_targets(states, actions, rewards, next_states, dones)
+
+        chosen = np.argmax(network.predict(next_states), axis=1)
+        evaluated = network.predict_target(next_states)[np.arange(len(states)), chosen]
+        expected = rewards + self.agent.discount_factor * evaluated * (~dones)
+        np.testing.assert_allclose(targets[np.arange(len(states)), actions], expected)
+
+    def test_huber_clips_td_errors(self):
+        self.agent.loss = "huber"
+        self.agent.huber_delta = 0.1
+        states, actions, rewards, next_states, dones = self._batch()
+        rewards = rewards * 100
+
+        targets, td_errors = self.agent.compute_targets(states, actions, rewards, next_states, dones)
+
+        self.assertLessEqual(np.max(np.abs(td_errors)), 0.1)
+        current = self.agent.q_network.predict(states)[np.arange(len(states)), actions]
+        np.testing.assert_allclose(targets[np.arange(len(states)), actions], current + td_errors)
+
+    def test_unknown_loss_is_rejected(self):
+        with self.assertRaises(ValueError):
+            DQNRoutingAgent(memory_size=10, loss="l1")
+
+    def test_replay_takes_one_training_step_per_call(self):
+        losses = [self.agent.replay() for _ in range(20)]
+
+        self.assertTrue(all(isinstance(loss, float) for loss in losses))
+        self.assertEqual(self.agent.q_network.training_step, 20)
+        self.assertEqual(self.agent.training_step, 20)
 
 
 if __name__ == "__main__":
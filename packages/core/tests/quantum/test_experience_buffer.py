@@ -11,7 +11,7 @@ import os
 from unittest.mock import patch
 
 from monkey_coder.quantum.experience_buffer import (
-    Experience, ExperienceReplayBuffer, PrioritizedExperienceBuffer
+    Experience, ExperienceReplayBuffer, PrioritizedExperienceBuffer, ReplayBatch
 )
 
 
@@ -413,8 +413,10 @@ class TestPrioritizedExperienceBuffer:
         assert isinstance(indices, np.ndarray)
         assert isinstance(weights, np.ndarray)
         
-        # Weights should be normalized
-        assert weights.max() == 1.0
+        # Weights are normalized by the lowest priority in the buffer
+        priorities = self.buffer._priority_slots[indices]
+        np.testing.assert_allclose(weights, (priorities / 0.1) ** (-0.6 * 0.4))
+        assert weights.max() <= 1.0
         assert all(w > 0 for w in weights)
     
     def test_update_priorities(self):
@@ -465,6 +467,137 @@ class TestPrioritizedExperienceBuffer:
         assert len(self.buffer) == 0
 
 
+def _experience(idx: int) -> Experience:
+    return Experience(
+        state=np.array([float(idx), float(idx + 1)]),
+        action=idx % 4,
+        reward=float(idx),
+        next_state=np.array([float(idx + 0.5), float(idx + 1.5)]),
+        done=idx % 10 == 9,
+        timestamp=float(idx),
+    )
+
+
+class TestArrayStorage:
+    """Tests for the structure-of-arrays ring storage."""
+
+    def test_ring_wraps_and_keeps_newest(self):
+        buffer = ExperienceReplayBuffer(capacity=8, min_size=1, cleanup_threshold=1.0)
+        for i in range(21):
+            buffer.add(_experience(i))
+
+        assert len(buffer) == 8
+        arrays = buffer._logical_arrays()
+        np.testing.assert_array_equal(arrays['rewards'], np.arange(13, 21, dtype=np.float32))
+        np.testing.assert_array_equal(arrays['states'][:, 0], np.arange(13, 21, dtype=np.float32))
+
+    def test_sample_batch_returns_consistent_training_arrays(self):
+        buffer = ExperienceReplayBuffer(capacity=16, min_size=1, cleanup_threshold=1.0)
+        for i in range(40):
+            buffer.add(_experience(i))
+
+        batch = buffer.sample_batch(10)
+
+        assert isinstance(batch, ReplayBatch)
+        assert batch.states.dtype == np.float32
+        assert batch.states.shape == (10, 2)
+        assert batch.weights is None
+        assert len(set(batch.indices.tolist())) == 10  # without replacement
+        # Every row belongs to one experience
+        np.testing.assert_array_equal(batch.states[:, 0], batch.rewards)
+        np.testing.assert_array_equal(batch.next_states[:, 0], batch.rewards + 0.5)
+        np.testing.assert_array_equal(batch.actions, batch.rewards.astype(int) % 4)
+        assert batch.rewards.min() >= 24
+        assert buffer.get_batch_arrays(batch)[0] is batch.states
+
+    def test_sample_batch_cost_does_not_depend_on_capacity(self):
+        buffer = ExperienceReplayBuffer(capacity=200_000, min_size=1, cleanup_threshold=1.0)
+        for i in range(200_000):
+            buffer._append(_experience(i % 50))
+        with patch.object(buffer, '_slots', wraps=buffer._slots) as slots:
+            batch = buffer.sample_batch(32)
+        assert slots.call_args[0][0].shape == (32,)
+        assert batch.states.shape == (32, 2)
+
+    def test_memory_per_experience(self):
+        buffer = ExperienceReplayBuffer(capacity=1000, min_size=1)
+        buffer.add(Experience(np.zeros(21), 0, 0.0, np.zeros(21), False, 0.0))
+
+        # 2 x 21 float32 states + action, reward, done, timestamp
+        assert buffer.get_statistics()['memory_bytes'] == 1000 * (2 * 21 * 4 + 8 + 4 + 1 + 8)
+
+    def test_mismatched_state_shape_is_rejected(self):
+        buffer = ExperienceReplayBuffer(capacity=10, min_size=1)
+        buffer.add(_experience(0))
+        with pytest.raises(ValueError, match="does not match buffer state shape"):
+            buffer.add(Experience(np.zeros(3), 0, 0.0, np.zeros(3), False, 0.0))
+
+    def test_load_legacy_experience_list(self, tmp_path):
+        import pickle
+
+        path = tmp_path / "legacy.pkl"
+        with open(path, 'wb') as f:
+            pickle.dump({'experiences': [_experience(i) for i in range(12)], 'capacity': 10,
+                         'min_size': 2, 'cleanup_threshold': 1.0, 'stats': {}}, f)
+
+        buffer = ExperienceReplayBuffer(capacity=50, min_size=5)
+        assert buffer.load_buffer(str(path)) is True
+        assert len(buffer) == 10
+        np.testing.assert_array_equal(buffer._logical_arrays()['rewards'], np.arange(2, 12))
+
+    def test_prioritized_indices_are_slots_after_wraparound(self):
+        buffer = PrioritizedExperienceBuffer(capacity=5, min_size=1, cleanup_threshold=1.0)
+        for i in range(7):
+            buffer.add(_experience(i), priority=1.0)
+        buffer.update_priorities(np.array([0]), np.array([5.0]))  # slot 0 holds experience 5
+
+        assert buffer._priorities.tolist() == [1.0, 1.0, 1.0, 5.0, 1.0]
+        batch = buffer.sample_batch(4)
+        assert batch.weights.max() == 1.0
+        np.testing.assert_array_equal(buffer._rewards[batch.indices], batch.rewards)
+
+    @staticmethod
+    def _add_chunk(buffer, chunk):
+        buffer.add_batch(
+            np.stack([e.state for e in chunk]),
+            np.array([e.action for e in chunk]),
+            np.array([e.reward for e in chunk]),
+            np.stack([e.next_state for e in chunk]),
+            np.array([e.done for e in chunk]),
+        )
+
+    def test_add_batch_matches_sequential_adds(self):
+        experiences = [_experience(i) for i in range(47)]
+        sequential = ExperienceReplayBuffer(capacity=20, min_size=1, cleanup_threshold=1.0)
+        batched = ExperienceReplayBuffer(capacity=20, min_size=1, cleanup_threshold=1.0)
+        for experience in experiences:
+            sequential.add(experience)
+        # The middle chunk is larger than the capacity
+        for start, end in ((0, 5), (5, 30), (30, 47)):
+            self._add_chunk(batched, experiences[start:end])
+
+        assert len(batched) == len(sequential)
+        assert batched.get_statistics()['total_added'] == 47
+        expected, actual = sequential._logical_arrays(), batched._logical_arrays()
+        for key in ('states', 'actions', 'rewards', 'next_states', 'dones'):
+            np.testing.assert_array_equal(actual[key], expected[key])
+
+    def test_add_batch_cleans_up_below_threshold(self):
+        buffer = ExperienceReplayBuffer(capacity=20, min_size=1, cleanup_threshold=0.9)
+        self._add_chunk(buffer, [_experience(i) for i in range(19)])
+
+        assert len(buffer) <= 18
+        assert buffer._logical_arrays()['rewards'][-1] == 18
+
+    def test_prioritized_add_batch_uses_max_priority(self):
+        buffer = PrioritizedExperienceBuffer(capacity=8, min_size=1, cleanup_threshold=1.0)
+        buffer.add(_experience(0), priority=3.0)
+        buffer.add_batch(np.ones((3, 2)), np.zeros(3), np.zeros(3), np.ones((3, 2)), np.zeros(3, dtype=bool))
+
+        assert buffer._priorities.tolist() == [3.0, 3.0, 3.0, 3.0]
+        assert buffer._tree.total == pytest.approx(4 * 3.0 ** buffer.alpha)
+
+
 class TestIntegration:
     """Integration tests for experience buffer components."""
     
@@ -542,4 +675,4 @@ class TestIntegration:
             
             # Verify importance weights are applied
             assert all(w > 0 for w in weights)
-            assert weights.max() == 1.0
\ No newline at end of file
+            assert weights.max() <= 1.0 + 1e-12
\ No newline at end of file
@@ -0,0 +1,212 @@
+"""
+Tests for the compiled inference-only Q-network and its hot-swap slot.
+"""
+
+import threading
+
+import numpy as np
+import pytest
+
+from monkey_coder.quantum.dqn_agent import DQNRoutingAgent
+from monkey_coder.quantum.inference import CompiledQNetwork, InferenceSlot, extract_layers
+from monkey_coder.quantum.neural_network import NumpyDQNNetwork, create_dqn_network
+
+
+def _states(n: int, size: int = 21, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).normal(size=(n, size))
+
+
+# Stand-ins for Keras layers: compilation goes by class name and get_weights()
+class Dense:
+    def __init__(self, kernel, bias, activation="linear"):
+        self._params = [kernel, bias]
+        self.activation = {"relu": lambda x: np.maximum(x, 0), "linear": lambda x: x}[activation]
+        self.activation.__name__ = activation
+
+    def get_weights(self):
+        return self._params
+
+    def __call__(self, x):
+        return self.activation(x @ self._params[0] + self._params[1])
+
+
+class BatchNormalization:
+    epsilon = 1e-3
+
+    def __init__(self, gamma, beta, mean, variance):
+        self._params = [gamma, beta, mean, variance]
+
+    def get_weights(self):
+        return self._params
+
+    def __call__(self, x):
+        gamma, beta, mean, variance = self._params
+        return gamma * (x - mean) / np.sqrt(variance + self.epsilon) + beta
+
+
+class Dropout:
+    def get_weights(self):
+        return []
+
+    def __call__(self, x):
+        return x
+
+
+class FakeSequential:
+    def __init__(self, layers):
+        self.layers = layers
+
+    def predict(self, x):
+        for layer in self.layers:
+            x = layer(x)
+        return x
+
+
+class TestCompiledQNetwork:
+    @pytest.mark.parametrize("activation", ["relu", "tanh", "sigmoid"])
+    def test_matches_numpy_network(self, activation):
+        network = NumpyDQNNetwork(21, 12, hidden_layers=(64, 32), activation=activation)
+        engine = CompiledQNetwork.from_network(network, max_batch=8)
+        states = _states(20)
+
+        assert engine.layer_sizes == [21, 64, 32, 12]
+        assert engine.activations == (activation, activation, "linear")
+        # Single row, scratch-sized batch and an oversized batch
+        for batch in (states[0], states[:8], states):
+            expected = network.predict(batch)
+            actual = engine.predict(batch)
+            assert actual.dtype == np.float32
+            np.testing.assert_allclose(actual, expected, rtol=1e-4, atol=1e-5)
+        np.testing.assert_array_equal(engine.best_actions(states), network.predict(states).argmax(axis=1))
+
+    def test_snapshot_is_independent_of_later_training(self):
+        wrapper = create_dqn_network(21, 12, force_numpy=True)
+        engine = CompiledQNetwork.from_network(wrapper)
+        states = _states(4)
+        before = wrapper.predict(states)
+
+        wrapper.train(states, before + 1.0)
+        assert not np.allclose(wrapper.predict(states), before)
+        np.testing.assert_allclose(engine.predict(states), before, rtol=1e-4, atol=1e-5)
+
+    def test_results_do_not_alias_scratch_buffers(self):
+        engine = CompiledQNetwork.from_network(NumpyDQNNetwork(21, 12))
+        states = _states(2)
+        first = engine.predict(states[0])
+        engine.predict(states[1])
+        np.testing.assert_array_equal(first, engine.predict(states[0]))
+
+        out = np.empty((2, 12), dtype=np.float32)
+        assert engine.predict(states, out=out) is out
+
+    def test_keras_layout_folds_batch_norm_and_skips_dropout(self):
+        rng = np.random.default_rng(1)
+        model = FakeSequential([
+            Dense(rng.normal(size=(21, 16)), rng.normal(size=16), "relu"),
+            BatchNormalization(rng.uniform(0.5, 2, 16), rng.normal(size=16), rng.normal(size=16), rng.uniform(0.1, 3, 16)),
+            Dropout(),
+            Dense(rng.normal(size=(16, 8)), rng.normal(size=8), "relu"),
+            BatchNormalization(rng.uniform(0.5, 2, 8), rng.normal(size=8), rng.normal(size=8), rng.uniform(0.1, 3, 8)),
+            Dense(rng.normal(size=(8, 12)), rng.normal(size=12)),
+        ])
+        engine = CompiledQNetwork.from_network(model)
+        states = _states(5)
+
+        assert engine.layer_sizes == [21, 16, 8, 12]
+        np.testing.assert_allclose(engine.predict(states), model.predict(states), rtol=1e-4, atol=1e-4)
+
+    def test_rejects_unknown_networks_and_bad_inputs(self):
+        with pytest.raises(TypeError):
+            extract_layers(object())
+        with pytest.raises(ValueError):
+            CompiledQNetwork([(np.ones((3, 2)), np.ones(2), "relu"), (np.ones((3, 1)), np.ones(1), "linear")])
+        with pytest.raises(ValueError):
+            CompiledQNetwork([(np.ones((3, 2)), np.ones(2), "softplus")])
+
+        engine = CompiledQNetwork([(np.ones((3, 2)), np.zeros(2), "linear")])
+        with pytest.raises(ValueError):
+            engine.predict(np.ones(4))
+
+    def test_threads_use_separate_scratch_buffers(self):
+        network = NumpyDQNNetwork(21, 12)
+        engine = CompiledQNetwork.from_network(network)
+        states = _states(8)
+        expected = network.predict(states)
+        failures = []
+
+        def worker(row):
+            for _ in range(200):
+                if not np.allclose(engine.predict(states[row]), expected[row], rtol=1e-4, atol=1e-5):
+                    failures.append(row)
+
+        threads = [threading.Thread(target=worker, args=(row,)) for row in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert not failures
+
+
+class TestInferenceSlot:
+    def test_publish_swaps_and_tracks_source(self):
+        slot = InferenceSlot()
+        source = object()
+        first = CompiledQNetwork([(np.eye(2), np.zeros(2), "linear")])
+        second = CompiledQNetwork([(2 * np.eye(2), np.zeros(2), "linear")])
+
+        assert slot.engine is None and slot.engine_for(source) is None
+        assert slot.publish(first, source=source) == 1
+        assert slot.engine_for(source) is first
+        assert slot.engine_for(object()) is None
+        assert slot.publish(second, source=source) == 2
+        assert slot.engine_for(source) is second
+
+        slot.clear()
+        assert slot.engine is None and slot.generation == 2
+
+
+class TestAgentServing:
+    def _agent(self) -> DQNRoutingAgent:
+        agent = DQNRoutingAgent(state_size=21, action_size=12, batch_size=8, exploration_rate=0.0,
+                                exploration_min=0.0, random_seed=None)
+        agent.q_network = agent.target_q_network = create_dqn_network(21, 12, force_numpy=True)
+        return agent
+
+    def test_act_batch_serves_the_compiled_snapshot(self):
+        agent = self._agent()
+        states = _states(16)
+        assert agent.inference.engine_for(agent.q_network) is None  # network assigned directly
+
+        assert agent.refresh_inference()
+        engine = agent.inference.engine
+        np.testing.assert_array_equal(agent.act_batch(states), engine.best_actions(states))
+        np.testing.assert_array_equal(agent.act_batch(states), agent.q_network.predict(states).argmax(axis=1))
+
+    def test_replay_publishes_a_fresh_snapshot(self):
+        agent = self._agent()
+        agent.refresh_inference()
+        rng = np.random.default_rng(2)
+        for _ in range(8):
+            agent.memory.append((rng.normal(size=21), int(rng.integers(12)), 1.0, rng.normal(size=21), False))
+
+        generation = agent.inference.generation
+        agent.replay()
+        assert agent.inference.generation == generation + 1
+        states = _states(4)
+        np.testing.assert_allclose(agent.inference.engine.predict(states), agent.q_network.predict(states),
+                                   rtol=1e-4, atol=1e-5)
+
+    def test_uncompilable_network_falls_back_to_its_predict(self):
+        agent = self._agent()
+        agent.refresh_inference()
+
+        class Opaque:
+            def predict(self, states):
+                q_values = np.zeros((len(states), 12))
+                q_values[:, 3] = 1.0
+                return q_values
+
+        agent.q_network = Opaque()
+        assert (agent.act_batch(_states(3)) == 3).all()  # the old snapshot belongs to another network
+        assert not agent.refresh_inference()
+        assert agent.inference.engine is None
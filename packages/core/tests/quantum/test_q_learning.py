@@ -0,0 +1,216 @@
+"""
+Tests for the tabular Q-learning router and its compact Q-store.
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from monkey_coder.quantum.q_learning import Action, QLearningRouter, State
+from monkey_coder.quantum.q_table import CompactQTable, decode_keys, encode_keys
+
+
+def _state(task_type: str = "analysis", complexity: float = 0.5) -> State:
+    return State(
+        task_type=task_type,
+        complexity=complexity,
+        domain="backend",
+        persona="developer",
+        context_size=2500,
+        urgency=0.3,
+        quality_requirement=0.8,
+    )
+
+
+@pytest.fixture
+def router(tmp_path):
+    return QLearningRouter(save_path=str(tmp_path / "q_table.npz"))
+
+
+class TestCompactQTable:
+    def test_unset_entries_read_as_zero_and_never_win(self):
+        table = CompactQTable([("a",), ("b",), ("c",)])
+        assert table.get(("s",), ("a",)) == 0.0
+        assert table.best(("s",)) is None
+        assert ("s",) not in table
+
+        table.set(("s",), ("b",), -3.0)
+        assert table.best(("s",)) == (("b",), -3.0)  # the only known action, despite being negative
+        assert table.max_value(("s",)) == -3.0
+        assert table.actions_of(("s",)) == {("b",): -3.0}
+        assert len(table) == 1
+        assert table.num_entries == 1
+
+    def test_grows_for_new_states_and_actions(self):
+        table = CompactQTable([("a",)], initial_states=2)
+        for i in range(50):
+            table.set((i,), (f"action-{i % 20}",), float(i))
+
+        assert table.shape == (50, 21)
+        assert table.get((49,), ("action-9",)) == 49.0
+        assert table.best((30,)) == (("action-10",), 30.0)
+        assert table.num_entries == 50
+
+    def test_cached_greedy_action_matches_argmax(self):
+        rng = np.random.default_rng(0)
+        actions = [(i,) for i in range(6)]
+        table = CompactQTable(actions)
+        for _ in range(2000):
+            state = (int(rng.integers(5)),)
+            table.set(state, actions[rng.integers(6)], float(rng.integers(-3, 4)))
+            if rng.random() < 0.3:
+                table.best(state)
+
+        for state, values in table.items():
+            best_value = max(values.values())
+            expected = min(a for a, v in values.items() if v == best_value)  # argmax takes the first
+            assert table.best(state) == (expected, best_value)
+
+    def test_key_encoding_round_trip(self):
+        keys = [("analysis", 0.5, 3, True), ("testing", 1.0, 32, False)]
+        packed = encode_keys(keys)
+        assert packed.dtype.names is not None
+        assert decode_keys(packed) == keys
+
+        mixed = [("a", 1), (None, "b")]
+        assert decode_keys(encode_keys(mixed)) == mixed  # JSON fallback
+
+    def test_incremental_saves_and_compaction(self, tmp_path):
+        path = tmp_path / "q.npz"
+        table = CompactQTable([("a",), ("b",), ("c",), ("d",)])
+        for i in range(100):
+            table.set((i,), ("a",), float(i))
+        assert table.save(path) == path
+
+        table.set((3,), ("b",), 7.0)
+        table.set(("new",), ("c",), 1.5)
+        delta = table.save(path, metadata={"epsilon": 0.2})
+        assert delta != path and delta.exists()
+
+        loaded, metadata = CompactQTable.load(path)
+        assert metadata == {"epsilon": 0.2}
+        assert loaded.shape == table.shape
+        assert loaded.num_entries == table.num_entries == 102
+        assert loaded.get((3,), ("b",)) == 7.0
+        assert loaded.best(("new",)) == (("c",), 1.5)
+
+        # A sparse table is stored as (row, column, value) entries
+        with np.load(path) as data:
+            assert "entries" in data and "values" not in data
+
+        # Touching most rows forces a full snapshot, which drops the deltas
+        for i in range(100):
+            table.set((i,), ("b",), -1.0)
+        assert table.save(path) == path
+        assert not list(tmp_path.glob("q.delta-*.npz"))
+        assert CompactQTable.load(path)[0].get((50,), ("b",)) == -1.0
+
+    def test_deltas_of_an_older_generation_are_ignored(self, tmp_path):
+        path = tmp_path / "q.npz"
+        old = CompactQTable([("a",)])
+        for i in range(10):
+            old.set((i,), ("a",), 1.0)
+        old.set(("s",), ("a",), 1.0)
+        old.save(path)
+        old.set(("s",), ("a",), 2.0)
+        stale = old.save(path)
+        assert stale != path
+        stale_bytes = stale.read_bytes()
+
+        fresh = CompactQTable([("a",)])
+        fresh.set(("s",), ("a",), 5.0)
+        fresh.save(path, incremental=False)
+        assert not stale.exists()
+        stale.write_bytes(stale_bytes)  # e.g. left behind by a crash during compaction
+
+        assert CompactQTable.load(path)[0].get(("s",), ("a",)) == 5.0
+
+    def test_saved_loaded_table_keeps_extending(self, tmp_path):
+        path = tmp_path / "q.npz"
+        table = CompactQTable([("a",)])
+        table.set(("s",), ("a",), 1.0)
+        table.save(path)
+
+        loaded, _ = CompactQTable.load(path, actions=[("a",), ("z",)])
+        loaded.set(("t",), ("z",), 4.0)
+        loaded.save(path)
+
+        again, _ = CompactQTable.load(path)
+        assert again.get(("t",), ("z",)) == 4.0
+        assert again.get(("s",), ("a",)) == 1.0
+
+
+class TestQLearningRouter:
+    def test_select_action_is_argmax_of_known_values(self, router):
+        state = _state()
+        low, high = router.action_space[5], router.action_space[17]
+        router.set_q_value(state, low, 1.0)
+        router.set_q_value(state, high, 4.0)
+
+        chosen = router.select_action(state, explore=False)
+        assert chosen.to_tuple() == high.to_tuple()
+
+    def test_unknown_state_uses_heuristics(self, router):
+        action = router.select_action(_state(complexity=0.9), explore=False)
+        assert (action.provider, action.strategy) == ("openai", "quantum")
+        assert router.get_q_value(_state(complexity=0.9), action) == 0.0
+        assert len(router.q_table) == 0
+
+    def test_exploration_draws_from_action_space(self, router):
+        router.epsilon = 1.0
+        keys = {router.select_action(_state()).to_tuple() for _ in range(50)}
+        assert keys <= {a.to_tuple() for a in router.action_space}
+        assert len(keys) > 1
+
+    def test_update_rule(self, router):
+        state, next_state = _state(complexity=0.2), _state(complexity=0.6)
+        action = router.action_space[0]
+        router.set_q_value(next_state, router.action_space[1], 10.0)
+
+        router.update_q_value(state, action, reward=2.0, next_state=next_state)
+        expected = 0.1 * (2.0 + 0.95 * 10.0)
+        assert router.get_q_value(state, action) == pytest.approx(expected)
+
+        router.update_q_value(state, action, reward=1.0)  # terminal
+        assert router.get_q_value(state, action) == pytest.approx(expected + 0.1 * (1.0 - expected))
+
+    def test_save_and_reload(self, router, tmp_path):
+        state = _state()
+        heuristic = router.select_action(state, explore=False)
+        router.set_q_value(state, heuristic, 3.0)  # an action outside the action space
+        router.set_q_value(_state("testing"), router.action_space[2], -1.0)
+        router.epsilon = 0.05
+        router.save_q_table()
+
+        reloaded = QLearningRouter(save_path=str(tmp_path / "q_table.npz"))
+        assert reloaded.epsilon == 0.05
+        assert reloaded.get_q_value(state, heuristic) == 3.0
+        assert reloaded.select_action(state, explore=False).to_tuple() == heuristic.to_tuple()
+        assert reloaded.get_statistics()['total_entries'] == 2
+
+    def test_imports_legacy_json_q_table(self, tmp_path):
+        state, action = _state(), Action("groq", "llama-3.1-8b-instant", "sequential", 0.3, 2000)
+        legacy = {
+            'q_table': {json.dumps(state.to_tuple()): {json.dumps(action.to_tuple()): 6.5}},
+            'epsilon': 0.07,
+        }
+        (tmp_path / "q_table.json").write_text(json.dumps(legacy, indent=2))
+
+        router = QLearningRouter(save_path=str(tmp_path / "q_table.json"))
+        assert router.epsilon == 0.07
+        assert router.get_q_value(state, action) == 6.5
+        assert router.select_action(state, explore=False).to_tuple() == action.to_tuple()
+
+        router.save_q_table()
+        assert (tmp_path / "q_table.npz").exists()
+
+    def test_statistics_top_routes(self, router):
+        router.set_q_value(_state(), router.action_space[3], 2.0)
+        router.set_q_value(_state(), router.action_space[4], 5.0)
+
+        stats = router.get_statistics()
+        assert stats['total_states'] == 1
+        assert stats['top_routes'][0]['action'] == router.action_space[4].to_tuple()
+        assert stats['top_routes'][0]['q_value'] == 5.0
+        assert np.isfinite(stats['q_table_bytes'])
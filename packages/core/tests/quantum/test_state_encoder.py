@@ -594,6 +594,154 @@ class TestAdvancedStateEncoder:
         assert "time_of_day" in name_str  # Temporal feature
 
 
+def _reference_encode(encoder, task_context, provider_history, user_preferences,
+                      resource_constraints, provider_availability):
+    """The original concatenate-then-weight encoding, for comparison."""
+    current_hour = (time.time() // 3600) % 24 / 24.0
+    sections = [
+        np.array(encoder._task_values(task_context), dtype=np.float32),
+        encoder._encode_provider_history(provider_history, provider_availability),
+        user_preferences.get_preference_vector() if encoder.enable_user_personalization
+        else np.full(13, 0.5, dtype=np.float32),
+        resource_constraints.get_constraint_vector(),
+    ]
+    if encoder.enable_temporal_features:
+        day = task_context.day_of_week
+        sections.append(np.array([
+            task_context.time_of_day, day / 7.0, task_context.timezone_offset / 12.0, current_hour,
+            np.sin(2 * np.pi * current_hour), np.cos(2 * np.pi * current_hour),
+            np.sin(2 * np.pi * day / 7.0), np.cos(2 * np.pi * day / 7.0),
+        ], dtype=np.float32))
+    sections.append(encoder._encode_contextual_factors(task_context, provider_availability))
+    state = np.concatenate(sections)
+
+    if encoder.enable_dynamic_weighting:
+        weights = np.ones_like(state)
+        if task_context.is_production:
+            weights[15:75] *= 1.2
+        if task_context.requires_accuracy and task_context.quality_threshold > 0.8:
+            for i in range(5):
+                weights[15 + i * 11 + 2] *= 1.3
+        if encoder.enable_temporal_features and task_context.latency_requirement < 10.0:
+            weights[98:106] *= 1.1
+        state = state * weights
+    return state
+
+
+class TestEncodeIntoAndBatch:
+    """Test buffer-writing and batch encoding against the concatenating encoder."""
+
+    @pytest.fixture
+    def contexts(self):
+        rng = np.random.default_rng(3)
+        categories = list(ContextComplexity)
+        task_types = [TaskType.CODE_GENERATION, TaskType.CODE_ANALYSIS, TaskType.DEBUGGING,
+                      TaskType.TESTING, TaskType.CUSTOM]
+        return [
+            TaskContextProfile(
+                task_type=task_types[i % 5],
+                estimated_complexity=float(rng.random()),
+                complexity_category=categories[i % 4],
+                domain_requirements=set("abc"[: i % 4]),
+                quality_threshold=float(rng.choice([0.7, 0.85, 0.95])),
+                latency_requirement=float(rng.choice([5.0, 20.0, 90.0])),
+                cost_sensitivity=float(rng.random()),
+                is_production=bool(i % 2),
+                requires_reasoning=bool(i % 3 == 0),
+                requires_accuracy=bool(i % 5 != 4),
+                time_of_day=float(rng.random()),
+                day_of_week=i % 7 + 1,
+                timezone_offset=float(rng.integers(-8, 9)),
+            )
+            for i in range(24)
+        ]
+
+    @pytest.fixture
+    def history(self):
+        return {
+            provider: ProviderPerformanceHistory(recent_avg_quality=0.6 + 0.05 * i, total_interactions=100 * i)
+            for i, provider in enumerate(ProviderType)
+        }
+
+    @pytest.fixture
+    def availability(self):
+        return {provider: provider != ProviderType.GROQ for provider in ProviderType}
+
+    @pytest.mark.parametrize("strategy", ["minimal", "basic", "standard", "comprehensive"])
+    def test_matches_concatenating_encoder(self, strategy, contexts, history, availability):
+        encoder = create_state_encoder(strategy)
+        preferences = UserPreferences(provider_preference_scores={ProviderType.OPENAI: 0.9})
+        constraints = ResourceConstraints(max_latency_seconds=25.0, billing_tier="premium")
+        out = np.empty(encoder.state_size, dtype=np.float32)
+
+        with patch("time.time", return_value=1_700_000_000.0):
+            for context in contexts:
+                expected = _reference_encode(encoder, context, history, preferences, constraints, availability)
+                assert encoder.encode_into(out, context, history, preferences, constraints, availability) is out
+                np.testing.assert_array_equal(out, expected)
+                np.testing.assert_array_equal(
+                    encoder.encode_state(context, history, preferences, constraints, availability), expected
+                )
+
+    def test_batch_rows_match_single_encodes(self, contexts, history, availability):
+        encoder = AdvancedStateEncoder()
+        preferences = [UserPreferences(risk_tolerance=i / len(contexts)) for i in range(len(contexts))]
+        constraints = ResourceConstraints(is_premium_user=True)
+        availabilities = [
+            {provider: (i + j) % 3 != 0 for j, provider in enumerate(ProviderType)} for i in range(len(contexts))
+        ]
+
+        with patch("time.time", return_value=1_700_000_000.0):
+            shared = encoder.encode_batch(contexts, history, preferences, constraints, availability)
+            per_request = encoder.encode_batch(contexts, [history] * len(contexts), preferences,
+                                               [constraints] * len(contexts), availabilities)
+            for i, context in enumerate(contexts):
+                np.testing.assert_array_equal(
+                    shared[i], encoder.encode_state(context, history, preferences[i], constraints, availability))
+                np.testing.assert_array_equal(
+                    per_request[i],
+                    encoder.encode_state(context, history, preferences[i], constraints, availabilities[i]))
+
+        assert shared.shape == (len(contexts), encoder.state_size)
+        assert encoder.encode_batch([], history, preferences[:0], constraints, availability).shape == (0, 112)
+
+    def test_provider_section_cache_tracks_changes(self, contexts, history, availability):
+        encoder = AdvancedStateEncoder(enable_dynamic_weighting=False)
+        args = (UserPreferences(), ResourceConstraints())
+        quality = encoder._provider_slice.start + 3  # openai recent_avg_quality
+
+        first = encoder.encode_state(contexts[0], history, *args, availability)
+        cached = encoder._provider_cache
+        encoder.encode_state(contexts[1], history, *args, availability)
+        assert encoder._provider_cache is cached
+
+        version = history[ProviderType.OPENAI].version
+        history[ProviderType.OPENAI].recent_avg_quality = 0.6  # same value, no change
+        assert history[ProviderType.OPENAI].version == version
+        history[ProviderType.OPENAI].recent_avg_quality = 0.99
+        second = encoder.encode_state(contexts[0], history, *args, availability)
+        assert first[quality] == np.float32(0.6) and second[quality] == np.float32(0.99)
+
+        history[ProviderType.ANTHROPIC] = ProviderPerformanceHistory(recent_success_rate=0.1)
+        availability = {**availability, ProviderType.OPENAI: False}
+        third = encoder.encode_state(contexts[0], history, *args, availability)
+        np.testing.assert_array_equal(
+            third[encoder._provider_slice],
+            encoder._encode_provider_history(history, availability),
+        )
+        assert not cached.flags.writeable
+
+    def test_rejects_mismatched_buffers(self, contexts, history, availability):
+        encoder = AdvancedStateEncoder()
+        args = (contexts[0], history, UserPreferences(), ResourceConstraints(), availability)
+        with pytest.raises(ValueError):
+            encoder.encode_into(np.empty(104, dtype=np.float32), *args)
+        with pytest.raises(ValueError):
+            encoder.encode_into(np.empty(112, dtype=np.float64), *args)
+        with pytest.raises(ValueError):
+            encoder.encode_batch(contexts, [history], UserPreferences(), ResourceConstraints(), availability)
+
+
 class TestConvenienceFunctions:
     """Test convenience functions."""
     
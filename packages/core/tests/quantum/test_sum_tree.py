@@ -0,0 +1,117 @@
+"""
+Tests for the sum/min segment tree used by prioritized replay.
+"""
+
+import numpy as np
+import pytest
+
+from monkey_coder.quantum.experience_buffer import Experience, PrioritizedExperienceBuffer
+from monkey_coder.quantum.sum_tree import SumTree
+
+
+def test_totals_and_min_track_updates():
+    tree = SumTree(5)
+    tree.update([0, 1, 2], [1.0, 2.0, 3.0])
+    assert tree.total == pytest.approx(6.0)
+    assert tree.min == pytest.approx(1.0)
+
+    tree.update(0, 0.0)  # removed slots do not count towards the minimum
+    tree.update([2, 2], [9.0, 4.0])  # last write wins
+    assert tree.total == pytest.approx(6.0)
+    assert tree.min == pytest.approx(2.0)
+    np.testing.assert_allclose(tree.get([0, 1, 2, 3]), [0.0, 2.0, 4.0, 0.0])
+
+    tree.clear()
+    assert tree.total == 0.0
+    assert tree.min == np.inf
+
+
+def test_find_maps_prefix_sums_to_slots():
+    tree = SumTree(6)
+    tree.update(np.arange(6), [1.0, 0.0, 2.0, 0.0, 3.0, 0.0])
+
+    slots = tree.find([0.0, 0.99, 1.0, 2.5, 3.0, 5.99])
+    assert slots.tolist() == [0, 0, 2, 2, 4, 4]
+    # Values at or beyond the total never land on an empty slot
+    assert tree.find([6.0, 7.5]).tolist() == [4, 4]
+
+
+def test_rejects_negative_priorities_and_empty_sampling():
+    tree = SumTree(4)
+    with pytest.raises(ValueError, match="non-negative"):
+        tree.update(1, -1.0)
+    with pytest.raises(ValueError, match="empty"):
+        tree.sample(2)
+
+
+def test_sampling_frequencies_match_priorities():
+    """Empirical draw frequencies follow p_i / sum(p) (chi-square goodness of fit)."""
+    rng = np.random.default_rng(1234)
+    priorities = rng.uniform(0.1, 5.0, size=37)
+    priorities[[3, 11]] = 0.0
+    tree = SumTree(len(priorities))
+    tree.update(np.arange(len(priorities)), priorities)
+
+    draws = 200_000
+    counts = np.zeros(len(priorities))
+    for _ in range(draws // 100):
+        slots, sampled = tree.sample(100, rng)
+        np.testing.assert_allclose(sampled, priorities[slots])
+        np.add.at(counts, slots, 1)
+
+    assert counts[3] == counts[11] == 0
+    expected = draws * priorities / priorities.sum()
+    nonzero = expected > 0
+    chi2 = np.sum((counts[nonzero] - expected[nonzero]) ** 2 / expected[nonzero])
+    # 34 degrees of freedom; the 99.9th percentile is ~65.2
+    assert chi2 < 65.2
+
+
+def test_prioritized_buffer_samples_in_proportion_with_min_normalised_weights():
+    np.random.seed(7)
+    buffer = PrioritizedExperienceBuffer(capacity=64, min_size=1, cleanup_threshold=1.0,
+                                         alpha=1.0, beta=1.0, beta_increment=0.0)
+    for i in range(64):
+        buffer.add(Experience(np.array([float(i)]), 0, float(i), np.array([0.0]), False, 0.0),
+                   priority=4.0 if i < 16 else 1.0)
+
+    counts = np.zeros(64)
+    for _ in range(500):
+        batch = buffer.sample_batch(32)
+        np.add.at(counts, batch.indices, 1)
+        expected_weights = np.where(batch.rewards < 16, 0.25, 1.0)
+        np.testing.assert_allclose(batch.weights, expected_weights)
+
+    high_share = counts[:16].sum() / counts.sum()
+    assert high_share == pytest.approx(64 / 112, abs=0.01)
+
+
+def test_prioritized_buffer_evicted_slots_leave_the_tree():
+    buffer = PrioritizedExperienceBuffer(capacity=10, min_size=1, cleanup_threshold=0.5)
+    for i in range(6):
+        buffer.add(Experience(np.array([float(i)]), 0, 0.0, np.array([0.0]), False, 0.0), priority=float(i + 1))
+
+    # Cleanup dropped the oldest slot when the buffer passed half full
+    assert len(buffer) == 5
+    assert buffer._tree.get(0) == 0.0
+    assert buffer._tree.min == pytest.approx(2.0 ** buffer.alpha)
+    assert buffer._tree.total == pytest.approx(sum((i + 1.0) ** buffer.alpha for i in range(1, 6)))
+
+    buffer.update_priorities(np.array([0, 1]), np.array([50.0, 0.5]))
+    assert buffer._tree.get(0) == 0.0  # evicted slot is not resurrected
+    assert buffer._priority_slots[1] == 0.5
+
+
+def test_dql_replay_buffer_uses_the_tree():
+    pytest.importorskip("torch")
+    from monkey_coder.quantum.dql_network import PrioritizedReplayBuffer, Transition
+
+    buffer = PrioritizedReplayBuffer(capacity=4, alpha=1.0, beta=1.0)
+    for i in range(6):
+        buffer.add(Transition(np.array([float(i)]), 0, float(i), None, False), priority=float(i + 1))
+
+    assert len(buffer) == 4
+    assert buffer.tree.total == pytest.approx(5 + 6 + 3 + 4)
+    transitions, weights, indices = buffer.sample(4)
+    assert [t.reward for t in transitions] == [float(buffer.buffer[i].reward) for i in indices]
+    assert weights.max() <= 1.0
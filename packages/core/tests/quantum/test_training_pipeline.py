@@ -16,6 +16,8 @@ from monkey_coder.quantum.training_pipeline import (
     TrainingMode,
     TrainingMetrics,
     RoutingEnvironmentSimulator,
+    VectorizedRoutingEnvironment,
+    ParallelExperienceCollector,
     DQNTrainingPipeline
 )
 from monkey_coder.quantum.dqn_agent import RoutingState, RoutingAction
@@ -472,6 +474,127 @@ class TestDQNTrainingPipeline:
             pipeline.experience_buffer.add(experience)
 
 
+class TestVectorizedTraining:
+    """Test lockstep environments and the batched / parallel training loops."""
+
+    def test_observations_match_routing_state_vectors(self):
+        env = VectorizedRoutingEnvironment(num_envs=6, seed=3)
+        for _ in range(3):
+            states = env.observe()
+            for i in range(env.num_envs):
+                np.testing.assert_allclose(states[i], env.routing_state(i).to_vector(), rtol=1e-6)
+            env.step(np.arange(env.num_envs) % env.action_size)
+
+    def test_reward_model_matches_scalar_simulator(self):
+        env = VectorizedRoutingEnvironment(num_envs=12, seed=0)
+        simulator = RoutingEnvironmentSimulator()
+        for i in range(env.num_envs):
+            action = RoutingAction.from_action_index(i)
+            simulator.current_state = env.routing_state(i)
+            with patch("numpy.random.normal", return_value=0.0):
+                expected = simulator._calculate_reward(action)
+            env.rng = MagicMock(wraps=np.random.default_rng(0))
+            env.rng.normal.side_effect = lambda loc, scale, size: np.zeros(size)
+            _, rewards, _, _ = env.step(np.full(env.num_envs, i))
+            assert rewards[i] == pytest.approx(expected)
+            env.reset()
+
+    def test_finished_environments_reset(self):
+        env = VectorizedRoutingEnvironment(num_envs=32, max_steps=1, seed=1)
+        next_states, rewards, dones, info = env.step(np.zeros(32, dtype=int))
+
+        assert next_states.shape == (32, 21)
+        assert ((rewards >= 0.0) & (rewards <= 1.0)).all()
+        assert dones.all()  # max_steps reached everywhere
+        np.testing.assert_allclose(info["episode_reward"], rewards)
+        assert (info["episode_length"] == 1).all()
+        assert (env.step_count == 0).all()
+        assert (env.episode_reward == 0.0).all()
+
+    def test_rejects_other_state_sizes(self):
+        with pytest.raises(ValueError):
+            VectorizedRoutingEnvironment(state_size=10)
+
+    def test_act_batch_is_greedy_without_exploration(self):
+        pipeline = DQNTrainingPipeline(TrainingConfig())
+        pipeline.agent.exploration_rate = 0.0
+        states = VectorizedRoutingEnvironment(num_envs=8, seed=0).observe()
+
+        actions = pipeline.agent.act_batch(states)
+        np.testing.assert_array_equal(actions, np.argmax(pipeline.agent.q_network.predict(states), axis=1))
+
+    def test_train_agent_targets_match_per_row_computation(self):
+        config = TrainingConfig(training_mode=TrainingMode.PRIORITIZED, batch_size=8, min_buffer_size=8)
+        pipeline = DQNTrainingPipeline(config)
+        env = VectorizedRoutingEnvironment(num_envs=16, seed=2)
+        states = env.observe()
+        next_states, rewards, dones, _ = env.step(np.arange(16) % 12)
+        pipeline.experience_buffer.add_batch(states, np.arange(16) % 12, rewards, next_states, dones)
+
+        network = pipeline.agent.q_network
+        batch = pipeline.experience_buffer.sample_batch(8)
+        with patch.object(network, "train", return_value=0.0) as train, \
+                patch.object(pipeline.experience_buffer, "sample_batch", return_value=batch):
+            pipeline._train_agent()
+        targets = train.call_args[0][1]
+
+        expected = network.predict(batch.states).copy()
+        max_next_q = network.predict_target(batch.next_states).max(axis=1)
+        for i in range(8):
+            expected[i, batch.actions[i]] = batch.rewards[i] + (
+                0.0 if batch.dones[i] else config.discount_factor * max_next_q[i]
+            )
+            expected[i] *= batch.weights[i]
+        np.testing.assert_allclose(targets, expected, rtol=1e-6)
+
+    def test_vectorized_training_loop(self):
+        config = TrainingConfig(
+            num_envs=8, max_episodes=40, batch_size=16, min_buffer_size=32,
+            buffer_size=500, training_frequency=2, target_performance=1.1, seed=0
+        )
+        pipeline = DQNTrainingPipeline(config)
+        metrics = pipeline.train()
+
+        assert len(metrics) == 40
+        assert [m.episode for m in metrics] == list(range(40))
+        assert pipeline.current_episode == 40
+        assert len(pipeline.experience_buffer) == min(pipeline.current_step, 450)
+        # One training step per training_frequency environment steps once warm
+        assert 0 < len(pipeline.training_losses) <= pipeline.current_step // 2
+        assert pipeline.agent.exploration_rate < config.initial_epsilon
+
+    def test_parallel_collector_round_trip(self):
+        pipeline = DQNTrainingPipeline(TrainingConfig())
+        with ParallelExperienceCollector(num_workers=2, envs_per_worker=4, seed=0) as collector:
+            collector.request(pipeline.agent.q_network.get_weights(), 0.5, 5)
+            rollouts = collector.gather()
+
+        assert len(rollouts) == 2
+        for rollout in rollouts:
+            assert rollout["states"].shape == (20, 21)
+            assert rollout["actions"].shape == (20,)
+            assert len(rollout["episode_rewards"]) == rollout["dones"].sum()
+        # Workers draw independent streams
+        assert not np.array_equal(rollouts[0]["states"], rollouts[1]["states"])
+
+    def test_parallel_training_and_checkpoint(self, tmp_path):
+        config = TrainingConfig(
+            num_envs=4, num_workers=2, rollout_steps=4, max_episodes=30, batch_size=16,
+            min_buffer_size=32, buffer_size=500, target_performance=1.1, seed=0
+        )
+        pipeline = DQNTrainingPipeline(config)
+        metrics = pipeline.train()
+        assert len(metrics) == 30
+
+        path = str(tmp_path / "checkpoint")
+        assert pipeline.save_checkpoint(path)
+        restored = DQNTrainingPipeline(config)
+        assert restored.load_checkpoint(path)
+        assert restored.current_episode == 30
+        assert restored.current_step == pipeline.current_step
+        assert len(restored.experience_buffer) == len(pipeline.experience_buffer)
+
+
 class TestIntegration:
     """Integration tests for training pipeline components."""
 
@@ -343,3 +343,122 @@ class TestIntegration:
             # Final confidence may or may not be higher, but should be reasonable
             # Just check it's computed
             assert final_confidence > 0.0
+
+
+class TestBatchedRefinement:
+    """Tests for lockstep batch refinement, summary steps and bounded history."""
+    
+    @staticmethod
+    def _batch(n=12, seed=0):
+        rng = np.random.default_rng(seed)
+        states = rng.normal(size=(n, 112)) * 0.5
+        answers = rng.normal(size=(n, 64)) * 0.3
+        contexts = [
+            {'attention_context': [rng.normal(size=112) for _ in range(3)]} if i % 3 else None
+            for i in range(n)
+        ]
+        return states, answers, contexts
+    
+    def test_rows_match_single_refinements(self):
+        """Each row follows the same schedule and values as refine()."""
+        states, answers, contexts = self._batch()
+        config = TRMConfig(halt_threshold=0.55, max_inner_steps=4, max_outer_steps=3)
+        batched = TRMRefinementModule(config)
+        single = TRMRefinementModule(config)
+        
+        z_all, y_all, all_steps = batched.refine_many(states, answers, context=contexts)
+        
+        step_counts = set()
+        for i in range(len(states)):
+            z, y, steps = single.refine(states[i], answers[i], context=contexts[i])
+            assert np.allclose(z_all[i], z) and np.allclose(y_all[i], y)
+            assert [(s.step_number, s.cycle_type) for s in all_steps[i]] == \
+                [(s.step_number, s.cycle_type) for s in steps]
+            assert np.allclose([s.halt_probability for s in all_steps[i]], [s.halt_probability for s in steps])
+            assert np.allclose(all_steps[i][-1].latent_state, steps[-1].latent_state)
+            step_counts.add(len(steps))
+        
+        assert len(step_counts) > 1  # rows halted at different points
+        assert batched.get_metrics() == single.get_metrics()
+    
+    def test_shared_context(self):
+        states, answers, _ = self._batch(n=4)
+        context = {'attention_context': [np.ones(112), np.zeros(3)]}
+        module = TRMRefinementModule()
+        
+        z_all, _, _ = module.refine_many(states, answers, context=context)
+        z, _, _ = TRMRefinementModule().refine(states[2], answers[2], context=context)
+        assert np.allclose(z_all[2], z)
+    
+    def test_summary_steps(self):
+        states, answers, contexts = self._batch(n=6)
+        config = TRMConfig(halt_threshold=0.55, max_inner_steps=4, max_outer_steps=3)
+        
+        full = TRMRefinementModule(config).refine_many(states, answers, context=contexts)
+        z_all, y_all, all_steps = TRMRefinementModule(config).refine_many(
+            states, answers, context=contexts, record_steps="summary"
+        )
+        
+        for i, steps in enumerate(all_steps):
+            assert len(steps) == len(full[2][i])
+            assert all(s.latent_state is None and s.answer_embedding is None for s in steps[:-1])
+            assert np.array_equal(steps[-1].latent_state, z_all[i])
+            assert np.array_equal(steps[-1].answer_embedding, y_all[i])
+        
+        with pytest.raises(ValueError):
+            TRMRefinementModule(config).refine_many(states, record_steps="none")
+    
+    def test_history_is_bounded(self):
+        module = TRMRefinementModule(TRMConfig(history_size=3))
+        states, _, _ = self._batch(n=5)
+        
+        _, _, all_steps = module.refine_many(states)
+        
+        assert len(module.refinement_history) == 3
+        assert module.refinement_history[-1] is all_steps[-1]
+        assert module.get_metrics()["total_refinements"] == 5
+
+
+class TestTRMRouterBatch:
+    """TRMRouter.route_batch refines all uncached requests in one call."""
+    
+    def test_route_batch_matches_route_request(self):
+        from unittest.mock import patch
+        
+        from monkey_coder.models import ExecuteRequest, ExecutionContext, PersonaConfig, PersonaType, TaskType
+        from monkey_coder.quantum.trm_router import create_trm_router
+        
+        requests = [
+            ExecuteRequest(
+                prompt=prompt,
+                task_type=TaskType.CODE_GENERATION,
+                context=ExecutionContext(user_id="u"),
+                persona_config=PersonaConfig(persona=PersonaType.DEVELOPER),
+            )
+            for prompt in ["write a sort function", "review this api for injection", "fix the crash"]
+        ]
+        
+        def state_vector(self, request):
+            return np.random.default_rng(len(request.prompt)).random(112).astype(np.float32)
+        
+        with patch(
+            "monkey_coder.core.quantum_routing.QuantumAdvancedRouter._generate_quantum_state_vector",
+            state_vector,
+        ):
+            sequential_router = create_trm_router()
+            sequential_router.fallback_to_basic = False
+            sequential = [sequential_router.route_request(request) for request in requests]
+            
+            batch_router = create_trm_router()
+            batch_router.fallback_to_basic = False
+            with patch.object(
+                batch_router.trm_module, "refine_many", wraps=batch_router.trm_module.refine_many
+            ) as refine_many:
+                batched = batch_router.route_batch(requests)
+        
+        assert refine_many.call_count == 1
+        for a, b in zip(sequential, batched):
+            assert (a.provider, a.model) == (b.provider, b.model)
+            assert a.confidence == pytest.approx(b.confidence)
+            assert a.metadata["trm_steps"] == b.metadata["trm_steps"]
+        assert len(batch_router.trm_routing_history) == len(requests)
@@ -0,0 +1,143 @@
+"""
+Tests for batch routing and the JSONL replay CLI.
+"""
+
+import json
+
+import pytest
+
+from monkey_coder.core.batch_routing import BatchStats, main, request_from_record, route_jsonl
+from monkey_coder.core.routing import AdvancedRouter
+from monkey_coder.models import TaskType
+
+RECORDS = [
+    {"request_id": "r1", "title": "Design a scalable microservices architecture", "body": "Include fault tolerance."},
+    {"prompt": "Write a function to add two numbers", "task_type": "code_generation"},
+    {"request_id": "r3", "title": "Fix the crash", "body": "Debug this traceback in the parser"},
+]
+
+
+def _lines(records):
+    return [json.dumps(record) + "\n" for record in records]
+
+
+def test_request_from_backlog_record():
+    request = request_from_record(RECORDS[0])
+
+    assert request.prompt.startswith("Design a scalable microservices architecture")
+    assert "fault tolerance" in request.prompt
+    assert request.task_type == TaskType.CUSTOM
+    assert request.task_id == "r1"
+
+
+def test_route_batch_matches_route_request():
+    requests = [request_from_record(record) for record in RECORDS]
+    batch = AdvancedRouter(enable_cache=False).route_batch(requests)
+    single = [AdvancedRouter(enable_cache=False).route_request(request) for request in requests]
+
+    assert [(d.provider, d.model, d.persona) for d in batch] == [(d.provider, d.model, d.persona) for d in single]
+
+
+def test_route_batch_scores_all_misses_in_one_call(monkeypatch):
+    requests = [request_from_record(record) for record in RECORDS + RECORDS[:1]]
+    router = AdvancedRouter()
+    calls = []
+    score_models_batch = router.score_models_batch
+
+    def spy(requirements, *args, **kwargs):
+        calls.append(len(requirements))
+        return score_models_batch(requirements, *args, **kwargs)
+
+    monkeypatch.setattr(router, "score_models_batch", spy)
+    monkeypatch.setattr(router, "_score_models", lambda *a, **k: pytest.fail("per-request scoring in batch"))
+    decisions = router.route_batch(requests)
+
+    assert calls == [len(RECORDS)]
+    assert decisions[-1].metadata.get("cached") is True
+    assert (decisions[-1].provider, decisions[-1].model) == (decisions[0].provider, decisions[0].model)
+    assert len(router.routing_history) == len(requests)
+
+
+def test_route_jsonl_preserves_order_and_reports_errors():
+    lines = _lines(RECORDS[:2]) + ["not json\n", "\n"] + _lines(RECORDS[2:])
+    stats = BatchStats()
+
+    output = [json.loads(line) for line in route_jsonl(lines, chunk_size=2, stats=stats)]
+
+    assert [entry["line"] for entry in output] == [1, 2, 3, 5]
+    assert [entry["id"] for entry in output] == ["r1", 2, 3, "r3"]
+    assert "error" in output[2]
+    assert {"provider", "model", "persona", "confidence"} <= set(output[0])
+    assert stats.to_dict() == {"routed": 3, "errors": 1}
+
+
+def test_route_jsonl_routes_each_chunk_with_one_batch_call(monkeypatch):
+    calls = []
+    route_batch = AdvancedRouter.route_batch
+
+    def spy(self, requests):
+        calls.append(len(requests))
+        return route_batch(self, requests)
+
+    monkeypatch.setattr(AdvancedRouter, "route_batch", spy)
+    monkeypatch.setattr(AdvancedRouter, "route_request", lambda *a: pytest.fail("per-record routing"))
+    lines = _lines(RECORDS) + ["[1]\n"] + _lines(RECORDS)
+
+    output = [json.loads(line) for line in route_jsonl(lines, chunk_size=4)]
+
+    assert calls == [3, 3]  # the invalid line is reported, not routed
+    assert [entry["line"] for entry in output] == list(range(1, 8))
+    assert "error" in output[3] and "provider" in output[4]
+
+
+def test_route_jsonl_falls_back_per_request_when_batch_fails(monkeypatch):
+    def broken(self, requests):
+        raise RuntimeError("scoring matrix unavailable")
+
+    monkeypatch.setattr(AdvancedRouter, "route_batch", broken)
+    stats = BatchStats()
+
+    output = [json.loads(line) for line in route_jsonl(_lines(RECORDS), stats=stats)]
+
+    assert all("provider" in entry for entry in output)
+    assert stats.to_dict() == {"routed": 3, "errors": 0}
+
+
+def test_process_pool_output_matches_in_process():
+    lines = _lines(RECORDS * 4)
+
+    in_process = list(route_jsonl(lines, workers=1, chunk_size=3, enable_cache=False))
+    pooled = list(route_jsonl(lines, workers=2, chunk_size=3, enable_cache=False))
+
+    assert pooled == in_process
+
+
+def test_cli_streams_jsonl(tmp_path):
+    source = tmp_path / "requests.jsonl"
+    target = tmp_path / "decisions.jsonl"
+    source.write_text("".join(_lines(RECORDS)))
+
+    assert main([str(source), "-o", str(target), "--include-scores"]) == 0
+
+    decisions = [json.loads(line) for line in target.read_text().splitlines()]
+    assert len(decisions) == len(RECORDS)
+    assert all(decision["model_scores"] for decision in decisions)
+
+
+def test_cli_reports_missing_input(tmp_path, capsys):
+    with pytest.raises(SystemExit) as exc:
+        main([str(tmp_path / "missing.jsonl")])
+
+    assert exc.value.code == 2
+    assert "cannot read input" in capsys.readouterr().err
+
+
+def test_cli_rejects_unknown_log_level(tmp_path, capsys):
+    source = tmp_path / "requests.jsonl"
+    source.write_text("".join(_lines(RECORDS[:1])))
+
+    with pytest.raises(SystemExit) as exc:
+        main([str(source), "--log-level", "verbose"])
+
+    assert exc.value.code == 2
+    assert "invalid choice" in capsys.readouterr().err
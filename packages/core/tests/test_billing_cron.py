@@ -0,0 +1,223 @@
+"""
+Tests for rollup-based Stripe usage reporting and partition retention in billing.cron.
+"""
+
+import time
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from monkey_coder.billing import cron
+from monkey_coder.database.models import UsageEvent, usage_rollup_rows
+
+DAY = date(2026, 10, 15)
+
+
+class FakeConnection:
+    """Enough of an asyncpg connection for billing.cron."""
+
+    def __init__(self, rollups=(), partitions=None, delete_batches=()):
+        self.rollups = list(rollups)
+        self.partitions = partitions
+        self.delete_batches = list(delete_batches)
+        self.executed = []
+        self.pages = []
+
+    async def fetchrow(self, query, *args):
+        assert "pg_partitioned_table" in query
+        return {"?column?": 1} if self.partitions is not None else None
+
+    async def fetch(self, query, *args):
+        if "usage_daily_rollups" in query:
+            _, last_key, limit = args
+            self.pages.append(args)
+            rows = sorted(self.rollups, key=lambda row: row["api_key_hash"])
+            return [row for row in rows if row["api_key_hash"] > last_key][:limit]
+        return self.partitions
+
+    async def execute(self, query, *args):
+        self.executed.append((" ".join(query.split()), args))
+        if query.lstrip().startswith("DELETE"):
+            return f"DELETE {self.delete_batches.pop(0)}"
+        return "OK"
+
+
+class FakePool:
+    def __init__(self, connection):
+        self.connection = connection
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.connection
+
+
+class FakeStripe:
+    def __init__(self, fail_for=()):
+        self.reports = []
+        self.fail_for = set(fail_for)
+        self.active = 0
+        self.max_active = 0
+
+    def report_usage(self, subscription_item_id, quantity, idempotency_key=None):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(0.01)
+            if subscription_item_id in self.fail_for:
+                raise RuntimeError("card_declined")
+            self.reports.append((subscription_item_id, quantity, idempotency_key))
+            return {"quantity": quantity}
+        finally:
+            self.active -= 1
+
+
+def rollup(key, tokens_total, reported=0, customer=True, item=True):
+    return {
+        "api_key_hash": key,
+        "tokens_total": tokens_total,
+        "cost_total": tokens_total * 1e-6,
+        "request_count": 1,
+        "reported_tokens": reported,
+        "stripe_customer_id": f"cus_{key}" if customer else None,
+        "stripe_subscription_item_id": f"si_{key}" if item else None,
+    }
+
+
+@pytest.fixture
+def use_connection(monkeypatch):
+    def install(connection):
+        async def get_database_connection():
+            return FakePool(connection)
+        monkeypatch.setattr(cron, "get_database_connection", get_database_connection)
+        return connection
+    return install
+
+
+class TestReportDailyUsage:
+    @pytest.mark.asyncio
+    async def test_pages_rollups_and_reports_outstanding_usage(self, use_connection, monkeypatch):
+        monkeypatch.setattr(cron, "REPORT_PAGE_SIZE", 2)
+        connection = use_connection(FakeConnection([
+            rollup("a", 1000),
+            rollup("b", 500, reported=200),
+            rollup("c", 300, customer=False),
+            rollup("d", 400, item=False),
+        ]))
+        stripe = FakeStripe()
+
+        results = await cron.report_daily_usage_to_stripe(DAY, stripe_client=stripe, rate=0)
+
+        assert results["success"] is True
+        assert connection.pages == [(DAY, "", 2), (DAY, "b", 2), (DAY, "d", 2)]
+        assert sorted(stripe.reports) == [
+            ("si_a", 1000, "usage-a-2026-10-15-1000"),
+            ("si_b", 300, "usage-b-2026-10-15-500"),
+        ]
+        assert results["customers_processed"] == 2
+        assert results["customers_skipped"] == 2
+        assert results["total_usage_reported"] == 1300
+        marked = sorted(args for sql, args in connection.executed if sql.startswith("UPDATE usage_daily_rollups"))
+        assert marked == [(DAY, "a", 1000), (DAY, "b", 500)]
+
+    @pytest.mark.asyncio
+    async def test_reports_concurrently_within_the_rate_limit(self, use_connection):
+        use_connection(FakeConnection([rollup(str(n), 10) for n in range(8)]))
+        stripe = FakeStripe()
+
+        start = time.perf_counter()
+        results = await cron.report_daily_usage_to_stripe(DAY, stripe_client=stripe, concurrency=4, rate=100)
+        elapsed = time.perf_counter() - start
+
+        assert results["customers_processed"] == 8
+        assert 1 < stripe.max_active <= 4
+        assert elapsed >= 7 / 100  # eight calls spaced 10 ms apart
+
+    @pytest.mark.asyncio
+    async def test_failed_customer_is_left_unreported(self, use_connection):
+        connection = use_connection(FakeConnection([rollup("a", 10), rollup("b", 20)]))
+        stripe = FakeStripe(fail_for={"si_a"})
+
+        results = await cron.report_daily_usage_to_stripe(DAY, stripe_client=stripe, rate=0)
+
+        assert results["success"] is False
+        assert "card_declined" in results["errors"][0]
+        assert [args[1] for sql, args in connection.executed if sql.startswith("UPDATE")] == ["b"]
+
+
+def partition(name, upper, rows=100.0):
+    bound = "DEFAULT" if upper is None else f"FOR VALUES FROM ('x') TO ('{upper} 00:00:00+00')"
+    return {"name": name, "bound": bound, "rows": rows}
+
+
+class TestPartitionRetention:
+    @pytest.mark.asyncio
+    async def test_cleanup_drops_expired_partitions(self, use_connection):
+        today = datetime.now(timezone.utc).date()
+        old = today - timedelta(days=40)
+        connection = use_connection(FakeConnection(partitions=[
+            partition("usage_events_legacy", old, rows=5000.0),
+            partition(f"usage_events_p{old:%Y%m%d}", old + timedelta(days=1)),
+            partition(f"usage_events_p{today:%Y%m%d}", today + timedelta(days=1)),
+            partition("usage_events_default", None),
+        ]))
+
+        results = await cron.cleanup_old_usage_events(days_to_keep=30)
+
+        drops = [sql for sql, _ in connection.executed if sql.startswith("DROP")]
+        assert drops == [
+            'DROP TABLE IF EXISTS "usage_events_legacy"',
+            f'DROP TABLE IF EXISTS "usage_events_p{old:%Y%m%d}"',
+        ]
+        assert results["events_deleted"] == 5100
+        assert not any(sql.startswith("DELETE") for sql, _ in connection.executed)
+
+    @pytest.mark.asyncio
+    async def test_missing_daily_partitions_are_created_ahead(self, use_connection):
+        today = datetime.now(timezone.utc).date()
+        connection = use_connection(FakeConnection(partitions=[
+            partition(f"usage_events_p{today:%Y%m%d}", today + timedelta(days=1)),
+            partition("usage_events_default", None),
+        ]))
+
+        results = await cron.ensure_usage_partitions(days_ahead=2)
+
+        assert results["created"] == [f"usage_events_p{today + timedelta(days=n):%Y%m%d}" for n in (1, 2)]
+        first = connection.executed[0][0]
+        tomorrow = today + timedelta(days=1)
+        assert f"FOR VALUES FROM ('{tomorrow.isoformat()} 00:00:00+00')" in first
+
+    @pytest.mark.asyncio
+    async def test_unpartitioned_table_is_deleted_in_batches(self, use_connection, monkeypatch):
+        monkeypatch.setattr(cron, "CLEANUP_DELETE_BATCH", 10)
+        connection = use_connection(FakeConnection(delete_batches=[10, 10, 3]))
+
+        results = await cron.cleanup_old_usage_events()
+
+        assert results["events_deleted"] == 23
+        assert all(args[1] == 10 for sql, args in connection.executed)
+
+
+def test_rollup_rows_aggregate_per_utc_day_and_key():
+    def event(key, created_at, tokens):
+        return UsageEvent(
+            api_key_hash=key, execution_id="e", task_type="t",
+            tokens_input=tokens, tokens_output=0, tokens_total=tokens,
+            provider="p", model="m", model_cost_input=0, model_cost_output=0,
+            cost_input=0, cost_output=0, cost_total=tokens / 1000,
+            execution_time=0, status="completed", created_at=created_at,
+        )
+
+    late = datetime(2026, 10, 15, 23, 30, tzinfo=timezone(timedelta(hours=-5)))  # 04:30 UTC on the 16th
+    rows = usage_rollup_rows([
+        event("a", datetime(2026, 10, 15, 1), 10),
+        event("a", datetime(2026, 10, 15, 9), 5),
+        event("a", late, 7),
+        event("b", datetime(2026, 10, 15, 2), 1),
+    ])
+
+    assert sorted(rows) == [
+        (date(2026, 10, 15), "a", 15, 0, 15, pytest.approx(0.015), 2),
+        (date(2026, 10, 15), "b", 1, 0, 1, pytest.approx(0.001), 1),
+        (date(2026, 10, 16), "a", 7, 0, 7, pytest.approx(0.007), 1),
+    ]
@@ -0,0 +1,95 @@
+"""
+Tests for the compiled routing keyword matcher.
+
+The matcher replaces per-keyword ``in``/``re.search`` scans in the router and
+the modular scorers, so these tests check it against those naive semantics
+on a randomized corpus. Timing and a routing-equivalence check over a
+prompt corpus live in ``benchmark_keyword_matcher.py``.
+"""
+
+import random
+import re
+
+from monkey_coder.core.keyword_matcher import (
+    ROUTING_KEYWORDS,
+    KeywordMatcher,
+    get_routing_matcher,
+)
+from monkey_coder.core.routing import AdvancedRouter
+from monkey_coder.core.scoring import ScoringManager
+
+VOCABULARY = sorted({kw for keywords in ROUTING_KEYWORDS.values() for kw in keywords})
+NOISE = [
+    "the", "a", "of", "to", "detail", "fastest", "unittest", "retest", "classic",
+    "authority", "x_y", "foo-bar", "/arch", "/architecture", "/sec", "/secure", "/dev",
+]
+
+
+def _random_prompt(rng: random.Random) -> str:
+    words = [rng.choice(VOCABULARY if rng.random() < 0.4 else NOISE) for _ in range(rng.randint(1, 60))]
+    return rng.choice([" ", "_", "-", "", ". "]).join(words).lower()
+
+
+def _naive_flags(text: str, keyword: str):
+    escaped = re.escape(keyword)
+    return (
+        keyword in text,
+        re.search(r'\b' + escaped + r'\b', text) is not None,
+        re.search(escaped + r'\b', text) is not None,
+    )
+
+
+class TestKeywordMatcher:
+    """Behavioural tests for KeywordMatcher."""
+
+    def test_matches_naive_semantics(self):
+        """Hit table agrees with ``in`` and word-boundary regex searches."""
+        matcher = KeywordMatcher(ROUTING_KEYWORDS)
+        rng = random.Random(1234)
+
+        for _ in range(500):
+            text = _random_prompt(rng)
+            hits = matcher.match(text)
+            for keyword in VOCABULARY:
+                expected = _naive_flags(text, keyword)
+                actual = (keyword in hits, hits.has_word(keyword), hits.has_word_end(keyword))
+                assert actual == expected, (keyword, text)
+
+    def test_overlapping_and_prefix_hits(self):
+        """Keywords nested in or overlapping other keywords are all reported."""
+        matcher = KeywordMatcher({"kw": ("test", "unittest", "testing", "auth", "authentication")})
+        hits = matcher.match("unittesting authentication")
+
+        assert set(hits.keywords()) == {"test", "unittest", "testing", "auth", "authentication"}
+        assert hits.has_word("authentication")
+        assert not hits.has_word("auth")
+        assert not hits.has_word("test")
+        assert hits.count("kw") == 5
+        assert hits.count("kw", words=True) == 1
+
+    def test_category_counts(self):
+        """Category counts follow the vocabulary lists."""
+        matcher = KeywordMatcher({"steps": ("first", "then", "finally"), "other": ("then",)})
+        hits = matcher.match("first do this, then that")
+
+        assert hits.count("steps") == 2
+        assert hits.count("other") == 1
+        assert hits.any("steps")
+        assert not hits.any("missing")
+        assert hits.by_category() == {"steps": 2, "other": 1}
+
+    def test_last_match_is_memoised(self):
+        """Repeated analysis of the same prompt reuses the hit table."""
+        matcher = get_routing_matcher()
+        text = "design a secure api"
+
+        assert matcher.match(text) is matcher.match(text)
+
+    def test_router_and_scorers_share_matcher(self):
+        """The router and the modular scorers score from one compiled matcher."""
+        router = AdvancedRouter()
+        manager = ScoringManager()
+
+        assert router.keyword_matcher is get_routing_matcher()
+        assert manager.complexity_scorer.matcher is router.keyword_matcher
+        assert manager.context_classifier.matcher is router.keyword_matcher
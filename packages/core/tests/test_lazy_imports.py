@@ -0,0 +1,64 @@
+"""
+Tests for deferred imports of heavy ML dependencies.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+from monkey_coder.utils import lazy_imports
+from monkey_coder.utils.lazy_imports import module_available, optional_import, require
+
+CORE_DIR = Path(__file__).resolve().parents[1]
+
+
+def test_missing_module_is_reported_without_raising():
+    assert not module_available("monkey_coder_no_such_package")
+    assert optional_import("monkey_coder_no_such_package") is None
+    with pytest.raises(ImportError, match="pip install monkey-coder-extra"):
+        require("monkey_coder_no_such_package", "a test feature", "monkey-coder-extra")
+
+
+def test_optional_import_caches_the_module():
+    assert module_available("json")
+    assert optional_import("json") is sys.modules["json"]
+    assert lazy_imports._imported["json"] is sys.modules["json"]
+
+
+def test_broken_install_imports_as_none(tmp_path, monkeypatch):
+    (tmp_path / "monkey_coder_broken_pkg.py").write_text("raise RuntimeError('bad build')\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    assert module_available("monkey_coder_broken_pkg")
+    assert optional_import("monkey_coder_broken_pkg") is None
+
+
+def test_startup_imports_leave_heavy_stacks_unloaded(tmp_path):
+    # Stand-in packages record whether anything imported them
+    for name in lazy_imports.HEAVY_MODULES:
+        package = tmp_path / name
+        package.mkdir()
+        (package / "__init__.py").write_text("import os\nos.environ['IMPORTED_' + __name__.upper()] = '1'\n")
+
+    probe = textwrap.dedent("""
+        import json, os, sys
+        import monkey_coder.quantum
+        import monkey_coder.context
+        from monkey_coder.quantum import neural_network
+        print(json.dumps({
+            "imported": sorted(k for k in os.environ if k.startswith("IMPORTED_")),
+            "tensorflow_available": neural_network.TENSORFLOW_AVAILABLE,
+        }))
+    """)
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(tmp_path), str(CORE_DIR)]))
+    proc = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, env=env, cwd=CORE_DIR)
+    assert proc.returncode == 0, proc.stderr[-2000:]
+
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    assert result["imported"] == []
+    assert result["tensorflow_available"] is True
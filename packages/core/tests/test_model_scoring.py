@@ -0,0 +1,138 @@
+"""
+Tests for the vectorized model scoring matrix.
+
+Scores must match the scalar ``_calculate_model_score`` loop exactly so
+routing decisions do not change; batch scoring is benchmarked against it.
+"""
+
+import random
+import time
+
+import numpy as np
+import pytest
+
+from monkey_coder.core.model_scoring import ModelScoringMatrix
+from monkey_coder.core.quantum_routing import QuantumAdvancedRouter
+from monkey_coder.core.routing import AdvancedRouter, ModelCapabilities
+from monkey_coder.models import MODEL_REGISTRY, ProviderType
+
+
+def _random_requirements(rng: random.Random):
+    return {
+        "code_generation": rng.uniform(0.3, 1.0),
+        "reasoning": rng.uniform(0.3, 1.0),
+        "context_window": rng.choice([4096, 16384, 65536, 200000, 1000000]),
+        "reliability": rng.uniform(0.5, 1.0),
+    }
+
+
+def _scalar_scores(router, requirements):
+    scores = {}
+    for provider, models in MODEL_REGISTRY.items():
+        for model in models:
+            if (provider, model) in router.model_capabilities:
+                capabilities = router.model_capabilities[(provider, model)]
+                scores[(provider, model)] = router._calculate_model_score(capabilities, requirements)
+    return scores
+
+
+class TestModelScoringMatrix:
+    """Equivalence and API tests for ModelScoringMatrix."""
+
+    def test_scores_match_scalar_formula(self):
+        """Vectorized scores are bit-identical to the scalar loop, in registry order."""
+        router = AdvancedRouter(enable_cache=False)
+        rng = random.Random(11)
+
+        for _ in range(200):
+            requirements = _random_requirements(rng)
+            expected = _scalar_scores(router, requirements)
+            actual = router._score_models(requirements)
+            assert list(actual) == list(expected)
+            assert actual == expected
+
+    def test_batch_matches_single_scores(self):
+        router = AdvancedRouter(enable_cache=False)
+        rng = random.Random(5)
+        batch = [_random_requirements(rng) for _ in range(64)]
+
+        keys, scores = router.score_models_batch(batch)
+
+        assert scores.shape == (64, len(keys))
+        for row, requirements in zip(scores, batch):
+            assert dict(zip(keys, row.tolist())) == router._score_models(requirements)
+
+    def test_unavailable_providers_are_masked(self):
+        router = AdvancedRouter(enable_cache=False)
+        requirements = _random_requirements(random.Random(1))
+        available = [ProviderType.ANTHROPIC, ProviderType.GROQ]
+
+        scores = router._score_models(requirements, available_providers=available)
+        keys, batch = router.score_models_batch([requirements], available_providers=available)
+
+        assert scores
+        assert {provider for provider, _ in scores} <= set(available)
+        assert keys == list(scores)
+        assert batch[0].tolist() == list(scores.values())
+
+    def test_matrix_rebuilds_when_capabilities_replaced(self):
+        router = AdvancedRouter(enable_cache=False)
+        provider, model = next(iter(router.scoring_matrix.keys))
+        router.model_capabilities = {
+            (provider, model): ModelCapabilities(
+                code_generation=1.0, reasoning=1.0, context_window=1000, latency_ms=100,
+                cost_per_token=0.0, reliability=1.0, specializations=["fast"],
+            )
+        }
+
+        assert router.scoring_matrix.keys == [(provider, model)]
+        assert router.scoring_matrix.is_fast.tolist() == [True]
+
+    def test_quantum_adjustments_match_scalar_rules(self):
+        """Provider bonuses, premium bonus, fast-model bonus and clipping are applied per model."""
+        router = QuantumAdvancedRouter(enable_cache=False)
+        requirements = _random_requirements(random.Random(9))
+        performance = {
+            ProviderType.OPENAI: {"success_rate": 0.9, "avg_quality": 0.8, "avg_latency": 3.0},
+            ProviderType.GROQ: {"success_rate": 0.5, "avg_quality": 0.4, "avg_latency": 0.2},
+        }
+        constraints = {"is_premium_user": True, "max_latency_seconds": 2.0}
+
+        scores = router._score_models_with_quantum_features(
+            requirements,
+            {"provider_performance_data": performance},
+            {"resource_constraints": constraints},
+        )
+
+        for (provider, model), base in router._score_models(requirements).items():
+            expected = base
+            if provider in performance:
+                perf = performance[provider]
+                expected += perf["success_rate"] * 0.1 + perf["avg_quality"] * 0.1 - min(perf["avg_latency"] / 10.0, 0.1)
+            expected += 0.05
+            if "fast" in router.model_capabilities[(provider, model)].specializations:
+                expected += 0.15
+            assert scores[(provider, model)] == pytest.approx(max(0.0, min(1.0, expected)))
+
+
+class TestModelScoringPerformance:
+    """Throughput of batch scoring versus the per-model Python loop."""
+
+    @pytest.mark.slow
+    def test_batch_scoring_faster_than_scalar_loop(self):
+        router = AdvancedRouter(enable_cache=False)
+        rng = random.Random(2)
+        batch = [_random_requirements(rng) for _ in range(2000)]
+        matrix = ModelScoringMatrix(router.model_capabilities)
+        vectors = np.stack([matrix.requirement_vector(r) for r in batch])
+
+        start = time.perf_counter()
+        for requirements in batch:
+            _scalar_scores(router, requirements)
+        scalar_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        matrix.score_batch(vectors)
+        batch_time = time.perf_counter() - start
+
+        assert batch_time * 10 < scalar_time, f"batch {batch_time:.4f}s vs scalar {scalar_time:.4f}s"
@@ -3,12 +3,19 @@ Tests for the Functional Quantum Execution Module
 """
 
 import asyncio
+import threading
 import pytest
 from unittest.mock import Mock, patch
 import time
 
 from monkey_coder.quantum import QuantumManager, quantum_task, CollapseStrategy
-from monkey_coder.quantum.manager import TaskVariation, QuantumResult
+from monkey_coder.quantum.manager import (
+    QuantumResult,
+    TaskVariation,
+    get_max_concurrency,
+    set_max_concurrency,
+    variation_cancelled,
+)
 
 
 class TestQuantumManager:
@@ -356,6 +363,145 @@ class TestQuantumTaskDecorator:
         assert result == 10
 
 
+class TestCancellationAndSharedResources:
+    """Cancellation of losing variations, shared pools, the global limit and timing histograms."""
+    
+    @pytest.mark.asyncio
+    async def test_first_success_cancels_async_losers(self):
+        manager = QuantumManager(max_workers=2)
+        cancelled = []
+        
+        async def task(delay, name):
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                cancelled.append(name)
+                raise
+            return name
+        
+        variations = [
+            TaskVariation(id="slow", task=task, params={"delay": 2.0, "name": "slow"}),
+            TaskVariation(id="fast", task=task, params={"delay": 0.01, "name": "fast"}),
+        ]
+        start = time.time()
+        result = await manager.execute_quantum_task(variations, collapse_strategy=CollapseStrategy.FIRST_SUCCESS)
+        
+        assert result.value == "fast"
+        assert time.time() - start < 1.0
+        assert cancelled == ["slow"]
+        
+        histograms = manager.get_metrics()["variation_latency"]
+        assert histograms["fast"]["success"]["count"] == 1
+        assert histograms["slow"]["cancelled"]["count"] == 1
+        assert manager.get_metrics()["executions"][-1]["cancelled_variations"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_sync_losers_see_cancellation_and_queued_ones_never_start(self):
+        manager = QuantumManager(max_workers=2)
+        started = []
+        stopped_early = threading.Event()
+        
+        def task(name, delay):
+            started.append(name)
+            deadline = time.time() + delay
+            while time.time() < deadline:
+                if variation_cancelled():
+                    stopped_early.set()
+                    return None
+                time.sleep(0.005)
+            return name
+        
+        variations = [
+            TaskVariation(id="fast", task=task, params={"name": "fast", "delay": 0.05}),
+            TaskVariation(id="slow", task=task, params={"name": "slow", "delay": 3.0}),
+            TaskVariation(id="queued", task=task, params={"name": "queued", "delay": 3.0}),
+        ]
+        result = await manager.execute_quantum_task(variations, collapse_strategy=CollapseStrategy.FIRST_SUCCESS)
+        
+        assert result.value == "fast"
+        assert stopped_early.wait(1.0)
+        await asyncio.sleep(0.05)
+        assert "queued" not in started
+    
+    @pytest.mark.asyncio
+    async def test_other_strategies_wait_for_every_variation(self):
+        manager = QuantumManager(max_workers=2)
+        
+        async def task(delay):
+            await asyncio.sleep(delay)
+            return delay
+        
+        variations = [TaskVariation(id=f"v{i}", task=task, params={"delay": d}) for i, d in enumerate((0.01, 0.05))]
+        result = await manager.execute_quantum_task(variations, collapse_strategy=CollapseStrategy.COMBINED)
+        
+        assert result.metadata["count"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_timeout_cancels_and_reports(self):
+        manager = QuantumManager(timeout=0.05)
+        
+        async def task():
+            await asyncio.sleep(2.0)
+        
+        result = await manager.execute_quantum_task([TaskVariation(id="stuck", task=task, params={})])
+        
+        assert result.success is False
+        assert isinstance(result.error, asyncio.TimeoutError)
+        assert manager.get_variation_histograms()["stuck"]["timeout"]["count"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_global_concurrency_limit_spans_managers(self):
+        previous = get_max_concurrency()
+        set_max_concurrency(2)
+        running = 0
+        peak = 0
+        
+        async def task():
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return True
+        
+        try:
+            managers = [QuantumManager(max_workers=4), QuantumManager(max_workers=8)]
+            await asyncio.gather(*(
+                manager.execute_quantum_task(
+                    [TaskVariation(id=f"v{i}", task=task, params={}) for i in range(4)],
+                    collapse_strategy=CollapseStrategy.COMBINED,
+                )
+                for manager in managers
+            ))
+        finally:
+            set_max_concurrency(previous)
+        
+        assert peak == 2
+    
+
+    def test_execution_history_is_bounded(self):
+        """Long-lived managers keep only recent executions, plus running totals."""
+        manager = QuantumManager(execution_history=2)
+        for n in range(5):
+            manager._record_metrics(CollapseStrategy.FIRST_SUCCESS, 1, float(n), success=n % 2 == 0)
+
+        metrics = manager.get_metrics()
+
+        assert [e["execution_time"] for e in metrics["executions"]] == [3.0, 4.0]
+        assert metrics["total_executions"] == 5
+        assert metrics["successful_executions"] == 3
+
+    def test_managers_share_thread_pools(self):
+        assert QuantumManager(max_workers=3)._executor is QuantumManager(max_workers=3)._executor
+        assert QuantumManager(max_workers=3)._executor is not QuantumManager(max_workers=5)._executor
+        
+        @quantum_task(variations=[{"id": "a"}, {"id": "b"}])
+        def decorated(x):
+            return x
+        
+        assert decorated.quantum_manager._executor is QuantumManager(max_workers=4)._executor
+
+
 class TestQuantumBenchmarks:
     """Benchmark tests for quantum execution performance."""
     
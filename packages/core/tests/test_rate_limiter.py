@@ -0,0 +1,133 @@
+"""
+Tests for the atomic Redis rate limiter and its bounded in-process fallback.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+import redis.asyncio as aioredis
+from fastapi import HTTPException
+
+from monkey_coder.middleware import rate_limiter
+from monkey_coder.middleware.rate_limiter import RedisRateLimiter
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture
+def server():
+    pytest.importorskip("lupa")  # fakeredis runs Lua scripts through lupa
+    return fakeredis.FakeServer()
+
+
+def limiter_for(server, **kwargs):
+    return RedisRateLimiter(client=fakeredis.FakeAsyncRedis(server=server, decode_responses=True), **kwargs)
+
+
+def unreachable_limiter(**kwargs):
+    return RedisRateLimiter(client=aioredis.from_url("redis://127.0.0.1:1", socket_connect_timeout=0.2), **kwargs)
+
+
+def request_from(ip):
+    return SimpleNamespace(client=SimpleNamespace(host=ip))
+
+
+class TestSlidingWindow:
+    @pytest.mark.asyncio
+    async def test_limit_is_enforced_with_retry_after(self, server):
+        limiter = limiter_for(server, max_requests=3, window_seconds=60)
+        for _ in range(3):
+            await limiter.check_rate_limit(request_from("1.1.1.1"), "login")
+
+        with pytest.raises(HTTPException) as exc:
+            await limiter.check_rate_limit(request_from("1.1.1.1"), "login")
+
+        assert exc.value.status_code == 429
+        assert 59 <= int(exc.value.headers["Retry-After"]) <= 60
+        await limiter.check_rate_limit(request_from("2.2.2.2"), "login")
+
+    @pytest.mark.asyncio
+    async def test_concurrent_workers_cannot_overshoot(self, server):
+        workers = [limiter_for(server, max_requests=10, window_seconds=60) for _ in range(4)]
+
+        decisions = await asyncio.gather(*(workers[n % 4].hit("1.1.1.1", "execute") for n in range(50)))
+
+        assert sum(d.allowed for d in decisions) == 10
+        assert {d.backend for d in decisions} == {"redis"}
+
+    @pytest.mark.asyncio
+    async def test_requests_leave_the_window(self, server):
+        limiter = limiter_for(server, max_requests=2, window_seconds=0.1)
+        assert [(await limiter.hit("ip", "r")).allowed for _ in range(3)] == [True, True, False]
+
+        await asyncio.sleep(0.15)
+
+        assert (await limiter.hit("ip", "r")).allowed
+
+
+class TestTokenBucket:
+    @pytest.mark.asyncio
+    async def test_burst_then_refill(self, server):
+        limiter = limiter_for(server, mode="token_bucket", max_requests=4, window_seconds=0.2)
+
+        burst = [await limiter.hit("ip", "r") for _ in range(5)]
+        assert [d.allowed for d in burst] == [True] * 4 + [False]
+        assert 0 < burst[-1].retry_after <= 0.05
+
+        await asyncio.sleep(0.06)  # one token refills every 50 ms
+        assert (await limiter.hit("ip", "r")).allowed
+        assert not (await limiter.hit("ip", "r")).allowed
+
+    def test_unknown_mode_is_rejected(self):
+        with pytest.raises(ValueError, match="leaky"):
+            RedisRateLimiter(client=fakeredis.FakeAsyncRedis(), mode="leaky")
+
+
+class TestFallback:
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("mode", ["sliding_window", "token_bucket"])
+    async def test_unreachable_redis_uses_local_limits(self, mode):
+        limiter = unreachable_limiter(mode=mode, max_requests=2, window_seconds=60)
+
+        decisions = [await limiter.hit("ip", "r") for _ in range(3)]
+
+        assert [d.allowed for d in decisions] == [True, True, False]
+        assert {d.backend for d in decisions} == {"local"}
+
+    @pytest.mark.asyncio
+    async def test_redis_is_retried_only_after_the_backoff(self, monkeypatch):
+        limiter = unreachable_limiter(max_requests=100, window_seconds=60)
+        calls = 0
+        redis_hit = limiter._redis_hit
+
+        async def counting(*args):
+            nonlocal calls
+            calls += 1
+            return await redis_hit(*args)
+
+        monkeypatch.setattr(limiter, "_redis_hit", counting)
+        for _ in range(5):
+            await limiter.hit("ip", "r")
+        assert calls == 1
+
+        limiter._redis_down_until = 0
+        await limiter.hit("ip", "r")
+        assert calls == 2
+
+    @pytest.mark.asyncio
+    async def test_fallback_store_is_bounded_and_swept(self, monkeypatch):
+        monkeypatch.setenv("RATE_LIMIT_FALLBACK_MAX_KEYS", "3")
+        limiter = unreachable_limiter(max_requests=5, window_seconds=60)
+        clock = [1000.0]
+        monkeypatch.setattr(rate_limiter.time, "time", lambda: clock[0])
+
+        for n in range(10):
+            await limiter.hit(f"10.0.0.{n}", "r")
+        assert list(limiter._fallback_store) == [
+            "rate_limit:10.0.0.7:r", "rate_limit:10.0.0.8:r", "rate_limit:10.0.0.9:r"
+        ]
+
+        clock[0] += 120  # all keys idle for longer than the window
+        await limiter.hit("10.0.0.42", "r")
+        assert list(limiter._fallback_store) == ["rate_limit:10.0.0.42:r"]
@@ -0,0 +1,138 @@
+"""
+Tests for the bounded routing history and its running aggregates.
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from monkey_coder.core.quantum_routing import QuantumAdvancedRouter
+from monkey_coder.core.routing import AdvancedRouter, RoutingDecision
+from monkey_coder.core.routing_history import RoutingHistory
+from monkey_coder.models import (
+    ExecuteRequest,
+    ExecutionContext,
+    PersonaConfig,
+    PersonaType,
+    ProviderType,
+    TaskType,
+)
+
+
+def _decision(provider=ProviderType.OPENAI, confidence=0.8, complexity=0.5, level="moderate", **metadata):
+    return RoutingDecision(
+        provider=provider,
+        model="gpt-4.1",
+        persona=PersonaType.DEVELOPER,
+        complexity_score=complexity,
+        context_score=0.5,
+        capability_score=0.5,
+        confidence=confidence,
+        reasoning="test",
+        metadata={"complexity_level": level, "context_type": "code_generation", **metadata},
+    )
+
+
+def _request(prompt):
+    return ExecuteRequest(
+        prompt=prompt,
+        task_type=TaskType.CODE_GENERATION,
+        context=ExecutionContext(user_id="history_test"),
+        persona_config=PersonaConfig(persona=PersonaType.DEVELOPER),
+    )
+
+
+class TestRoutingHistory:
+    """Ring buffer and aggregate behaviour."""
+
+    def test_capacity_is_bounded_and_keeps_most_recent(self):
+        history = RoutingHistory(capacity=3)
+        for i in range(5):
+            history.record(_decision(confidence=i / 10))
+
+        assert len(history) == 3
+        assert history.total == 5
+        assert [r.confidence for r in history] == [0.2, 0.3, 0.4]
+        assert history[-1].confidence == 0.4
+        assert history[0].confidence == 0.2
+        assert [r.confidence for r in history.recent(2)] == [0.3, 0.4]
+        assert [r.confidence for r in history[-10:]] == [0.2, 0.3, 0.4]
+        with pytest.raises(IndexError):
+            history[3]
+
+    def test_records_are_compact(self):
+        history = RoutingHistory()
+        entry = history.record(_decision(model_scores={"gpt-4.1": 0.9}, cached=True))
+
+        assert not hasattr(entry, "__dict__")
+        assert entry.cached is True
+        assert entry.to_dict()["provider"] == "openai"
+        assert "model_scores" not in entry.to_dict()
+
+    def test_aggregates_match_full_scan(self):
+        rng = random.Random(3)
+        history = RoutingHistory(capacity=16)
+        decisions = [
+            _decision(
+                provider=rng.choice([ProviderType.OPENAI, ProviderType.ANTHROPIC, ProviderType.GOOGLE]),
+                confidence=rng.random(),
+                complexity=rng.random(),
+                level=rng.choice(["simple", "moderate", "complex"]),
+            )
+            for _ in range(200)
+        ]
+        for decision in decisions:
+            history.record(decision)
+
+        stats = history.stats()
+        confidences = [d.confidence for d in decisions]
+        complexities = [d.complexity_score for d in decisions]
+        assert stats["total"] == 200
+        assert stats["retained"] == 16
+        assert stats["avg_confidence_score"] == pytest.approx(np.mean(confidences))
+        assert stats["confidence_std"] == pytest.approx(np.std(confidences))
+        assert stats["avg_complexity_score"] == pytest.approx(np.mean(complexities))
+        assert stats["complexity_std"] == pytest.approx(np.std(complexities))
+        assert stats["confidence_histogram"] == np.histogram(confidences, bins=10, range=(0, 1))[0].tolist()
+        assert sum(stats["provider_counts"].values()) == 200
+        assert stats["provider_counts"]["openai"] == sum(d.provider == ProviderType.OPENAI for d in decisions)
+        assert stats["complexity_distribution"]["complex"] == sum(
+            d.metadata["complexity_level"] == "complex" for d in decisions
+        )
+
+    def test_clear_resets_aggregates(self):
+        history = RoutingHistory(capacity=2)
+        history.record(_decision(confidence=1.0))
+        history.clear()
+
+        assert len(history) == 0
+        assert history.stats()["total"] == 0
+        assert sum(history.stats()["confidence_histogram"]) == 0
+
+
+class TestRouterHistoryIntegration:
+    """Routers record into the bounded history and report from its aggregates."""
+
+    def test_router_history_is_bounded(self):
+        router = AdvancedRouter(enable_cache=False, history_capacity=4)
+        for i in range(6):
+            router.route_request(_request(f"Write function number {i}"))
+
+        assert len(router.routing_history) == 4
+        debug = router.get_routing_debug_info(_request("Write one more function"))
+        assert debug["routing_history_count"] == 7
+        assert debug["routing_statistics"]["provider_counts"]
+
+    def test_quantum_statistics_read_aggregates(self):
+        router = QuantumAdvancedRouter(enable_cache=False, history_capacity=2)
+        router.route_request(_request("Design a scalable service"))
+        for confidence in (0.2, 0.5, 0.9):
+            router.quantum_routing_history.record(_decision(confidence=confidence), state_vector=np.zeros(112))
+
+        stats = router.get_quantum_routing_statistics()
+        assert stats["total_quantum_routes"] == 3
+        assert len(router.quantum_routing_history) == 2
+        assert router.quantum_routing_history[-1].state_vector is not None
+        assert sum(stats["confidence_histogram"]) == 3
+        assert stats["avg_confidence_score"] == pytest.approx(np.mean([0.2, 0.5, 0.9]))
@@ -0,0 +1,179 @@
+"""
+Tests for pre-framed SSE encoding, delta coalescing and the streaming execute pipeline.
+"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from monkey_coder.app.streaming_execute import StreamingExecuteRequest, create_sse_stream
+from monkey_coder.providers.streaming_adapter import FakeStreamProvider, StreamChunk
+from monkey_coder.streaming import sse_encoder
+from monkey_coder.streaming.sse_encoder import SSEEncoder, coalesce_chunks, encode_event
+
+
+def parse_frames(body: bytes):
+    """Split an SSE body into (fields, data) per event."""
+    events = []
+    for block in body.decode().split("\n\n"):
+        if not block:
+            continue
+        fields = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((fields, json.loads(fields["data"]) if "data" in fields else None))
+    return events
+
+
+async def deltas(texts, delay=0.0, finish_last=False):
+    for i, text in enumerate(texts, 1):
+        if delay:
+            await asyncio.sleep(delay)
+        yield StreamChunk(content=text, index=i, tokens=1,
+                          finish_reason="stop" if finish_last and i == len(texts) else None)
+
+
+async def collect(generator):
+    return [item async for item in generator]
+
+
+class TestSSEEncoder:
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_frames_match_the_legacy_wire_format(self, monkeypatch, use_orjson):
+        if not use_orjson:
+            monkeypatch.setattr(sse_encoder, "orjson", None)
+        encoder = SSEEncoder("abc")
+        body = (
+            encoder.event("status", {"status": "started"})
+            + encoder.message("héllo\nworld", 3)
+            + encoder.event("progress", {"chunks": 5}, with_id=False)
+            + encoder.event("complete", {"ok": True}, suffix="complete")
+        )
+
+        assert isinstance(body, bytes)
+        assert [(fields.get("id"), fields["event"], data) for fields, data in parse_frames(body)] == [
+            ("abc", "status", {"status": "started"}),
+            ("abc-3", "message", {"content": "héllo\nworld", "index": 3}),
+            (None, "progress", {"chunks": 5}),
+            ("abc-complete", "complete", {"ok": True}),
+        ]
+
+    def test_encode_event_and_comment(self):
+        assert encode_event("error", {"error": "x"}, event_id="s-error") == b'id: s-error\nevent: error\ndata: {"error":"x"}\n\n'
+        assert SSEEncoder.comment("heartbeat") == b": heartbeat\n\n"
+
+
+class TestCoalesceChunks:
+    @pytest.mark.asyncio
+    async def test_queued_deltas_merge_up_to_the_size_bound(self):
+        frames = await collect(coalesce_chunks(deltas(["ab"] * 10), max_chars=6, max_delay=0.05))
+
+        assert [f.content for f in frames] == ["ababab", "ababab", "ababab", "ab"]
+        assert [f.index for f in frames] == [1, 2, 3, 4]
+        assert [f.deltas for f in frames] == [3, 3, 3, 1]
+        assert sum(f.tokens for f in frames) == 10
+
+    @pytest.mark.asyncio
+    async def test_slow_deltas_are_flushed_after_max_delay(self):
+        frames = await collect(coalesce_chunks(deltas(["a", "b", "c"], delay=0.05), max_delay=0.005))
+
+        assert [f.content for f in frames] == ["a", "b", "c"]
+
+    @pytest.mark.asyncio
+    async def test_finish_reason_ends_the_stream(self):
+        async def source():
+            async for chunk in deltas(["x", "y"], finish_last=True):
+                yield chunk
+            yield StreamChunk(content="after finish", index=3)
+
+        frames = await collect(coalesce_chunks(source()))
+
+        assert "".join(f.content for f in frames) == "xy"
+        assert frames[-1].finish_reason == "stop"
+
+    @pytest.mark.asyncio
+    async def test_upstream_errors_follow_the_buffered_frame(self):
+        async def source():
+            yield StreamChunk(content="partial", index=1)
+            raise RuntimeError("provider dropped")
+
+        received = []
+        with pytest.raises(RuntimeError, match="provider dropped"):
+            async for frame in coalesce_chunks(source()):
+                received.append(frame.content)
+        assert received == ["partial"]
+
+    @pytest.mark.asyncio
+    async def test_slow_consumer_pauses_the_provider(self):
+        produced = 0
+        closed = asyncio.Event()
+
+        async def endless():
+            nonlocal produced
+            try:
+                while True:
+                    produced += 1
+                    yield StreamChunk(content="t", index=produced)
+                    await asyncio.sleep(0)
+            finally:
+                closed.set()
+
+        frames = coalesce_chunks(endless(), max_chars=4, max_delay=0, max_pending=8)
+        first = await frames.__anext__()
+        await asyncio.sleep(0.05)  # client stalls
+        read_ahead = produced
+        await asyncio.sleep(0.05)
+
+        assert first.content
+        assert produced == read_ahead <= 4 + 8 + 2
+        await frames.aclose()
+        assert closed.is_set()
+
+
+def fake_executor(content):
+    provider = FakeStreamProvider(content, chunk_chars=3)
+    registry = SimpleNamespace(get_provider=lambda name: provider if name == "openai" else None)
+    return SimpleNamespace(provider_registry=registry)
+
+
+class TestStreamingExecute:
+    @pytest.mark.asyncio
+    async def test_stream_yields_one_bytes_frame_per_event(self):
+        text = "def add(a, b):\n    return a + b"
+        request = StreamingExecuteRequest(prompt="add", stream_options={"coalesce_ms": 50, "max_frame_chars": 12})
+
+        frames = await collect(create_sse_stream(request, fake_executor(text), "s1"))
+        events = parse_frames(b"".join(frames))
+
+        assert all(isinstance(frame, bytes) for frame in frames)
+        assert len(frames) == len(events)
+        assert events[0][0]["event"] == "status"
+        messages = [data for fields, data in events if fields["event"] == "message"]
+        assert 1 < len(messages) < len(text) / 3
+        assert "".join(m["content"] for m in messages) == text
+        fields, complete = events[-1]
+        assert (fields["id"], fields["event"]) == ("s1-complete", "complete")
+        assert complete["result"] == text
+        assert complete["model"] == "fake-stream"
+        assert complete["ttft_ms"] is not None
+
+    @pytest.mark.asyncio
+    async def test_full_result_payload_is_optional(self):
+        request = StreamingExecuteRequest(prompt="x", stream_options={"include_result": False})
+
+        frames = await collect(create_sse_stream(request, fake_executor("ab"), "s2"))
+        fields, complete = parse_frames(b"".join(frames))[-1]
+
+        assert fields["event"] == "complete"
+        assert "result" not in complete
+        assert complete["status"] == "completed"
+
+    @pytest.mark.asyncio
+    async def test_unknown_provider_sends_an_error_event(self):
+        request = StreamingExecuteRequest(prompt="x", provider="nope")
+
+        frames = await collect(create_sse_stream(request, fake_executor(""), "s3"))
+        fields, error = parse_frames(b"".join(frames))[-1]
+
+        assert (fields["id"], fields["event"]) == ("s3-error", "error")
+        assert "nope" in error["error"]
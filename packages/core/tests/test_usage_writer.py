@@ -0,0 +1,220 @@
+"""
+Tests for the write-behind usage event writer and its use in PricingMiddleware.
+"""
+
+import asyncio
+import json
+import os
+
+import httpx
+import pytest
+from fastapi import FastAPI, Response
+
+from monkey_coder.database.models import USAGE_EVENT_COLUMNS, UsageEvent
+from monkey_coder.pricing.middleware import PricingMiddleware, attach_usage_info_to_response
+from monkey_coder.pricing import usage_writer
+from monkey_coder.pricing.usage_writer import UsageEventWriter
+
+
+def make_event(n=0):
+    return UsageEvent(
+        api_key_hash="k", execution_id=f"exec-{n}", task_type="code_generation",
+        tokens_input=10, tokens_output=20, tokens_total=30,
+        provider="openai", model="gpt-4.1", model_cost_input=1e-6, model_cost_output=3e-6,
+        cost_input=1e-5, cost_output=6e-5, cost_total=7e-5,
+        execution_time=0.1, status="completed", metadata={"n": n},
+    )
+
+
+class FakeSink:
+    """Records batches; can fail or stall to simulate Postgres trouble."""
+
+    def __init__(self, delay=0.0):
+        self.batches = []
+        self.delay = delay
+        self.fail = False
+
+    async def __call__(self, events, use_copy=True):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("database unavailable")
+        self.batches.append((use_copy, [e.execution_id for e in events]))
+        return len(events)
+
+    @property
+    def written(self):
+        return [execution_id for _, ids in self.batches for execution_id in ids]
+
+
+@pytest.fixture
+def sink():
+    return FakeSink()
+
+
+@pytest.fixture
+def writer(sink, tmp_path):
+    return UsageEventWriter(sink, batch_size=3, flush_interval=0.05, flush_timeout=0.2,
+                            spill_path=tmp_path / "spill.jsonl")
+
+
+def test_record_matches_column_order():
+    event = make_event(1)
+    record = dict(zip(USAGE_EVENT_COLUMNS, event.to_record()))
+
+    assert record["execution_id"] == "exec-1"
+    assert record["cost_total"] == event.cost_total
+    assert json.loads(record["metadata"]) == {"n": 1}
+
+
+class TestUsageEventWriter:
+    @pytest.mark.asyncio
+    async def test_full_batch_is_written_with_one_copy(self, writer, sink):
+        for n in range(3):
+            writer.submit(make_event(n))
+        assert sink.batches == []  # submit never writes inline
+
+        await asyncio.sleep(0.01)
+
+        assert sink.batches == [(True, ["exec-0", "exec-1", "exec-2"])]
+        await writer.close()
+
+    @pytest.mark.asyncio
+    async def test_partial_batch_is_written_after_flush_interval(self, writer, sink):
+        writer.submit(make_event(0))
+        await asyncio.sleep(0.01)
+        assert sink.batches == []
+
+        await asyncio.sleep(0.1)
+
+        assert sink.written == ["exec-0"]
+        await writer.close()
+
+    @pytest.mark.asyncio
+    async def test_failed_batches_spill_and_replay_idempotently(self, writer, sink):
+        sink.fail = True
+        for n in range(4):
+            writer.submit(make_event(n))
+        assert await writer.flush() is False
+        assert writer.spill_path.exists()
+        assert writer.get_stats()["spilled"] == 4
+
+        sink.fail = False
+        writer.submit(make_event(4))
+        await asyncio.sleep(0.1)
+
+        assert sorted(sink.written) == [f"exec-{n}" for n in range(5)]
+        assert {use_copy for use_copy, ids in sink.batches if "exec-0" in ids} == {False}
+        assert not writer.get_stats()["spill_pending"]
+        await writer.close()
+
+    @pytest.mark.asyncio
+    async def test_slow_database_times_out_into_the_spill_file(self, tmp_path):
+        sink = FakeSink(delay=1.0)
+        writer = UsageEventWriter(sink, batch_size=10, flush_interval=10, flush_timeout=0.02,
+                                  spill_path=tmp_path / "spill.jsonl")
+        writer.submit(make_event(0))
+
+        await writer.close()
+
+        spilled = [UsageEvent.model_validate_json(line) for line in writer.spill_path.read_text().splitlines()]
+        assert [e.execution_id for e in spilled] == ["exec-0"]
+
+    @pytest.mark.asyncio
+    async def test_replay_keeps_unwritten_lines_and_skips_corrupt_ones(self, writer, sink):
+        lines = [make_event(n).model_dump_json() for n in range(5)]
+        writer.spill_path.write_text("\n".join(lines[:2] + ['{"truncated'] + lines[2:]) + "\n")
+        sink.fail = True
+
+        assert await writer.replay_spill() == 0
+        sink.fail = False
+        assert await writer.replay_spill() == 5
+
+        assert sink.written == [f"exec-{n}" for n in range(5)]
+        assert all(use_copy is False for use_copy, _ in sink.batches)
+        assert not writer.get_stats()["spill_pending"]
+
+    @pytest.mark.asyncio
+    async def test_full_buffer_spills_instead_of_growing(self, sink, tmp_path):
+        writer = UsageEventWriter(sink, batch_size=100, flush_interval=10, max_buffer=2,
+                                  spill_path=tmp_path / "spill.jsonl")
+        for n in range(3):
+            writer.submit(make_event(n))
+
+        assert writer.get_stats()["buffered"] == 2
+        assert writer.get_stats()["spilled"] == 1
+        await writer.close()
+        assert sink.written == ["exec-0", "exec-1"]
+
+    @pytest.mark.asyncio
+    async def test_close_flushes_and_later_events_spill(self, writer, sink):
+        writer.submit(make_event(0))
+        await writer.close()
+        writer.submit(make_event(1))
+
+        assert sink.written == ["exec-0"]
+        assert writer.get_stats()["spilled"] == 1
+
+    def test_default_spill_path_is_per_process(self, sink, tmp_path, monkeypatch):
+        monkeypatch.setenv("USAGE_SPILL_PATH", str(tmp_path / "usage.jsonl"))
+
+        writer = UsageEventWriter(sink)
+
+        assert writer.spill_path == tmp_path / f"usage.{os.getpid()}.jsonl"
+
+    @pytest.mark.asyncio
+    async def test_spill_files_of_stopped_workers_are_replayed(self, sink, tmp_path, monkeypatch):
+        monkeypatch.setenv("USAGE_SPILL_PATH", str(tmp_path / "usage.jsonl"))
+        monkeypatch.setattr(usage_writer, "_pid_running", lambda pid: pid != 1001)
+        (tmp_path / "usage.1001.jsonl").write_text(make_event(0).model_dump_json() + "\n")
+        (tmp_path / "usage.1001.jsonl.replay").write_text(make_event(1).model_dump_json() + "\n")
+        (tmp_path / "usage.1002.jsonl").write_text(make_event(2).model_dump_json() + "\n")
+        writer = UsageEventWriter(sink, flush_interval=10)
+
+        assert await writer.replay_spill() == 2
+
+        assert sorted(sink.written) == ["exec-0", "exec-1"]
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["usage.1002.jsonl"]  # live worker's file
+        assert await writer.replay_spill() == 0
+
+
+@pytest.mark.asyncio
+async def test_app_shutdown_closes_usage_writer(sink, tmp_path, monkeypatch):
+    from monkey_coder.app.main import app
+
+    writer = UsageEventWriter(sink, flush_interval=10, spill_path=tmp_path / "spill.jsonl")
+    monkeypatch.setattr(usage_writer, "_writer", writer)
+    writer.submit(make_event(0))
+
+    async with app.router.lifespan_context(app):
+        pass
+
+    assert sink.written == ["exec-0"]
+    assert usage_writer._writer is None
+
+
+@pytest.mark.asyncio
+async def test_middleware_response_does_not_wait_for_the_database(tmp_path):
+    sink = FakeSink(delay=0.5)
+    writer = UsageEventWriter(sink, batch_size=1, flush_interval=10, spill_path=tmp_path / "spill.jsonl")
+    app = FastAPI()
+    app.add_middleware(PricingMiddleware, writer=writer)
+
+    @app.post("/v1/execute")
+    async def execute():
+        response = Response("ok")
+        attach_usage_info_to_response(response, "exec-1", "code_generation", "openai", "gpt-4.1", 100, 50)
+        return response
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        response = await client.post("/v1/execute", headers={"Authorization": "Bearer sk-test"})
+        elapsed = loop.time() - start
+
+    assert response.status_code == 200
+    assert elapsed < 0.25
+    assert writer.get_stats()["submitted"] == 1
+    await writer.close()
+    assert sink.written == ["exec-1"]